@@ -1,15 +1,22 @@
 import sys
+import uuid
+import argparse
 import logging
+from pathlib import Path
 from typing import final
 from rich.console import Console
 from rich.panel import Panel
 
 from .schemas import UserQuery, OrchestratorActionType
 from .simple_agent import SimpleAgent
-from .storage import ProfileStore
+from .storage import CachedProfileStore
 from .user_profile import onboard_user
 from .intent_classifier import IntentClassifier
 from .orchestrator import Orchestrator
+from .prompts import BEST_EFFORT_SUFFIX
+from .batch import run_batch_file
+from .config import get_batch_config
+from .tools.http import configure_pool
 
 from dotenv import load_dotenv
 
@@ -19,21 +26,26 @@ MAX_CLARIFY_TURNS = 2
 console = Console()
 
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> int | None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "batch":
+        return batch_main(argv[1:])
+
     console.print(
         "[bold green]Personal Research & Learning Agent[/bold green] "
         "(Day 2- Intent and user profiling)"
     )
 
-    store = ProfileStore()
+    store = CachedProfileStore()  # saves are written behind and flushed at exit
     profile = store.load()
     if profile is None:
         profile = onboard_user()
         store.save(profile)
 
-    console.print("Type your question, or 'quit' to exist.\n")
+    console.print("Type your question, '+ <question>' to follow up on the last answer, or 'quit' to exist.\n")
 
     orchestrator = Orchestrator()
+    session_id = None  # shared by a question's clarification turns and its follow-ups
     
     while True:
         try:
@@ -49,6 +61,21 @@ def main() -> None:
             console.print("Goodbye!")
             break
 
+        if question.startswith("+") and session_id is not None:
+            try:
+                result = orchestrator.run(UserQuery(question=question[1:].strip(), session_id=session_id), profile)
+            except Exception as e:
+                console.print(f"[red]Error:[/red] {e}")
+                continue
+            if result.action.kind == OrchestratorActionType.need_clarification:
+                # the session is still being clarified (e.g. an earlier turn failed): ask, keep the session
+                console.print(f"\n[bold magenta]Clarify:[/bold magenta] {result.action.clarifying_question}")
+                console.print("[dim]Reply with '+ <details>' to continue this question.[/dim]\n")
+                continue
+            _print_answer(result.answer, result)
+            continue
+        session_id = uuid.uuid4().hex
+
         try:
             original_question = question
             current_question = original_question
@@ -56,7 +83,9 @@ def main() -> None:
             force_final = False
 
             for turn in range(MAX_CLARIFY_TURNS + 1):
-                result = orchestrator.run(UserQuery(question=current_question), profile, force_final=False)
+                result = orchestrator.run(
+                    UserQuery(question=current_question, session_id=session_id), profile, force_final=False
+                )
 
                 if result.action.kind == OrchestratorActionType.final:
                     # Able to generate final answer
@@ -79,33 +108,59 @@ def main() -> None:
 
             if answer is None and (turn == MAX_CLARIFY_TURNS or force_final):
                 # Clarification is still required but force final
-                forced_question = (current_question + "\n\nProvide a best-effort answer using reasonable assumptions.")
+                forced_question = current_question + BEST_EFFORT_SUFFIX
 
-                result = orchestrator.run(UserQuery(question=forced_question), profile, force_final=True)
+                result = orchestrator.run(
+                    UserQuery(question=forced_question, session_id=session_id), profile, force_final=True
+                )
                 answer = result.answer
 
         except Exception as e:
             console.print(f"[red]Error:[/red] {e}")
             continue
 
-        console.print(Panel.fit(answer.explanation, title="Explanation"))
-
-        if answer.bullet_summary:
-            console.print("\n[bold]Key Takeaways:[/bold]")
-            for i, bullet in enumerate(answer.bullet_summary, start=1):
-                console.print(f"  {i}. {bullet}")
-        
-        if answer.sources:
-            console.print("\n[bold]Sources:[/bold]")
-            for i, src in enumerate(answer.sources, start=1):
-                console.print(f"  {i}. {src.title} | {src.url}")
-        
-        for tr in result.tool_results:
-            if tr.error:
-                console.print(f"[dim]Tool Error {tr.tool} failed: {tr.error.error_type} ({tr.query})[/dim]")
+        _print_answer(answer, result)
+
+
+def _print_answer(answer, result) -> None:
+    console.print(Panel.fit(answer.explanation, title="Explanation"))
+
+    if answer.bullet_summary:
+        console.print("\n[bold]Key Takeaways:[/bold]")
+        for i, bullet in enumerate(answer.bullet_summary, start=1):
+            console.print(f"  {i}. {bullet}")
+    
+    if answer.sources:
+        console.print("\n[bold]Sources:[/bold]")
+        for i, src in enumerate(answer.sources, start=1):
+            console.print(f"  {i}. {src.title} | {src.url}")
     
-        console.print("\n")
+    for tr in result.tool_results:
+        if tr.error:
+            console.print(f"[dim]Tool Error {tr.tool} failed: {tr.error.error_type} ({tr.query})[/dim]")
+    
+    console.print("\n")
+
+
+def batch_main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(
+        prog="research-learning-agent batch",
+        description="Answer the questions of a JSONL file concurrently; results stream to --out in completion order",
+    )
+    ap.add_argument("input", type=Path, help='JSONL lines: {"id"?, "question", "profile"?}')
+    ap.add_argument("--out", type=Path, default=Path("data/batch_answers.jsonl"))
+    ap.add_argument("--parallel", type=int, default=get_batch_config().parallelism, help="Questions answered at once")
+    args = ap.parse_args(argv)
+
+    parallelism = max(1, args.parallel)
+    configure_pool(2 * parallelism)  # tool calls of all workers share one keep-alive pool
+    orchestrator = Orchestrator()
+    counts = run_batch_file(
+        orchestrator, args.input, args.out, default_profile=CachedProfileStore().load(), parallelism=parallelism,
+    )
+    console.print(f"{sum(counts.values())} questions -> {args.out} ({', '.join(f'{k}={v}' for k, v in sorted(counts.items()))})")
+    return 1 if counts.get("error") else 0
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    raise SystemExit(main())
\ No newline at end of file
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import json
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Iterable, Iterator, TextIO
+
+from pydantic import BaseModel, ValidationError
+
+from .orchestrator import Orchestrator
+from .prompts import BEST_EFFORT_SUFFIX
+from .schemas import OrchestratorActionType, OrchestratorResult, UserProfile, UserQuery
+from .logging_utils import get_logger
+
+
+logger = get_logger("batch")
+
+
+class BatchItem(BaseModel):
+    """One input line: a question, and optionally the profile to answer it for (default: the CLI profile)."""
+
+    id: str | None = None
+    question: str
+    profile: UserProfile | None = None
+
+
+def read_items(lines: Iterable[str]) -> Iterator[tuple[int, BatchItem | None, str | None]]:
+    """(line number, item, error) per non-blank JSONL line; a line that does not parse yields (n, None, error)."""
+    for n, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield n, BatchItem.model_validate_json(line), None
+        except ValidationError as e:
+            yield n, None, f"invalid batch line: {e.errors()[0]['msg']}"
+
+
+def answer_item(orchestrator: Orchestrator, item: BatchItem, profile: UserProfile, session_id: str) -> OrchestratorResult:
+    """Answer without a user to ask: a clarifying question is answered best effort, as the CLI does on an empty reply."""
+    result = orchestrator.run(UserQuery(question=item.question, session_id=session_id), profile)
+    if result.action.kind == OrchestratorActionType.need_clarification:
+        result = orchestrator.run(
+            UserQuery(question=item.question + BEST_EFFORT_SUFFIX, session_id=session_id), profile, force_final=True
+        )
+    return result
+
+
+def _row(item_id: str, item: BatchItem, result: OrchestratorResult, latency_ms: float) -> dict[str, Any]:
+    answer = result.answer
+    return {
+        "id": item_id,
+        "question": item.question,
+        "status": "ok",
+        "latency_ms": round(latency_ms, 1),
+        "timings_ms": result.timings_ms,
+        "trace_id": result.trace_id,
+        "total_tokens": result.usage.total_tokens,
+        "mode": answer.mode.value if answer and answer.mode else None,
+        "degradations": [d.value for d in answer.degradations] if answer else [],
+        "answer": answer.model_dump(mode="json") if answer else None,
+    }
+
+
+def run_batch(
+    orchestrator: Orchestrator,
+    lines: Iterable[str],
+    *,
+    default_profile: UserProfile | None,
+    parallelism: int,
+) -> Iterator[dict[str, Any]]:
+    """
+    Answer every line of a JSONL batch on one shared Orchestrator (its caches, session store and
+    clients are shared by the workers), yielding one result row per line in completion order.
+
+    At most `2 * parallelism` questions are read ahead, so large inputs are streamed, not loaded.
+    A failing question yields a row with `status="error"` and does not stop the batch.
+    """
+    def work(item_id: str, item: BatchItem, profile: UserProfile) -> dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            result = answer_item(orchestrator, item, profile, session_id=f"batch-{uuid.uuid4().hex}")  # ids may repeat; sessions must not
+        except Exception as e:
+            logger.warning("batch item %s failed: %s", item_id, e)
+            return {
+                "id": item_id, "question": item.question, "status": "error", "error": f"{type(e).__name__}: {e}",
+                "latency_ms": round((time.perf_counter() - started) * 1000.0, 1),
+            }
+        return _row(item_id, item, result, (time.perf_counter() - started) * 1000.0)
+
+    pending: set[Future[dict[str, Any]]] = set()
+    with ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="batch") as pool:
+        for n, item, error in read_items(lines):
+            item_id = str(n) if item is None or item.id is None else item.id
+            profile = (item.profile or default_profile) if item is not None else None
+            if error is None and profile is None:
+                error = "no profile: pass one on the line or create the CLI profile first"
+            if error is not None:
+                yield {"id": item_id, "question": item.question if item else None, "status": "error", "error": error}
+                continue
+            pending.add(pool.submit(work, item_id, item, profile))
+            if len(pending) >= 2 * parallelism:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    yield fut.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                yield fut.result()
+
+
+def write_rows(rows: Iterable[dict[str, Any]], out: TextIO) -> dict[str, int]:
+    """Write rows as JSONL, flushing each one so results can be tailed; returns counts per status."""
+    counts: dict[str, int] = {}
+    for row in rows:
+        out.write(json.dumps(row, ensure_ascii=False) + "\n")
+        out.flush()
+        counts[row["status"]] = counts.get(row["status"], 0) + 1
+    return counts
+
+
+def run_batch_file(
+    orchestrator: Orchestrator,
+    in_path: Path,
+    out_path: Path,
+    *,
+    default_profile: UserProfile | None,
+    parallelism: int,
+) -> dict[str, int]:
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with in_path.open(encoding="utf-8") as src, out_path.open("w", encoding="utf-8") as out:
+        return write_rows(run_batch(orchestrator, src, default_profile=default_profile, parallelism=parallelism), out)
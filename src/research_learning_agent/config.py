@@ -12,4 +12,117 @@ def get_llm_config() -> LLMConfig:
         model_name=os.getenv("OPENAI_MODEL", "gpt-4.1-mini"),
         temperature=float(os.getenv("LLM_TEMPERATURE", "0.2")),
         max_tokens=int(os.getenv("LLM_MAX_TOKENS", "800")),
-    )
\ No newline at end of file
+    )
+
+
+@dataclass
+class GeneratorConfig:
+    parallel_sections: bool = False  # one LLM call per section instead of one long completion
+    max_concurrency: int = 4         # cap on in-flight section calls
+    prompt_token_budget: int = 0     # 0 = per-mode default (prompt_budget.PROMPT_TOKEN_BUDGETS)
+
+def get_generator_config() -> GeneratorConfig:
+    return GeneratorConfig(
+        parallel_sections=os.getenv("GENERATOR_PARALLEL_SECTIONS", "0").strip().lower() in {"1", "true", "yes", "on"},
+        max_concurrency=max(1, int(os.getenv("GENERATOR_MAX_CONCURRENCY", "4"))),
+        prompt_token_budget=max(0, int(os.getenv("GENERATOR_PROMPT_TOKEN_BUDGET", "0"))),
+    )
+
+
+@dataclass
+class EscalationConfig:
+    adaptive: bool = False           # let EscalationController move the LLM escalation threshold online
+    target_llm_rate: float = 0.30    # max share of classified queries sent to the LLM
+    latency_target_ms: float = 0.0   # 0 = ignore LLM latency; otherwise the target rate shrinks while LLM calls are slower
+    window: int = 200                # rolling window of classifications the controller looks at
+    update_every: int = 20           # re-evaluate the threshold every N classifications
+    min_threshold: float = 0.55      # guardrail: never keep rule results below this confidence off the LLM
+    max_threshold: float = 0.70      # the static threshold; the controller only lowers from here
+    min_agreement: float = 0.80      # guardrail: rules must agree with the LLM this often at a confidence level to skip it
+    min_samples: int = 20            # LLM-checked samples needed per confidence level before trusting its agreement
+    probe_rate: float = 0.05         # share of skipped rows still sent to the LLM to keep measuring agreement
+
+def get_escalation_config() -> EscalationConfig:
+    return EscalationConfig(
+        adaptive=os.getenv("INTENT_ADAPTIVE_ESCALATION", "0").strip().lower() in {"1", "true", "yes", "on"},
+        target_llm_rate=min(1.0, max(0.0, float(os.getenv("INTENT_TARGET_LLM_RATE", "0.30")))),
+        latency_target_ms=max(0.0, float(os.getenv("INTENT_LLM_LATENCY_TARGET_MS", "0"))),
+    )
+
+
+@dataclass
+class IntentCacheConfig:
+    max_entries: int = 1024   # 0 disables the cache
+    ttl_s: float = 3600.0
+
+def get_intent_cache_config() -> IntentCacheConfig:
+    return IntentCacheConfig(
+        max_entries=max(0, int(os.getenv("INTENT_CACHE_SIZE", "1024"))),
+        ttl_s=max(0.0, float(os.getenv("INTENT_CACHE_TTL_S", "3600"))),
+    )
+
+
+@dataclass
+class UsageBudgetConfig:
+    request_token_budget: int = 0        # 0 = no per-request cap; otherwise the answer mode is downgraded to fit
+    user_daily_token_budget: int = 0     # 0 = no per-user cap; counted per UTC day in the usage ledger
+    prompt_price_per_1k: float = 0.0     # USD per 1K prompt tokens (0 = don't price)
+    completion_price_per_1k: float = 0.0
+
+def get_usage_budget_config() -> UsageBudgetConfig:
+    return UsageBudgetConfig(
+        request_token_budget=max(0, int(os.getenv("LLM_REQUEST_TOKEN_BUDGET", "0"))),
+        user_daily_token_budget=max(0, int(os.getenv("LLM_USER_DAILY_TOKEN_BUDGET", "0"))),
+        prompt_price_per_1k=max(0.0, float(os.getenv("LLM_PROMPT_PRICE_PER_1K", "0"))),
+        completion_price_per_1k=max(0.0, float(os.getenv("LLM_COMPLETION_PRICE_PER_1K", "0"))),
+    )
+
+
+@dataclass
+class SLOConfig:
+    latency_budget_ms: float = 0.0   # per-question time budget for Orchestrator.run; 0 = no SLO, full pipeline
+    min_sections: int = 2            # the fewer_sections step keeps this many required sections
+
+def get_slo_config() -> SLOConfig:
+    return SLOConfig(
+        latency_budget_ms=max(0.0, float(os.getenv("ORCH_LATENCY_BUDGET_MS", "0"))),
+        min_sections=max(1, int(os.getenv("ORCH_SLO_MIN_SECTIONS", "2"))),
+    )
+
+
+@dataclass
+class SessionConfig:
+    max_sessions: int = 256   # 0 disables session reuse
+    ttl_s: float = 1800.0     # idle sessions expire after this long
+
+def get_session_config() -> SessionConfig:
+    return SessionConfig(
+        max_sessions=max(0, int(os.getenv("SESSION_MAX", "256"))),
+        ttl_s=max(0.0, float(os.getenv("SESSION_TTL_S", "1800"))),
+    )
+
+
+@dataclass
+class BatchConfig:
+    parallelism: int = 4     # questions answered concurrently by `research-learning-agent batch`
+
+def get_batch_config() -> BatchConfig:
+    return BatchConfig(parallelism=max(1, int(os.getenv("BATCH_PARALLELISM", "4"))))
+
+
+@dataclass
+class ServerConfig:
+    host: str = "127.0.0.1"
+    port: int = 8080
+    max_concurrency: int = 8      # questions answered at once (worker threads)
+    max_queue: int = 32           # admitted questions waiting for a worker; beyond this requests get 503
+    max_clarify_turns: int = 2    # clarification rounds before the server answers best effort
+
+def get_server_config() -> ServerConfig:
+    return ServerConfig(
+        host=os.getenv("SERVER_HOST", "127.0.0.1"),
+        port=int(os.getenv("SERVER_PORT", "8080")),
+        max_concurrency=max(1, int(os.getenv("SERVER_MAX_CONCURRENCY", "8"))),
+        max_queue=max(0, int(os.getenv("SERVER_MAX_QUEUE", "32"))),
+        max_clarify_turns=max(0, int(os.getenv("SERVER_MAX_CLARIFY_TURNS", "2"))),
+    )
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from urllib.parse import urlsplit, urlunsplit
+
+import numpy as np
+
+from .schemas import ToolResult, ToolType
+from .logging_utils import get_logger
+
+
+logger = get_logger("evidence_ranker")
+
+
+DEFAULT_TOP_N = 8
+DEDUP_THRESHOLD = 0.85   # cosine similarity above which two results count as near-duplicates
+MMR_LAMBDA = 0.7         # relevance vs. diversity trade-off (1.0 = pure relevance)
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_WORD_PAT = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from how i in is it of on or that the this to what when where which "
+    "who why with you your do does can vs".split()
+)
+
+
+@dataclass
+class RankedEvidence:
+    tool: ToolType
+    title: str
+    url: str
+    snippet: str
+    score: float  # normalized relevance in [0, 1]
+
+
+def _tokens(text: str) -> list[str]:
+    return [t for t in _WORD_PAT.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def _canonical_url(url: str) -> str:
+    """Canonical form used to detect the same page returned by several tools."""
+    try:
+        parts = urlsplit(url.strip())
+        path = parts.path.rstrip("/")
+        return urlunsplit((parts.scheme.lower(), parts.netloc.lower().removeprefix("www."), path, parts.query, ""))
+    except Exception:
+        return url.strip()
+
+
+def _collect(tool_results: list[ToolResult]) -> list[RankedEvidence]:
+    out: list[RankedEvidence] = []
+    seen: set[str] = set()
+    for tr in tool_results:
+        if tr.error:
+            continue
+        for r in tr.results or []:
+            url = str(r.get("url", "")).strip()
+            if not url:
+                continue
+            key = _canonical_url(url)
+            if key in seen:
+                continue
+            seen.add(key)
+            out.append(RankedEvidence(
+                tool=tr.tool,
+                title=str(r.get("title", "")).strip(),
+                url=url,
+                snippet=str(r.get("snippet", "")).strip(),
+                score=0.0,
+            ))
+    return out
+
+
+def _term_matrix(docs: list[list[str]], vocab: dict[str, int]) -> np.ndarray:
+    tf = np.zeros((len(docs), len(vocab)), dtype=np.float64)
+    for i, doc in enumerate(docs):
+        if doc:
+            np.add.at(tf[i], [vocab[t] for t in doc], 1.0)
+    return tf
+
+
+def bm25_scores(tf: np.ndarray, query_idx: list[int]) -> np.ndarray:
+    """Vectorized BM25 of every document (row of `tf`) against the query term columns."""
+    n_docs = tf.shape[0]
+    if n_docs == 0 or not query_idx:
+        return np.zeros(n_docs)
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+    dl = tf.sum(axis=1)
+    avgdl = max(float(dl.mean()), 1e-9)
+
+    q_tf = tf[:, query_idx]
+    denom = q_tf + BM25_K1 * (1.0 - BM25_B + BM25_B * dl[:, None] / avgdl)
+    return (idf[query_idx] * q_tf * (BM25_K1 + 1.0) / np.maximum(denom, 1e-9)).sum(axis=1)
+
+
+def _tfidf_unit_rows(tf: np.ndarray) -> np.ndarray:
+    n_docs = tf.shape[0]
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log((1.0 + n_docs) / (1.0 + df)) + 1.0
+    x = np.log1p(tf) * idf
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    return x / np.maximum(norms, 1e-12)
+
+
+def _mmr(relevance: np.ndarray, sim: np.ndarray, candidates: list[int], k: int, lam: float) -> list[int]:
+    selected: list[int] = []
+    remaining = list(candidates)
+    while remaining and len(selected) < k:
+        rel = relevance[remaining]
+        if selected:
+            redundancy = sim[np.ix_(remaining, selected)].max(axis=1)
+        else:
+            redundancy = np.zeros(len(remaining))
+        best = remaining[int(np.argmax(lam * rel - (1.0 - lam) * redundancy))]
+        selected.append(best)
+        remaining.remove(best)
+    return selected
+
+
+def rank_evidence(
+    question: str,
+    tool_results: list[ToolResult],
+    *,
+    top_n: int = DEFAULT_TOP_N,
+    dedup_threshold: float = DEDUP_THRESHOLD,
+    mmr_lambda: float = MMR_LAMBDA,
+) -> list[RankedEvidence]:
+    """
+    Rank tool results for the generator:
+      1) BM25 of title+snippet against the question (provider order breaks ties)
+      2) drop near-duplicates (same canonical URL or TF-IDF cosine >= dedup_threshold)
+      3) pick a diverse top-N with maximal marginal relevance
+    """
+    items = _collect(tool_results)
+    if not items:
+        return []
+
+    docs = [_tokens(f"{it.title} {it.snippet}") for it in items]
+    q_terms = list(dict.fromkeys(_tokens(question)))
+
+    vocab: dict[str, int] = {}
+    for doc in docs + [q_terms]:
+        for t in doc:
+            vocab.setdefault(t, len(vocab))
+    tf = _term_matrix(docs, vocab)
+
+    raw = bm25_scores(tf, [vocab[t] for t in q_terms])
+    top = float(raw.max()) if raw.size else 0.0
+    relevance = raw / top if top > 0 else np.zeros(len(items))
+    # small provider-order prior so ties (and queries without usable terms) keep provider ranking
+    relevance = 0.95 * relevance + 0.05 * (1.0 - np.arange(len(items)) / len(items))
+
+    unit = _tfidf_unit_rows(tf)
+    sim = unit @ unit.T
+
+    kept: list[int] = []
+    for i in np.argsort(-relevance, kind="stable"):
+        i = int(i)
+        if docs[i] and any(sim[i, j] >= dedup_threshold for j in kept):
+            continue
+        kept.append(i)
+
+    picked = _mmr(relevance, sim, kept, top_n, mmr_lambda)
+    logger.debug(
+        "ranked evidence candidates=%d after_dedup=%d selected=%d", len(items), len(kept), len(picked)
+    )
+
+    out = []
+    for i in picked:
+        items[i].score = round(float(relevance[i]), 4)
+        out.append(items[i])
+    return out
+
+
+def uncovered_terms(
+    question: str, tool_results: list[ToolResult], *, context: str = "", min_share: float = 0.5
+) -> list[str]:
+    """
+    Content terms of `question` found in no tool result (title or snippet) and not in `context`,
+    if they make up at least `min_share` of its terms; otherwise [] (the evidence covers the question).
+    """
+    terms = list(dict.fromkeys(_tokens(question)))
+    covered = set(_tokens(context))
+    for it in _collect(tool_results):
+        covered.update(_tokens(f"{it.title} {it.snippet}"))
+    missing = [t for t in terms if t not in covered]
+    return missing if terms and len(missing) >= min_share * len(terms) else []
@@ -1,19 +1,41 @@
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 
 from .schemas import (
     UserQuery, AgentAnswer, LLMMessage, UserProfile, IntentResult, Plan, ToolResult, 
-    SourceItem, GenerationSpec, AnswerSection
+    SourceItem, GenerationSpec, AnswerSection, LearningMode
 )
 from .llm_client import LLMClient
+from .config import GeneratorConfig, get_generator_config
+from .evidence_ranker import DEFAULT_TOP_N, RankedEvidence, rank_evidence
+from .prompt_budget import (
+    PROMPT_TOKEN_BUDGETS, AssembledPrompt, assemble_to_budget, record_prompt_tokens, truncate_field
+)
+from .tracing import bind
+from .usage import usage_tags
 from .logging_utils import get_logger
 
 
 logger = get_logger("Generator")
 
 
+# Modes whose long, multi-section answers are worth splitting into concurrent calls
+PARALLEL_MODES = {LearningMode.deep_research, LearningMode.guided_study}
+
+# The guided_study day plan is the longest section; it is written in day groups
+DAY_PLAN_SECTION = "7-10 Day Study Plan"
+DAY_GROUPS = [(1, 3), (4, 6), (7, 10)]
+
+_URL_PAT = re.compile(r"https?://[^\s)\]>]+")
+
+_MAX_SNIPPET_CHARS = 160
+
+
 
 def build_generator_prompt(
-    profile: UserProfile, intent_result: IntentResult, plan: Plan, evidence: str, 
+    profile: UserProfile, intent_result: IntentResult, plan_text: str, evidence: str, 
     sections_list: list[str], force_final: bool
 ) -> str:
     forced_instruction = ""
@@ -31,9 +53,9 @@ YOU MUST:
 You are a learning/research assistant.
 
 User profile:
-- background: {profile.background}
+- background: {truncate_field(profile.background)}
 - Level: {profile.level}
-- Goals: {profile.goals}
+- Goals: {truncate_field(profile.goals)}
 - Preferred output: {profile.preferred_output}
 
 Intent:
@@ -41,7 +63,7 @@ Intent:
 - Suggested output: {intent_result.suggested_output}
 
 Plan:
-{plan.model_dump_json(indent=2)}
+{plan_text}
 
 {forced_instruction}
 
@@ -77,32 +99,144 @@ SOURCES:
 - ...
 """
 
+def build_shared_context(
+    profile: UserProfile, intent_result: IntentResult, plan_text: str, evidence: str, style_notes: str
+) -> str:
+    """Compact context shared by every call of the section-parallel path."""
+    return f"""
+You are a learning/research assistant.
+
+User profile:
+- background: {truncate_field(profile.background)}
+- Level: {profile.level}
+- Goals: {truncate_field(profile.goals)}
+- Preferred output: {profile.preferred_output}
+
+Intent: {intent_result.intent}
+
+Plan:
+{plan_text}
+
+Style: {style_notes}
+
+Evidence you may use (URLs provided)
+{evidence}
+"""
+
+
+def build_framing_prompt(shared_context: str, sections_list: list[str], force_final: bool) -> str:
+    forced_instruction = ""
+    if force_final:
+        forced_instruction = """
+The user question may still be ambiguous. State your assumptions explicitly in the explanation
+and end it with ONE follow-up question to confirm or refine them.
+"""
+
+    return f"""{shared_context}
+Other writers are producing these sections in parallel: {sections_list}
+Your job is ONLY the short framing that comes before them.
+{forced_instruction}
+Rules:
+- Do NOT write any of the sections.
+- If evidence is empty/unavailable, answer from general knowledge and say so briefly.
+
+Return in this exact format:
+
+EXPLANATION:
+<...>
+
+BULLETS:
+- ...
+"""
+
+
+def build_section_prompt(
+    shared_context: str, title: str, sections_list: list[str], focus: str | None = None
+) -> str:
+    focus_instruction = f"\nScope: {focus}\n" if focus else ""
+    return f"""{shared_context}
+The answer has these sections: {sections_list}
+Other writers are producing the other sections in parallel. Write ONLY the section "{title}".
+{focus_instruction}
+Rules:
+- Use evidence when relevant.
+- Do NOT invent sources. Only cite URLs from the evidence above.
+- Do not repeat content that belongs in the other sections.
+
+Return in this exact format:
+
+## {title}
+<Section Contents>
+
+SOURCES:
+- <URLs from the evidence you actually used, or nothing>
+"""
+
+
+@dataclass
+class _SectionJob:
+    title: str
+    focus: str | None = None
+
+
+def generation_calls(spec: GenerationSpec, config: GeneratorConfig) -> int:
+    """LLM calls `Generator.generate` makes for `spec`: one, or framing + one per section job when parallel."""
+    if config.parallel_sections and spec.mode in PARALLEL_MODES:
+        return 1 + len(Generator._section_jobs(spec.required_sections))
+    return 1
+
+
 class Generator:
-    def __init__(self) -> None:
-        self.llm = LLMClient()
+    def __init__(self, config: GeneratorConfig | None = None, *, llm: LLMClient | None = None) -> None:
+        self.llm = llm or LLMClient()  # any object with `chat(messages) -> str`, e.g. an offline fake
+        self.config = config or get_generator_config()
     
     def generate(
         self, query: UserQuery, profile: UserProfile, intent: IntentResult, 
         plan: Plan, tool_results: list[ToolResult], spec: GenerationSpec,
         *, force_final: bool = False
     ) -> AgentAnswer:
-        evidence = self._format_evidence(tool_results)
+        start = time.perf_counter()
+        if self.config.parallel_sections and spec.mode in PARALLEL_MODES:
+            path = "parallel"
+            answer = self._generate_parallel(query, profile, intent, plan, tool_results, spec, force_final=force_final)
+        else:
+            path = "single"
+            answer = self._generate_single(query, profile, intent, plan, tool_results, spec, force_final=force_final)
+
+        logger.info(
+            "generation path=%s mode=%s sections=%d wall_ms=%.1f",
+            path, spec.mode.value, len(spec.required_sections), (time.perf_counter() - start) * 1000,
+        )
+        return answer
 
-        system_prompt = build_generator_prompt(
-            profile, intent, plan, evidence, spec.required_sections, force_final
+    def _generate_single(
+        self, query: UserQuery, profile: UserProfile, intent: IntentResult, 
+        plan: Plan, tool_results: list[ToolResult], spec: GenerationSpec,
+        *, force_final: bool = False
+    ) -> AgentAnswer:
+        assembled = assemble_to_budget(
+            lambda plan_text, evidence: build_generator_prompt(
+                profile, intent, plan_text, evidence, spec.required_sections, force_final
+            ),
+            plan,
+            self._evidence_lines(tool_results, query.question),
+            self._prompt_budget(spec),
         )
 
         messages: list[LLMMessage] = [
-            LLMMessage(role="system", content=system_prompt),
+            LLMMessage(role="system", content=assembled.text),
             LLMMessage(role="user", content=query.question),
         ]
+        self._record_prompt("generator", messages, spec, assembled)
 
-        raw = self.llm.chat(messages)
+        with usage_tags(stage="generator", mode=spec.mode.value):
+            raw = self.llm.chat(messages)
         logger.debug("Raw generator output:\n%s", raw)
 
         explanation, bullets = self._parse_response(raw)
         sections = self._parse_sections(raw, spec.required_sections)
-        sources = self._build_sources(tool_results)
+        sources = self._build_sources(tool_results, question=query.question)
 
         return AgentAnswer(
             explanation=explanation,
@@ -113,34 +247,204 @@ class Generator:
             sources=sources,
         )
 
+    def _generate_parallel(
+        self, query: UserQuery, profile: UserProfile, intent: IntentResult, 
+        plan: Plan, tool_results: list[ToolResult], spec: GenerationSpec,
+        *, force_final: bool = False
+    ) -> AgentAnswer:
+        """
+        Generate the framing (explanation + bullets) and each section as concurrent LLM calls
+        over one shared compact context, then stitch them into a single AgentAnswer.
+        """
+        assembled = assemble_to_budget(
+            lambda plan_text, evidence: build_shared_context(profile, intent, plan_text, evidence, spec.style_notes),
+            plan,
+            self._evidence_lines(tool_results, query.question),
+            self._prompt_budget(spec),
+        )
+        shared = assembled.text
+        jobs = self._section_jobs(spec.required_sections)
+
+        workers = max(1, min(self.config.max_concurrency, len(jobs) + 1))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="generator") as pool:
+            framing_future = pool.submit(
+                bind(self._chat), build_framing_prompt(shared, spec.required_sections, force_final), query.question,
+                stage="generator_framing", spec=spec, assembled=assembled,
+            )
+            section_futures = [
+                pool.submit(
+                    bind(self._chat),
+                    build_section_prompt(shared, job.title, spec.required_sections, job.focus),
+                    query.question,
+                    stage="generator_section", spec=spec, assembled=assembled,
+                )
+                for job in jobs
+            ]
+
+            try:
+                framing_raw: str | None = framing_future.result()
+            except Exception as e:
+                # A failed framing call keeps the sections; the answer just has no lead explanation/bullets
+                logger.warning("framing generation failed: %s", e)
+                framing_raw = None
+            section_raws: list[str] = []
+            for job, fut in zip(jobs, section_futures):
+                try:
+                    section_raws.append(fut.result())
+                except Exception as e:
+                    # A failed section degrades to empty content, same as a missing section in the single path
+                    logger.warning("section generation failed title=%r focus=%r: %s", job.title, job.focus, e)
+                    section_raws.append("")
+
+        explanation, bullets = self._parse_response(framing_raw) if framing_raw is not None else ("", [])
+
+        parts: dict[str, list[str]] = {}
+        cited: list[str] = []
+        for job, raw in zip(jobs, section_raws):
+            body, urls = self._parse_section_reply(raw, job.title)
+            if body:
+                parts.setdefault(job.title, []).append(body)
+            cited.extend(urls)
+
+        sections = [
+            AnswerSection(title=title, content="\n\n".join(parts.get(title, [])))
+            for title in spec.required_sections
+        ]
+
+        return AgentAnswer(
+            explanation=explanation,
+            bullet_summary=bullets,
+            model_name=None,
+            sections=sections,
+            mode=spec.mode,
+            sources=self._reconcile_sources(cited, tool_results, question=query.question),
+        )
+
+    def _chat(
+        self, system_prompt: str, question: str, *, stage: str, spec: GenerationSpec, assembled: AssembledPrompt
+    ) -> str:
+        messages: list[LLMMessage] = [
+            LLMMessage(role="system", content=system_prompt),
+            LLMMessage(role="user", content=question),
+        ]
+        self._record_prompt(stage, messages, spec, assembled)
+        with usage_tags(stage=stage, mode=spec.mode.value):
+            return self.llm.chat(messages)
+
+    def _prompt_budget(self, spec: GenerationSpec) -> int:
+        return self.config.prompt_token_budget or PROMPT_TOKEN_BUDGETS[spec.mode]
+
     @staticmethod
-    def _format_evidence(tool_results: list[ToolResult], max_items_per_tool: int = 5) -> str:
-        lines = []
-        for tr in tool_results:
-            if tr.error:
-                lines.append(f"- {tr.tool} FAILED for query={tr.query!r}: {tr.error.error_type}")
-                continue
-            for r in (tr.results or [])[:max_items_per_tool]:
-                lines.append(f"- [{tr.tool}] {r.get('title')} | {r.get('url')}")
-        return "\n".join(lines) if lines else "(no external evidence)"
-    
+    def _record_prompt(
+        stage: str, messages: list[LLMMessage], spec: GenerationSpec, assembled: AssembledPrompt
+    ) -> None:
+        record_prompt_tokens(
+            stage,
+            messages,
+            mode=spec.mode.value,
+            budget=assembled.budget,
+            evidence_kept=assembled.evidence_kept,
+            evidence_dropped=assembled.evidence_dropped,
+            plan_detail=assembled.plan_detail,
+        )
+
+    @staticmethod
+    def _section_jobs(required_sections: list[str]) -> list[_SectionJob]:
+        """One job per section; the day plan is further split into day groups."""
+        jobs: list[_SectionJob] = []
+        for title in required_sections:
+            if title == DAY_PLAN_SECTION:
+                for first, last in DAY_GROUPS:
+                    jobs.append(_SectionJob(
+                        title=title,
+                        focus=(
+                            f"The full plan runs 7-10 days and is split between writers by day groups {DAY_GROUPS}. "
+                            f"Write ONLY days {first}-{last}, each starting with '**Day N**'. "
+                            "Stop early if the plan needs fewer days."
+                        ),
+                    ))
+            else:
+                jobs.append(_SectionJob(title=title))
+        return jobs
 
     @staticmethod
-    def _build_sources(tool_results: list[ToolResult], max_sources: int = 5) -> list[SourceItem]:
-        seen = set()
-        out = []
+    def _parse_section_reply(raw: str, title: str) -> tuple[str, list[str]]:
+        """Split a single-section reply into (content without the echoed heading, cited URLs)."""
+        body, _, sources_block = (raw or "").partition("SOURCES:")
+        lines = body.strip().splitlines()
+        if lines and lines[0].lstrip().startswith("#") and lines[0].lstrip("# ").strip() == title:
+            lines = lines[1:]
+        return "\n".join(lines).strip(), _URL_PAT.findall(sources_block)
+
+    @classmethod
+    def _reconcile_sources(
+        cls, cited_urls: list[str], tool_results: list[ToolResult], max_sources: int = 5, question: str = ""
+    ) -> list[SourceItem]:
+        """
+        Consistency pass over the SOURCES blocks of all section calls:
+        keep only URLs that exist in the tool results (in first-cited order), dedupe,
+        then top up with the remaining tool results like the single-call path does.
+        """
+        known: dict[str, str] = {}
         for tr in tool_results:
             if tr.error:
                 continue
             for r in tr.results:
                 url = r.get("url", "").strip()
-                title = r.get("title", "").strip()
-                if url and url not in seen:
-                    out.append(SourceItem(title=title, url=url))
-                    seen.add(url)
-                if len(out) >= max_sources:
-                    return out
-        return out
+                if url and url not in known:
+                    known[url] = r.get("title", "").strip()
+
+        out: list[SourceItem] = []
+        seen: set[str] = set()
+        for url in cited_urls:
+            url = url.strip().rstrip(".,;")
+            if url in seen:
+                continue
+            if url not in known:
+                logger.debug("dropping cited url not present in evidence: %s", url)
+                continue
+            out.append(SourceItem(title=known[url], url=url))
+            seen.add(url)
+
+        for src in cls._build_sources(tool_results, max_sources=max_sources, question=question):
+            if len(out) >= max_sources:
+                break
+            if src.url not in seen:
+                out.append(src)
+                seen.add(src.url)
+        return out[:max_sources]
+
+    @staticmethod
+    def _evidence_line(e: RankedEvidence) -> str:
+        line = f"- [{e.tool.value}] {e.title} | {e.url}"
+        if e.snippet:
+            snippet = e.snippet if len(e.snippet) <= _MAX_SNIPPET_CHARS else e.snippet[:_MAX_SNIPPET_CHARS - 3] + "..."
+            line += f" :: {snippet}"
+        return line
+
+    @classmethod
+    def _evidence_lines(cls, tool_results: list[ToolResult], question: str = "", top_n: int = DEFAULT_TOP_N) -> list[str]:
+        """Evidence lines ordered by value: ranked, de-duplicated results first, tool failures last."""
+        lines = [cls._evidence_line(e) for e in rank_evidence(question, tool_results, top_n=top_n)]
+        failures = [
+            f"- {tr.tool.value} FAILED for query={tr.query!r}: {tr.error.error_type}"
+            for tr in tool_results if tr.error
+        ]
+        return lines + failures
+
+    @classmethod
+    def _format_evidence(cls, tool_results: list[ToolResult], question: str = "", top_n: int = DEFAULT_TOP_N) -> str:
+        lines = cls._evidence_lines(tool_results, question, top_n)
+        return "\n".join(lines) if lines else "(no external evidence)"
+    
+
+    @staticmethod
+    def _build_sources(tool_results: list[ToolResult], max_sources: int = 5, question: str = "") -> list[SourceItem]:
+        """Sources are the top of the same ranking the evidence comes from (never LLM-generated)."""
+        return [
+            SourceItem(title=e.title, url=e.url)
+            for e in rank_evidence(question, tool_results, top_n=max_sources)
+        ]
 
     @staticmethod
     def _parse_sections(text: str, required_sections: list[str]) -> list[AnswerSection]:
@@ -185,7 +489,9 @@ class Generator:
         if "explanation:" in lower and "bullets:" in lower:
             exp_idx = lower.index("explanation:")
             bul_idx = lower.index("bullets:")
-            sec_idx = lower.index("sections:")
+            sec_idx = lower.find("sections:", bul_idx)
+            if sec_idx < 0:
+                sec_idx = len(raw_text)
 
             explanation = raw_text[exp_idx + len("explanation:") : bul_idx].strip()
             bullet_block = raw_text[bul_idx + len("bullets:") : sec_idx].strip()
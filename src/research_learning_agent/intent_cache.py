@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from .schemas import IntentResult, UserLevel
+from .prompts import BEST_EFFORT_SUFFIX
+from .logging_utils import get_logger
+
+
+logger = get_logger("intent_cache")
+
+
+_TRAILING_PUNCT = re.compile(r"[\s?.!]+$")
+
+
+def normalize_question(question: str) -> str:
+    """Cache key text: case/whitespace-insensitive, without trailing punctuation or the forced-final suffix."""
+    q = question.strip()
+    if q.endswith(BEST_EFFORT_SUFFIX):
+        q = q[: -len(BEST_EFFORT_SUFFIX)]
+    return _TRAILING_PUNCT.sub("", " ".join(q.lower().split()))
+
+
+def fingerprint(*parts: object) -> str:
+    """Short stable hash of the things a cached result depends on (rules, prompt, thresholds)."""
+    h = hashlib.sha256()
+    for p in parts:
+        h.update(repr(p).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()[:16]
+
+
+class IntentCache:
+    """
+    LRU + TTL cache of IntentResult keyed by (normalized question, user level).
+
+    Entries carry the `version` they were computed under; a lookup under another version
+    (rules or intent prompt changed) is a miss. `get` returns a copy, so callers may mutate it.
+    """
+
+    def __init__(
+        self,
+        *,
+        version: str,
+        max_entries: int = 1024,
+        ttl_s: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.version = version
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, str], tuple[str, float, IntentResult]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(question: str, level: UserLevel | str) -> tuple[str, str]:
+        return normalize_question(question), str(getattr(level, "value", level))
+
+    def get(self, question: str, level: UserLevel | str) -> IntentResult | None:
+        key = self.key(question, level)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                version, stored_at, result = entry
+                if version == self.version and self._clock() - stored_at < self.ttl_s:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return result.model_copy(deep=True)
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, question: str, level: UserLevel | str, result: IntentResult) -> None:
+        if self.max_entries <= 0:
+            return
+        key = self.key(question, level)
+        with self._lock:
+            self._entries[key] = (self.version, self._clock(), result.model_copy(deep=True))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -1,11 +1,25 @@
 import json
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
 
 from .llm_client import LLMClient
 from .schemas import IntentResult, LLMMessage, UserProfile, LearningIntent
 from .prompts import INTENT_SYSTEM_PROMPT
 from .utils.json_extract import extract_json
-from .telemetry import log_intent_event
+from .telemetry import log_intent_event, log_intent_events
+from .prompt_budget import record_prompt_tokens
+from .intent_matcher import SignalMatcher, SignalRule
+from .intent_model import IntentModel, get_intent_model, model_stamp
+from .intent_escalation import EscalationController, recent_events
+from .intent_cache import IntentCache, fingerprint
+from .config import get_escalation_config, get_intent_cache_config
+from .tracing import bind, current_span, span
+from .usage import usage_tags
+from . import telemetry
 from .logging_utils import get_logger
 
 
@@ -31,9 +45,29 @@ _INTENT_KEYWORDS = {
 
 _WHAT_IS_PAT = re.compile(r"^\s*(what is|what's|explain|define|how does)\b", re.IGNORECASE)
 
+# Code-like /stacktrace cues boost troubleshooting (substring checks)
+_CODE_CUES = ("traceback", "file ", "line ", "syntaxerror")
+_CODE_CUE_WEIGHT = 1.5
+
+# All rules in one precompiled single-pass matcher (the query is lowercased first)
+_MATCHER: SignalMatcher[LearningIntent] = SignalMatcher(
+    [SignalRule(LearningIntent.casual_curiosity, _WHAT_IS_PAT.pattern)]
+    + [SignalRule(intent, p) for intent, pats in _INTENT_KEYWORDS.items() for p in pats]
+    + [SignalRule(
+        LearningIntent.urgent_troubleshooting, "|".join(re.escape(c) for c in _CODE_CUES), _CODE_CUE_WEIGHT
+    )]
+)
+
 
 def _signal_strength(query: str) -> dict[LearningIntent, float]:
     """Calculate signal strength for each intent based on the query."""
+    scores = {k: 0.0 for k in LearningIntent}
+    scores.update(_MATCHER.scores(query.lower()))
+    return scores
+
+
+def _signal_strength_reference(query: str) -> dict[LearningIntent, float]:
+    """One regex search per pattern; reference for `_signal_strength` (equivalence tests, benchmark)."""
     q = query.lower()
     scores = {k: 0.0 for k in LearningIntent}
 
@@ -45,9 +79,8 @@ def _signal_strength(query: str) -> dict[LearningIntent, float]:
             if re.search(p, q):
                 scores[intent] += 1.0
     
-    # Code-like /stacktrace cues boost troubleshooting
-    if "traceback" in q or "file " in q or "line " in q or "syntaxerror" in q:
-        scores[LearningIntent.urgent_troubleshooting] += 1.5
+    if any(c in q for c in _CODE_CUES):
+        scores[LearningIntent.urgent_troubleshooting] += _CODE_CUE_WEIGHT
 
     return scores
 
@@ -104,9 +137,17 @@ def _pick_intent(scores: dict[LearningIntent, float]) -> LearningIntent:
     return LearningIntent.casual_curiosity
 
 
-def _needs_llm(scores: dict[LearningIntent, float], conf: float, query: str) -> bool:
+# Rule confidence below which the LLM is consulted (an EscalationController may lower it at runtime)
+ESCALATION_THRESHOLD = 0.70
+# Rule/model confidence below which a clarifying question is proposed
+CLARIFY_THRESHOLD = 0.65
+
+
+def _needs_llm(
+    scores: dict[LearningIntent, float], conf: float, query: str, threshold: float = ESCALATION_THRESHOLD
+) -> bool:
     """Determine if we need the LLM to classify the intent."""
-    if conf >= 0.70:
+    if conf >= threshold:
         return False
     q = query.strip()
 
@@ -121,9 +162,52 @@ def _needs_llm(scores: dict[LearningIntent, float], conf: float, query: str) ->
     return True
 
 
+# ---- vectorized rule stage (classify_many) ----
+
+_INTENT_COLUMNS = list(LearningIntent)
+_PICK_ORDER = [
+    LearningIntent.urgent_troubleshooting,
+    LearningIntent.professional_research,
+    LearningIntent.guided_study,
+    LearningIntent.casual_curiosity,
+]
+_PICK_ORDER_COLS = np.array([_INTENT_COLUMNS.index(k) for k in _PICK_ORDER])
+
+
+def _pick_intents(matrix: np.ndarray) -> np.ndarray:
+    """Row-wise `_pick_intent`: column index of the best score, ties broken in `_PICK_ORDER`."""
+    is_best = matrix == matrix.max(axis=1, keepdims=True)
+    return _PICK_ORDER_COLS[np.argmax(is_best[:, _PICK_ORDER_COLS], axis=1)]
+
+
+def _calibrate_confidences(matrix: np.ndarray, chosen: np.ndarray) -> np.ndarray:
+    """Row-wise `_calibrate_confidence`."""
+    rows = np.arange(matrix.shape[0])
+    best = matrix[rows, chosen]
+    others = matrix.copy()
+    others[rows, chosen] = -np.inf
+    margin = best - others.max(axis=1)
+    return np.select(
+        [
+            best <= 0.0,
+            (best >= 2.5) & (margin >= 1.5),
+            (best >= 2.0) & (margin >= 1.0),
+            (best >= 1.5) & (margin >= 0.8),
+            (best >= 1.0) & (margin >= 0.5),
+        ],
+        [0.55, 0.90, 0.85, 0.78, 0.70],
+        default=0.60,
+    )
+
+
+def _needs_llm_many(confs: np.ndarray, threshold: float = ESCALATION_THRESHOLD) -> np.ndarray:
+    # `_needs_llm` sends every row below the threshold to the LLM, whatever the query shape
+    return confs < threshold
+
+
 def _intent_clarifier(intent: LearningIntent, conf: float, query: str) -> str | None:
     """Propose a clarifying question for the intent."""
-    if conf >= 0.65:
+    if conf >= CLARIFY_THRESHOLD:
         return None
     # Generic best clarifier:
     return "Is this question mainly out of curiosity, or are you trying to study it systematically (or use it for work?"
@@ -141,77 +225,354 @@ def _normalize_clarifying_qeustion(res: IntentResult, query: str) -> str | None:
     return q
 
 
+def _rule_result(
+    query: str,
+    intent: LearningIntent,
+    conf: float,
+    *,
+    rationale: str = "Rule-based: strong intent signals in query.",
+    stage: str = "rules",
+) -> IntentResult:
+    """IntentResult produced without an LLM call (rules or the local model)."""
+    return IntentResult(
+        intent=intent,
+        confidence=conf,
+        rationale=rationale,
+        suggested_output="balanced" if intent != LearningIntent.urgent_troubleshooting else "detailed",
+        should_ask_clarifying_question=conf < CLARIFY_THRESHOLD and intent not in {LearningIntent.urgent_troubleshooting},
+        clarifying_question=_intent_clarifier(intent, conf, query),
+        use_llm=False,
+        stage=stage,
+    )
+
+
+def _model_result(query: str, intent: LearningIntent, prob: float) -> IntentResult:
+    return _rule_result(
+        query, intent, round(min(0.92, prob), 4),
+        rationale=f"Local model: p={prob:.2f} for {intent.value}.", stage="model",
+    )
+
+
+def _resolve_llm_result(query: str, llm_result: IntentResult, rule_conf: float) -> IntentResult:
+    """Blend the LLM result with rule confidence and apply guardrails."""
+    final_conf = _blend_confidence(rule_conf, llm_result.confidence)
+    final_intent = llm_result.intent
+
+    # Gardrails: "what is X" should rarely be guided_study unless user explicitly ask to study
+    if _WHAT_IS_PAT.search(query.lower()) and final_intent == LearningIntent.guided_study:
+        final_intent = LearningIntent.casual_curiosity
+        final_conf = max(0.65, final_conf - 1.10)
+    
+    llm_result.intent = final_intent
+    llm_result.confidence = final_conf
+
+    # Ensure clarifying question is intent-disambiguating
+    llm_result.clarifying_question = _normalize_clarifying_qeustion(llm_result, query)
+    return llm_result
+
+
+def _intent_event(
+    query: str,
+    result: IntentResult,
+    scores: dict[LearningIntent, float],
+    *,
+    rule_intent: LearningIntent,
+    rule_conf: float,
+    llm_ms: float | None = None,
+    cached: bool = False,
+    degraded: bool = False,
+) -> dict:
+    event = {
+        "query": query[:200],
+        "intent": result.intent,
+        "confidence": result.confidence,
+        "use_llm": result.use_llm,
+        "stage": result.stage,
+        "should_ask_clarifying_question": result.should_ask_clarifying_question,
+        "suggested_output": result.suggested_output,
+        # optional for debugging (safe):
+        "signals": scores,  # from _signal_strength
+        # rule-stage decision, so the escalation controller can be warm-started from telemetry
+        "rule_intent": rule_intent,
+        "rule_confidence": rule_conf,
+    }
+    if llm_ms is not None:
+        event["llm_ms"] = round(llm_ms, 1)
+    if cached:
+        event["cached"] = True
+    if degraded:
+        event["degraded"] = True  # LLM skipped for the latency SLO
+    return event
+
+
+# Stage 1.5: the local model answers instead of the LLM when its calibrated probability reaches this
+MODEL_CONFIDENCE_THRESHOLD = 0.80
+
+
+def intent_cache_version(model_path: Path | None = None, escalation_threshold: float = ESCALATION_THRESHOLD) -> str:
+    """
+    Changes whenever the rules, thresholds, intent prompt, local model file or active escalation
+    threshold change, invalidating cached results.
+    """
+    rules = [(r.key.value, r.pattern, r.weight) for r in _MATCHER.rules]
+    return fingerprint(
+        rules, CLARIFY_THRESHOLD, MODEL_CONFIDENCE_THRESHOLD, INTENT_SYSTEM_PROMPT,
+        model_stamp(model_path), escalation_threshold,
+    )
+
+
 class IntentClassifier:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        *,
+        model_path: Path | None = None,
+        escalation: EscalationController | None = None,
+        cache: IntentCache | None = None,
+    ) -> None:
         self.llm = LLMClient()
+        self.model_path = model_path
+        self.escalation = escalation
+        if escalation is None:
+            config = get_escalation_config()
+            if config.adaptive:
+                self.escalation = EscalationController(config)
+                telemetry.flush()
+                self.escalation.warm_start(recent_events(telemetry.INTENT_LOG_PATH, config.window))
+        self._cache_versions: dict[tuple[tuple[int, int] | None, float], str] = {}
+        self.cache = cache
+        if cache is None:
+            cache_config = get_intent_cache_config()
+            if cache_config.max_entries > 0:
+                self.cache = IntentCache(
+                    version=self._cache_version(self.escalation_threshold),
+                    max_entries=cache_config.max_entries, ttl_s=cache_config.ttl_s,
+                )
+
+    @property
+    def model(self) -> IntentModel | None:
+        """Local intent model, loaded lazily (None until `scripts/train_intent_model.py` has been run)."""
+        return get_intent_model(self.model_path)
+
+    @property
+    def escalation_threshold(self) -> float:
+        return self.escalation.threshold if self.escalation is not None else ESCALATION_THRESHOLD
+
+    def _cache_version(self, threshold: float) -> str:
+        """Cache version for the model file and escalation threshold in use, memoized per combination."""
+        key = (model_stamp(self.model_path), threshold)
+        version = self._cache_versions.get(key)
+        if version is None:
+            version = self._cache_versions[key] = intent_cache_version(self.model_path, threshold)
+        return version
+
+    def _sync_cache(self, threshold: float) -> None:
+        # results depend on the escalation threshold and model file, which change at runtime
+        if self.cache is not None:
+            self.cache.version = self._cache_version(threshold)
+
+    def _model_predictions(self, questions: list[str]) -> list[tuple[LearningIntent, float] | None]:
+        """Confident local-model predictions, or None where the LLM is still needed."""
+        model = self.model
+        if model is None or not questions:
+            return [None] * len(questions)
+        probs = model.predict_proba(questions)
+        out: list[tuple[LearningIntent, float] | None] = []
+        for row in probs:
+            k = int(np.argmax(row))
+            ok = row[k] >= MODEL_CONFIDENCE_THRESHOLD and model.classes[k] in LearningIntent.__members__
+            out.append((LearningIntent(model.classes[k]), float(row[k])) if ok else None)
+        return out
+
+    def _probe(self, rule_conf: float) -> bool:
+        """Row kept off the LLM by a lowered threshold, sent anyway so the controller can check the rules."""
+        return self.escalation is not None and self.escalation.should_probe(rule_conf)
+
+    def _observe(
+        self,
+        rule_intent: LearningIntent,
+        rule_conf: float,
+        result: IntentResult,
+        *,
+        model_ok: bool | None,
+        llm_ms: float | None,
+    ) -> None:
+        if self.escalation is not None:
+            self.escalation.observe(
+                rule_intent=rule_intent, rule_conf=rule_conf, final_intent=result.intent,
+                stage=result.stage, model_ok=model_ok, llm_ms=llm_ms,
+            )
     
-    def classify(self, user_question: str, profile: UserProfile) -> IntentResult:
+    def classify(self, user_question: str, profile: UserProfile, *, allow_llm: bool = True) -> IntentResult:
+        """
+        Intent for one question. With `allow_llm=False` (latency SLO) questions the rules are unsure
+        about get the local model's or the rules' answer instead of an LLM call; such results are not cached.
+        """
+        with span("intent.classify", allow_llm=allow_llm) as s:
+            result = self._classify(user_question, profile, allow_llm=allow_llm)
+            s.set(intent=result.intent.value, stage=result.stage, confidence=round(result.confidence, 3))
+            return result
+
+    def _classify(self, user_question: str, profile: UserProfile, *, allow_llm: bool = True) -> IntentResult:
         scores = _signal_strength(user_question)
         rule_intent = _pick_intent(scores)
         rule_conf = _calibrate_confidence(rule_intent, scores)
-
-        if not _needs_llm(scores, rule_conf, user_question):
-            # produce IntenResult from rules
-            result = IntentResult(
-                intent=rule_intent,
-                confidence=rule_conf,
-                rationale="Rule-based: strong intent signals in query.",
-                suggested_output="balanced" if rule_intent != LearningIntent.urgent_troubleshooting else "detailed",
-                should_ask_clarifying_question=rule_conf < 0.65 and rule_intent not in {LearningIntent.urgent_troubleshooting},
-                clarifying_question=_intent_clarifier(rule_intent, rule_conf, user_question),
-                use_llm=False,
-            )
-
+        threshold = self.escalation_threshold
+        self._sync_cache(threshold)
+
+        # Repeats (re-asks, forced final pass) reuse the earlier result and skip the model/LLM
+        cached = self.cache.get(user_question, profile.level) if self.cache is not None else None
+        if cached is not None:
+            current_span().set(cached=True)
+            logger.debug("Cached IntentResult:")
+            logger.debug(cached.model_dump())
+            log_intent_event(_intent_event(
+                user_question, cached, scores, rule_intent=rule_intent, rule_conf=rule_conf, cached=True
+            ))
+            return cached
+
+        needs_llm = _needs_llm(scores, rule_conf, user_question, threshold)
+        probe = not needs_llm and allow_llm and self._probe(rule_conf)
+        # Stage 1.5: local model, only for queries the rules are unsure about (probes measure rules vs LLM)
+        model_pred = self._model_predictions([user_question])[0] if needs_llm else None
+        llm_ms: float | None = None
+
+        if not needs_llm and not probe:
+            result = _rule_result(user_question, rule_intent, rule_conf)
             logger.debug("Rule-based IntentResult:")
             logger.debug(result.model_dump())
-
-            log_intent_event({
-                "query": user_question[:200],
-                "intent": result.intent,
-                "confidence": result.confidence,
-                "use_llm": result.use_llm,
-                "should_ask_clarifying_question": result.should_ask_clarifying_question,
-                "suggested_output": result.suggested_output,
-                # optional for debugging (safe):
-                "signals": scores,  # from _signal_strength
-            })
-
+        elif model_pred is not None:
+            result = _model_result(user_question, *model_pred)
+            logger.debug("Model-based IntentResult:")
+            logger.debug(result.model_dump())
+        elif not allow_llm:
+            result = _rule_result(user_question, rule_intent, rule_conf)
+            log_intent_event(_intent_event(
+                user_question, result, scores, rule_intent=rule_intent, rule_conf=rule_conf, degraded=True
+            ))
             return result
+        else:
+            # Stage 2: call LLM (query-first; profile secondary)
+            llm_result, llm_ms = self._classify_with_llm_timed(user_question, profile)
+            result = _resolve_llm_result(user_question, llm_result, rule_conf)
+            logger.debug("LLM-based IntentResult:")
+            logger.debug(result.model_dump())
 
-        # Stage 2: call LLM (query-first; profile secondary)
-        llm_result = self._classify_with_llm(user_question, profile)
+        self._observe(rule_intent, rule_conf, result, model_ok=(model_pred is not None) if needs_llm else None, llm_ms=llm_ms)
+        if self.cache is not None:
+            self.cache.put(user_question, profile.level, result)
+        log_intent_event(_intent_event(
+            user_question, result, scores, rule_intent=rule_intent, rule_conf=rule_conf, llm_ms=llm_ms
+        ))
+        return result
+
+    def classify_many(
+        self,
+        questions: list[str],
+        profile: UserProfile,
+        *,
+        max_workers: int = 8,
+    ) -> list[IntentResult]:
+        """
+        Classify a batch of questions (regression runs, telemetry re-scoring).
+
+        Rule scores for all questions form one (n x intents) matrix; intent choice and confidence
+        calibration are vectorized over it. Low-confidence rows go through the local model in one
+        call; only rows it is unsure about are sent to the LLM, concurrently,
+        and telemetry for the whole batch is written in one append. Results match `classify` per question;
+        if the LLM call fails for a row, that row keeps its rule-based result with `stage="fallback"`
+        (never cached, so callers can tell it from a real answer and retry it).
+        The escalation threshold is read once for the whole batch. Cached questions, and repeats within
+        the batch, are not classified again.
+        """
+        if not questions:
+            return []
+        with span("intent.classify_many", n=len(questions)) as s:
+            results = self._classify_many(questions, profile, max_workers=max_workers)
+            s.set(llm=sum(r.stage == "llm" for r in results))
+            return results
+
+    def _classify_many(self, questions: list[str], profile: UserProfile, *, max_workers: int) -> list[IntentResult]:
+        matrix = _MATCHER.score_matrix([q.lower() for q in questions], _INTENT_COLUMNS)
+        chosen = _pick_intents(matrix)
+        confs = _calibrate_confidences(matrix, chosen)
+        threshold = self.escalation_threshold
+        self._sync_cache(threshold)
+
+        # cache hits and repeats of an earlier row in the batch are not classified again
+        results: list[IntentResult | None] = [None] * len(questions)
+        reused: dict[int, int] = {}  # row -> first row with the same cache key
+        active = np.ones(len(questions), dtype=bool)
+        if self.cache is not None:
+            first_row: dict[tuple[str, str], int] = {}
+            for i, q in enumerate(questions):
+                key = self.cache.key(q, profile.level)
+                if key in first_row:
+                    reused[i] = first_row[key]
+                elif (hit := self.cache.get(q, profile.level)) is not None:
+                    results[i] = hit
+                else:
+                    first_row[key] = i
+                    continue
+                active[i] = False
+
+        needs_llm = _needs_llm_many(confs, threshold) & active
+        rule_rows = np.flatnonzero(active & ~needs_llm)
+        probes = [int(i) for i in rule_rows if self._probe(float(confs[i]))]
+
+        for i in rule_rows:
+            results[i] = _rule_result(questions[i], _INTENT_COLUMNS[chosen[i]], float(confs[i]))
+
+        candidates = [int(i) for i in np.flatnonzero(needs_llm)]
+        model_preds = self._model_predictions([questions[i] for i in candidates])
+        model_ok = {i: pred is not None for i, pred in zip(candidates, model_preds)}
+        llm_rows = probes.copy()
+        for i, pred in zip(candidates, model_preds):
+            if pred is not None:
+                results[i] = _model_result(questions[i], *pred)
+            else:
+                llm_rows.append(i)
+
+        llm_ms: dict[int, float] = {}
+        failed: set[int] = set()
+        if llm_rows:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(llm_rows)))) as pool:
+                futures = {i: pool.submit(bind(self._classify_with_llm_timed), questions[i], profile) for i in llm_rows}
+            for i, fut in futures.items():
+                try:
+                    llm_result, llm_ms[i] = fut.result()
+                    results[i] = _resolve_llm_result(questions[i], llm_result, float(confs[i]))
+                except Exception as e:
+                    logger.warning("LLM intent classification failed in batch (row %d): %s", i, e)
+                    results[i] = _rule_result(
+                        questions[i], _INTENT_COLUMNS[chosen[i]], float(confs[i]), stage="fallback",
+                        rationale="Rule-based: LLM classification failed.",
+                    )
+                    failed.add(i)
+
+        for i, first in reused.items():
+            results[i] = results[first].model_copy(deep=True)
+
+        logger.debug("classify_many: n=%d llm=%d cached=%d", len(questions), len(llm_rows), int((~active).sum()))
+        for i in np.flatnonzero(active):
+            r = results[i]
+            self._observe(_INTENT_COLUMNS[chosen[i]], float(confs[i]), r, model_ok=model_ok.get(i), llm_ms=llm_ms.get(i))
+            if self.cache is not None and i not in failed:
+                self.cache.put(questions[i], profile.level, r)
+        log_intent_events([
+            _intent_event(
+                q, r, dict(zip(_INTENT_COLUMNS, map(float, row))),
+                rule_intent=_INTENT_COLUMNS[c], rule_conf=float(conf), llm_ms=llm_ms.get(i), cached=not is_active,
+            )
+            for i, (q, r, row, c, conf, is_active) in enumerate(zip(questions, results, matrix, chosen, confs, active))
+        ])
+        return results
 
-        # Blend/conflict resolution
-        final_conf = _blend_confidence(rule_conf, llm_result.confidence)
-        final_intent = llm_result.intent
+    def _classify_with_llm_timed(self, user_question: str, profile: UserProfile) -> tuple[IntentResult, float]:
+        t0 = time.perf_counter()
+        with span("intent.llm"):
+            result = self._classify_with_llm(user_question, profile)
+        return result, (time.perf_counter() - t0) * 1000.0
 
-        # Gardrails: "what is X" should rarely be guided_study unless user explicitly ask to study
-        if _WHAT_IS_PAT.search(user_question.lower()) and final_intent == LearningIntent.guided_study:
-            final_intent = LearningIntent.casual_curiosity
-            final_conf = max(0.65, final_conf - 1.10)
-        
-        llm_result.intent = final_intent
-        llm_result.confidence = final_conf
-
-        # Ensure clarifying question is intent-disambiguating
-        llm_result.clarifying_question = _normalize_clarifying_qeustion(llm_result, user_question)
-
-        logger.debug("LLM-based IntentResult:")
-        logger.debug(llm_result.model_dump())
-
-        log_intent_event({
-            "query": user_question[:200],
-            "intent": llm_result.intent,
-            "confidence": llm_result.confidence,
-            "use_llm": llm_result.use_llm,
-            "should_ask_clarifying_question": llm_result.should_ask_clarifying_question,
-            "suggested_output": llm_result.suggested_output,
-            # optional for debugging (safe):
-            "signals": scores,  # from _signal_strength
-        })
-
-        return llm_result
-    
     def _classify_with_llm(self, user_question: str, profile: UserProfile) -> IntentResult:
         """Classify the intent using the LLM."""
         user_context = f"""
@@ -223,7 +584,9 @@ User goals: {profile.goals}
             LLMMessage(role="system", content=INTENT_SYSTEM_PROMPT),
             LLMMessage(role="user", content=user_context + "\nUser message: " + user_question),
         ]
-        raw = self.llm.chat(messages)
+        record_prompt_tokens("intent", messages)
+        with usage_tags(stage="intent"):
+            raw = self.llm.chat(messages)
 
         logger.debug("Raw intent classifier output:")
         logger.debug(raw)
@@ -236,6 +599,7 @@ User goals: {profile.goals}
 
         intent = IntentResult.model_validate(parsed)
         intent.use_llm = True
+        intent.stage = "llm"
         
         logger.debug("Validated IntentResult:")
         logger.debug(intent.model_dump())
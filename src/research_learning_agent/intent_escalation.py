@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable
+
+from .config import EscalationConfig, get_escalation_config
+from .telemetry import log_escalation_event, tail_events
+from .logging_utils import get_logger
+
+
+logger = get_logger("intent_escalation")
+
+
+def _label(intent: Any) -> str:
+    return str(getattr(intent, "value", intent))
+
+
+@dataclass
+class _Observation:
+    rule_conf: float
+    stage: str                  # rules | model | llm
+    model_ok: bool | None       # None when the local model was not consulted
+
+
+class EscalationController:
+    """
+    Moves the LLM escalation threshold online to keep the LLM-use rate at or below a target.
+
+    Rows with rule confidence below `threshold` go to the LLM. Over a rolling window the
+    controller knows each row's rule confidence, so it can predict the LLM-use rate any
+    threshold would have produced, and picks the highest (most accurate) threshold whose
+    predicted rate fits the target. When `latency_target_ms` is set, the target shrinks in
+    proportion while the rolling mean LLM latency is above it.
+
+    Guardrails:
+    - the threshold stays within [min_threshold, max_threshold];
+    - a confidence level is kept off the LLM only if, on LLM-checked rows at that level,
+      the rule intent agreed with the LLM at least `min_agreement` of the time over at least
+      `min_samples` rows. A small `probe_rate` of skipped rows still goes to the LLM so this
+      agreement keeps being measured after the threshold drops.
+
+    Every re-evaluation is logged to `telemetry.ESCALATION_LOG_PATH`.
+    """
+
+    def __init__(self, config: EscalationConfig | None = None) -> None:
+        self.config = config or get_escalation_config()
+        self.threshold = self.config.max_threshold
+        self._lock = threading.Lock()
+        self._window: deque[_Observation] = deque(maxlen=self.config.window)
+        self._agreement: dict[float, deque[bool]] = {}
+        self._latency_ms: deque[float] = deque(maxlen=self.config.window)
+        self._since_update = 0
+        self._skipped = 0
+
+    # ---- per-classification hooks ----
+
+    def should_probe(self, rule_conf: float) -> bool:
+        """For a row the current threshold keeps off the LLM: send it anyway to measure agreement?"""
+        cfg = self.config
+        if rule_conf >= cfg.max_threshold or cfg.probe_rate <= 0:
+            return False
+        with self._lock:
+            self._skipped += 1
+            return self._skipped % max(1, round(1 / cfg.probe_rate)) == 0
+
+    def observe(
+        self,
+        *,
+        rule_intent: Any,
+        rule_conf: float,
+        final_intent: Any,
+        stage: str,
+        model_ok: bool | None = None,
+        llm_ms: float | None = None,
+    ) -> None:
+        rule_conf = round(float(rule_conf), 4)
+        with self._lock:
+            self._window.append(_Observation(rule_conf, stage, model_ok))
+            if stage == "llm":
+                agree = self._agreement.setdefault(rule_conf, deque(maxlen=self.config.window))
+                agree.append(_label(rule_intent) == _label(final_intent))
+                if llm_ms is not None:
+                    self._latency_ms.append(float(llm_ms))
+            self._since_update += 1
+            if self._since_update < self.config.update_every:
+                return
+            self._since_update = 0
+            event = self._update()
+        log_escalation_event(event)
+
+    # ---- control ----
+
+    def agreement(self, level: float) -> tuple[float, int]:
+        """(rule/LLM agreement rate, samples) at one rule-confidence level."""
+        agree = self._agreement.get(round(level, 4), ())
+        return (sum(agree) / len(agree) if agree else 0.0), len(agree)
+
+    def _guard_ok(self, level: float) -> bool:
+        rate, n = self.agreement(level)
+        return n >= self.config.min_samples and rate >= self.config.min_agreement
+
+    def predicted_llm_rate(self, threshold: float) -> float:
+        """Share of the window that would have gone to the LLM with `threshold` (model-decided rows excluded)."""
+        if not self._window:
+            return 0.0
+        return sum(o.rule_conf < threshold and o.model_ok is not True for o in self._window) / len(self._window)
+
+    def effective_target(self) -> float:
+        cfg = self.config
+        if cfg.latency_target_ms <= 0 or not self._latency_ms:
+            return cfg.target_llm_rate
+        mean_ms = sum(self._latency_ms) / len(self._latency_ms)
+        return cfg.target_llm_rate * min(1.0, cfg.latency_target_ms / mean_ms)
+
+    def _update(self) -> dict[str, Any]:
+        cfg = self.config
+        levels = sorted({o.rule_conf for o in self._window if cfg.min_threshold <= o.rule_conf < cfg.max_threshold})
+        # a threshold T skips every level in [T, max_threshold); each of them must pass the guardrail
+        allowed = [cfg.max_threshold]
+        for level in reversed(levels):
+            if not self._guard_ok(level):
+                break
+            allowed.append(level)
+
+        target = self.effective_target()
+        fitting = [t for t in allowed if self.predicted_llm_rate(t) <= target]
+        new = max(fitting) if fitting else min(allowed)
+        old, self.threshold = self.threshold, new
+
+        window = len(self._window)
+        return {
+            "threshold": new,
+            "previous_threshold": old,
+            "changed": new != old,
+            "reason": "fits_target" if fitting else "guardrail_floor",
+            "target_llm_rate": round(target, 4),
+            "predicted_llm_rate": round(self.predicted_llm_rate(new), 4),
+            "observed_llm_rate": round(sum(o.stage == "llm" for o in self._window) / window, 4) if window else 0.0,
+            "mean_llm_ms": round(sum(self._latency_ms) / len(self._latency_ms), 1) if self._latency_ms else None,
+            "window": window,
+            "agreement": {str(level): [round(r, 3), n] for level in levels for r, n in [self.agreement(level)]},
+        }
+
+    # ---- warm start ----
+
+    def warm_start(self, events: Iterable[dict[str, Any]]) -> None:
+        """
+        Replay intent telemetry events (those carrying `rule_confidence`) without logging decisions.
+        Cache hits and LLM skips forced by the latency SLO are left out, as in live observation.
+        """
+        with self._lock:
+            for e in events:
+                if "rule_confidence" not in e or e.get("cached") or e.get("degraded"):
+                    continue
+                stage = str(e.get("stage") or ("llm" if e.get("use_llm") else "rules"))
+                self._window.append(_Observation(round(float(e["rule_confidence"]), 4), stage, True if stage == "model" else None))
+                if stage == "llm":
+                    level = round(float(e["rule_confidence"]), 4)
+                    agree = self._agreement.setdefault(level, deque(maxlen=self.config.window))
+                    agree.append(_label(e.get("rule_intent")) == _label(e.get("intent")))
+                    if e.get("llm_ms") is not None:
+                        self._latency_ms.append(float(e["llm_ms"]))
+            if self._window:
+                self._update()
+        logger.debug("escalation controller warm-started: threshold=%.2f window=%d", self.threshold, len(self._window))
+
+
+def recent_events(path: Path, n: int) -> list[dict[str, Any]]:
+    """The last `n` parseable events of a JSONL telemetry file, including its rotated archives."""
+    return tail_events(path, n)
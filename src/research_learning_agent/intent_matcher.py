@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Generic, Hashable, Sequence, TypeVar
+
+import numpy as np
+
+from .logging_utils import get_logger
+
+
+logger = get_logger("intent_matcher")
+
+
+K = TypeVar("K", bound=Hashable)
+
+
+@dataclass(frozen=True)
+class SignalRule(Generic[K]):
+    key: K          # what the rule scores (e.g. a LearningIntent)
+    pattern: str    # regex, matched anywhere in the (already normalized) text
+    weight: float = 1.0
+
+
+def _leading_word_char(pattern: str) -> str | None:
+    """First character of rules shaped like `\\b<literal>...`, which can only match at a word start."""
+    if not pattern.startswith(r"\b") or len(pattern) < 3:
+        return None
+    c = pattern[2]
+    if not c.isalnum() or (len(pattern) > 3 and pattern[3] in "?*{"):
+        return None
+    return c
+
+
+class SignalMatcher(Generic[K]):
+    """
+    Scores text against many regex rules in one scan.
+
+    Each rule contributes its weight at most once when its pattern matches anywhere, which is
+    the same as running `re.search` per rule.
+
+    Rules of the form `\\b<literal>...` (nearly all keyword rules) are compiled into a single
+    alternation inside a zero-width lookahead, guarded by a word boundary and a character class
+    of their first letters, so the engine only tries the alternation at word starts that can
+    begin a rule. Alternation reports the first rule matching at a position; later rules are
+    then checked at that position only. Any other rule is searched on its own.
+    """
+
+    def __init__(self, rules: list[SignalRule[K]]) -> None:
+        self.rules = list(rules)
+        self.keys: list[K] = list(dict.fromkeys(r.key for r in self.rules))
+        self._compiled = [re.compile(r.pattern) for r in self.rules]
+
+        leads = {i: _leading_word_char(r.pattern) for i, r in enumerate(self.rules)}
+        self._combined_rules = [i for i, c in leads.items() if c is not None]
+        self._other_rules = [i for i, c in leads.items() if c is None]
+
+        self._combined: re.Pattern[str] | None = None
+        self._group_to_rule: dict[int, int] = {}
+        if self._combined_rules:
+            first_chars = "".join(sorted({leads[i] for i in self._combined_rules}))
+            alternation = "|".join(f"(?P<r{i}>{self.rules[i].pattern[2:]})" for i in self._combined_rules)
+            self._combined = re.compile(rf"\b(?=[{re.escape(first_chars)}])(?=(?:{alternation}))")
+            # the outermost group closes last, so lastindex is the rule group even if a pattern has groups
+            self._group_to_rule = {self._combined.groupindex[f"r{i}"]: i for i in self._combined_rules}
+
+    def matched_rules(self, text: str) -> set[int]:
+        found = {i for i in self._other_rules if self._compiled[i].search(text)}
+        if self._combined is None:
+            return found
+
+        rules = self._combined_rules
+        for m in self._combined.finditer(text):
+            first = self._group_to_rule[m.lastindex]
+            found.add(first)
+            pos = m.start()
+            for i in rules[rules.index(first) + 1:]:
+                if i not in found and self._compiled[i].match(text, pos):
+                    found.add(i)
+        return found
+
+    def scores(self, text: str) -> dict[K, float]:
+        out = {k: 0.0 for k in self.keys}
+        for i in self.matched_rules(text):
+            out[self.rules[i].key] += self.rules[i].weight
+        return out
+
+    def score_matrix(self, texts: Sequence[str], keys: Sequence[K] | None = None) -> np.ndarray:
+        """Scores of many texts as an (n_texts x n_keys) matrix; columns follow `keys` (default: self.keys)."""
+        keys = list(keys) if keys is not None else self.keys
+        col = {k: j for j, k in enumerate(keys)}
+        rule_col = np.array([col.get(r.key, -1) for r in self.rules], dtype=np.int64)
+        weights = np.array([r.weight for r in self.rules], dtype=np.float64)
+
+        out = np.zeros((len(texts), len(keys)), dtype=np.float64)
+        for row, text in enumerate(texts):
+            hits = [i for i in self.matched_rules(text) if rule_col[i] >= 0]
+            if hits:
+                np.add.at(out[row], rule_col[hits], weights[hits])
+        return out
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import json
+import re
+import threading
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+from .logging_utils import get_logger
+from .telemetry import read_events
+
+
+logger = get_logger("intent_model")
+
+
+DATA_DIR = Path("data")
+INTENT_MODEL_PATH = DATA_DIR / "intent_model.npz"
+
+FEATURE_DIM = 1 << 14
+NB_ALPHA = 0.1                          # additive smoothing
+TEMPERATURES = (1.0, 1.5, 2.0, 3.0, 4.0, 6.0, 8.0, 12.0, 16.0, 24.0, 32.0, 48.0, 64.0)
+CV_FOLDS = 5
+HOLDOUT_EVERY = 4                       # 1 in N queries (by hash) is held out of training for evaluation
+
+_WORD_PAT = re.compile(r"[a-z0-9][a-z0-9'+#-]*")
+
+
+def features(text: str) -> list[int]:
+    """Hashed word unigrams, word bigrams and in-word character 4-grams."""
+    words = _WORD_PAT.findall(text.lower())
+    grams = [f"w:{w}" for w in words]
+    grams += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+    for w in words:
+        padded = f"<{w}>"
+        grams += [f"c:{padded[i:i + 4]}" for i in range(max(1, len(padded) - 3))]
+    return [zlib.crc32(g.encode("utf-8")) % FEATURE_DIM for g in grams]
+
+
+@dataclass
+class _Counts:
+    """
+    Hashed n-gram counts as sparse (row, feature, count) triples: memory grows with the n-grams
+    in the texts, not with n x FEATURE_DIM.
+    """
+
+    n: int
+    rows: np.ndarray  # (nnz,) text index
+    cols: np.ndarray  # (nnz,) feature index
+    vals: np.ndarray  # (nnz,) count
+
+    def select(self, mask: np.ndarray) -> "_Counts":
+        keep = mask[self.rows]
+        new_row = np.cumsum(mask) - 1
+        return _Counts(int(mask.sum()), new_row[self.rows[keep]], self.cols[keep], self.vals[keep])
+
+    def class_totals(self, y: np.ndarray, k: int) -> np.ndarray:
+        """(k, FEATURE_DIM) feature counts summed per class, y = class index per row."""
+        flat = np.bincount(y[self.rows] * FEATURE_DIM + self.cols, weights=self.vals, minlength=k * FEATURE_DIM)
+        return flat.reshape(k, FEATURE_DIM)
+
+    def dot(self, log_likelihood: np.ndarray) -> np.ndarray:
+        """(n, k) = counts @ log_likelihood.T, accumulated row by row from the non-zero features."""
+        if self.n == 0:
+            return np.zeros((0, len(log_likelihood)))
+        return np.stack(
+            [np.bincount(self.rows, weights=self.vals * ll[self.cols], minlength=self.n) for ll in log_likelihood],
+            axis=1,
+        )
+
+
+def _counts(texts: Sequence[str]) -> _Counts:
+    feats = [features(text) for text in texts]
+    rows = np.repeat(np.arange(len(texts), dtype=np.int64), [len(f) for f in feats])
+    cols = np.fromiter((i for f in feats for i in f), dtype=np.int64, count=len(rows))
+    keys, vals = np.unique(rows * FEATURE_DIM + cols, return_counts=True)
+    return _Counts(len(texts), keys // FEATURE_DIM, keys % FEATURE_DIM, vals.astype(np.float64))
+
+
+@dataclass
+class IntentModel:
+    """
+    Multinomial naive Bayes over hashed n-grams, with temperature-scaled probabilities.
+
+    Naive Bayes is badly over-confident on short texts; the temperature is fitted by
+    cross-validation on the training data so `predict_proba` can gate LLM escalation.
+    """
+
+    classes: list[str]
+    log_prior: np.ndarray       # (k,)
+    log_likelihood: np.ndarray  # (k, FEATURE_DIM)
+    temperature: float = 1.0
+
+    @classmethod
+    def train(cls, texts: Sequence[str], labels: Sequence[str], *, alpha: float = NB_ALPHA) -> "IntentModel":
+        x = _counts(texts)  # built once, shared by the fit and the temperature cross-validation
+        model = cls._fit(x, list(labels), alpha)
+        model.temperature = _fit_temperature(x, list(labels), alpha)
+        return model
+
+    @classmethod
+    def _fit(cls, x: _Counts, labels: list[str], alpha: float, classes: list[str] | None = None) -> "IntentModel":
+        classes = classes or sorted(set(labels))
+        y = np.array([classes.index(label) for label in labels], dtype=np.int64)
+        counts = x.class_totals(y, len(classes)) + alpha
+        prior = np.bincount(y, minlength=len(classes)) + 1.0
+        return cls(
+            classes=classes,
+            log_prior=np.log(prior / prior.sum()).astype(np.float32),
+            log_likelihood=np.log(counts / counts.sum(axis=1, keepdims=True)).astype(np.float32),
+        )
+
+    def _joint_log(self, texts: Sequence[str]) -> np.ndarray:
+        return _counts(texts).dot(self.log_likelihood) + self.log_prior
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        """(n x k) calibrated class probabilities; columns follow `self.classes`."""
+        z = self._joint_log(texts) / self.temperature
+        z -= z.max(axis=1, keepdims=True)
+        p = np.exp(z)
+        return p / p.sum(axis=1, keepdims=True)
+
+    def predict(self, text: str) -> tuple[str, float]:
+        p = self.predict_proba([text])[0]
+        k = int(np.argmax(p))
+        return self.classes[k], float(p[k])
+
+    # ---- persistence ----
+
+    def save(self, path: Path = INTENT_MODEL_PATH) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as f:
+            np.savez_compressed(
+                f,
+                classes=np.array(self.classes),
+                log_prior=self.log_prior,
+                # float16 keeps the file small; the precision loss does not change predictions in practice
+                log_likelihood=self.log_likelihood.astype(np.float16),
+                temperature=np.array(self.temperature),
+            )
+
+    @classmethod
+    def load(cls, path: Path = INTENT_MODEL_PATH) -> "IntentModel":
+        with np.load(path) as data:
+            return cls(
+                classes=[str(c) for c in data["classes"]],
+                log_prior=data["log_prior"].astype(np.float32),
+                log_likelihood=data["log_likelihood"].astype(np.float32),
+                temperature=float(data["temperature"]),
+            )
+
+
+def _fit_temperature(x: _Counts, labels: list[str], alpha: float) -> float:
+    """Pick the temperature minimizing cross-validated negative log-likelihood."""
+    n = x.n
+    classes = sorted(set(labels))
+    if n < CV_FOLDS or len(classes) < 2:
+        return TEMPERATURES[len(TEMPERATURES) // 2]
+
+    y = np.array([classes.index(label) for label in labels])
+    folds = np.arange(n) % CV_FOLDS
+    joint = np.zeros((n, len(classes)), dtype=np.float64)
+    for f in range(CV_FOLDS):
+        test = folds == f
+        model = IntentModel._fit(x.select(~test), [labels[i] for i in np.flatnonzero(~test)], alpha, classes)
+        joint[test] = x.select(test).dot(model.log_likelihood) + model.log_prior
+
+    def nll(t: float) -> float:
+        z = joint / t
+        z -= z.max(axis=1, keepdims=True)
+        log_p = z - np.log(np.exp(z).sum(axis=1, keepdims=True))
+        return float(-log_p[np.arange(n), y].mean())
+
+    return min(TEMPERATURES, key=nll)
+
+
+# ---- training data ----
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def is_holdout(query: str) -> bool:
+    """Deterministic evaluation split: these queries are never trained on, so model stats on them are honest."""
+    return zlib.crc32(_normalize_query(query).encode("utf-8")) % HOLDOUT_EVERY == 0
+
+
+def _event_label(e: dict, min_confidence: float) -> str | None:
+    """Label of a telemetry event: explicit, a fresh LLM decision, or a confident undegraded rule decision."""
+    if e.get("label"):
+        return str(e["label"])
+    if e.get("cached") or e.get("degraded"):
+        return None  # replays of an earlier decision, or rules forced by the latency SLO
+    stage = e.get("stage") or ("llm" if e.get("use_llm") else "rules")
+    if stage == "llm" or (stage == "rules" and float(e.get("confidence", 0.0)) >= min_confidence):
+        return e.get("intent")
+    return None  # stage == "model": the model's own predictions are not labels
+
+
+def load_training_data(
+    cases_path: Path,
+    events_path: Path | None = None,
+    *,
+    min_confidence: float = 0.78,
+    exclude_holdout: bool = True,
+) -> tuple[list[str], list[str]]:
+    """
+    Labelled examples from the regression fixture (`expected_intent`) and intent telemetry.
+    Telemetry events count as labels when they carry an explicit `label`, came from a non-cached
+    LLM call, or were rule-classified (not degraded) with confidence >= `min_confidence`.
+    Duplicate queries keep the first label; held-out queries (`is_holdout`) are skipped.
+    """
+    texts: list[str] = []
+    labels: list[str] = []
+    seen: set[str] = set()
+
+    def add(query: str, label: str) -> None:
+        key = _normalize_query(query)
+        if exclude_holdout and is_holdout(key):
+            return
+        if key and key not in seen:
+            seen.add(key)
+            texts.append(query)
+            labels.append(label)
+
+    if cases_path.exists():
+        for c in json.loads(cases_path.read_text(encoding="utf-8")):
+            add(str(c["query"]), str(c["expected_intent"]))
+
+    if events_path is not None:
+        for e in read_events(events_path):  # the live log and its rotated archives
+            label = _event_label(e, min_confidence)
+            if label:
+                add(str(e.get("query", "")), str(label))
+
+    return texts, labels
+
+
+# ---- lazy loading ----
+
+_cache: dict[Path, tuple[tuple[int, int] | None, IntentModel | None]] = {}
+_cache_lock = threading.Lock()
+
+
+def model_stamp(path: Path | None = None) -> tuple[int, int] | None:
+    """(mtime_ns, size) of the trained model file, or None if it has not been trained."""
+    try:
+        st = (path or INTENT_MODEL_PATH).stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def get_intent_model(path: Path | None = None) -> IntentModel | None:
+    """Load the trained model once per path, and again after the file is retrained; None if not trained."""
+    path = path or INTENT_MODEL_PATH
+    stamp = model_stamp(path)
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached is None or cached[0] != stamp:
+            model = None
+            if stamp is not None:
+                try:
+                    model = IntentModel.load(path)
+                    logger.debug("loaded intent model from %s", path)
+                except Exception as e:
+                    logger.warning("could not load intent model %s: %s", path, e)
+            cached = _cache[path] = (stamp, model)
+        return cached[1]
@@ -1,15 +1,32 @@
 import os
+import threading
 
 from openai import OpenAI
 
 from .schemas import LLMMessage
 from .config import get_llm_config
+from .tracing import span
+from .prompt_budget import count_message_tokens, count_tokens
+from .usage import record_llm_usage
 from .logging_utils import get_logger
 
 
 logger = get_logger("LLMClient")
 
 
+_clients: dict[str, OpenAI] = {}
+_clients_lock = threading.Lock()
+
+
+def _shared_openai(api_key: str) -> OpenAI:
+    """One OpenAI client (and connection pool) per API key, shared by every component; it is thread-safe."""
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            client = _clients[api_key] = OpenAI(api_key=api_key)
+        return client
+
+
 class LLMClient:
     """Thin wrapper around the OpenAI chat completions API."""
     
@@ -18,7 +35,7 @@ class LLMClient:
         if not api_key:
             raise ValueError("OPENAI_API_KEY environment variable is not set")
         
-        self.client = OpenAI(api_key=api_key)
+        self.client = _shared_openai(api_key)
         self.config = get_llm_config()
     
     def chat(self, messages: list[LLMMessage]) -> str:
@@ -27,19 +44,33 @@ class LLMClient:
         for m in messages:
             logger.debug("ROLE=%s CONTENT=%s", m.role, m.content)
 
-        completion = self.client.chat.completions.create(
-            model=self.config.model_name,
-            messages=[m.model_dump() for m in messages],
-            temperature=self.config.temperature,
-            max_tokens=self.config.max_tokens,
-        )
+        with span("llm.chat", model=self.config.model_name, messages=len(messages)) as s:
+            completion = self.client.chat.completions.create(
+                model=self.config.model_name,
+                messages=[m.model_dump() for m in messages],
+                temperature=self.config.temperature,
+                max_tokens=self.config.max_tokens,
+            )
 
-        reply = completion.choices[0].message.content
+            reply = completion.choices[0].message.content
+            s.set(reply_chars=len(reply or ""))
+            self._record_usage(completion, messages, reply)
 
         logger.debug("Received raw LLM response:")
         logger.debug(reply)
 
         return reply
 
-
-    
\ No newline at end of file
+    def _record_usage(self, completion: object, messages: list[LLMMessage], reply: str | None) -> None:
+        """Record the tokens the API reports for this call; count them locally if it reports none."""
+        usage = getattr(completion, "usage", None)
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        completion_tokens = getattr(usage, "completion_tokens", None)
+        estimated = prompt_tokens is None or completion_tokens is None
+        if estimated:
+            prompt_tokens = count_message_tokens(messages)
+            completion_tokens = count_tokens(reply or "")
+        record_llm_usage(
+            model=self.config.model_name, prompt_tokens=int(prompt_tokens), completion_tokens=int(completion_tokens),
+            estimated=estimated,
+        )
@@ -1,7 +1,14 @@
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
 
-from .schemas import UserMemory, LearningMode, MemoryItem
-from .store.memory_store import MemoryStore
+from .schemas import UserMemory, MemoryHead, LearningMode, MemoryItem, AgentAnswer
+from .store.base import BaseMemoryStore
+from .memory_extract import extract_memory_fields
+from .memory_index import HistoryIndex, MIN_SCORE, text_features
+from .memory_rollup import MemoryRollup, roll_up
+from .prompt_budget import count_tokens, truncate_field
 from .logging_utils import get_logger
 
 
@@ -11,18 +18,54 @@ logger = get_logger("memory_manager")
 MAX_HISTORY = 50
 MAX_TOPICS = 10
 
+RELEVANT_HISTORY_K = 5
+HISTORY_CONTEXT_TOKENS = 200  # cap for the relevant-history block in the prompt context
+
+MAX_PENDING_ROLLUP = 200      # evicted items waiting for the background rollup; beyond this, fold inline
+DIGEST_CONTEXT_TOKENS = 120   # cap for the topic-digest block in the prompt context
+DIGEST_CONTEXT_K = 3
+
+MAX_CACHED_INDEXES = 1024     # per-user history indexes kept in memory; evicted ones are rebuilt from the store
+
 
 class MemoryManager:
-    def __init__(self, store: MemoryStore) -> None:
+    def __init__(
+        self,
+        store: BaseMemoryStore,
+        *,
+        background_rollup: bool = True,
+        max_cached_indexes: int = MAX_CACHED_INDEXES,
+    ) -> None:
         self.store = store
+        self.max_cached_indexes = max_cached_indexes
+        self._indexes: OrderedDict[str, HistoryIndex] = OrderedDict()
+        self._indexes_guard = threading.Lock()
+        self._locks: dict[str, threading.RLock] = {}
+        self._locks_guard = threading.Lock()
+        self.rollup = MemoryRollup(self._lock, self.store.save) if background_rollup else None
+
+    def _lock(self, user_id: str) -> threading.RLock:
+        with self._locks_guard:
+            return self._locks.setdefault(user_id, threading.RLock())
 
     def load(self, user_id: str = "default") -> UserMemory:
         logger.debug("Loading memory for user %s", user_id)
-        return self.store.load(user_id) or UserMemory(user_id=user_id)
+        mem = self.store.load(user_id) or UserMemory(user_id=user_id)
+        if mem.rollup_pending:  # left over from a rollup that never ran (e.g. process exit)
+            self._schedule_rollup(mem)
+        return mem
+
+    def load_head(self, user_id: str = "default") -> MemoryHead:
+        """Topics and preferences only; enough for build_prompt_context without reading history."""
+        return self.store.load_head(user_id) or MemoryHead(user_id=user_id)
+
+    def load_history(self, user_id: str = "default", *, offset: int = 0, limit: int | None = None) -> list[MemoryItem]:
+        return self.store.load_history(user_id, offset=offset, limit=limit)
 
     def save(self, mem: UserMemory) -> None:
         logger.debug("Saving memory for user %s", mem.user_id)
-        self.store.save(mem)
+        with self._lock(mem.user_id):
+            self.store.save(mem)
     
     def update_after_answer(
         self,
@@ -38,27 +81,136 @@ class MemoryManager:
 
         ts = datetime.now(timezone.utc).isoformat()
         item = MemoryItem(ts=ts, query=query[:200], topic=topic, intent=intent, mode=mode, summary=answer_summary[:300])
-        mem.history.append(item)
-        mem.history = mem.history[-MAX_HISTORY:]
-
-        # update topics list (unique, keep recency)
-        if topic:
-            if topic in mem.topics:
-                mem.topics.remove(topic)
-            mem.topics.append(topic)
-            mem.topics = mem.topics[-MAX_TOPICS:]
-            mem.last_topic = topic
-        
+        with self._lock(mem.user_id):
+            mem.history.append(item)
+            # evicted items are folded into topic digests later instead of being dropped
+            mem.rollup_pending.extend(mem.history[:-MAX_HISTORY])
+            mem.history = mem.history[-MAX_HISTORY:]
+
+            # update topics list (unique, keep recency)
+            if topic:
+                if topic in mem.topics:
+                    mem.topics.remove(topic)
+                mem.topics.append(topic)
+                mem.topics = mem.topics[-MAX_TOPICS:]
+                mem.last_topic = topic
+
+            if mem.rollup_pending:
+                self._schedule_rollup(mem)
+
+            self._index(mem.user_id).sync(mem.history)
         return mem
 
-    def build_prompt_context(self, mem: UserMemory) -> str:
+    def _schedule_rollup(self, mem: UserMemory) -> None:
+        if self.rollup is None or len(mem.rollup_pending) >= MAX_PENDING_ROLLUP:
+            with self._lock(mem.user_id):
+                roll_up(mem)
+            return
+        self.rollup.submit(mem)
+
+    def remember_answer(
+        self,
+        mem: UserMemory,
+        *,
+        query: str,
+        intent: str,
+        answer: AgentAnswer,
+    ) -> UserMemory:
+        """update_after_answer with topic and summary extracted locally from the answer (no LLM call)."""
+        t0 = time.perf_counter()
+        topic, summary = extract_memory_fields(query, answer)
+        logger.debug("extracted memory fields topic=%r in %.2fms", topic, (time.perf_counter() - t0) * 1000)
+        return self.update_after_answer(
+            mem, query=query, topic=topic, intent=intent, mode=answer.mode, answer_summary=summary
+        )
+
+    def _index(self, user_id: str) -> HistoryIndex:
+        # the per-user lock makes one thread build a missing index; the guard protects the shared LRU
+        with self._lock(user_id):
+            with self._indexes_guard:
+                index = self._indexes.get(user_id)
+                if index is not None:
+                    self._indexes.move_to_end(user_id)
+                    return index
+            index = HistoryIndex()
+            index.sync(self.store.load_history(user_id))
+            with self._indexes_guard:
+                self._indexes[user_id] = index
+                while len(self._indexes) > self.max_cached_indexes:
+                    self._indexes.popitem(last=False)
+            return index
+
+    def relevant_history(self, mem: MemoryHead, question: str, k: int = RELEVANT_HISTORY_K) -> list[MemoryItem]:
+        """History items most related to `question`, best first."""
+        with self._lock(mem.user_id):
+            index = self._index(mem.user_id)
+            if isinstance(mem, UserMemory):
+                index.sync(mem.history)
+            return [item for item, _ in index.search(question, k)]
+
+    def build_prompt_context(
+        self,
+        mem: MemoryHead,
+        question: str | None = None,
+        *,
+        history_token_cap: int = HISTORY_CONTEXT_TOKENS,
+    ) -> str:
         # Keep this short. The generator prompt should not blow up.
         recent_topics = ", ".join(mem.topics[max(-5, -MAX_HISTORY):]) if mem.topics else "none"
         prefs = mem.preferences
 
-        return (
+        ctx = (
             f"USER_MEMORY:\n"
             f"- Recent topics: {recent_topics}\n"
             f"- Preferences: explanation_style={prefs.explanation_style.value}, resource_preference={prefs.resource_preference.value}, verbosity={prefs.verbosity.value}\n"
             f"- Avoid repeating basics for topics the user already coverred.\n"
         )
+        if question:
+            ctx += self._relevant_history_block(mem, question, history_token_cap)
+        ctx += self._digest_block(mem, question)
+        return ctx
+
+    def _digest_block(self, mem: MemoryHead, question: str | None) -> str:
+        """Long-term topics rolled up out of history: most related to the question, else most recent."""
+        digests = [d for d in mem.digests if d.topic not in mem.topics[-5:]]
+        if not digests:
+            return ""
+        if question:
+            q = text_features(question)
+            scored = [(float(text_features(f"{d.topic} {d.topic} {d.summary}") @ q), d) for d in digests]
+            digests = [d for score, d in sorted(scored, key=lambda x: -x[0]) if score >= MIN_SCORE]
+        else:
+            digests = list(reversed(digests))
+
+        header = "- Earlier topics:\n"
+        used = count_tokens(header)
+        lines: list[str] = []
+        for d in digests[:DIGEST_CONTEXT_K]:
+            line = f"  - {d.topic} (asked {d.count}x, last {d.last_seen[:10]})"
+            if d.summary:
+                line += f": {truncate_field(d.summary, 160)}"
+            n = count_tokens(line) + 1
+            if used + n > DIGEST_CONTEXT_TOKENS:
+                break
+            used += n
+            lines.append(line)
+        if not lines:
+            return ""
+        return header + "\n".join(lines) + "\n"
+
+    def _relevant_history_block(self, mem: MemoryHead, question: str, token_cap: int) -> str:
+        header = "- Related earlier questions:\n"
+        used = count_tokens(header)
+        lines: list[str] = []
+        for item in self.relevant_history(mem, question):
+            line = f"  - [{item.topic}] {truncate_field(item.query, 120)}"
+            if item.summary:
+                line += f" -> {truncate_field(item.summary, 160)}"
+            n = count_tokens(line) + 1
+            if used + n > token_cap:
+                break
+            used += n
+            lines.append(line)
+        if not lines:
+            return ""
+        return header + "\n".join(lines) + "\n"
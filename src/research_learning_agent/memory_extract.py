@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import re
+from collections import Counter
+
+from .schemas import AgentAnswer
+from .logging_utils import get_logger
+
+
+logger = get_logger("memory_extract")
+
+
+MAX_TOPIC_WORDS = 4
+MAX_SUMMARY_CHARS = 300
+
+_WORD_PAT = re.compile(r"[a-z0-9][a-z0-9+#'-]*")
+_PHRASE_SPLIT = re.compile(r"[.,;:!?()\[\]{}\"\n\t/|*`]+")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+_MARKDOWN_PAT = re.compile(r"^\s*(?:[-*+]|\d+[.)]|#+)\s*|\*\*|__|`|\[(.*?)\]\([^)]*\)")
+_STOPWORDS = frozenset(
+    "a about above after again all also am an and any are as at be because been before being below between both "
+    "but by can could did do does doing down during each few for from further had has have having he her here "
+    "hers him his how i if in into is it its itself just me more most my no nor not now of off on once only or "
+    "other our out over own same she should so some such than that the their them then there these they this "
+    "those through to too under until up use used using very vs want was we were what when where which while "
+    "who whom why will with would you your explain tell show give need please help learn understand "
+    "know get make difference between example examples work works mean means unable able try trying keep keeps "
+    "still getting doesn't don't can't won't isn't".split()
+)
+
+
+def _words(text: str) -> list[str]:
+    return _WORD_PAT.findall(text.lower())
+
+
+def _clean_markdown(text: str) -> str:
+    return _MARKDOWN_PAT.sub(lambda m: m.group(1) or "", text)
+
+
+def candidate_phrases(text: str) -> list[tuple[str, ...]]:
+    """RAKE candidates: runs of non-stopwords between stopwords/punctuation."""
+    phrases: list[tuple[str, ...]] = []
+    for chunk in _PHRASE_SPLIT.split(text.lower()):
+        run: list[str] = []
+        for w in _WORD_PAT.findall(chunk):
+            if w in _STOPWORDS or w.isdigit():
+                if run:
+                    phrases.append(tuple(run))
+                run = []
+            else:
+                run.append(w)
+        if run:
+            phrases.append(tuple(run))
+    return phrases
+
+
+def word_scores(phrases: list[tuple[str, ...]]) -> dict[str, float]:
+    """RAKE word score: degree / frequency over all candidate phrases."""
+    freq: Counter[str] = Counter()
+    degree: Counter[str] = Counter()
+    for p in phrases:
+        for w in p:
+            freq[w] += 1
+            degree[w] += len(p)
+    return {w: degree[w] / freq[w] for w in freq}
+
+
+def extract_topic(question: str, context: str = "") -> str:
+    """
+    Short topic label for a question.
+
+    Candidates come from the question only (the topic should name what was asked);
+    words are scored with RAKE over question + answer text, so terms the answer keeps
+    returning to outrank incidental ones.
+    """
+    q_phrases = candidate_phrases(question)
+    if not q_phrases:
+        return " ".join(_words(question)[:MAX_TOPIC_WORDS])
+
+    scores = word_scores(q_phrases + candidate_phrases(context))
+    best = max(
+        q_phrases,
+        key=lambda p: sum(scores.get(w, 0.0) for w in p[:MAX_TOPIC_WORDS]),
+    )
+    return " ".join(best[:MAX_TOPIC_WORDS])
+
+
+def split_sentences(texts: list[str], min_chars: int = 20) -> list[str]:
+    out: list[str] = []
+    for text in texts:
+        for raw in _SENTENCE_SPLIT.split(text or ""):
+            s = " ".join(_clean_markdown(raw).split())
+            if len(s) >= min_chars and not s.lower().startswith(("http://", "https://")):
+                out.append(s)
+    return out
+
+
+def extract_summary(question: str, answer: AgentAnswer, max_chars: int = MAX_SUMMARY_CHARS) -> str:
+    texts = [answer.explanation, *answer.bullet_summary, *(s.content for s in answer.sections)]
+    return summarize_sentences(question, split_sentences(texts), max_chars)
+
+
+def summarize_sentences(query: str, sentences: list[str], max_chars: int = MAX_SUMMARY_CHARS) -> str:
+    """
+    Extractive summary: score sentences by query-term overlap and term frequency across
+    all sentences (earlier sentences get a small bonus), then keep the best ones in
+    original order within `max_chars`.
+    """
+    if not sentences:
+        return ""
+
+    q_terms = {w for w in _words(query) if w not in _STOPWORDS}
+    tf = Counter(w for s in sentences for w in _words(s) if w not in _STOPWORDS)
+    top_tf = max(tf.values(), default=1)
+
+    scored: list[tuple[float, int]] = []
+    for i, s in enumerate(sentences):
+        terms = [w for w in _words(s) if w not in _STOPWORDS]
+        if not terms:
+            continue
+        overlap = sum(2.0 for w in set(terms) if w in q_terms)
+        salience = sum(tf[w] / top_tf for w in terms) / len(terms) ** 0.5
+        position = 1.0 / (1 + i)
+        scored.append((overlap + salience + position, i))
+
+    chosen: list[int] = []
+    used = 0
+    for _, i in sorted(scored, reverse=True):
+        n = len(sentences[i]) + (1 if chosen else 0)
+        if used + n > max_chars:
+            continue
+        chosen.append(i)
+        used += n
+
+    if not chosen:  # every sentence is longer than the limit
+        first = sentences[max(scored)[1]] if scored else sentences[0]
+        return first[: max_chars - 3].rstrip() + "..."
+    return " ".join(sentences[i] for i in sorted(chosen))
+
+
+def extract_memory_fields(question: str, answer: AgentAnswer) -> tuple[str, str]:
+    """(topic, summary) for MemoryManager.update_after_answer, without an LLM call."""
+    context = " ".join([answer.explanation, *answer.bullet_summary, *(s.title for s in answer.sections)])
+    return extract_topic(question, context), extract_summary(question, answer)
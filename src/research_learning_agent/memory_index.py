@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import re
+import zlib
+
+import numpy as np
+
+from .schemas import MemoryItem
+from .logging_utils import get_logger
+
+
+logger = get_logger("memory_index")
+
+
+INDEX_DIM = 2048        # hashed feature space for character n-grams
+NGRAM_SIZES = (3, 4)
+MIN_SCORE = 0.15        # cosine similarity below which a history item is not considered relevant
+
+_WORD_PAT = re.compile(r"[a-z0-9]+")
+
+
+def text_features(text: str) -> np.ndarray:
+    """Hashed, log-scaled, L2-normalized character n-gram vector (n-grams do not cross word boundaries)."""
+    vec = np.zeros(INDEX_DIM, dtype=np.float32)
+    buckets: list[int] = []
+    for word in _WORD_PAT.findall(text.lower()):
+        padded = f" {word} "
+        for n in NGRAM_SIZES:
+            for i in range(len(padded) - n + 1):
+                buckets.append(zlib.crc32(padded[i:i + n].encode("utf-8")) % INDEX_DIM)
+    if not buckets:
+        return vec
+    np.add.at(vec, buckets, 1.0)
+    vec = np.log1p(vec)
+    return vec / max(float(np.linalg.norm(vec)), 1e-12)
+
+
+def item_text(item: MemoryItem) -> str:
+    # topic and query describe what was asked; summary adds what was learned
+    return f"{item.topic} {item.topic} {item.query} {item.summary}"
+
+
+class HistoryIndex:
+    """
+    Per-user retrieval index over MemoryItem topic/query/summary.
+
+    Each item is one row of a dense (n_items x INDEX_DIM) matrix; search is one matrix-vector
+    product plus argpartition, so latency is bounded by the history window, not by the text.
+    Rows are appended/dropped incrementally to follow the history window.
+    """
+
+    def __init__(self) -> None:
+        self.items: list[MemoryItem] = []
+        self._matrix = np.zeros((0, INDEX_DIM), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def add(self, item: MemoryItem) -> None:
+        self.items.append(item)
+        self._matrix = np.vstack([self._matrix, text_features(item_text(item))[None, :]])
+
+    def sync(self, history: list[MemoryItem]) -> None:
+        """Make the index match `history`: drop evicted rows, index only new items."""
+        if [it.ts for it in self.items] == [it.ts for it in history]:
+            return
+        wanted = {it.ts for it in history}
+        keep = [i for i, it in enumerate(self.items) if it.ts in wanted]
+        if len(keep) != len(self.items):
+            self.items = [self.items[i] for i in keep]
+            self._matrix = self._matrix[keep]
+
+        indexed = {it.ts for it in self.items}
+        new_items = [it for it in history if it.ts not in indexed]
+        if new_items:
+            self.items.extend(new_items)
+            self._matrix = np.vstack([self._matrix, np.stack([text_features(item_text(it)) for it in new_items])])
+
+    def search(self, query: str, k: int = 5, *, min_score: float = MIN_SCORE) -> list[tuple[MemoryItem, float]]:
+        """Top-k items by cosine similarity to `query`, best first."""
+        if not self.items or k <= 0:
+            return []
+        q = text_features(query)
+        if not q.any():
+            return []
+        scores = self._matrix @ q
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.items[i], float(scores[i])) for i in top if scores[i] >= min_score]
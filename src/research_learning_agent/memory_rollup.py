@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Callable
+
+from .schemas import MemoryItem, TopicDigest, UserMemory
+from .memory_extract import split_sentences, summarize_sentences
+from .logging_utils import get_logger
+
+
+logger = get_logger("memory_rollup")
+
+
+MAX_DIGESTS = 30
+DIGEST_SUMMARY_CHARS = 300
+
+
+def _key(topic: str) -> str:
+    return " ".join(topic.lower().split())
+
+
+def fold_into_digests(digests: list[TopicDigest], items: list[MemoryItem]) -> list[TopicDigest]:
+    """
+    Fold history items into per-topic digests (count, modes used, first/last seen, merged summary).
+    Returns digests ordered by last_seen (most recent last), capped at MAX_DIGESTS.
+    """
+    by_topic = {_key(d.topic): d.model_copy(deep=True) for d in digests}
+    new_summaries: dict[str, list[str]] = {}
+
+    for it in items:
+        if not it.topic:
+            continue
+        key = _key(it.topic)
+        d = by_topic.get(key)
+        if d is None:
+            d = by_topic[key] = TopicDigest(topic=it.topic, first_seen=it.ts, last_seen=it.ts)
+        d.count += 1
+        mode = str(getattr(it.mode, "value", it.mode))
+        d.modes[mode] = d.modes.get(mode, 0) + 1
+        d.first_seen = min(d.first_seen, it.ts)
+        d.last_seen = max(d.last_seen, it.ts)
+        if it.summary:
+            new_summaries.setdefault(key, []).append(it.summary)
+
+    for key, summaries in new_summaries.items():
+        d = by_topic[key]
+        # newest summaries first so they win ties in the extractive merge
+        sentences = split_sentences(list(reversed(summaries)) + [d.summary], min_chars=1)
+        d.summary = summarize_sentences(d.topic, list(dict.fromkeys(sentences)), DIGEST_SUMMARY_CHARS)
+
+    out = sorted(by_topic.values(), key=lambda d: d.last_seen)
+    return out[-MAX_DIGESTS:]
+
+
+def roll_up(mem: UserMemory) -> int:
+    """Move `mem.rollup_pending` into `mem.digests`. Caller holds the user's lock. Returns items folded."""
+    pending = mem.rollup_pending
+    if not pending:
+        return 0
+    mem.digests = fold_into_digests(mem.digests, pending)
+    mem.rollup_pending = []
+    return len(pending)
+
+
+class MemoryRollup:
+    """
+    Background worker that folds evicted history items into topic digests.
+
+    `MemoryManager.update_after_answer` only moves evicted items to `rollup_pending` and submits the
+    memory here, so the answer path never pays for digest merging. The worker folds under the
+    same per-user lock the manager uses and persists the result with `save`.
+    """
+
+    def __init__(
+        self,
+        lock_for: Callable[[str], threading.RLock],
+        save: Callable[[UserMemory], None],
+    ) -> None:
+        self._lock_for = lock_for
+        self._save = save
+        self._queue: queue.Queue[UserMemory | None] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._start_guard = threading.Lock()
+
+    def submit(self, mem: UserMemory) -> None:
+        self._ensure_started()
+        self._queue.put(mem)
+
+    def _ensure_started(self) -> None:
+        with self._start_guard:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="memory-rollup", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            mem = self._queue.get()
+            try:
+                if mem is None:
+                    return
+                with self._lock_for(mem.user_id):
+                    folded = roll_up(mem)
+                    if folded:
+                        self._save(mem)
+                if folded:
+                    logger.debug("rolled up %d history items for user %s", folded, mem.user_id)
+            except Exception:
+                logger.exception("memory rollup failed for user %s", getattr(mem, "user_id", "?"))
+            finally:
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        """Block until every submitted memory has been rolled up."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import atexit
+import bisect
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from .store.write_behind import atomic_write_text
+from .logging_utils import get_logger
+
+
+logger = get_logger("metrics")
+
+
+# `.prom` suffix -> Prometheus text exposition format, anything else -> JSON
+SNAPSHOT_PATH = Path(os.getenv("METRICS_SNAPSHOT_PATH", "data/metrics.json"))
+SNAPSHOT_INTERVAL_S = 10.0
+# Latency buckets (ms): geometric, each 25% wider, 0.1 ms .. ~2 min
+BUCKET_EDGES_MS = tuple(round(0.1 * 1.25 ** k, 3) for k in range(64))
+PERCENTILES = (50, 95, 99)
+
+_LabelKey = tuple[tuple[str, str], ...]
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; percentiles are bucket upper edges (<= 25% relative error)."""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKET_EDGES_MS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        self.counts[bisect.bisect_left(BUCKET_EDGES_MS, value_ms)] += 1
+        self.count += 1
+        self.sum += value_ms
+
+    def percentile(self, q: float) -> float | None:
+        if self.count == 0:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if c and seen >= rank:
+                return BUCKET_EDGES_MS[min(i, len(BUCKET_EDGES_MS) - 1)]
+        return BUCKET_EDGES_MS[-1]
+
+
+class MetricsRegistry:
+    """In-process histograms and counters keyed by metric name + labels; thread-safe."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._histograms: dict[str, dict[_LabelKey, Histogram]] = {}
+        self._counters: dict[str, dict[_LabelKey, float]] = {}
+        self._last_snapshot = 0.0
+
+    @staticmethod
+    def _key(labels: dict[str, Any]) -> _LabelKey:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def observe(self, name: str, value_ms: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._histograms.setdefault(name, {}).setdefault(key, Histogram()).observe(value_ms)
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    # ---- export ----
+
+    def snapshot(self) -> dict[str, Any]:
+        """JSON-friendly view: per series count/sum/mean and p50/p95/p99 (ms); counters as values."""
+        with self._lock:
+            hists = {
+                name: [
+                    {
+                        "labels": dict(key),
+                        "count": h.count,
+                        "sum_ms": round(h.sum, 3),
+                        "mean_ms": round(h.sum / h.count, 3) if h.count else None,
+                        **{f"p{q}_ms": h.percentile(q) for q in PERCENTILES},
+                    }
+                    for key, h in sorted(series.items())
+                ]
+                for name, series in sorted(self._histograms.items())
+            }
+            counters = {
+                name: [{"labels": dict(key), "value": v} for key, v in sorted(series.items())]
+                for name, series in sorted(self._counters.items())
+            }
+        return {"ts": time.time(), "histograms": hists, "counters": counters}
+
+    def to_prometheus(self, prefix: str = "rla_") -> str:
+        def fmt(labels: _LabelKey, extra: tuple[tuple[str, str], ...] = ()) -> str:
+            pairs = [*labels, *extra]
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+        lines: list[str] = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                metric = prefix + name
+                lines.append(f"# TYPE {metric} histogram")
+                for key, h in sorted(series.items()):
+                    cumulative = 0
+                    for edge, c in zip(BUCKET_EDGES_MS, h.counts):
+                        cumulative += c
+                        if c:  # sparse buckets keep the file small; cumulative counts stay correct
+                            lines.append(f"{metric}_bucket{fmt(key, (('le', str(edge)),))} {cumulative}")
+                    lines.append(f"{metric}_bucket{fmt(key, (('le', '+Inf'),))} {h.count}")
+                    lines.append(f"{metric}_sum{fmt(key)} {h.sum:.3f}")
+                    lines.append(f"{metric}_count{fmt(key)} {h.count}")
+            for name, series in sorted(self._counters.items()):
+                metric = prefix + name
+                lines.append(f"# TYPE {metric} counter")
+                for key, v in sorted(series.items()):
+                    lines.append(f"{metric}{fmt(key)} {v:g}")
+        return "\n".join(lines) + "\n"
+
+    def write_snapshot(self, path: Path | None = None) -> Path:
+        path = path or SNAPSHOT_PATH
+        text = self.to_prometheus() if path.suffix == ".prom" else json.dumps(self.snapshot(), indent=2)
+        atomic_write_text(path, text)
+        with self._lock:
+            self._last_snapshot = time.monotonic()
+        return path
+
+    def maybe_write_snapshot(self, path: Path | None = None) -> None:
+        """Write the snapshot if the last one is older than SNAPSHOT_INTERVAL_S; never raises."""
+        if time.monotonic() - self._last_snapshot < SNAPSHOT_INTERVAL_S:
+            return
+        try:
+            self.write_snapshot(path)
+        except Exception as e:
+            logger.warning("could not write metrics snapshot: %s", e)
+
+
+REGISTRY = MetricsRegistry()
+
+
+@atexit.register
+def _final_snapshot() -> None:
+    if REGISTRY._histograms or REGISTRY._counters:
+        try:
+            REGISTRY.write_snapshot()
+        except Exception:
+            pass
+
+
+class StageTimer:
+    """Times named stages of one request; totals per stage land in `timings_ms` and in the registry."""
+
+    def __init__(
+        self,
+        metric: str = "stage_latency_ms",
+        registry: MetricsRegistry | None = None,
+        *,
+        on_stage: Callable[[str, float], None] | None = None,
+    ) -> None:
+        self.metric = metric
+        self.registry = registry or REGISTRY
+        self.on_stage = on_stage  # called with (stage, ms) as each stage ends, e.g. to stream progress
+        self.timings_ms: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            ms = (time.perf_counter() - t0) * 1000.0
+            self.timings_ms[name] = round(self.timings_ms.get(name, 0.0) + ms, 3)
+            self.registry.observe(self.metric, ms, stage=name)
+            if self.on_stage is not None:
+                self.on_stage(name, ms)
+
+
+# ---- HTTP call accounting (attributed to the enclosing tool call) ----
+
+@dataclass
+class HTTPCallStats:
+    attempts: int = 0
+    retries: int = 0
+    backoff_ms: float = 0.0
+
+
+_http_stats: contextvars.ContextVar[HTTPCallStats | None] = contextvars.ContextVar("http_stats", default=None)
+
+
+@contextmanager
+def collect_http_stats() -> Iterator[HTTPCallStats]:
+    """HTTP attempts/retries/backoff made inside the block (by tools/http.request) are added to the yielded stats."""
+    stats = HTTPCallStats()
+    token = _http_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _http_stats.reset(token)
+
+
+def current_http_stats() -> HTTPCallStats | None:
+    return _http_stats.get()
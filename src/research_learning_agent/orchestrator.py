@@ -1,34 +1,198 @@
 from __future__ import annotations
 
+from typing import Callable
+
 from .schemas import (
     UserQuery, AgentAnswer, UserProfile, StepType, OrchestratorActionType, 
-    OrchestratorAction, OrchestratorResult, ToolResult
+    OrchestratorAction, OrchestratorResult, ToolResult, LearningMode, Degradation, Plan, IntentResult,
+    PlanStep, ToolCall, ToolType
 )
 from .intent_classifier import IntentClassifier
-from .planner import Planner
-from .generator import Generator
+from .planner import Planner, template_plan
+from .generator import Generator, generation_calls
+from .simple_agent import SimpleAgent
 from .tool_executor import ToolExecutor
 from .pedagogy import Pedagogy
+from .metrics import REGISTRY, StageTimer
+from .tracing import span, start_trace
+from .usage import (
+    UsageCollector, UsageLedger, collect_usage, mode_within_budget, remaining_tokens, usage_event, usage_tags
+)
+from .slo import LatencyBudget, StageLatencyModel
+from .session import SessionState, SessionStore
+from .evidence_ranker import uncovered_terms
+from .config import get_generator_config, get_llm_config, get_session_config, get_slo_config, get_usage_budget_config
+from .telemetry import log_usage_event
 from .logging_utils import get_logger
 
 
 logger = get_logger("Orchesrator")
 
 
+FOLLOW_UP_TOP_K = 3  # results fetched when a follow-up asks about something the session's evidence does not cover
+
+
 class Orchestrator:
     def __init__(self) -> None:
         self.intent = IntentClassifier()
         self.planner = Planner()
         self.tools = ToolExecutor()
         self.pedagogy = Pedagogy()
-        self.generator = Generator()
+        self.generator_config = get_generator_config()  # also sizes the token-budget estimate of a generation
+        self.generator = Generator(self.generator_config)
+        self.usage_ledger = UsageLedger()
+        self.budget = get_usage_budget_config()
+        self.slo = get_slo_config()
+        self.stage_latency = StageLatencyModel()
+        self.simple_agent: SimpleAgent | None = None  # created on first use by the last SLO ladder step
+        session_config = get_session_config()
+        self.sessions = SessionStore(max_sessions=session_config.max_sessions, ttl_s=session_config.ttl_s)
+
+    def run(
+        self,
+        query: UserQuery,
+        profile: UserProfile,
+        *,
+        force_final: bool = False,
+        trace_id: str | None = None,
+        latency_budget_ms: float | None = None,
+        on_stage: Callable[[str, float], None] | None = None,
+    ) -> OrchestratorResult:
+        """
+        Answer one question. Turns sharing a `query.session_id` reuse the session's earlier work: a
+        clarification reply re-classifies the intent only, the force_final pass keeps it, and a
+        follow-up after an answer reuses intent, plan and evidence (fetching more only for terms the
+        evidence does not cover), so it costs one generator call. With a latency budget (`latency_budget_ms`, default `ORCH_LATENCY_BUDGET_MS`)
+        stages that overrun their share degrade step by step; the steps taken are in `answer.degradations`.
+        `on_stage(stage, ms)` is called as each stage ends.
+        """
+        timer = StageTimer(on_stage=on_stage)
+        budget_ms = self.slo.latency_budget_ms if latency_budget_ms is None else latency_budget_ms
+        slo = LatencyBudget(budget_ms, self.stage_latency) if budget_ms > 0 else None
+        with start_trace("orchestrator.run", trace_id=trace_id, user_id=profile.user_id, force_final=force_final) as root:
+            with timer.stage("total"), collect_usage() as usage:
+                result = self._run(query, profile, timer, usage, slo, force_final=force_final)
+            result.usage = usage.snapshot()
+            root.set(action=result.action.kind.value, total_tokens=result.usage.total_tokens)
+            if slo is not None:
+                root.set(latency_budget_ms=budget_ms, degradations=[d.value for d in slo.applied])
+        degradations = slo.applied if slo is not None else []
+        if result.answer is not None:
+            result.answer.degradations = list(degradations)
+        self.stage_latency.observe_run(timer.timings_ms, degradations, skip=result.session_reused)
+        result.timings_ms = dict(timer.timings_ms)
+        result.trace_id = root.trace_id
+        self._record_usage(profile, result)
+        REGISTRY.inc("orchestrator_runs_total", action=result.action.kind.value)
+        REGISTRY.maybe_write_snapshot()
+        return result
 
-    def run(self, query: UserQuery, profile: UserProfile, *, force_final: bool = False) -> OrchestratorResult:
-        # 1) intent
-        intent_result = self.intent.classify(query.question, profile)
+    def _record_usage(self, profile: UserProfile, result: OrchestratorResult) -> None:
+        if result.usage.calls == 0:
+            return
+        self.usage_ledger.add(profile.user_id, result.usage)
+        log_usage_event(usage_event(
+            profile.user_id, result.usage, trace_id=result.trace_id,
+            mode=result.answer.mode.value if result.answer and result.answer.mode else None,
+            budget_downgraded_from=result.budget_downgraded_from.value if result.budget_downgraded_from else None,
+        ))
 
-        # 2) clarification decision (skipped if force_final)
-        if not force_final:
+    def _mode_within_budget(self, mode: LearningMode, profile: UserProfile, usage: UsageCollector) -> LearningMode:
+        """Downgrade the answer mode when its generation would overrun the request or daily user token budget."""
+        remaining = remaining_tokens(
+            self.budget,
+            used_in_request=usage.total_tokens,
+            user_used_today=self.usage_ledger.used_today(profile.user_id) if self.budget.user_daily_token_budget else 0,
+        )
+        return mode_within_budget(
+            mode, remaining, get_llm_config().max_tokens,
+            calls=lambda m: generation_calls(self.pedagogy.build_spec(m, profile), self.generator_config),
+        )
+
+    def _execute_tools(self, plan: Plan, slo: LatencyBudget | None) -> list[ToolResult]:
+        """Run the plan's research steps; under the SLO, skip them, keep only the first call, or stop early."""
+        steps = [step for step in plan.steps if step.type == StepType.research]
+        if slo is None:
+            return [r for step in steps for r in self.tools.execute_step(step)]
+        if steps and slo.left_for("tools") <= 0:
+            slo.apply(Degradation.skipped_tools)
+            return []
+        if steps and slo.over("tools"):
+            if sum(len(step.tool_calls) for step in steps) > 1:
+                slo.apply(Degradation.trimmed_tools)
+            steps = [steps[0].model_copy(update={"tool_calls": steps[0].tool_calls[:1]})]
+
+        results: list[ToolResult] = []
+        for i, step in enumerate(steps):
+            if i and slo.left_for("tools") <= 0:
+                slo.apply(Degradation.trimmed_tools)  # partial results: later research steps are dropped
+                break
+            results.extend(self.tools.execute_step(step))
+        return results
+
+    def _update_evidence(self, state: SessionState, question: str, slo: LatencyBudget | None) -> list[ToolResult]:
+        """The session's evidence, plus one search when the follow-up is mostly about terms it does not cover."""
+        missing = uncovered_terms(question, state.tool_results, context=state.question)
+        if not missing:
+            return list(state.tool_results)
+        if slo is not None and slo.over("tools"):
+            slo.apply(Degradation.skipped_tools)
+            return list(state.tool_results)
+        step = PlanStep(
+            step_id="follow_up", type=StepType.research, description="Evidence for the follow-up question",
+            tool_calls=[ToolCall(tool=ToolType.web_search, query=f"{state.question} {' '.join(missing)}", top_k=FOLLOW_UP_TOP_K)],
+        )
+        return [*state.tool_results, *self.tools.execute_step(step)]
+
+    def _save_session(
+        self, query: UserQuery, profile: UserProfile, state: SessionState | None, *,
+        question: str, intent: IntentResult, **fields,
+    ) -> None:
+        if not query.session_id:
+            return
+        self.sessions.put(SessionState(
+            session_id=query.session_id, user_id=profile.user_id, question=question, intent=intent,
+            turns=(state.turns if state is not None else 0) + 1, **fields,
+        ))
+
+    def _simple_answer(
+        self, query: UserQuery, profile: UserProfile, intent: IntentResult, tool_results: list[ToolResult]
+    ) -> AgentAnswer:
+        """Last SLO ladder step: one SimpleAgent call, with sources from whatever tool results exist."""
+        if self.simple_agent is None:
+            self.simple_agent = SimpleAgent()
+        with usage_tags(stage="simple_agent"):
+            answer = self.simple_agent.answer(query, profile, intent)
+        answer.sources = Generator._build_sources(tool_results, question=query.question)
+        return answer
+
+    def _run(
+        self,
+        query: UserQuery,
+        profile: UserProfile,
+        timer: StageTimer,
+        usage: UsageCollector,
+        slo: LatencyBudget | None,
+        *,
+        force_final: bool,
+    ) -> OrchestratorResult:
+        state = self.sessions.get(query.session_id, user_id=profile.user_id) if query.session_id else None
+        follow_up = state is not None and state.answered
+        reused: list[str] = []
+
+        # 1) intent (kept from the session for follow-ups and the force_final pass)
+        with timer.stage("intent"), span("orchestrator.intent"):
+            if state is not None and state.intent is not None and (follow_up or force_final):
+                intent_result = state.intent
+                reused.append("intent")
+            elif slo is not None and slo.over("intent"):
+                slo.apply(Degradation.rules_only_intent)
+                intent_result = self.intent.classify(query.question, profile, allow_llm=False)
+            else:
+                intent_result = self.intent.classify(query.question, profile)
+
+        # 2) clarification decision (skipped if force_final or the intent is already settled)
+        if not force_final and "intent" not in reused:
             # 3.1 Prefer intent clarifying question if available
             cq = getattr(intent_result, "clarifying_question", None)
             needs_clarify = bool(intent_result.should_ask_clarifying_question and cq)
@@ -43,6 +207,7 @@ class Orchestrator:
             
             # 3.3 Return clarifying question
             if needs_clarify:
+                self._save_session(query, profile, state, question=query.question, intent=intent_result, awaiting_clarification=True)
                 return OrchestratorResult(
                     action=OrchestratorAction(
                         kind=OrchestratorActionType.need_clarification,
@@ -50,34 +215,69 @@ class Orchestrator:
                     )
                 )
 
+        follow_up_question = query.question
+        if follow_up:
+            query = UserQuery(
+                question=f"{state.question}\n\nFollow-up question: {query.question}", session_id=query.session_id
+            )
+
         # 3) plan
-        plan = self.planner.create_plan(query.question, profile, intent_result)
+        with timer.stage("plan"), span("orchestrator.plan"):
+            if follow_up:
+                plan = state.plan
+                reused.append("plan")
+            elif slo is not None and slo.over("plan"):
+                slo.apply(Degradation.template_plan)
+                plan = template_plan(query.question, intent_result)
+            else:
+                plan = self.planner.create_plan(query.question, profile, intent_result)
 
         # 4) tool execution
-        tool_results: list[ToolResult] = []
-        for step in plan.steps:
-            if step.type == StepType.research:
-                tool_results.extend(self.tools.execute_step(step))
+        with timer.stage("tools"), span("orchestrator.tools"):
+            if follow_up:
+                tool_results = self._update_evidence(state, follow_up_question, slo)
+                reused.append("tools")
+            else:
+                tool_results = self._execute_tools(plan, slo)
         
         # 5) pedagogy
-        mode = self.pedagogy.choose_mode(intent_result, profile)
-        spec = self.pedagogy.build_spec(mode, profile)
+        with timer.stage("pedagogy"), span("orchestrator.pedagogy"):
+            chosen_mode = self.pedagogy.choose_mode(intent_result, profile)
+            mode = self._mode_within_budget(chosen_mode, profile, usage)
+            if mode != chosen_mode:
+                logger.info("token budget: mode %s -> %s", chosen_mode.value, mode.value)
+            spec = self.pedagogy.build_spec(mode, profile)
         
         # 6) generate final answer
-        answer = self.generator.generate(
-            query=query, 
-            profile=profile, 
-            intent=intent_result, 
-            plan=plan, 
-            tool_results=tool_results,
-            spec=spec,
-            force_final=force_final,
-        )
+        with timer.stage("generate"), span("orchestrator.generate", mode=spec.mode.value):
+            step = slo.generation_step(len(spec.required_sections), self.slo.min_sections) if slo is not None else None
+            if step == Degradation.fewer_sections:
+                slo.apply(step)
+                spec = spec.model_copy(update={"required_sections": spec.required_sections[: self.slo.min_sections]})
+            if step == Degradation.simple_agent:
+                slo.apply(step)
+                answer = self._simple_answer(query, profile, intent_result, tool_results)
+            else:
+                answer = self.generator.generate(
+                    query=query, 
+                    profile=profile, 
+                    intent=intent_result, 
+                    plan=plan, 
+                    tool_results=tool_results,
+                    spec=spec,
+                    force_final=force_final,
+                )
 
+        self._save_session(
+            query, profile, state, question=state.question if follow_up else query.question,
+            intent=intent_result, plan=plan, tool_results=tool_results,
+        )
         return OrchestratorResult(
             action=OrchestratorAction(kind=OrchestratorActionType.final),
             answer=answer,
             intent=intent_result,
             plan=plan,
             tool_results=tool_results,
+            budget_downgraded_from=chosen_mode if mode != chosen_mode else None,
+            session_reused=reused,
         )
@@ -1,20 +1,62 @@
 import json
 import re
 from .llm_client import LLMClient
-from .schemas import LLMMessage, UserProfile, IntentResult, Plan
+from .schemas import LLMMessage, UserProfile, IntentResult, LearningIntent, Plan, PlanStep, StepType, ToolCall, ToolType
 from .prompts import PLANNER_SYSTEM_PROMPT
 from .utils.json_extract import extract_json
+from .prompt_budget import record_prompt_tokens
+from .tracing import span
+from .usage import usage_tags
 from .logging_utils import get_logger
 
 
 logger = get_logger("Planner")
 
 
+# Tool for the single research step of a template plan, per intent
+_TEMPLATE_TOOL = {
+    LearningIntent.casual_curiosity: ToolType.web_search,
+    LearningIntent.guided_study: ToolType.video_search,
+    LearningIntent.professional_research: ToolType.docs_search,
+    LearningIntent.urgent_troubleshooting: ToolType.web_search,
+}
+
+_TEMPLATE_STEP = {
+    LearningIntent.casual_curiosity: StepType.explain,
+    LearningIntent.guided_study: StepType.study_plan,
+    LearningIntent.professional_research: StepType.outline,
+    LearningIntent.urgent_troubleshooting: StepType.troubleshoot,
+}
+
+
+def template_plan(question: str, intent: IntentResult, *, top_k: int = 3) -> Plan:
+    """Fixed research -> intent step -> finalize plan, built without an LLM call (latency-SLO fallback)."""
+    return Plan(
+        goal=question,
+        intent=intent.intent.value,
+        steps=[
+            PlanStep(
+                step_id="s1", type=StepType.research, description="Gather sources for the question",
+                tool_calls=[ToolCall(tool=_TEMPLATE_TOOL[intent.intent], query=question, top_k=top_k)],
+            ),
+            PlanStep(step_id="s2", type=_TEMPLATE_STEP[intent.intent], description="Answer for the user's intent"),
+            PlanStep(step_id="s3", type=StepType.finalize, description="Finalize"),
+        ],
+        notes="template plan (latency SLO)",
+    )
+
+
 class Planner:
     def __init__(self) -> None:
         self.llm = LLMClient()
     
     def create_plan(self, question: str, profile: UserProfile, intent: IntentResult) -> Plan:
+        with span("planner.create_plan", intent=intent.intent.value) as s:
+            plan = self._create_plan(question, profile, intent)
+            s.set(steps=len(plan.steps))
+            return plan
+
+    def _create_plan(self, question: str, profile: UserProfile, intent: IntentResult) -> Plan:
         user_context=f"""
 User background: {profile.background}
 User level: {profile.level}
@@ -33,8 +75,10 @@ Suggested output: {intent.suggested_output}
             LLMMessage(role="system", content=PLANNER_SYSTEM_PROMPT),
             LLMMessage(role="user", content=user_context + "\n" + intent_context + "\nUser question:" + question),
         ]
+        record_prompt_tokens("planner", messages)
 
-        raw = self.llm.chat(messages)
+        with usage_tags(stage="planner"):
+            raw = self.llm.chat(messages)
         logger.debug("Raw planner output:\n%s", raw)
 
         data = extract_json(raw)
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Callable
+
+from .schemas import LearningMode, LLMMessage, Plan
+from .telemetry import log_prompt_event
+from .logging_utils import get_logger
+
+
+logger = get_logger("prompt_budget")
+
+
+# Prompt-token budget for the generator system prompt, per learning mode.
+# Long-form modes get more room for evidence and plan detail.
+PROMPT_TOKEN_BUDGETS: dict[LearningMode, int] = {
+    LearningMode.quick_explain: 1200,
+    LearningMode.fix_my_problem: 1600,
+    LearningMode.guided_study: 2000,
+    LearningMode.deep_research: 2400,
+}
+
+# Plan serializations, from most to least detailed
+PLAN_DETAIL_LEVELS = ("full", "brief", "goal_only")
+
+_MAX_PROFILE_FIELD_CHARS = 200
+
+
+# ---------------------------------
+# Token counting
+# ---------------------------------
+
+# Calibrated estimator for BPE tokenizers on English prose/markdown/URLs:
+# one token per short word (long words split every ~8 letters), digits in groups of 3,
+# and one token per punctuation mark.
+_TOKEN_PAT = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]")
+
+_encoder = None
+_encoder_loaded = False
+
+
+def _get_encoder():
+    """Load tiktoken lazily if it is installed; fall back to the estimator otherwise."""
+    global _encoder, _encoder_loaded
+    if not _encoder_loaded:
+        _encoder_loaded = True
+        try:
+            import tiktoken  # optional dependency
+
+            _encoder = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _encoder = None
+    return _encoder
+
+
+def estimate_tokens(text: str) -> int:
+    n = 0
+    for tok in _TOKEN_PAT.findall(text or ""):
+        n += 1 + (len(tok) - 1) // 8 if tok[0].isalpha() else 1
+    return n
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with a local tokenizer when available, otherwise estimate."""
+    enc = _get_encoder()
+    if enc is not None:
+        return len(enc.encode(text or ""))
+    return estimate_tokens(text)
+
+
+def count_message_tokens(messages: list[LLMMessage]) -> int:
+    # ~4 tokens of chat framing per message
+    return sum(count_tokens(m.content) + 4 for m in messages)
+
+
+def record_prompt_tokens(stage: str, messages: list[LLMMessage], **extra: object) -> int:
+    """Count the prompt tokens of one LLM call and record them in telemetry under `stage`."""
+    tokens = count_message_tokens(messages)
+    log_prompt_event({"stage": stage, "prompt_tokens": tokens, **extra})
+    return tokens
+
+
+# ---------------------------------
+# Compact serialization
+# ---------------------------------
+
+def compact_plan(plan: Plan, detail: str = "full") -> str:
+    """
+    Serialize a plan compactly (instead of indented JSON).
+      - full:      every step with type, description and tool queries
+      - brief:     step types with shortened descriptions
+      - goal_only: just the goal and the step sequence
+    """
+    if detail == "goal_only":
+        return f"Goal: {plan.goal}\nSteps: " + " -> ".join(s.type.value for s in plan.steps)
+
+    lines = [f"Goal: {plan.goal}"]
+    for s in plan.steps:
+        if detail == "brief":
+            desc = s.description if len(s.description) <= 80 else s.description[:77] + "..."
+            lines.append(f"- {s.type.value}: {desc}")
+            continue
+        line = f"- {s.step_id} [{s.type.value}] {s.description}"
+        if s.tool_calls:
+            line += " | tools: " + "; ".join(f"{c.tool.value}({c.query!r})" for c in s.tool_calls)
+        lines.append(line)
+    if plan.notes and detail == "full":
+        lines.append(f"Notes: {plan.notes}")
+    return "\n".join(lines)
+
+
+def truncate_field(text: str, limit: int = _MAX_PROFILE_FIELD_CHARS) -> str:
+    text = text or ""
+    return text if len(text) <= limit else text[: limit - 3] + "..."
+
+
+# ---------------------------------
+# Budgeted assembly
+# ---------------------------------
+
+@dataclass
+class AssembledPrompt:
+    text: str
+    tokens: int
+    budget: int
+    evidence_kept: int
+    evidence_dropped: int
+    plan_detail: str
+
+    @property
+    def over_budget(self) -> bool:
+        return self.tokens > self.budget
+
+
+def assemble_to_budget(
+    render: Callable[[str, str], str],
+    plan: Plan,
+    evidence_lines: list[str],
+    budget: int,
+) -> AssembledPrompt:
+    """
+    Fit a prompt into `budget` tokens.
+
+    `render(plan_text, evidence_text)` produces the full prompt. Evidence lines must be ordered
+    by value (most useful first). Trimming order:
+      1) drop lowest-value evidence lines
+      2) shorten plan serialization (full -> brief -> goal_only), re-adding evidence if it now fits
+    The most detailed plan that keeps at least one evidence line (when there is any) wins.
+    """
+    line_tokens = [count_tokens(line) + 1 for line in evidence_lines]
+    candidates: list[AssembledPrompt] = []
+
+    for detail in PLAN_DETAIL_LEVELS:
+        plan_text = compact_plan(plan, detail)
+        used = count_tokens(render(plan_text, ""))
+
+        kept = 0
+        for n in line_tokens:
+            if used + n > budget:
+                break
+            used += n
+            kept += 1
+
+        text = render(plan_text, _join_evidence(evidence_lines[:kept]))
+        candidate = AssembledPrompt(
+            text=text,
+            tokens=count_tokens(text),
+            budget=budget,
+            evidence_kept=kept,
+            evidence_dropped=len(evidence_lines) - kept,
+            plan_detail=detail,
+        )
+        candidates.append(candidate)
+        if not candidate.over_budget and (kept > 0 or not evidence_lines):
+            break
+
+    fitting = [c for c in candidates if not c.over_budget]
+    best = fitting[0] if fitting else min(candidates, key=lambda c: c.tokens)
+    if best.over_budget:
+        logger.warning("prompt over budget after trimming: tokens=%d budget=%d", best.tokens, budget)
+    elif best.evidence_dropped or best.plan_detail != "full":
+        logger.debug(
+            "prompt trimmed: tokens=%d budget=%d evidence_dropped=%d plan_detail=%s",
+            best.tokens, budget, best.evidence_dropped, best.plan_detail,
+        )
+    return best
+
+
+def _join_evidence(lines: list[str]) -> str:
+    return "\n".join(lines) if lines else "(no external evidence)"
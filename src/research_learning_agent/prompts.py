@@ -57,6 +57,9 @@ ADDITIONAL GUIDELINES
 - If you ask a clarifying question, set should_ask_clarifying_question=true and propose only ONE clarifying question.
 """
 
+# Appended by the CLI to force a final answer after clarification; ignored by the intent cache key
+BEST_EFFORT_SUFFIX = "\n\nProvide a best-effort answer using reasonable assumptions."
+
 
 PLANNER_SYSTEM_PROMPT = """
 You are a planning module for a learning/research agent.
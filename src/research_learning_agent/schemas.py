@@ -26,6 +26,15 @@ class AnswerSection(BaseModel):
     title: str
     content: str # keep it plain markdown text
 
+class Degradation(str, Enum):
+    """Latency-SLO ladder steps, in the order the orchestrator applies them."""
+    rules_only_intent = "rules_only_intent"  # intent from rules / local model, no LLM call
+    template_plan = "template_plan"          # fixed per-intent plan instead of the LLM planner
+    trimmed_tools = "trimmed_tools"          # fewer tool calls, or stopped early with partial results
+    skipped_tools = "skipped_tools"
+    fewer_sections = "fewer_sections"        # generation with a shortened list of required sections
+    simple_agent = "simple_agent"            # one SimpleAgent call instead of the sectioned generator
+
 class AgentAnswer(BaseModel):
     """Answer generated by the agent."""
 
@@ -48,6 +57,9 @@ class AgentAnswer(BaseModel):
     mode: LearningMode = LearningMode.quick_explain
     sections: list[AnswerSection] = Field(default_factory=list)
 
+    # latency-SLO steps applied while producing this answer (empty = full pipeline)
+    degradations: list[Degradation] = Field(default_factory=list)
+
 class LLMMessage(BaseModel):
     """Message sent to the LLM."""
     role: str
@@ -86,6 +98,7 @@ class IntentResult(BaseModel):
     should_ask_clarifying_question: bool = False
     clarifying_question: str | None = None
     use_llm: bool = False
+    stage: str = "rules"  # which stage decided: rules | model | llm | fallback (LLM call failed, rules stand in)
 
 class ToolType(str, Enum):
     web_search = "web_search"
@@ -108,6 +121,9 @@ class ToolResult(BaseModel):
     query: str
     results: list[dict[str, Any]] = Field(default_factory=list)  # each: {title, url, snippet}
     error: ToolError | None = None
+    latency_ms: float | None = None  # wall time of the call, including HTTP retries and backoff
+    http_retries: int = 0
+    backoff_ms: float = 0.0
 
 class StepType(str, Enum):
     clarify = "clarify"
@@ -141,12 +157,29 @@ class OrchestratorAction(BaseModel):
     kind: OrchestratorActionType
     clarifying_question: str | None = None
 
+class TokenUsage(BaseModel):
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    estimated_calls: int = 0  # calls whose usage the API did not report (counted locally)
+    cost_usd: float = 0.0
+    by_stage: dict[str, int] = Field(default_factory=dict)  # total tokens per stage: intent, planner, generator, ...
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
 class OrchestratorResult(BaseModel):
     action: OrchestratorAction
     answer: AgentAnswer | None = None
     intent: IntentResult | None = None
     plan: Plan | None = None
     tool_results: list[ToolResult] = Field(default_factory=list)
+    timings_ms: dict[str, float] = Field(default_factory=dict)  # per stage: intent, plan, tools, pedagogy, generate, total
+    trace_id: str | None = None  # spans in telemetry.TRACE_LOG_PATH (scripts/trace_view.py); None with tracing off
+    usage: TokenUsage = Field(default_factory=TokenUsage)  # LLM tokens spent on this request
+    budget_downgraded_from: LearningMode | None = None  # mode pedagogy chose, when the token budget forced a cheaper one
+    session_reused: list[str] = Field(default_factory=list)  # stages taken from the session's earlier turns: intent, plan, tools
 
 class GenerationSpec(BaseModel):
     mode: LearningMode
@@ -182,9 +215,32 @@ class MemoryItem(BaseModel):
     summary: str = "" # short summary of what user learned
     followed_up: bool = False # whether user asked a follow-up question
 
-class UserMemory(BaseModel):
+class TopicDigest(BaseModel):
+    """Compact long-term record of history items rolled up out of the recent window."""
+    topic: str
+    count: int = 0
+    modes: dict[str, int] = Field(default_factory=dict)  # LearningMode value -> times used
+    first_seen: str  # ISO datetime string
+    last_seen: str
+    summary: str = ""  # merged summary of what user learned
+
+class MemoryHead(BaseModel):
+    """Small part of UserMemory needed for prompt context; loadable without history."""
     user_id: str = "default"
     topics: list[str] = Field(default_factory=list)  # unique recent topics
-    history: list[MemoryItem] = Field(default_factory=list)  # recent N items
     preferences: UserPreferences = Field(default_factory=UserPreferences)
     last_topic: str | None = None
+    digests: list[TopicDigest] = Field(default_factory=list)  # bounded, most recently seen last
+
+class UserMemory(MemoryHead):
+    history: list[MemoryItem] = Field(default_factory=list)  # recent N items
+    rollup_pending: list[MemoryItem] = Field(default_factory=list)  # evicted from history, not yet in digests
+
+    def head(self) -> MemoryHead:
+        return MemoryHead(
+            user_id=self.user_id,
+            topics=list(self.topics),
+            preferences=self.preferences.model_copy(),
+            last_topic=self.last_topic,
+            digests=[d.model_copy(deep=True) for d in self.digests],
+        )
@@ -0,0 +1,112 @@
+# uv run python -m research_learning_agent.scripts.generation_bench --mode deep_research
+# uv run python -m research_learning_agent.scripts.generation_bench --mode guided_study --live
+
+from __future__ import annotations
+
+import argparse
+import re
+import statistics
+import time
+
+from research_learning_agent.config import GeneratorConfig
+from research_learning_agent.generator import Generator
+from research_learning_agent.pedagogy import Pedagogy
+from research_learning_agent.schemas import (
+    IntentResult, LearningIntent, LearningMode, LLMMessage, Plan, PlanStep, StepType, 
+    UserLevel, UserProfile, UserQuery
+)
+
+
+_MODE_INTENT = {
+    LearningMode.deep_research: LearningIntent.professional_research,
+    LearningMode.guided_study: LearningIntent.guided_study,
+}
+
+
+class SimulatedLLM:
+    """
+    Offline stand-in for LLMClient: latency = first-token latency + output tokens * per-token latency.
+    Output length scales with how many sections the prompt asks for, which is what makes
+    the single long completion slow.
+    """
+
+    def __init__(self, first_token_ms: float, per_token_ms: float, tokens_per_section: int) -> None:
+        self.first_token_ms = first_token_ms
+        self.per_token_ms = per_token_ms
+        self.tokens_per_section = tokens_per_section
+
+    def chat(self, messages: list[LLMMessage]) -> str:
+        prompt = messages[0].content
+        one_section = re.search(r'Write ONLY the section "(.*?)"', prompt)
+        if one_section:
+            n_tokens = self.tokens_per_section
+            reply = f"## {one_section.group(1)}\n...\n\nSOURCES:\n"
+        elif "Required section titles:" in prompt:
+            n_sections = prompt.split("Required section titles:")[1].split("\n")[1].count(",") + 1
+            n_tokens = self.tokens_per_section * n_sections + 100
+            reply = "EXPLANATION:\n...\n\nBULLETS:\n- ...\n\nSECTIONS:\n\nSOURCES:\n"
+        else:
+            n_tokens = 100
+            reply = "EXPLANATION:\n...\n\nBULLETS:\n- ...\n"
+        time.sleep((self.first_token_ms + n_tokens * self.per_token_ms) / 1000)
+        return reply
+
+
+def _inputs(mode: LearningMode, question: str):
+    profile = UserProfile(user_id="bench", background="software engineer", level=UserLevel.intermediate, goals="learn")
+    intent = IntentResult(intent=_MODE_INTENT[mode], confidence=0.9, rationale="bench")
+    plan = Plan(
+        goal=question,
+        intent=intent.intent.value,
+        steps=[
+            PlanStep(step_id="s1", type=StepType.outline, description="Outline the topic"),
+            PlanStep(step_id="s2", type=StepType.finalize, description="Write the answer"),
+        ],
+    )
+    spec = Pedagogy().build_spec(mode, profile)
+    return UserQuery(question=question), profile, intent, plan, spec
+
+
+def _time_path(gen: Generator, inputs, runs: int) -> list[float]:
+    query, profile, intent, plan, spec = inputs
+    out = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        gen.generate(query=query, profile=profile, intent=intent, plan=plan, tool_results=[], spec=spec)
+        out.append((time.perf_counter() - start) * 1000)
+    return out
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Wall-clock of section-parallel vs single-call generation")
+    ap.add_argument("--mode", choices=[m.value for m in _MODE_INTENT], default=LearningMode.deep_research.value)
+    ap.add_argument("--question", type=str, default="Compare PPO and SAC for continuous control")
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--max-concurrency", type=int, default=4)
+    ap.add_argument("--live", action="store_true", help="Call the real LLM (needs OPENAI_API_KEY)")
+    ap.add_argument("--first-token-ms", type=float, default=400.0)
+    ap.add_argument("--per-token-ms", type=float, default=2.0)
+    ap.add_argument("--tokens-per-section", type=int, default=250)
+    args = ap.parse_args(argv)
+
+    mode = LearningMode(args.mode)
+    inputs = _inputs(mode, args.question)
+
+    results: dict[str, list[float]] = {}
+    for name, parallel in (("single", False), ("parallel", True)):
+        llm = None if args.live else SimulatedLLM(args.first_token_ms, args.per_token_ms, args.tokens_per_section)
+        gen = Generator(
+            config=GeneratorConfig(parallel_sections=parallel, max_concurrency=args.max_concurrency), llm=llm,
+        )
+        results[name] = _time_path(gen, inputs, args.runs)
+
+    print(f"\n=== Generation wall-clock ({mode.value}, {'live' if args.live else 'simulated'}) ===")
+    for name, ms in results.items():
+        print(f"{name:<9} median={statistics.median(ms):8.1f} ms  min={min(ms):8.1f} ms  max={max(ms):8.1f} ms")
+    speedup = statistics.median(results["single"]) / max(statistics.median(results["parallel"]), 1e-9)
+    print(f"speedup   {speedup:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,61 @@
+# uv run python -m research_learning_agent.scripts.intent_matcher_bench --events data/intent_events.jsonl --n 50000
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from research_learning_agent.intent_classifier import _signal_strength, _signal_strength_reference
+
+
+DEFAULT_CASES_PATH = Path("tests/fixtures/intent_cases.json")
+DEFAULT_EVENTS_PATH = Path("data/intent_events.jsonl")
+
+
+def _load_queries(events: Path, cases: Path) -> list[str]:
+    queries: list[str] = []
+    if events.exists():
+        for line in events.read_text(encoding="utf-8").splitlines():
+            if line.strip():
+                queries.append(str(json.loads(line).get("query", "")))
+    if cases.exists():
+        queries.extend(str(c["query"]) for c in json.loads(cases.read_text(encoding="utf-8")))
+    return [q for q in queries if q]
+
+
+def _throughput(fn, queries: list[str]) -> float:
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return len(queries) / (time.perf_counter() - start)
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Rule-scoring throughput: per-pattern regex vs. single-pass matcher")
+    ap.add_argument("--events", type=Path, default=DEFAULT_EVENTS_PATH, help="Telemetry to re-classify")
+    ap.add_argument("--cases", type=Path, default=DEFAULT_CASES_PATH)
+    ap.add_argument("--n", type=int, default=50000, help="Number of queries to score (corpus is repeated)")
+    args = ap.parse_args(argv)
+
+    corpus = _load_queries(args.events, args.cases)
+    if not corpus:
+        print("No queries found.")
+        return 1
+    queries = (corpus * (args.n // len(corpus) + 1))[: args.n]
+
+    mismatches = sum(_signal_strength(q) != _signal_strength_reference(q) for q in corpus)
+
+    ref = _throughput(_signal_strength_reference, queries)
+    fast = _throughput(_signal_strength, queries)
+
+    print(f"\n=== Intent signal scoring ({len(queries)} queries, {len(corpus)} distinct) ===")
+    print(f"{'per-pattern re.search':<26}{ref:>12.0f} q/s")
+    print(f"{'single-pass matcher':<26}{fast:>12.0f} q/s   ({fast / ref:.2f}x)")
+    print(f"score mismatches: {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
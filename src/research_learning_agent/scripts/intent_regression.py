@@ -12,12 +12,22 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
-from research_learning_agent.intent_classifier import IntentClassifier
+from research_learning_agent.config import get_llm_config
+from research_learning_agent.intent_cache import fingerprint
+from research_learning_agent.intent_classifier import IntentClassifier, intent_cache_version
+from research_learning_agent.intent_model import INTENT_MODEL_PATH, is_holdout
 from research_learning_agent.schemas import UserProfile, UserLevel
 
 
 DEFAULT_CASES_PATH = Path("tests/fixtures/intent_cases.json")
 DEFAULT_OUT_DIR = Path("tests/results/intent_regression_runs")
+CASE_CACHE_NAME = "case_cache.json"
+
+# prediction fields reused from the case cache (everything except the case's own id/expectation/note)
+_PREDICTION_FIELDS = (
+    "predicted_intent", "confidence", "use_llm", "stage", "should_ask_clarifying_question",
+    "clarifying_question", "reasoning", "suggested_output",
+)
 
 
 @dataclass
@@ -58,6 +68,79 @@ def _safe_env_profile() -> UserProfile:
     return UserProfile(user_id="test_user", background="", level=level, goals="")
 
 
+def _classifier_version(model_path: Path = INTENT_MODEL_PATH) -> str:
+    """Everything a prediction depends on besides the query: rules + prompt, LLM name, local model file."""
+    model = fingerprint(model_path.read_bytes()) if model_path.exists() else None
+    return fingerprint(intent_cache_version(), get_llm_config().model_name, model)
+
+
+def _case_key(query: str, level: str, version: str) -> str:
+    return fingerprint(query, level, version)
+
+
+def _prediction(res: Any) -> dict[str, Any]:
+    return {
+        "predicted_intent": getattr(res, "intent", None),
+        "confidence": getattr(res, "confidence", None),
+        "use_llm": getattr(res, "use_llm", None),
+        "stage": getattr(res, "stage", None),
+        "should_ask_clarifying_question": getattr(res, "should_ask_clarifying_question", None),
+        "clarifying_question": getattr(res, "clarifying_question", None),
+        "reasoning": getattr(res, "reasoning", None),
+        "suggested_output": getattr(res, "suggested_output", None),
+    }
+
+
+def _load_case_cache(path: Path) -> dict[str, dict[str, Any]]:
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _previous_run(out_dir: Path, current: Path) -> Path | None:
+    runs = sorted(p for p in out_dir.glob("intent_run_*.jsonl") if p != current)
+    return runs[-1] if runs else None
+
+
+def _diff_runs(previous: list[dict[str, Any]], rows: list[dict[str, Any]]) -> dict[str, list[str]]:
+    """Per-case changes against the previous run, by case id."""
+    before = {r["id"]: r for r in previous}
+    diff: dict[str, list[str]] = {"fixed": [], "regressed": [], "changed": [], "new": []}
+    for r in rows:
+        old = before.get(r["id"])
+        if old is None:
+            diff["new"].append(r["id"])
+            continue
+        was_ok = old["predicted_intent"] == old["expected_intent"]
+        is_ok = r["predicted_intent"] == r["expected_intent"]
+        if was_ok and not is_ok:
+            diff["regressed"].append(r["id"])
+        elif is_ok and not was_ok:
+            diff["fixed"].append(r["id"])
+        elif old["predicted_intent"] != r["predicted_intent"]:
+            diff["changed"].append(r["id"])
+    return diff
+
+
+def _model_holdout(rows: list[dict[str, Any]]) -> dict[str, Any]:
+    """LLM use with and without the local model, on the held-out split the model was not trained on."""
+    held = [r for r in rows if is_holdout(r["query"])]
+    total = len(held)
+    use_llm = sum(1 for r in held if r["use_llm"])
+    # rows answered by the local model would otherwise have gone to the LLM
+    by_model = sum(1 for r in held if r.get("stage") == "model")
+    return {
+        "total": total,
+        "accuracy": round(sum(1 for r in held if r["predicted_intent"] == r["expected_intent"]) / total, 4) if total else 0.0,
+        "use_llm_rate": round(use_llm / total, 4) if total else 0.0,
+        "use_llm_rate_rules_only": round((use_llm + by_model) / total, 4) if total else 0.0,
+        "model_stage_count": by_model,
+    }
+
+
 def _summarize(rows: list[dict[str, Any]]) -> dict[str, Any]:
     total = len(rows)
     correct = sum(1 for r in rows if r["predicted_intent"] == r["expected_intent"])
@@ -87,6 +170,7 @@ def _summarize(rows: list[dict[str, Any]]) -> dict[str, Any]:
         "clarify_rate": round((ask_count / total) if total else 0.0, 4),
         "avg_confidence": round(avg_conf, 4),
         "use_llm_rate": round(use_llm_rate, 4),
+        "model_holdout": _model_holdout(rows),
         "confusion_by_expected": by_expected,
     }
 
@@ -99,12 +183,33 @@ def _print_summary(summary: dict[str, Any]) -> None:
     print(f"Clarify Rate:    {summary['clarify_rate']:.2%}")
     print(f"Avg Confidence:  {summary['avg_confidence']:.3f}")
     print(f"LLM Use Rate:    {summary['use_llm_rate']:.2%}")
+    held = summary["model_holdout"]
+    print(
+        f"  held-out split ({held['total']} cases, not trained on): {held['use_llm_rate']:.2%}, "
+        f"without model {held['use_llm_rate_rules_only']:.2%} "
+        f"(local model answered {held['model_stage_count']}, "
+        f"-{held['use_llm_rate_rules_only'] - held['use_llm_rate']:.2%} LLM use)"
+    )
+
+    if "reused_from_cache" in summary:
+        print(f"Re-evaluated:    {summary['evaluated']} (reused {summary['reused_from_cache']} from cache)")
+    if summary.get("llm_failures"):
+        print(f"LLM failures:    {summary['llm_failures']} (rule fallback reported, not cached)")
 
     print("\nConfusion by expected intent:")
     for exp, preds in summary["confusion_by_expected"].items():
         preds_str = ", ".join([f"{p}={n}" for p, n in sorted(preds.items(), key=lambda x: -x[1])])
         print(f"  - {exp}: {preds_str}")
 
+    diff = summary.get("diff_vs_previous")
+    if diff:
+        print(f"\nChanges vs {diff['previous_run']}:")
+        for kind in ("regressed", "fixed", "changed", "new"):
+            if diff[kind]:
+                print(f"  - {kind}: {', '.join(diff[kind])}")
+        if not any(diff[k] for k in ("regressed", "fixed", "changed", "new")):
+            print("  (no changes)")
+
 
 def main(argv: list[str] | None = None) -> int:
     ap = argparse.ArgumentParser(description="Intent regression harness (heuristics + optional LLM fallback)")
@@ -113,6 +218,8 @@ def main(argv: list[str] | None = None) -> int:
     ap.add_argument("--max-cases", type=int, default=0, help="Max cases to run (0=all)")
     ap.add_argument("--min-accuracy", type=float, default=0.80, help="Fail if accuracy below this threshold")
     ap.add_argument("--print-mismatches", action="store_true", help="Print mismatched cases")
+    ap.add_argument("--workers", type=int, default=8, help="Max concurrent LLM calls")
+    ap.add_argument("--no-cache", action="store_true", help="Re-evaluate every case, ignoring the case cache")
     args = ap.parse_args(argv)
 
     cases_path = Path(args.cases)
@@ -129,31 +236,51 @@ def main(argv: list[str] | None = None) -> int:
     
     profile = _safe_env_profile()
 
-    clf = IntentClassifier()
+    # only cases whose (query, level, classifier version) changed since a previous run are re-evaluated
+    cache_path = out_dir / CASE_CACHE_NAME
+    case_cache = {} if args.no_cache else _load_case_cache(cache_path)
+    version = _classifier_version()
+    level = str(getattr(profile.level, "value", profile.level))
+    keys = [_case_key(c.query, level, version) for c in cases]
+    todo = [i for i, k in enumerate(keys) if k not in case_cache]
+
+    # rows whose LLM call failed are reported with the rules' answer but never cached, so a
+    # transient outage does not pin that answer until the classifier version changes
+    fallbacks: dict[str, dict[str, Any]] = {}
+    if todo:
+        clf = IntentClassifier()
+        results = clf.classify_many([cases[i].query for i in todo], profile, max_workers=args.workers)
+        for i, res in zip(todo, results):
+            target = fallbacks if getattr(res, "stage", None) == "fallback" else case_cache
+            target[keys[i]] = _prediction(res)
+        # keep only entries for the current fixture/version so the cache does not grow without bound
+        live = set(keys)
+        cache_path.write_text(
+            json.dumps({k: v for k, v in case_cache.items() if k in live}, ensure_ascii=False, default=str),
+            encoding="utf-8",
+        )
 
     rows: list[dict[str, Any]] = []
-
-    for c in cases:
-        res = clf.classify(c.query, profile)
-        row = {
+    for c, key in zip(cases, keys):
+        prediction = json.loads(json.dumps(fallbacks.get(key) or case_cache[key], default=str))  # enums -> values
+        rows.append({
             "id": c.id,
             "query": c.query,
             "expected_intent": c.expected_intent,
-            "predicted_intent": getattr(res, "intent", None),
-            "confidence": getattr(res, "confidence", None),
-            "use_llm": getattr(res, "use_llm", None),
-            "should_ask_clarifying_question": getattr(res, "should_ask_clarifying_question", None),
-            "clarifying_question": getattr(res, "clarifying_question", None),
-            "reasoning": getattr(res, "reasoning", None),
-            "suggested_output": getattr(res, "suggested_output", None),
+            **{f: prediction.get(f) for f in _PREDICTION_FIELDS},
             "note": c.note,
-        }
-        rows.append(row)
+        })
+
+    out_jsonl.write_text("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in rows), encoding="utf-8")
 
-        with out_jsonl.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(row, ensure_ascii=False) + "\n")
-        
     summary = _summarize(rows)
+    summary["evaluated"] = len(todo)
+    summary["llm_failures"] = len(fallbacks)
+    summary["reused_from_cache"] = len(cases) - len(todo)
+    previous = _previous_run(out_dir, out_jsonl)
+    if previous is not None:
+        prev_rows = [json.loads(line) for line in previous.read_text(encoding="utf-8").splitlines() if line.strip()]
+        summary["diff_vs_previous"] = {"previous_run": previous.name, **_diff_runs(prev_rows, rows)}
     out_summary.write_text(json.dumps(summary, indent=2, ensure_ascii=False), encoding="utf-8")
 
     _print_summary(summary)
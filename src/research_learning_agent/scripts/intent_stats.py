@@ -1,22 +1,69 @@
+# uv run python -m research_learning_agent.scripts.intent_stats --hours 24 --by hour
+
+from __future__ import annotations
+
+import argparse
 import json
-from collections import Counter
 from pathlib import Path
 
+from research_learning_agent.telemetry_stats import DEFAULT_STATE_PATH, IntentStats, WindowStats, hours_ago
+
+
+DEFAULT_EVENTS_PATH = Path("data/intent_events.jsonl")
+
+
+def _fmt_ms(v: float | None) -> str:
+    return "-" if v is None else f"{v:.0f}ms"
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Incremental intent telemetry stats (only new events are read)")
+    ap.add_argument("--events", type=Path, default=DEFAULT_EVENTS_PATH, help="Live log; rotated .gz siblings are included")
+    ap.add_argument("--state", type=Path, default=DEFAULT_STATE_PATH, help="Checkpoint + persisted aggregates")
+    ap.add_argument("--hours", type=float, default=None, help="Report only the last N hours (default: everything)")
+    ap.add_argument("--by", choices=["hour", "day"], default=None, help="Also print one row per hour/day")
+    ap.add_argument("--rebuild", action="store_true", help="Ignore the checkpoint and re-read all files")
+    ap.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = ap.parse_args(argv)
+
+    stats = IntentStats() if args.rebuild else IntentStats.load(args.state)
+    new = stats.update(args.events)
+    stats.save(args.state)
+
+    since = hours_ago(args.hours) if args.hours is not None else None
+    summary = stats.summary(since)
+    if args.json:
+        print(json.dumps({**summary, "new_events": new}, indent=2))
+        return 0
 
-p = Path("data/intent_events.jsonl")
-c = Counter()
-n = 0
-low = 0
+    print(f"\n=== Intent telemetry ({'last %gh' % args.hours if args.hours is not None else 'all time'}) ===")
+    print(f"Events:               {summary['events']} ({new} new this run)")
+    print("Intent distribution:  " + ", ".join(f"{k}={v:.1%}" for k, v in summary["intent_distribution"].items()))
+    print("Stages:               " + ", ".join(f"{k}={v}" for k, v in sorted(summary["stage_counts"].items())))
+    print(f"LLM-use rate:         {summary['llm_use_rate']:.1%}")
+    print(f"Low-confidence rate:  {summary['low_confidence_rate']:.1%}")
+    print(f"Cache hit rate:       {summary['cached_rate']:.1%}")
+    lat = summary["llm_latency_ms"]
+    print(f"LLM latency:          p50={_fmt_ms(lat['p50'])} p90={_fmt_ms(lat['p90'])} p99={_fmt_ms(lat['p99'])}")
 
+    if args.by:
+        width = 13 if args.by == "hour" else 10
+        rows: dict[str, list[str]] = {}
+        for key in sorted(k for k in stats.windows if k != "unknown"):
+            if since is None or key >= since.strftime("%Y-%m-%dT%H"):
+                rows.setdefault(key[:width], []).append(key)
+        print(f"\n{'window':<14}{'events':>8}{'llm':>8}{'low':>8}{'p50':>9}{'p90':>9}")
+        for label, keys in rows.items():
+            w = WindowStats()
+            for k in keys:
+                w.merge(stats.windows[k])
+            n = max(w.n, 1)
+            print(
+                f"{label:<14}{w.n:>8}{w.llm / n:>8.1%}{w.low_confidence / n:>8.1%}"
+                f"{_fmt_ms(w.latency_percentile(50)):>9}{_fmt_ms(w.latency_percentile(90)):>9}"
+            )
+    return 0
 
-for line in p.read_text(encoding="utf-8").splitlines():
-    e = json.loads(line)
-    c[e["intent"]] += 1
-    n += 1
-    if e["confidence"] < 0.65:
-        low += 1
-    
 
-print("Total:", n)
-print("Intent distribution:", c)
-print("Low confidence rate:", low / max(n, 1))
\ No newline at end of file
+if __name__ == "__main__":
+    raise SystemExit(main())
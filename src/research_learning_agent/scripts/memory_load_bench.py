@@ -0,0 +1,85 @@
+# uv run python -m research_learning_agent.scripts.memory_load_bench --history 50 1000 10000 --repeat 20
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+from research_learning_agent.schemas import LearningMode, MemoryItem, UserMemory
+from research_learning_agent.store.base import BaseMemoryStore
+from research_learning_agent.store.journal_memory_store import JournalMemoryStore
+from research_learning_agent.store.memory_store import MemoryStore
+from research_learning_agent.store.sqlite_memory_store import SQLiteMemoryStore
+
+
+def _memory(n: int) -> UserMemory:
+    mem = UserMemory(user_id="default", topics=[f"topic {i}" for i in range(10)], last_topic="topic 9")
+    mem.history = [
+        MemoryItem(
+            ts=f"2026-01-01T00:00:00.{i:06d}+00:00",
+            query=f"question {i} about topic {i % 17}",
+            topic=f"topic {i % 17}",
+            intent="casual_curiosity",
+            mode=LearningMode.quick_explain,
+            summary="summary " * 30,
+        )
+        for i in range(n)
+    ]
+    return mem
+
+
+def _measure(fn: Callable[[], object], repeat: int) -> tuple[float, float]:
+    """Median latency (ms) and peak traced allocation (KiB) of one call."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak / 1024
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Full load vs. head-only load vs. first history page, by history size")
+    ap.add_argument("--history", type=int, nargs="+", default=[50, 1000, 10000])
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--page", type=int, default=20, help="History page size")
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        print(f"\n=== Memory load benchmark (repeat={args.repeat}, page={args.page}) ===")
+        print(f"{'backend':<10}{'history':>9}{'call':>14}{'p50 ms':>10}{'peak KiB':>11}")
+
+        for n in args.history:
+            mem = _memory(n)
+            stores: list[tuple[str, BaseMemoryStore]] = [
+                ("json", MemoryStore(path=tmp_dir / f"user_memory_{n}.json")),
+                ("sqlite", SQLiteMemoryStore(path=tmp_dir / f"mem_{n}.sqlite3")),
+                ("journal", JournalMemoryStore(root=tmp_dir / f"journal_{n}", fsync=False)),
+            ]
+            for name, store in stores:
+                store.save(mem)
+                calls = {
+                    "load": lambda: store.load("default"),
+                    "load_head": lambda: store.load_head("default"),
+                    "history page": lambda: store.load_history("default", limit=args.page),
+                }
+                for label, fn in calls.items():
+                    ms, kib = _measure(fn, args.repeat)
+                    print(f"{name:<10}{n:>9}{label:>14}{ms:>10.3f}{kib:>11.1f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,112 @@
+# uv run python -m research_learning_agent.scripts.memory_store_bench --users 50 --updates 40 --threads 1 4 8
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from research_learning_agent.memory import MemoryManager
+from research_learning_agent.schemas import LearningIntent, LearningMode, UserMemory
+from research_learning_agent.store.base import BaseMemoryStore
+from research_learning_agent.store.journal_memory_store import JournalMemoryStore
+from research_learning_agent.store.memory_store import MemoryStore
+from research_learning_agent.store.sqlite_memory_store import SQLiteMemoryStore
+
+
+def _pct(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    return s[min(len(s) - 1, int(round(p / 100 * (len(s) - 1))))]
+
+
+def _one_update(mgr: MemoryManager, user_id: str, i: int, load_ms: list[float], save_ms: list[float]) -> None:
+    t0 = time.perf_counter()
+    mem = mgr.load(user_id)
+    t1 = time.perf_counter()
+    mgr.update_after_answer(
+        mem,
+        query=f"question {i} about topic {i % 17}",
+        topic=f"topic {i % 17}",
+        intent=LearningIntent.casual_curiosity,
+        mode=LearningMode.quick_explain,
+        answer_summary="summary " * 20,
+    )
+    t2 = time.perf_counter()
+    mgr.save(mem)
+    t3 = time.perf_counter()
+    load_ms.append((t1 - t0) * 1000)
+    save_ms.append((t3 - t2) * 1000)
+
+
+def _run(store_factory, users: int, updates: int, threads: int) -> dict[str, float]:
+    store: BaseMemoryStore = store_factory()
+    mgr = MemoryManager(store)
+    jobs = [(f"user{u}", i) for i in range(updates) for u in range(users)]
+    random.Random(0).shuffle(jobs)
+    # keep each user's updates ordered: a user is always handled by the same thread
+    buckets: list[list[tuple[str, int]]] = [[] for _ in range(threads)]
+    for user_id, i in sorted(jobs, key=lambda j: j[1]):
+        buckets[hash(user_id) % threads].append((user_id, i))
+
+    load_ms: list[float] = []
+    save_ms: list[float] = []
+
+    def worker(bucket: list[tuple[str, int]]) -> None:
+        for user_id, i in bucket:
+            _one_update(mgr, user_id, i, load_ms, save_ms)
+
+    start = time.perf_counter()
+    ts = [threading.Thread(target=worker, args=(b,)) for b in buckets]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "ops_per_s": len(jobs) / elapsed,
+        "load_p50": statistics.median(load_ms),
+        "load_p95": _pct(load_ms, 95),
+        "save_p50": statistics.median(save_ms),
+        "save_p95": _pct(save_ms, 95),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Concurrent load+update+save benchmark for memory stores")
+    ap.add_argument("--users", type=int, default=50)
+    ap.add_argument("--updates", type=int, default=40, help="Updates per user")
+    ap.add_argument("--threads", type=int, nargs="+", default=[1, 4, 8])
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        print(f"\n=== Memory store benchmark (users={args.users}, updates/user={args.updates}) ===")
+        print(f"{'backend':<22}{'threads':>8}{'ops/s':>10}{'load p50':>10}{'load p95':>10}{'save p50':>10}{'save p95':>10}")
+
+        # Baseline: the JSON store is a single document, so it only makes sense single-user, single-thread.
+        r = _run(lambda: MemoryStore(path=tmp_dir / "user_memory.json"), 1, args.users * args.updates, 1)
+        print(f"{'json (1 user)':<22}{1:>8}{r['ops_per_s']:>10.0f}{r['load_p50']:>10.2f}{r['load_p95']:>10.2f}{r['save_p50']:>10.2f}{r['save_p95']:>10.2f}")
+
+        for n in args.threads:
+            db = tmp_dir / f"mem_{n}.sqlite3"
+            r = _run(lambda: SQLiteMemoryStore(path=db), args.users, args.updates, n)
+            print(f"{'sqlite (multi-user)':<22}{n:>8}{r['ops_per_s']:>10.0f}{r['load_p50']:>10.2f}{r['load_p95']:>10.2f}{r['save_p50']:>10.2f}{r['save_p95']:>10.2f}")
+
+        for n in args.threads:
+            root = tmp_dir / f"journal_{n}"
+            r = _run(lambda: JournalMemoryStore(root=root), args.users, args.updates, n)
+            print(f"{'journal (multi-user)':<22}{n:>8}{r['ops_per_s']:>10.0f}{r['load_p50']:>10.2f}{r['load_p95']:>10.2f}{r['save_p50']:>10.2f}{r['save_p95']:>10.2f}")
+
+    print("(latencies in ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
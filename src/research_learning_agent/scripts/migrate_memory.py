@@ -0,0 +1,30 @@
+# uv run python -m research_learning_agent.scripts.migrate_memory --json data/user_memory.json --db data/user_memory.sqlite3
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from research_learning_agent.store.memory_store import MEMORY_PATH
+from research_learning_agent.store.sqlite_memory_store import SQLITE_MEMORY_PATH, SQLiteMemoryStore, migrate_json_to_sqlite
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Migrate the legacy JSON user memory into the SQLite store")
+    ap.add_argument("--json", type=str, default=str(MEMORY_PATH), help="Path to legacy user_memory.json")
+    ap.add_argument("--db", type=str, default=str(SQLITE_MEMORY_PATH), help="Path to the SQLite database")
+    ap.add_argument("--overwrite", action="store_true", help="Replace the user if already present in the database")
+    args = ap.parse_args(argv)
+
+    store = SQLiteMemoryStore(path=Path(args.db))
+    mem = migrate_json_to_sqlite(Path(args.json), store, overwrite=args.overwrite)
+    if mem is None:
+        print("Nothing migrated.")
+        return 0
+
+    print(f"Migrated user={mem.user_id} topics={len(mem.topics)} history={len(mem.history)} -> {args.db}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
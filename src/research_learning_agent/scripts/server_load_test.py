@@ -0,0 +1,199 @@
+# uv run python -m research_learning_agent.scripts.server_load_test --concurrency 1,2,4,8,16 --requests 64
+# uv run python -m research_learning_agent.scripts.server_load_test --url http://127.0.0.1:8080 --user alice
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+from research_learning_agent.config import ServerConfig
+from research_learning_agent.orchestrator import Orchestrator
+from research_learning_agent.server import AgentServer
+from research_learning_agent.storage import ProfileDirectory
+from research_learning_agent.schemas import (
+    AgentAnswer, IntentResult, Plan, PlanStep, StepType, ToolCall, ToolResult, ToolType, UserProfile,
+)
+
+
+class SimulatedPipeline:
+    """
+    Offline stand-ins for the intent classifier, planner, tools and generator: each call sleeps for
+    its stage latency (I/O-bound like the real LLM and HTTP calls) and returns a fixed result.
+    `peak_parallel` is the most generate calls that overlapped since the last `reset_peak()`.
+    """
+
+    def __init__(self, intent_s: float, plan_s: float, tools_s: float, generate_s: float) -> None:
+        self.intent_s, self.plan_s, self.tools_s, self.generate_s = intent_s, plan_s, tools_s, generate_s
+        self._lock = threading.Lock()
+        self._active = 0
+        self.peak_parallel = 0
+
+    def reset_peak(self) -> None:
+        with self._lock:
+            self.peak_parallel = self._active
+
+    def classify(self, question, profile, *, allow_llm=True):
+        time.sleep(self.intent_s)
+        return IntentResult(intent="professional_research", confidence=0.9, rationale="simulated")
+
+    def create_plan(self, question, profile, intent):
+        time.sleep(self.plan_s)
+        return Plan(goal=question, intent=intent.intent, steps=[PlanStep(
+            step_id="s1", type=StepType.research, description="research",
+            tool_calls=[ToolCall(tool=ToolType.web_search, query=question, top_k=3)],
+        )])
+
+    def execute_step(self, step):
+        time.sleep(self.tools_s)
+        return [ToolResult(tool=c.tool, query=c.query, results=[]) for c in step.tool_calls]
+
+    def generate(self, *, query, profile, intent, plan, tool_results, spec, force_final=False):
+        with self._lock:
+            self._active += 1
+            self.peak_parallel = max(self.peak_parallel, self._active)
+        try:
+            time.sleep(self.generate_s)
+        finally:
+            with self._lock:
+                self._active -= 1
+        return AgentAnswer(explanation=f"simulated answer to: {query.question}", mode=spec.mode)
+
+
+# ---- minimal asyncio HTTP client (one request per connection, like the server) ----
+
+async def http_json(
+    host: str, port: int, method: str, path: str, payload: dict[str, Any] | None = None
+) -> tuple[int, dict[str, str], Any]:
+    """(status, headers, decoded JSON body; a list of events for NDJSON streams)."""
+    reader, writer = await asyncio.open_connection(host, port)
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, rest = raw.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ")[1])
+    headers = {k.strip().lower(): v.strip() for k, v in (l.split(":", 1) for l in lines[1:] if ":" in l)}
+    if headers.get("transfer-encoding") == "chunked":
+        return status, headers, [json.loads(l) for l in _dechunk(rest).decode("utf-8").splitlines() if l]
+    return status, headers, json.loads(rest or b"null")
+
+
+def _dechunk(data: bytes) -> bytes:
+    out = bytearray()
+    while data:
+        size_line, _, data = data.partition(b"\r\n")
+        size = int(size_line, 16)
+        if size == 0:
+            break
+        out += data[:size]
+        data = data[size + 2:]
+    return bytes(out)
+
+
+async def run_level(host: str, port: int, user_id: str, concurrency: int, n_requests: int) -> dict[str, Any]:
+    """Send `n_requests` questions from `concurrency` concurrent clients; throughput and latency of the 200s."""
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    counter = iter(range(n_requests))
+
+    async def client() -> None:
+        for i in counter:
+            t0 = time.perf_counter()
+            status, _, _ = await http_json(host, port, "POST", "/v1/ask", {"user_id": user_id, "question": f"load test question {i}"})
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == 200:
+                latencies.append((time.perf_counter() - t0) * 1000.0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": n_requests,
+        "ok": statuses.get(200, 0),
+        "rejected_503": statuses.get(503, 0),
+        "throughput_rps": round(statuses.get(200, 0) / elapsed, 2),
+        "p50_ms": round(statistics.median(latencies), 1) if latencies else None,
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 1) if latencies else None,
+    }
+
+
+async def _levels(host: str, port: int, user_id: str, levels: list[int], n_requests: int) -> list[dict[str, Any]]:
+    return [await run_level(host, port, user_id, c, n_requests) for c in levels]
+
+
+async def _simulated_levels(args: argparse.Namespace, levels: list[int]) -> list[dict[str, Any]]:
+    os.environ.setdefault("OPENAI_API_KEY", "simulated")  # components are replaced; no LLM call is made
+    sim = SimulatedPipeline(*(ms / 1000.0 for ms in args.stage_ms))
+    orch = Orchestrator()
+    orch.intent = orch.planner = orch.tools = orch.generator = sim
+    with tempfile.TemporaryDirectory() as tmp:
+        profiles = ProfileDirectory(Path(tmp))
+        profiles.save(UserProfile(user_id="load", background="", level="beginner", goals=""))
+        server = AgentServer(
+            orch, profiles,
+            ServerConfig(max_concurrency=args.max_concurrency, max_queue=args.max_queue, port=0),
+        )
+        host, port = await server.start("127.0.0.1", 0)
+        try:
+            rows = []
+            for c in levels:
+                sim.reset_peak()
+                rows.append({**await run_level(host, port, "load", c, args.requests), "peak_parallel": sim.peak_parallel})
+            return rows
+        finally:
+            await server.close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Throughput and latency of the HTTP service at increasing client concurrency")
+    ap.add_argument("--url", default=None, help="Running server to load (default: an in-process server with a simulated pipeline)")
+    ap.add_argument("--user", default="load", help="user_id whose profile the running server has")
+    ap.add_argument("--concurrency", default="1,2,4,8,16", help="Comma-separated client concurrency levels")
+    ap.add_argument("--requests", type=int, default=64, help="Questions sent per level")
+    ap.add_argument("--max-concurrency", type=int, default=16, help="Simulated server: worker threads")
+    ap.add_argument("--max-queue", type=int, default=32, help="Simulated server: admission queue")
+    ap.add_argument(
+        "--stage-ms", type=float, nargs=4, default=[20.0, 60.0, 80.0, 200.0], metavar=("INTENT", "PLAN", "TOOLS", "GENERATE"),
+        help="Simulated stage latencies",
+    )
+    ap.add_argument("--json", action="store_true", help="Print the rows as JSON")
+    args = ap.parse_args(argv)
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    if args.url:
+        parts = urlsplit(args.url)
+        rows = asyncio.run(_levels(parts.hostname or "127.0.0.1", parts.port or 80, args.user, levels, args.requests))
+    else:
+        rows = asyncio.run(_simulated_levels(args, levels))
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 0
+    base = rows[0]["throughput_rps"] or 1.0
+    print(f"{'clients':>8}{'ok':>6}{'503':>6}{'req/s':>9}{'speedup':>9}{'p50 ms':>9}{'p95 ms':>9}")
+    for r in rows:
+        print(
+            f"{r['concurrency']:>8}{r['ok']:>6}{r['rejected_503']:>6}{r['throughput_rps']:>9.2f}"
+            f"{r['throughput_rps'] / base:>8.1f}x{r['p50_ms'] or 0:>9.1f}{r['p95_ms'] or 0:>9.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
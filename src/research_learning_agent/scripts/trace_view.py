@@ -0,0 +1,59 @@
+# uv run python -m research_learning_agent.scripts.trace_view [TRACE_ID] [--list 20]
+
+from __future__ import annotations
+
+import argparse
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+from research_learning_agent.tracing import critical_path, load_spans, render_waterfall, roots
+
+
+DEFAULT_TRACES_PATH = Path("data/traces.jsonl")
+
+
+def _fmt_start(start_ms: float) -> str:
+    return datetime.fromtimestamp(start_ms / 1000.0, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Waterfall and critical path of one request trace")
+    ap.add_argument("trace_id", nargs="?", default=None, help="Trace id (default: the most recent trace)")
+    ap.add_argument("--traces", type=Path, default=DEFAULT_TRACES_PATH, help="Span log; rotated .gz siblings are included")
+    ap.add_argument("--list", type=int, default=None, metavar="N", help="List the N most recent traces instead")
+    ap.add_argument("--width", type=int, default=40, help="Width of the timeline bars")
+    ap.add_argument("--json", action="store_true", help="Print the spans and critical path as JSON")
+    args = ap.parse_args(argv)
+
+    if args.list is not None or args.trace_id is None:
+        recent = roots(load_spans(args.traces))
+        if not recent:
+            print(f"No traces in {args.traces}")
+            return 1
+        if args.list is not None:
+            for r in recent[-args.list:]:
+                print(f"{r['trace_id']}  {_fmt_start(r['start_ms'])}  {r['duration_ms']:>9.1f}ms  {r['name']}  {r['status']}")
+            return 0
+        args.trace_id = recent[-1]["trace_id"]
+
+    spans = load_spans(args.traces, args.trace_id)
+    if not spans:
+        print(f"Trace {args.trace_id} not found in {args.traces}")
+        return 1
+    path = critical_path(spans)
+
+    if args.json:
+        print(json.dumps({"trace_id": args.trace_id, "spans": spans, "critical_path": path}, indent=2))
+        return 0
+
+    print(f"\n=== Trace {args.trace_id} ===")
+    print(render_waterfall(spans, width=args.width))
+    print("\nCritical path (self time = not covered by a critical child):")
+    for s in path:
+        print(f"  {s['name']:<28}{s['duration_ms']:>10.1f}ms  self {s['self_ms']:>9.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,58 @@
+# uv run python -m research_learning_agent.scripts.train_intent_model --events data/intent_events.jsonl
+
+from __future__ import annotations
+
+import argparse
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+from research_learning_agent.intent_model import (
+    CV_FOLDS, HOLDOUT_EVERY, INTENT_MODEL_PATH, IntentModel, load_training_data,
+)
+
+
+DEFAULT_CASES_PATH = Path("tests/fixtures/intent_cases.json")
+DEFAULT_EVENTS_PATH = Path("data/intent_events.jsonl")
+
+
+def _cv_accuracy(texts: list[str], labels: list[str]) -> float:
+    folds = np.arange(len(texts)) % CV_FOLDS
+    correct = 0
+    for f in range(CV_FOLDS):
+        train = [i for i in range(len(texts)) if folds[i] != f]
+        test = [i for i in range(len(texts)) if folds[i] == f]
+        if not test or len({labels[i] for i in train}) < 2:
+            continue
+        model = IntentModel.train([texts[i] for i in train], [labels[i] for i in train])
+        probs = model.predict_proba([texts[i] for i in test])
+        correct += sum(model.classes[int(np.argmax(p))] == labels[i] for p, i in zip(probs, test))
+    return correct / max(len(texts), 1)
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Train the local intent model (naive Bayes over hashed n-grams)")
+    ap.add_argument("--cases", type=Path, default=DEFAULT_CASES_PATH)
+    ap.add_argument("--events", type=Path, default=DEFAULT_EVENTS_PATH, help="Intent telemetry used as extra labels")
+    ap.add_argument("--out", type=Path, default=INTENT_MODEL_PATH)
+    args = ap.parse_args(argv)
+
+    texts, labels = load_training_data(args.cases, args.events)
+    if len(set(labels)) < 2:
+        print("Need labelled examples for at least two intents.")
+        return 1
+
+    model = IntentModel.train(texts, labels)
+    model.save(args.out)
+
+    print(f"\n=== Intent model ({len(texts)} examples; 1 in {HOLDOUT_EVERY} queries held out for intent_regression) ===")
+    print("Label counts:   " + ", ".join(f"{k}={v}" for k, v in sorted(Counter(labels).items())))
+    print(f"CV accuracy:    {_cv_accuracy(texts, labels):.2%} ({CV_FOLDS}-fold)")
+    print(f"Temperature:    {model.temperature}")
+    print(f"Saved:          {args.out} ({args.out.stat().st_size / 1024:.1f} KiB)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
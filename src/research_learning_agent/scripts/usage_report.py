@@ -0,0 +1,46 @@
+# uv run python -m research_learning_agent.scripts.usage_report --days 7
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+from research_learning_agent.usage import USAGE_LEDGER_PATH, UsageLedger
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="LLM token usage per user and UTC day, from the usage ledger")
+    ap.add_argument("--ledger", type=Path, default=USAGE_LEDGER_PATH)
+    ap.add_argument("--days", type=int, default=7, help="Most recent N days in the ledger")
+    ap.add_argument("--user", default=None, help="Only this user")
+    ap.add_argument("--json", action="store_true", help="Print the rows as JSON")
+    args = ap.parse_args(argv)
+
+    ledger = UsageLedger(args.ledger)
+    rows = []
+    for day in ledger.days()[-args.days:]:
+        for user_id, u in sorted(ledger.day(day).items()):
+            if args.user is None or user_id == args.user:
+                rows.append({"day": day, "user_id": user_id, **u.model_dump(), "total_tokens": u.total_tokens})
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 0
+    if not rows:
+        print(f"No usage recorded in {args.ledger}")
+        return 0
+
+    print(f"{'day':<12}{'user':<16}{'requests':>9}{'prompt':>10}{'completion':>12}{'tokens/req':>12}{'cost':>10}  by stage")
+    for r in rows:
+        per_req = r["total_tokens"] / max(r["requests"], 1)
+        stages = ", ".join(f"{k}={v}" for k, v in sorted(r["by_stage"].items(), key=lambda kv: -kv[1]))
+        print(
+            f"{r['day']:<12}{r['user_id']:<16}{r['requests']:>9}{r['prompt_tokens']:>10}{r['completion_tokens']:>12}"
+            f"{per_req:>12.0f}{r['cost_usd']:>10.4f}  {stages}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,368 @@
+# uv run python -m research_learning_agent.server --port 8080 --max-concurrency 8 --max-queue 32
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from pydantic import BaseModel, ValidationError
+
+from .config import ServerConfig, get_server_config
+from .metrics import REGISTRY
+from .orchestrator import Orchestrator
+from .prompts import BEST_EFFORT_SUFFIX
+from .schemas import OrchestratorActionType, OrchestratorResult, UserProfile, UserQuery
+from .storage import ProfileDirectory
+from .tools.http import configure_pool
+from .logging_utils import get_logger
+
+
+logger = get_logger("server")
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+_REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 409: "Conflict",
+    413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable",
+}
+
+
+# ---------------------------------
+# Request / response models
+# ---------------------------------
+
+class AskRequest(BaseModel):
+    """
+    POST /v1/ask. A new question needs `question` and gets a server-generated `session_id`; a
+    clarification is resumed with that `session_id` and `reply` (empty reply = answer best effort);
+    a follow-up sends a new `question` with the `session_id` of an answered session. Session ids
+    only resolve for the user they were issued to.
+    """
+
+    user_id: str
+    question: str | None = None
+    session_id: str | None = None
+    reply: str | None = None
+    stream: bool = False
+    latency_budget_ms: float | None = None
+
+
+@dataclass
+class ServiceError(Exception):
+    """Error returned to the client as `{"error": message}` with this status."""
+    status: int
+    message: str
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class _Request:
+    method: str
+    path: str
+    headers: dict[str, str]
+    body: bytes
+
+    def json(self) -> Any:
+        try:
+            return json.loads(self.body or b"{}")
+        except json.JSONDecodeError as e:
+            raise ServiceError(400, f"invalid JSON: {e.msg}")
+
+
+def result_payload(result: OrchestratorResult, session_id: str) -> dict[str, Any]:
+    if result.action.kind == OrchestratorActionType.need_clarification:
+        return {
+            "status": "need_clarification",
+            "session_id": session_id,
+            "clarifying_question": result.action.clarifying_question,
+        }
+    return {
+        "status": "final",
+        "session_id": session_id,
+        "answer": result.answer.model_dump(mode="json") if result.answer else None,
+        "trace_id": result.trace_id,
+        "timings_ms": result.timings_ms,
+        "total_tokens": result.usage.total_tokens,
+        "session_reused": result.session_reused,
+    }
+
+
+# ---------------------------------
+# Server
+# ---------------------------------
+
+class AgentServer:
+    """
+    asyncio HTTP/1.1 front end for one shared Orchestrator.
+
+    Every request is answered on a bounded worker pool (`max_concurrency` threads); the intent cache,
+    session store, OpenAI client and tool HTTP pool are shared by the workers. At most `max_queue`
+    admitted questions wait for a worker; beyond that the server answers 503 with Retry-After instead
+    of queueing without bound. One request per connection (`Connection: close`).
+    """
+
+    def __init__(
+        self,
+        orchestrator: Orchestrator | None = None,
+        profiles: ProfileDirectory | None = None,
+        config: ServerConfig | None = None,
+    ) -> None:
+        self.config = config or get_server_config()
+        configure_pool(2 * self.config.max_concurrency)
+        self.orchestrator = orchestrator or Orchestrator()
+        self.profiles = profiles or ProfileDirectory()
+        self._pool = ThreadPoolExecutor(max_workers=self.config.max_concurrency, thread_name_prefix="agent-worker")
+        self._server: asyncio.Server | None = None
+        self._in_flight = 0  # admitted questions, running or waiting; only touched on the event loop
+
+    @property
+    def capacity(self) -> int:
+        return self.config.max_concurrency + self.config.max_queue
+
+    async def start(self, host: str | None = None, port: int | None = None) -> tuple[str, int]:
+        self._server = await asyncio.start_server(
+            self._handle,
+            host or self.config.host,
+            self.config.port if port is None else port,
+            limit=MAX_HEADER_BYTES,
+        )
+        addr = self._server.sockets[0].getsockname()
+        logger.info("serving on http://%s:%s (workers=%d queue=%d)", addr[0], addr[1], self.config.max_concurrency, self.config.max_queue)
+        return addr[0], addr[1]
+
+    async def serve_forever(self) -> None:
+        assert self._server is not None, "call start() first"
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self.profiles.flush()
+
+    # ---- connection handling ----
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        started = time.perf_counter()
+        status = 500
+        try:
+            req = await _read_request(reader)
+            status = await self._dispatch(req, writer)
+        except ServiceError as e:
+            status = e.status
+            await _send_json(writer, e.status, {"error": e.message}, e.headers)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            status = 499
+        except Exception as e:
+            logger.exception("request failed: %s", e)
+            await _send_json(writer, 500, {"error": f"{type(e).__name__}: {e}"})
+        finally:
+            REGISTRY.inc("server_requests_total", status=status)
+            REGISTRY.observe("server_request_ms", (time.perf_counter() - started) * 1000.0, status=status)
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    async def _dispatch(self, req: _Request, writer: asyncio.StreamWriter) -> int:
+        if req.path == "/healthz" and req.method == "GET":
+            await _send_json(writer, 200, {
+                "status": "ok", "in_flight": self._in_flight, "capacity": self.capacity,
+                "queued": max(0, self._in_flight - self.config.max_concurrency),
+            })
+            return 200
+        if req.path.startswith("/v1/profiles/"):
+            if req.method != "PUT":
+                raise ServiceError(405, "use PUT")
+            return await self._put_profile(req.path.removeprefix("/v1/profiles/"), req, writer)
+        if req.path == "/v1/ask":
+            if req.method != "POST":
+                raise ServiceError(405, "use POST")
+            return await self._ask(req, writer)
+        raise ServiceError(404, f"no route for {req.path}")
+
+    async def _put_profile(self, user_id: str, req: _Request, writer: asyncio.StreamWriter) -> int:
+        try:
+            profile = UserProfile.model_validate({**req.json(), "user_id": user_id})
+        except ValidationError as e:
+            raise ServiceError(400, f"invalid profile: {e.errors()[0]['msg']}")
+        if not ProfileDirectory.valid_user_id(user_id):
+            raise ServiceError(400, f"invalid user_id: {user_id!r}")
+        self.profiles.save(profile)
+        await _send_json(writer, 200, {"status": "saved", "user_id": user_id})
+        return 200
+
+    # ---- /v1/ask ----
+
+    def _prepare(self, ask: AskRequest) -> tuple[UserProfile, UserQuery, bool]:
+        """Profile, query and force_final for one ask; resumes use the session's stored question."""
+        if not ProfileDirectory.valid_user_id(ask.user_id):
+            raise ServiceError(400, f"invalid user_id: {ask.user_id!r}")
+        profile = self.profiles.load(ask.user_id)
+        if profile is None:
+            raise ServiceError(404, f"no profile for {ask.user_id!r}; PUT /v1/profiles/{ask.user_id} first")
+
+        state = self.orchestrator.sessions.get(ask.session_id, user_id=ask.user_id) if ask.session_id else None
+        if ask.session_id and state is None:
+            raise ServiceError(404, "unknown session_id; omit it to start a new session")
+
+        if ask.reply is None:
+            if not ask.question or not ask.question.strip():
+                raise ServiceError(400, "question is required")
+            return profile, UserQuery(question=ask.question, session_id=ask.session_id or uuid.uuid4().hex), False
+
+        if state is None or not state.awaiting_clarification:
+            raise ServiceError(409, "no clarification pending for this session_id")
+        if not ask.reply.strip() or state.turns >= self.config.max_clarify_turns:
+            return profile, UserQuery(question=state.question + BEST_EFFORT_SUFFIX, session_id=state.session_id), True
+        question = state.question + "\n\nAdditional context from user:\n" + ask.reply.strip()
+        return profile, UserQuery(question=question, session_id=state.session_id), False
+
+    def _submit(self, fn: Callable[[], OrchestratorResult]) -> asyncio.Future[OrchestratorResult]:
+        """Admit `fn` and run it on the worker pool; it holds its slot until it finishes, even if the client left."""
+        if self._in_flight >= self.capacity:
+            REGISTRY.inc("server_rejected_total")
+            raise ServiceError(503, "server busy, retry later", {"Retry-After": "1"})
+        self._in_flight += 1
+        fut = asyncio.get_running_loop().run_in_executor(self._pool, fn)
+        fut.add_done_callback(self._release)
+        return fut
+
+    def _release(self, _fut: asyncio.Future[OrchestratorResult]) -> None:
+        self._in_flight -= 1
+
+    async def _ask(self, req: _Request, writer: asyncio.StreamWriter) -> int:
+        try:
+            ask = AskRequest.model_validate(req.json())
+        except ValidationError as e:
+            raise ServiceError(400, f"invalid request: {e.errors()[0]['loc']} {e.errors()[0]['msg']}")
+        profile, query, force_final = self._prepare(ask)
+        if ask.stream:
+            return await self._ask_streaming(ask, profile, query, force_final, writer)
+
+        result = await self._submit(lambda: self.orchestrator.run(
+            query, profile, force_final=force_final, latency_budget_ms=ask.latency_budget_ms,
+        ))
+        await _send_json(writer, 200, result_payload(result, query.session_id))
+        return 200
+
+    async def _ask_streaming(
+        self, ask: AskRequest, profile: UserProfile, query: UserQuery, force_final: bool, writer: asyncio.StreamWriter
+    ) -> int:
+        """NDJSON over chunked encoding: accepted, started, one `stage` event per finished stage, then `result`."""
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue[dict[str, Any] | None] = asyncio.Queue()
+
+        def push(event: dict[str, Any]) -> None:
+            loop.call_soon_threadsafe(events.put_nowait, event)
+
+        def work() -> OrchestratorResult:
+            push({"event": "started"})
+            return self.orchestrator.run(
+                query, profile, force_final=force_final, latency_budget_ms=ask.latency_budget_ms,
+                on_stage=lambda stage, ms: push({"event": "stage", "stage": stage, "ms": round(ms, 1)}),
+            )
+
+        fut = self._submit(work)
+        fut.add_done_callback(lambda _: events.put_nowait(None))  # after the worker's queued events
+        writer.write(_head(200, {"Content-Type": "application/x-ndjson", "Transfer-Encoding": "chunked"}))
+        await _write_chunk(writer, {
+            "event": "accepted", "session_id": query.session_id,
+            "queued": max(0, self._in_flight - self.config.max_concurrency),
+        })
+        while (event := await events.get()) is not None:
+            await _write_chunk(writer, event)
+        try:
+            payload = {"event": "result", **result_payload(fut.result(), query.session_id)}
+        except Exception as e:
+            logger.exception("streamed ask failed: %s", e)
+            payload = {"event": "error", "error": f"{type(e).__name__}: {e}"}
+        await _write_chunk(writer, payload)
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+        return 200
+
+
+# ---------------------------------
+# HTTP/1.1 framing
+# ---------------------------------
+
+async def _read_request(reader: asyncio.StreamReader) -> _Request:
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.LimitOverrunError:
+        raise ServiceError(413, "headers too large")
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, _version = lines[0].split(" ", 2)
+    except ValueError:
+        raise ServiceError(400, "malformed request line")
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            k, v = line.split(":", 1)
+            headers[k.strip().lower()] = v.strip()
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise ServiceError(400, "invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise ServiceError(413, "body too large")
+    body = await reader.readexactly(length) if length else b""
+    return _Request(method=method.upper(), path=target.split("?", 1)[0], headers=headers, body=body)
+
+
+def _head(status: int, headers: dict[str, str]) -> bytes:
+    lines = [f"HTTP/1.1 {status} {_REASONS.get(status, 'Unknown')}", *(f"{k}: {v}" for k, v in headers.items()), "Connection: close"]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def _send_json(writer: asyncio.StreamWriter, status: int, payload: dict[str, Any], headers: dict[str, str] | None = None) -> None:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    writer.write(_head(status, {"Content-Type": "application/json", "Content-Length": str(len(body)), **(headers or {})}) + body)
+    await writer.drain()
+
+
+async def _write_chunk(writer: asyncio.StreamWriter, event: dict[str, Any]) -> None:
+    data = (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
+    writer.write(f"{len(data):x}\r\n".encode("latin-1") + data + b"\r\n")
+    await writer.drain()
+
+
+def main(argv: list[str] | None = None) -> int:
+    config = get_server_config()
+    ap = argparse.ArgumentParser(description="HTTP service answering questions for many users")
+    ap.add_argument("--host", default=config.host)
+    ap.add_argument("--port", type=int, default=config.port)
+    ap.add_argument("--max-concurrency", type=int, default=config.max_concurrency, help="Worker threads")
+    ap.add_argument("--max-queue", type=int, default=config.max_queue, help="Admitted questions waiting; beyond -> 503")
+    args = ap.parse_args(argv)
+    config.host, config.port = args.host, args.port
+    config.max_concurrency, config.max_queue = max(1, args.max_concurrency), max(0, args.max_queue)
+
+    async def serve() -> None:
+        server = AgentServer(config=config)
+        await server.start()
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from pydantic import BaseModel, Field
+
+from .schemas import IntentResult, Plan, ToolResult
+from .logging_utils import get_logger
+
+
+logger = get_logger("session")
+
+
+class SessionState(BaseModel):
+    """What the orchestrator already computed for a session, reused by its next turn."""
+
+    session_id: str
+    user_id: str | None = None               # owner; other users never see this session
+    question: str                            # question the plan and evidence were built for
+    intent: IntentResult | None = None
+    plan: Plan | None = None                 # None while the session is still being clarified
+    tool_results: list[ToolResult] = Field(default_factory=list)
+    awaiting_clarification: bool = False     # the last turn asked a clarifying question
+    turns: int = 0
+
+    @property
+    def answered(self) -> bool:
+        return self.plan is not None and not self.awaiting_clarification
+
+
+class SessionStore:
+    """
+    In-process LRU + TTL store of SessionState keyed by (user_id, `UserQuery.session_id`), so a
+    session id only resolves for the user whose turn created it.
+
+    `get` returns a copy; the orchestrator updates it and `put`s it back at the end of the turn.
+    Sessions idle for longer than `ttl_s` are dropped.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_sessions: int = 256,
+        ttl_s: float = 1800.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_sessions = max_sessions
+        self.ttl_s = ttl_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._sessions: OrderedDict[tuple[str | None, str], tuple[float, SessionState]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str, *, user_id: str | None = None) -> SessionState | None:
+        key = (user_id, session_id)
+        with self._lock:
+            entry = self._sessions.get(key)
+            if entry is None:
+                return None
+            touched_at, state = entry
+            if self._clock() - touched_at >= self.ttl_s:
+                del self._sessions[key]
+                return None
+            self._sessions.move_to_end(key)
+            return state.model_copy(deep=True)
+
+    def put(self, state: SessionState) -> None:
+        if self.max_sessions <= 0:
+            return
+        key = (state.user_id, state.session_id)
+        with self._lock:
+            self._sessions[key] = (self._clock(), state.model_copy(deep=True))
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def drop(self, session_id: str, *, user_id: str | None = None) -> None:
+        with self._lock:
+            self._sessions.pop((user_id, session_id), None)
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Iterable
+
+from .schemas import Degradation
+from .metrics import REGISTRY
+from .tracing import current_span
+from .logging_utils import get_logger
+
+
+logger = get_logger("slo")
+
+
+# Share of the per-question budget each stage may use; deadlines are cumulative, so time a stage
+# does not use carries over to the next one.
+STAGE_SHARES: dict[str, float] = {"intent": 0.10, "plan": 0.25, "tools": 0.30, "generate": 0.35}
+EWMA_ALPHA = 0.3
+
+# Which stage's expected latency stops being learned when a ladder step replaces it
+DEGRADED_STAGE = {
+    Degradation.rules_only_intent: "intent",
+    Degradation.template_plan: "plan",
+    Degradation.trimmed_tools: "tools",
+    Degradation.skipped_tools: "tools",
+    Degradation.fewer_sections: "generate",
+    Degradation.simple_agent: "generate",
+}
+
+
+class StageLatencyModel:
+    """Expected full-pipeline latency per stage: an EWMA over recent requests that ran the stage undegraded."""
+
+    def __init__(self, alpha: float = EWMA_ALPHA) -> None:
+        self.alpha = alpha
+        self._expected: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, ms: float) -> None:
+        with self._lock:
+            prev = self._expected.get(stage)
+            self._expected[stage] = ms if prev is None else (1 - self.alpha) * prev + self.alpha * ms
+
+    def observe_run(
+        self, timings_ms: dict[str, float], degradations: list[Degradation], *, skip: Iterable[str] = ()
+    ) -> None:
+        """Learn from one run's stage timings, except degraded stages and `skip` (e.g. reused from the session)."""
+        degraded = {DEGRADED_STAGE[d] for d in degradations} | set(skip)
+        for stage in STAGE_SHARES:
+            if stage in timings_ms and stage not in degraded:
+                self.observe(stage, timings_ms[stage])
+
+    def expected(self, stage: str) -> float | None:
+        with self._lock:
+            return self._expected.get(stage)
+
+
+class LatencyBudget:
+    """
+    Time left for one question, checked at stage boundaries.
+
+    A stage is "over" when the time left until its cumulative deadline is gone, or is smaller than
+    what the stage is expected to take; the orchestrator then applies the next ladder step for it.
+    """
+
+    def __init__(
+        self,
+        budget_ms: float,
+        model: StageLatencyModel | None = None,
+        *,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self.budget_ms = budget_ms
+        self.model = model or StageLatencyModel()
+        self.clock = clock
+        self.started = clock()
+        self.applied: list[Degradation] = []
+
+    def elapsed_ms(self) -> float:
+        return (self.clock() - self.started) * 1000.0
+
+    def remaining_ms(self) -> float:
+        return self.budget_ms - self.elapsed_ms()
+
+    def deadline_ms(self, stage: str) -> float:
+        share = 0.0
+        for name, s in STAGE_SHARES.items():
+            share += s
+            if name == stage:
+                break
+        return self.budget_ms * share
+
+    def left_for(self, stage: str) -> float:
+        return self.deadline_ms(stage) - self.elapsed_ms()
+
+    def over(self, stage: str) -> bool:
+        left = self.left_for(stage)
+        expected = self.model.expected(stage)
+        return left <= 0 or (expected is not None and expected > left)
+
+    def generation_step(self, n_sections: int, min_sections: int) -> Degradation | None:
+        """None (full generation), fewer_sections if a shorter answer is expected to fit, else simple_agent."""
+        left = self.remaining_ms()
+        if left <= 0:
+            return Degradation.simple_agent
+        expected = self.model.expected("generate")
+        if expected is None or expected <= left:
+            return None
+        if n_sections > min_sections and expected * min_sections / n_sections <= left:
+            return Degradation.fewer_sections
+        return Degradation.simple_agent
+
+    def apply(self, step: Degradation) -> None:
+        if step in self.applied:
+            return
+        self.applied.append(step)
+        logger.info("latency SLO: %s (elapsed=%.0fms budget=%.0fms)", step.value, self.elapsed_ms(), self.budget_ms)
+        REGISTRY.inc("slo_degradations_total", step=step.value)
+        current_span().set(degradation=step.value)
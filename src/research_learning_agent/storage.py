@@ -1,10 +1,18 @@
 import json
+import re
+import threading
+from collections import OrderedDict
 from pathlib import Path
 
 from .schemas import UserProfile
+from .store.write_behind import CachedDocument, WriteBehindFlusher, atomic_write_text, file_version
 
 DATA_DIR = Path("data")
 PROFILE_PATH = DATA_DIR / "user_profile.json"
+PROFILES_DIR = DATA_DIR / "profiles"
+MAX_CACHED_PROFILES = 1024  # per-user stores kept in memory by ProfileDirectory
+
+_USER_ID_PAT = re.compile(r"[A-Za-z0-9_.-]{1,64}")
 
 
 class ProfileStore:
@@ -19,4 +27,89 @@ class ProfileStore:
         return UserProfile.model_validate(data)
     
     def save(self, profile: UserProfile) -> None:
-        self.path.write_text(profile.model_dump_json(indent=2), encoding="utf-8")
+        atomic_write_text(self.path, profile.model_dump_json(indent=2))
+
+
+class CachedProfileStore(ProfileStore):
+    """
+    ProfileStore with an in-process cache: `load` re-reads the file only if it changed on disk,
+    `save` returns immediately and a write-behind flusher persists the latest profile.
+    Call `flush()` to persist now; pending writes are also flushed at interpreter exit.
+    """
+
+    def __init__(self, path: Path = PROFILE_PATH, *, flusher: WriteBehindFlusher | None = None) -> None:
+        super().__init__(path)
+        self.flusher = flusher or WriteBehindFlusher(name="profile-flusher")
+        self._doc: CachedDocument[UserProfile] = CachedDocument(
+            str(self.path),
+            read=lambda: ProfileStore.load(self),
+            write=lambda profile: ProfileStore.save(self, profile),
+            version=lambda: file_version(self.path),
+            flusher=self.flusher,
+        )
+
+    def load(self) -> UserProfile | None:
+        return self._doc.get()
+
+    def save(self, profile: UserProfile) -> None:
+        self._doc.put(profile)
+
+    @property
+    def dirty(self) -> bool:
+        return self._doc.dirty
+
+    def flush(self) -> None:
+        self.flusher.flush()
+
+
+class ProfileDirectory:
+    """
+    One CachedProfileStore per user, at `<root>/<user_id>.json`, for serving many users from one
+    process. Stores share a write-behind flusher; user ids are restricted to safe file names.
+    At most `max_cached` stores are kept, least recently used first out; a store with an
+    unwritten save is kept until the flusher has written it.
+    """
+
+    def __init__(
+        self,
+        root: Path = PROFILES_DIR,
+        *,
+        flusher: WriteBehindFlusher | None = None,
+        max_cached: int = MAX_CACHED_PROFILES,
+    ) -> None:
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.flusher = flusher or WriteBehindFlusher(name="profiles-flusher")
+        self.max_cached = max_cached
+        self._stores: OrderedDict[str, CachedProfileStore] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def valid_user_id(user_id: str) -> bool:
+        return bool(_USER_ID_PAT.fullmatch(user_id)) and user_id not in {".", ".."}
+
+    def _store(self, user_id: str) -> CachedProfileStore:
+        if not self.valid_user_id(user_id):
+            raise ValueError(f"invalid user_id: {user_id!r}")
+        with self._lock:
+            store = self._stores.get(user_id)
+            if store is None:
+                store = self._stores[user_id] = CachedProfileStore(self.root / f"{user_id}.json", flusher=self.flusher)
+                self._evict()
+            self._stores.move_to_end(user_id)
+            return store
+
+    def _evict(self) -> None:
+        # caller holds self._lock; dirty stores stay so a reload cannot miss their pending save
+        excess = len(self._stores) - self.max_cached
+        for user_id in [u for u, s in list(self._stores.items())[:-1] if not s.dirty][:max(0, excess)]:
+            del self._stores[user_id]
+
+    def load(self, user_id: str) -> UserProfile | None:
+        return self._store(user_id).load()
+
+    def save(self, profile: UserProfile) -> None:
+        self._store(profile.user_id).save(profile)
+
+    def flush(self) -> None:
+        self.flusher.flush()
@@ -0,0 +1,41 @@
+from abc import ABC, abstractmethod
+
+from research_learning_agent.schemas import UserMemory, MemoryHead, MemoryItem
+
+
+class BaseMemoryStore(ABC):
+    """Persistence backend for UserMemory, keyed by user_id."""
+
+    @abstractmethod
+    def load(self, user_id: str = "default") -> UserMemory | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def save(self, mem: UserMemory) -> None:
+        raise NotImplementedError
+
+    def load_head(self, user_id: str = "default") -> MemoryHead | None:
+        """
+        Load topics, preferences and last_topic without history.
+        Backends override this to avoid reading/validating history at all.
+        """
+        mem = self.load(user_id)
+        return mem.head() if mem is not None else None
+
+    def load_history(self, user_id: str = "default", *, offset: int = 0, limit: int | None = None) -> list[MemoryItem]:
+        """
+        Page through history, newest first: skip the `offset` most recent items and return up to `limit`
+        items before them, in chronological order.
+        """
+        mem = self.load(user_id)
+        if mem is None:
+            return []
+        return page_newest_first(mem.history, offset, limit)
+
+
+def page_newest_first(items: list, offset: int, limit: int | None) -> list:
+    end = len(items) - max(0, offset)
+    if end <= 0:
+        return []
+    start = 0 if limit is None else max(0, end - limit)
+    return items[start:end]
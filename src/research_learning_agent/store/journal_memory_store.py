@@ -0,0 +1,284 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Iterator
+
+from research_learning_agent.schemas import UserMemory, MemoryHead, MemoryItem, UserPreferences, TopicDigest
+from research_learning_agent.store.base import BaseMemoryStore
+from research_learning_agent.logging_utils import get_logger
+
+
+logger = get_logger("store.journal_memory_store")
+
+
+DATA_DIR = Path("data")
+JOURNAL_DIR = DATA_DIR / "memory_journal"
+
+COMPACT_THRESHOLD_BYTES = 256 * 1024
+
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9_.-]")
+
+# head fields written only in records where they changed
+_SPARSE_KEYS = ("digests", "pending")
+
+
+class JournalMemoryStore(BaseMemoryStore):
+    """
+    Log-structured memory store: one append-only journal plus one snapshot per user.
+
+    - `save` appends a single JSON line with the items added since the last save and the
+      (small, bounded) head: topics, last_topic, preferences and the history window size.
+      Digests and items awaiting rollup are written only in records where they changed.
+      Per-answer cost is O(1) in history length.
+    - `load` reads the snapshot and replays journal records with a higher sequence number.
+      A torn final line (crash mid-write) is ignored and trimmed before the next append.
+    - once the journal passes `compact_threshold_bytes`, a background thread folds it into a new
+      snapshot (temp file + rename) and starts an empty journal. Records carry a sequence number
+      and the snapshot stores the last one applied, so a crash between the two steps is harmless.
+    """
+
+    def __init__(
+        self,
+        root: Path = JOURNAL_DIR,
+        *,
+        compact_threshold_bytes: int = COMPACT_THRESHOLD_BYTES,
+        fsync: bool = True,
+    ) -> None:
+        self.root = root
+        self.compact_threshold_bytes = compact_threshold_bytes
+        self.fsync = fsync
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        # per-user position of what is already on disk
+        self._seq: dict[str, int] = {}
+        self._last_ts: dict[str, str | None] = {}
+        self._head: dict[str, dict[str, Any]] = {}
+        self._compactions: dict[str, threading.Thread] = {}
+
+    # ---- paths / locks ----
+
+    def _name(self, user_id: str) -> str:
+        safe = _SAFE_NAME.sub("_", user_id)
+        if safe != user_id:
+            safe += "-" + hashlib.sha1(user_id.encode("utf-8")).hexdigest()[:8]
+        return safe
+
+    def log_path(self, user_id: str) -> Path:
+        return self.root / f"{self._name(user_id)}.log"
+
+    def snapshot_path(self, user_id: str) -> Path:
+        return self.root / f"{self._name(user_id)}.snapshot.json"
+
+    def _lock(self, user_id: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(user_id, threading.Lock())
+
+    # ---- BaseMemoryStore ----
+
+    def load(self, user_id: str = "default") -> UserMemory | None:
+        with self._lock(user_id):
+            return self._replay(user_id)
+
+    def load_head(self, user_id: str = "default") -> MemoryHead | None:
+        """Read the journal backwards: the last record carries the head; digests come from the last record that has them."""
+        with self._lock(user_id):
+            head: MemoryHead | None = None
+            for record in self._records_from_end(self.log_path(user_id)):
+                if head is None:
+                    head = MemoryHead(
+                        user_id=user_id,
+                        topics=record.get("topics", []),
+                        preferences=UserPreferences.model_validate(record.get("preferences", {})),
+                        last_topic=record.get("last_topic"),
+                    )
+                if "digests" in record:
+                    head.digests = [TopicDigest.model_validate(d) for d in record["digests"]]
+                    return head
+
+            snap_path = self.snapshot_path(user_id)
+            if snap_path.exists():
+                snap = MemoryHead.model_validate(json.loads(snap_path.read_text(encoding="utf-8"))["memory"])
+                if head is None:
+                    return snap
+                head.digests = snap.digests
+            return head
+
+    def save(self, mem: UserMemory) -> None:
+        user_id = mem.user_id
+        with self._lock(user_id):
+            if user_id not in self._seq:
+                self._replay(user_id)
+
+            last_ts = self._last_ts.get(user_id)
+            new_items = [it for it in mem.history if last_ts is None or it.ts > last_ts]
+            head = self._head_of(mem)
+            if not new_items and head == self._head.get(user_id):
+                return
+
+            seq = self._seq[user_id] + 1
+            prev = self._head.get(user_id, {})
+            record = {"seq": seq, "items": [it.model_dump(mode="json") for it in new_items]}
+            record.update((k, v) for k, v in head.items() if k not in _SPARSE_KEYS or v != prev.get(k))
+            self._append(self.log_path(user_id), json.dumps(record, ensure_ascii=False) + "\n")
+
+            self._seq[user_id] = seq
+            self._head[user_id] = head
+            if new_items:
+                self._last_ts[user_id] = new_items[-1].ts
+
+        self._maybe_compact(user_id)
+
+    # ---- journal ----
+
+    @staticmethod
+    def _head_of(mem: UserMemory) -> dict[str, Any]:
+        return {
+            "topics": list(mem.topics),
+            "last_topic": mem.last_topic,
+            "preferences": mem.preferences.model_dump(mode="json"),
+            "keep": len(mem.history),
+            "digests": [d.model_dump(mode="json") for d in mem.digests],
+            "pending": [it.model_dump(mode="json") for it in mem.rollup_pending],
+        }
+
+    def _append(self, path: Path, line: str) -> None:
+        with path.open("a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+
+    def _replay(self, user_id: str) -> UserMemory | None:
+        """Rebuild memory from snapshot + journal and refresh the on-disk position. Caller holds the lock."""
+        mem: UserMemory | None = None
+        seq = 0
+
+        snap_path = self.snapshot_path(user_id)
+        if snap_path.exists():
+            snap = json.loads(snap_path.read_text(encoding="utf-8"))
+            seq = int(snap.get("seq", 0))
+            mem = UserMemory.model_validate(snap["memory"])
+
+        log_path = self.log_path(user_id)
+        if log_path.exists():
+            good_bytes = 0
+            with log_path.open("rb") as f:
+                for raw in f:
+                    try:
+                        if not raw.endswith(b"\n"):
+                            raise ValueError("incomplete record")
+                        record = json.loads(raw)
+                    except ValueError:
+                        logger.warning("ignoring torn journal tail for user %s at byte %d", user_id, good_bytes)
+                        break
+                    good_bytes += len(raw)
+                    if record["seq"] <= seq:
+                        continue  # already folded into the snapshot
+                    mem = self._apply(mem or UserMemory(user_id=user_id), record)
+                    seq = record["seq"]
+            if good_bytes < log_path.stat().st_size:
+                with log_path.open("r+b") as f:
+                    f.truncate(good_bytes)
+
+        self._seq[user_id] = seq
+        self._last_ts[user_id] = mem.history[-1].ts if mem and mem.history else None
+        self._head[user_id] = self._head_of(mem) if mem else {}
+        return mem
+
+    @staticmethod
+    def _records_from_end(path: Path) -> Iterator[dict[str, Any]]:
+        """Complete journal records, newest first, read backwards from the end of the file."""
+        if not path.exists():
+            return
+        with path.open("rb") as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            buf = b""
+            first_block = True
+            while pos > 0:
+                step = min(8192, pos)
+                pos -= step
+                f.seek(pos)
+                buf = f.read(step) + buf
+                lines = buf.split(b"\n")
+                # lines[0] may be partial until the start of the file is reached; the tail after the
+                # last newline (only in the first block read) is a torn record
+                complete = lines[1:] if pos > 0 else lines
+                if first_block:
+                    complete = complete[:-1]
+                    first_block = False
+                buf = lines[0] if pos > 0 else b""
+                for raw in reversed(complete):
+                    if raw.strip():
+                        try:
+                            yield json.loads(raw)
+                        except ValueError:
+                            continue
+
+    @staticmethod
+    def _apply(mem: UserMemory, record: dict[str, Any]) -> UserMemory:
+        mem.history.extend(MemoryItem.model_validate(it) for it in record.get("items", []))
+        keep = int(record.get("keep", len(mem.history)))
+        mem.history = mem.history[-keep:] if keep > 0 else []
+        mem.topics = list(record.get("topics", mem.topics))
+        mem.last_topic = record.get("last_topic", mem.last_topic)
+        if "preferences" in record:
+            mem.preferences = UserPreferences.model_validate(record["preferences"])
+        if "digests" in record:
+            mem.digests = [TopicDigest.model_validate(d) for d in record["digests"]]
+        if "pending" in record:
+            mem.rollup_pending = [MemoryItem.model_validate(it) for it in record["pending"]]
+        return mem
+
+    # ---- compaction ----
+
+    def _maybe_compact(self, user_id: str) -> None:
+        try:
+            size = self.log_path(user_id).stat().st_size
+        except FileNotFoundError:
+            return
+        if size < self.compact_threshold_bytes:
+            return
+        with self._locks_guard:
+            running = self._compactions.get(user_id)
+            if running is not None and running.is_alive():
+                return
+            t = threading.Thread(target=self.compact, args=(user_id,), name=f"memory-compact-{user_id}", daemon=True)
+            self._compactions[user_id] = t
+        t.start()
+
+    def compact(self, user_id: str) -> None:
+        """Fold the journal into a fresh snapshot and start an empty journal."""
+        with self._lock(user_id):
+            mem = self._replay(user_id)
+            if mem is None:
+                return
+            seq = self._seq[user_id]
+
+            snap_path = self.snapshot_path(user_id)
+            tmp = snap_path.with_suffix(".json.tmp")
+            payload = json.dumps({"seq": seq, "memory": mem.model_dump(mode="json")}, ensure_ascii=False)
+            with tmp.open("w", encoding="utf-8") as f:
+                f.write(payload)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            os.replace(tmp, snap_path)
+
+            # records up to `seq` are now in the snapshot; replay skips them even if truncation never happens.
+            # The new journal starts with a head-only record (also skipped by replay) so load_head stays cheap.
+            head_record = {"seq": seq, "items": [], **self._head_of(mem)}
+            with self.log_path(user_id).open("w", encoding="utf-8") as f:
+                f.write(json.dumps(head_record, ensure_ascii=False) + "\n")
+            logger.debug("compacted journal for user %s at seq=%d", user_id, seq)
+
+    def wait_for_compaction(self, timeout: float | None = None) -> None:
+        with self._locks_guard:
+            threads = list(self._compactions.values())
+        for t in threads:
+            t.join(timeout)
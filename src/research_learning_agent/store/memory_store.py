@@ -1,26 +1,129 @@
 import json
+import os
 from pathlib import Path
-from re import S
 
-from research_learning_agent.schemas import UserMemory
+from research_learning_agent.schemas import UserMemory, MemoryHead, MemoryItem
+from research_learning_agent.store.base import BaseMemoryStore, page_newest_first
+from research_learning_agent.store.write_behind import (
+    CachedDocument, WriteBehindFlusher, atomic_write_text, file_version
+)
 
 
 DATA_DIR = Path("data")
 MEMORY_PATH = DATA_DIR / "user_memory.json"
 
+_TAIL_BLOCK_BYTES = 8192
+
+
+class MemoryStore(BaseMemoryStore):
+    """
+    JSON store for a single user, split into two files so the head can be read on its own:
+      - `path` (user_memory.json): topics, preferences, last_topic, digests (+ items awaiting rollup)
+      - `user_memory.history.jsonl`: one MemoryItem per line, oldest first
+    Legacy single documents with an inline `history` list are still read.
+    """
 
-class MemoryStore:
     def __init__(self, path: Path = MEMORY_PATH) -> None:
         self.path = path
+        self.history_path = path.with_suffix(".history.jsonl")
         DATA_DIR.mkdir(parents=True, exist_ok=True)
 
     def load(self, user_id: str = "default") -> UserMemory | None:
         if not self.path.exists():
             return None
         data = json.loads(self.path.read_text(encoding="utf-8"))
-        # if later support multiple users, key by user_id
+        # single document; multi-user persistence lives in SQLiteMemoryStore
+        if "history" not in data:
+            data["history"] = [json.loads(line) for line in self._history_lines()]
         return UserMemory.model_validate(data)
+
+    def load_head(self, user_id: str = "default") -> MemoryHead | None:
+        if not self.path.exists():
+            return None
+        return MemoryHead.model_validate_json(self.path.read_text(encoding="utf-8"))
+
+    def load_history(self, user_id: str = "default", *, offset: int = 0, limit: int | None = None) -> list[MemoryItem]:
+        if not self.path.exists():
+            return []
+        if not self.history_path.exists():
+            return super().load_history(user_id, offset=offset, limit=limit)  # legacy inline history
+
+        if limit is None:
+            lines = self._history_lines()
+        else:
+            lines = self._tail_lines(max(0, offset) + limit)
+        return [MemoryItem.model_validate_json(line) for line in page_newest_first(lines, offset, limit)]
     
     def save(self, mem: UserMemory) -> None:
-        self.path.write_text(mem.model_dump_json(indent=2), encoding="utf-8")
-        
\ No newline at end of file
+        # history first: the head file is what makes a memory visible to load()
+        atomic_write_text(self.history_path, "".join(item.model_dump_json() + "\n" for item in mem.history))
+        atomic_write_text(self.path, mem.model_dump_json(exclude={"history"}, indent=2))
+
+    # ---- helpers ----
+
+    def _history_lines(self) -> list[str]:
+        if not self.history_path.exists():
+            return []
+        return [line for line in self.history_path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+    def _tail_lines(self, n: int) -> list[str]:
+        """Read only the last `n` lines of the history file, scanning backwards in blocks."""
+        if n <= 0:
+            return []
+        with self.history_path.open("rb") as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            buf = b""
+            while pos > 0 and buf.count(b"\n") <= n:
+                step = min(_TAIL_BLOCK_BYTES, pos)
+                pos -= step
+                f.seek(pos)
+                buf = f.read(step) + buf
+        raw_lines = buf.split(b"\n")
+        if pos > 0:
+            raw_lines = raw_lines[1:]  # first line may be partial (possibly mid-character)
+        lines = [line.decode("utf-8") for line in raw_lines if line.strip()]
+        return lines[-n:]
+
+
+class CachedMemoryStore(MemoryStore):
+    """
+    MemoryStore with an in-process cache and write-behind persistence.
+
+    Reads are served from memory unless either file changed on disk (mtime/size); `save` only
+    updates the cache and marks it dirty, and a flusher thread coalesces saves into one atomic
+    write of both files. Call `flush()` to persist now; pending writes are flushed at exit.
+    """
+
+    def __init__(self, path: Path = MEMORY_PATH, *, flusher: WriteBehindFlusher | None = None) -> None:
+        super().__init__(path)
+        self.flusher = flusher or WriteBehindFlusher(name="memory-flusher")
+        self._doc: CachedDocument[UserMemory] = CachedDocument(
+            str(self.path),
+            read=lambda: MemoryStore.load(self),
+            write=lambda mem: MemoryStore.save(self, mem),
+            version=lambda: (file_version(self.path), file_version(self.history_path)),
+            flusher=self.flusher,
+        )
+
+    def load(self, user_id: str = "default") -> UserMemory | None:
+        return self._doc.get()
+
+    def load_head(self, user_id: str = "default") -> MemoryHead | None:
+        # from the cached memory if it is current; otherwise read the head file only, not the history
+        hit, mem = self._doc.cached()
+        if hit:
+            return mem.head() if mem is not None else None
+        return MemoryStore.load_head(self, user_id)
+
+    def load_history(self, user_id: str = "default", *, offset: int = 0, limit: int | None = None) -> list[MemoryItem]:
+        mem = self._doc.peek()
+        if mem is None:
+            return []
+        return [it.model_copy() for it in page_newest_first(mem.history, offset, limit)]
+
+    def save(self, mem: UserMemory) -> None:
+        self._doc.put(mem)
+
+    def flush(self) -> None:
+        self.flusher.flush()
@@ -0,0 +1,338 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+from research_learning_agent.schemas import (
+    UserMemory, MemoryHead, UserPreferences, MemoryItem, ExplanationStyle, ResourcePreference, Verbosity, 
+    LearningMode, TopicDigest
+)
+from research_learning_agent.store.base import BaseMemoryStore
+from research_learning_agent.store.memory_store import MemoryStore
+from research_learning_agent.logging_utils import get_logger
+
+
+logger = get_logger("store.sqlite_memory_store")
+
+
+DATA_DIR = Path("data")
+SQLITE_MEMORY_PATH = DATA_DIR / "user_memory.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id     TEXT PRIMARY KEY,
+    last_topic  TEXT,
+    updated_at  TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS preferences (
+    user_id             TEXT PRIMARY KEY REFERENCES users(user_id) ON DELETE CASCADE,
+    explanation_style   TEXT NOT NULL,
+    resource_preference TEXT NOT NULL,
+    verbosity           TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS topics (
+    user_id   TEXT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    position  INTEGER NOT NULL,
+    topic     TEXT NOT NULL,
+    PRIMARY KEY (user_id, position)
+);
+
+CREATE TABLE IF NOT EXISTS history (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id     TEXT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    ts          TEXT NOT NULL,
+    query       TEXT NOT NULL,
+    topic       TEXT NOT NULL,
+    intent      TEXT NOT NULL,
+    mode        TEXT NOT NULL,
+    summary     TEXT NOT NULL DEFAULT '',
+    followed_up INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_history_user_id ON history(user_id, id);
+CREATE INDEX IF NOT EXISTS idx_history_user_ts ON history(user_id, ts);
+
+CREATE TABLE IF NOT EXISTS digests (
+    user_id     TEXT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    topic       TEXT NOT NULL,
+    count       INTEGER NOT NULL,
+    modes       TEXT NOT NULL,  -- JSON object: mode -> count
+    first_seen  TEXT NOT NULL,
+    last_seen   TEXT NOT NULL,
+    summary     TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (user_id, topic)
+);
+
+CREATE TABLE IF NOT EXISTS rollup_pending (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id     TEXT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    ts          TEXT NOT NULL,
+    query       TEXT NOT NULL,
+    topic       TEXT NOT NULL,
+    intent      TEXT NOT NULL,
+    mode        TEXT NOT NULL,
+    summary     TEXT NOT NULL DEFAULT '',
+    followed_up INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_rollup_pending_user_id ON rollup_pending(user_id, id);
+"""
+
+_ITEM_COLUMNS = "ts, query, topic, intent, mode, summary, followed_up"
+
+
+def _item_row(it: MemoryItem) -> tuple:
+    """A history item as stored in the `_ITEM_COLUMNS` order."""
+    return (
+        it.ts, it.query, it.topic, str(getattr(it.intent, "value", it.intent)),
+        it.mode.value, it.summary, int(it.followed_up),
+    )
+
+
+def _window_start(stored: list[tuple], rows: list[tuple]) -> int:
+    """
+    Number of leading stored rows that fell out of the window: the smallest offset at which the
+    stored rows line up with the head of `rows`. Items are identified by (ts, query, topic, intent, mode)
+    and compared position by position, so equal timestamps and edited summaries don't break the match.
+    """
+    for start in range(len(stored) + 1):
+        tail = stored[start:]
+        if len(tail) <= len(rows) and all(old[:5] == new[:5] for old, new in zip(tail, rows)):
+            return start
+    return len(stored)
+
+
+class SQLiteMemoryStore(BaseMemoryStore):
+    """
+    Multi-user memory store on SQLite (WAL mode).
+
+    - users / preferences / topics / history live in separate tables indexed by user_id,
+      so loading one user reads only that user's rows.
+    - history rows are matched to the in-memory window by position, not by timestamp: `save` deletes
+      rows that fell out of the window, updates rows whose item changed (e.g. `followed_up`) and
+      inserts the new tail, so a save after `MemoryManager.update_after_answer` writes one history row.
+    - topic digests and items awaiting rollup are small, bounded tables rewritten only when they change.
+    - one connection per thread; WAL lets readers proceed while a writer commits.
+    """
+
+    def __init__(self, path: Path = SQLITE_MEMORY_PATH, *, busy_timeout_ms: int = 5000) -> None:
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    # ---- connections ----
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ---- BaseMemoryStore ----
+
+    def load(self, user_id: str = "default") -> UserMemory | None:
+        conn = self._connect()
+        conn.execute("BEGIN")  # one read snapshot for head + history
+        try:
+            head = self.load_head(user_id)
+            if head is None:
+                return None
+            pending = self._load_items(
+                conn, "SELECT " + _ITEM_COLUMNS + " FROM rollup_pending WHERE user_id = ? ORDER BY id", (user_id,)
+            )
+            return UserMemory(**dict(head), history=self.load_history(user_id), rollup_pending=pending)
+        finally:
+            conn.execute("COMMIT")
+
+    def load_head(self, user_id: str = "default") -> MemoryHead | None:
+        conn = self._connect()
+        user = conn.execute("SELECT last_topic FROM users WHERE user_id = ?", (user_id,)).fetchone()
+        if user is None:
+            return None
+
+        prefs_row = conn.execute(
+            "SELECT explanation_style, resource_preference, verbosity FROM preferences WHERE user_id = ?",
+            (user_id,),
+        ).fetchone()
+        prefs = UserPreferences()
+        if prefs_row is not None:
+            prefs = UserPreferences(
+                explanation_style=ExplanationStyle(prefs_row[0]),
+                resource_preference=ResourcePreference(prefs_row[1]),
+                verbosity=Verbosity(prefs_row[2]),
+            )
+
+        topics = [
+            r[0] for r in conn.execute(
+                "SELECT topic FROM topics WHERE user_id = ? ORDER BY position", (user_id,)
+            )
+        ]
+        digests = [
+            TopicDigest(
+                topic=r[0], count=r[1], modes=json.loads(r[2]), first_seen=r[3], last_seen=r[4], summary=r[5]
+            )
+            for r in conn.execute(
+                "SELECT topic, count, modes, first_seen, last_seen, summary FROM digests "
+                "WHERE user_id = ? ORDER BY last_seen, topic",
+                (user_id,),
+            )
+        ]
+        return MemoryHead(user_id=user_id, topics=topics, preferences=prefs, last_topic=user[0], digests=digests)
+
+    def load_history(self, user_id: str = "default", *, offset: int = 0, limit: int | None = None) -> list[MemoryItem]:
+        items = self._load_items(
+            self._connect(),
+            "SELECT " + _ITEM_COLUMNS + " FROM history WHERE user_id = ? ORDER BY id DESC LIMIT ? OFFSET ?",
+            (user_id, -1 if limit is None else limit, max(0, offset)),
+        )
+        return items[::-1]
+
+    def save(self, mem: UserMemory) -> None:
+        conn = self._connect()
+        now = datetime.now(timezone.utc).isoformat()
+        prefs = mem.preferences
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO users (user_id, last_topic, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET last_topic = excluded.last_topic, updated_at = excluded.updated_at",
+                (mem.user_id, mem.last_topic, now),
+            )
+            conn.execute(
+                "INSERT INTO preferences (user_id, explanation_style, resource_preference, verbosity) "
+                "VALUES (?, ?, ?, ?) ON CONFLICT(user_id) DO UPDATE SET "
+                "explanation_style = excluded.explanation_style, "
+                "resource_preference = excluded.resource_preference, "
+                "verbosity = excluded.verbosity",
+                (mem.user_id, prefs.explanation_style.value, prefs.resource_preference.value, prefs.verbosity.value),
+            )
+
+            current_topics = [
+                r[0] for r in conn.execute(
+                    "SELECT topic FROM topics WHERE user_id = ? ORDER BY position", (mem.user_id,)
+                )
+            ]
+            if current_topics != mem.topics:
+                conn.execute("DELETE FROM topics WHERE user_id = ?", (mem.user_id,))
+                conn.executemany(
+                    "INSERT INTO topics (user_id, position, topic) VALUES (?, ?, ?)",
+                    [(mem.user_id, i, t) for i, t in enumerate(mem.topics)],
+                )
+
+            self._sync_history(conn, mem)
+            self._sync_rollup(conn, mem)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    # ---- helpers ----
+
+    @staticmethod
+    def _sync_history(conn: sqlite3.Connection, mem: UserMemory) -> None:
+        """Align persisted rows with the history window; delete evicted rows, update edited ones, append the rest."""
+        stored = conn.execute(
+            "SELECT id, " + _ITEM_COLUMNS + " FROM history WHERE user_id = ? ORDER BY id", (mem.user_id,)
+        ).fetchall()
+        rows = [_item_row(it) for it in mem.history]
+        start = _window_start([r[1:] for r in stored], rows)
+
+        evicted = stored[:start]
+        if evicted:
+            conn.executemany("DELETE FROM history WHERE id = ?", [(r[0],) for r in evicted])
+        kept = stored[start:]
+        conn.executemany(
+            "UPDATE history SET summary = ?, followed_up = ? WHERE id = ?",
+            [(row[5], row[6], old[0]) for old, row in zip(kept, rows) if tuple(old[1:]) != row],
+        )
+        SQLiteMemoryStore._insert_items(conn, "history", mem.user_id, mem.history[len(kept):])
+
+    @staticmethod
+    def _sync_rollup(conn: sqlite3.Connection, mem: UserMemory) -> None:
+        """Digests and items awaiting rollup are small and bounded; rewrite them only when they changed."""
+        stored_pending = conn.execute(
+            "SELECT " + _ITEM_COLUMNS + " FROM rollup_pending WHERE user_id = ? ORDER BY id", (mem.user_id,)
+        ).fetchall()
+        if stored_pending != [_item_row(it) for it in mem.rollup_pending]:
+            conn.execute("DELETE FROM rollup_pending WHERE user_id = ?", (mem.user_id,))
+            SQLiteMemoryStore._insert_items(conn, "rollup_pending", mem.user_id, mem.rollup_pending)
+
+        rows = [
+            (mem.user_id, d.topic, d.count, json.dumps(d.modes, sort_keys=True), d.first_seen, d.last_seen, d.summary)
+            for d in mem.digests
+        ]
+        stored = conn.execute(
+            "SELECT user_id, topic, count, modes, first_seen, last_seen, summary FROM digests "
+            "WHERE user_id = ? ORDER BY last_seen, topic",
+            (mem.user_id,),
+        ).fetchall()
+        if sorted(stored) != sorted(rows):
+            conn.execute("DELETE FROM digests WHERE user_id = ?", (mem.user_id,))
+            conn.executemany(
+                "INSERT INTO digests (user_id, topic, count, modes, first_seen, last_seen, summary) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    @staticmethod
+    def _insert_items(conn: sqlite3.Connection, table: str, user_id: str, items: list[MemoryItem]) -> None:
+        conn.executemany(
+            f"INSERT INTO {table} (user_id, " + _ITEM_COLUMNS + ") VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(user_id, *_item_row(it)) for it in items],
+        )
+
+    @staticmethod
+    def _load_items(conn: sqlite3.Connection, sql: str, params: tuple) -> list[MemoryItem]:
+        return [
+            MemoryItem(
+                ts=r[0], query=r[1], topic=r[2], intent=r[3], mode=LearningMode(r[4]),
+                summary=r[5], followed_up=bool(r[6]),
+            )
+            for r in conn.execute(sql, params)
+        ]
+
+    def user_ids(self) -> list[str]:
+        return [r[0] for r in self._connect().execute("SELECT user_id FROM users ORDER BY user_id")]
+
+
+def migrate_json_to_sqlite(
+    json_path: Path, store: SQLiteMemoryStore, *, overwrite: bool = False
+) -> UserMemory | None:
+    """
+    Import the legacy single-document `user_memory.json` into the SQLite store.
+    Returns the migrated memory, or None if there was nothing to migrate.
+    """
+    legacy = MemoryStore(path=json_path).load()
+    if legacy is None:
+        logger.info("no legacy memory at %s", json_path)
+        return None
+
+    if store.load(legacy.user_id) is not None and not overwrite:
+        logger.info("user %s already present in %s; skipping migration", legacy.user_id, store.path)
+        return None
+
+    if overwrite:
+        conn = store._connect()
+        conn.execute("DELETE FROM users WHERE user_id = ?", (legacy.user_id,))
+
+    store.save(legacy)
+    logger.info("migrated memory for user %s (%d history items)", legacy.user_id, len(legacy.history))
+    return legacy
@@ -0,0 +1,230 @@
+import atexit
+import os
+import tempfile
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Callable, Generic, TypeVar
+
+from pydantic import BaseModel
+
+from research_learning_agent.logging_utils import get_logger
+
+
+logger = get_logger("store.write_behind")
+
+
+FLUSH_DELAY_S = 0.5  # how long the flusher waits to coalesce further updates before writing
+
+M = TypeVar("M", bound=BaseModel)
+T = TypeVar("T")
+
+
+def atomic_write_text(path: Path, text: str, *, fsync: bool = False) -> None:
+    """Write `text` to a temp file in the same directory and rename it over `path`."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def file_version(path: Path) -> tuple[int, int] | None:
+    """(mtime_ns, size) of a file, or None if missing; used to detect writes by other processes."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class WriteBehindFlusher:
+    """
+    Background writer that coalesces updates.
+
+    `mark_dirty(key, write)` records the latest pending write for `key` (replacing an older
+    one). The first pending write wakes the flusher thread, which runs the pending writes `delay`
+    seconds after it; later updates within that window only replace pending writes. `flush()` runs them synchronously; it is also registered with `atexit`.
+    """
+
+    def __init__(self, *, delay: float = FLUSH_DELAY_S, name: str = "write-behind") -> None:
+        self.delay = delay
+        self.name = name
+        self._pending: dict[str, Callable[[], None]] = {}
+        self._dirty_since = 0.0  # monotonic time the oldest pending write was marked
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()  # one writer at a time (flusher thread or explicit flush)
+        self._closed = False
+        self._thread: threading.Thread | None = None
+
+        ref = weakref.ref(self)
+        atexit.register(lambda: (f := ref()) is not None and f.close())
+
+    def mark_dirty(self, key: str, write: Callable[[], None]) -> None:
+        with self._cond:
+            if self._closed:
+                raise RuntimeError(f"{self.name} flusher is closed")
+            if not self._pending:
+                self._dirty_since = time.monotonic()
+                self._cond.notify()
+            self._pending[key] = write
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    @property
+    def dirty(self) -> bool:
+        with self._cond:
+            return bool(self._pending)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                # coalesce: write `delay` after the first pending update, not after the latest one
+                deadline = self._dirty_since + self.delay
+                while self._pending and not self._closed and (left := deadline - time.monotonic()) > 0:
+                    self._cond.wait(left)
+                if self._closed:
+                    return
+            self.flush()
+
+    def flush(self) -> None:
+        with self._write_lock:
+            with self._cond:
+                pending, self._pending = self._pending, {}
+            for key, write in pending.items():
+                try:
+                    write()
+                except Exception:
+                    logger.exception("write-behind flush failed for %s", key)
+                    with self._cond:
+                        if not self._pending:
+                            self._dirty_since = time.monotonic()  # retry after another `delay`
+                        self._pending.setdefault(key, write)  # retry on the next flush
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
+
+
+class CachedDocument(Generic[M]):
+    """
+    In-process copy of one persisted document with dirty tracking.
+
+    - `get()` returns a private copy; the file is re-read only when its version (mtime/size)
+      changed since it was last read or written here, i.e. another process wrote it.
+    - `put()` replaces the cached value and schedules a write on the flusher; a pending local
+      update always wins over the file on disk.
+    - `update()` / `view()` mutate / read the cached value in place under the document lock,
+      for large documents that take many small updates (no copy per update; one per write).
+    """
+
+    def __init__(
+        self,
+        key: str,
+        *,
+        read: Callable[[], M | None],
+        write: Callable[[M], None],
+        version: Callable[[], object],
+        flusher: WriteBehindFlusher,
+    ) -> None:
+        self.key = key
+        self._read = read
+        self._write = write
+        self._version_fn = version
+        self.flusher = flusher
+
+        self._lock = threading.Lock()
+        self._value: M | None = None
+        self._loaded = False
+        self._version: object = None
+        self._dirty = False
+        self._generation = 0
+
+    def _refresh(self) -> None:
+        # caller holds self._lock
+        if not self._dirty:
+            version = self._version_fn()
+            if not self._loaded or version != self._version:
+                self._value = self._read()
+                self._version = version
+                self._loaded = True
+
+    def peek(self) -> M | None:
+        """Current value without copying; callers must not mutate it."""
+        with self._lock:
+            self._refresh()
+            return self._value
+
+    @property
+    def dirty(self) -> bool:
+        """A local update is not yet written."""
+        with self._lock:
+            return self._dirty
+
+    def cached(self) -> tuple[bool, M | None]:
+        """(True, value) if the in-process value is current, without reading the file; (False, None) if stale or unloaded."""
+        with self._lock:
+            if self._dirty or (self._loaded and self._version_fn() == self._version):
+                return True, self._value
+            return False, None
+
+    def get(self) -> M | None:
+        with self._lock:
+            self._refresh()
+            return self._value.model_copy(deep=True) if self._value is not None else None
+
+    def view(self, fn: Callable[[M | None], T]) -> T:
+        """`fn(value)` under the document lock, so it never sees a concurrent `update()` half-applied."""
+        with self._lock:
+            self._refresh()
+            return fn(self._value)
+
+    def update(self, fn: Callable[[M], None], default: Callable[[], M]) -> None:
+        """Apply `fn` to the cached value (or `default()` if there is none) in place and schedule a write."""
+        with self._lock:
+            self._refresh()
+            if self._value is None:
+                self._value = default()
+            fn(self._value)
+            self._loaded = True
+            self._dirty = True
+            self._generation += 1
+        self.flusher.mark_dirty(self.key, self._flush)
+
+    def put(self, value: M) -> None:
+        with self._lock:
+            self._value = value.model_copy(deep=True)
+            self._loaded = True
+            self._dirty = True
+            self._generation += 1
+        self.flusher.mark_dirty(self.key, self._flush)
+
+    def _flush(self) -> None:
+        with self._lock:
+            if not self._dirty or self._value is None:
+                return
+            generation = self._generation
+            value = self._value.model_copy(deep=True)  # update() mutates the cached value in place
+        self._write(value)
+        with self._lock:
+            if self._generation == generation:
+                self._dirty = False
+                self._version = self._version_fn()
@@ -1,10 +1,18 @@
 from __future__ import annotations
 
+import atexit
+import gzip
 import json
+import os
+import queue
+import shutil
+import threading
+import time
 
+from collections import deque
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Iterator
 
 from .logging_utils import get_logger
 
@@ -13,16 +21,285 @@ logger = get_logger("Telemetry")
 
 DATA_DIR = Path("data")
 INTENT_LOG_PATH = DATA_DIR / "intent_events.jsonl"
+PROMPT_LOG_PATH = DATA_DIR / "prompt_events.jsonl"
+ESCALATION_LOG_PATH = DATA_DIR / "escalation_events.jsonl"
+TRACE_LOG_PATH = DATA_DIR / "traces.jsonl"
+USAGE_LOG_PATH = DATA_DIR / "usage_events.jsonl"
+
+QUEUE_SIZE = 10_000              # submissions (one event, or one batch of events) buffered before new ones are dropped
+BATCH_SIZE = 256                 # write as soon as this many events are buffered
+FLUSH_INTERVAL_S = 1.0           # ... or this long after the oldest buffered event arrived
+MAX_FILE_BYTES = 32 * 1024 * 1024
+ROTATE_DAILY = False             # opt in: also rotate when the file was last written on an earlier (UTC) day
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def rotated_files(path: Path) -> list[Path]:
+    """Rotated (gzip) siblings of a telemetry file, oldest first; the live file is not included."""
+    return sorted(path.parent.glob(f"{path.stem}.*{path.suffix}.gz"))
+
+
+def _file_events(path: Path) -> list[dict[str, Any]]:
+    if not path.exists():
+        return []
+    opener = gzip.open if path.suffix == ".gz" else open
+    out: list[dict[str, Any]] = []
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                out.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # partial last line of a file still being written
+    return out
+
+
+def read_events(path: Path) -> Iterator[dict[str, Any]]:
+    """Events of a telemetry file and its rotated archives, oldest first; unparseable lines are skipped."""
+    for p in [*rotated_files(path), path]:
+        yield from _file_events(p)
+
+
+def tail_events(path: Path, n: int) -> list[dict[str, Any]]:
+    """The last `n` events of a telemetry file, continuing into its newest archives when the live file has fewer."""
+    tail: deque[dict[str, Any]] = deque()
+    for p in [path, *reversed(rotated_files(path))]:
+        if len(tail) >= n:
+            break
+        events = _file_events(p)
+        tail.extendleft(reversed(events[max(0, len(events) - (n - len(tail))):]))
+    return list(tail)
+
+
+def _rotate(path: Path) -> Path:
+    """Move `path` aside as `<stem>.<utc timestamp><suffix>.gz`."""
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    target = path.with_name(f"{path.stem}.{stamp}{path.suffix}.gz")
+    tmp = path.with_name(f".{path.name}.rotating")
+    os.replace(path, tmp)
+    with tmp.open("rb") as src, gzip.open(target, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    tmp.unlink()
+    return target
+
+
+def _needs_rotation(path: Path, incoming: int) -> bool:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return False
+    if st.st_size == 0:
+        return False
+    if st.st_size + incoming > MAX_FILE_BYTES:
+        return True
+    if ROTATE_DAILY:
+        last_write = datetime.fromtimestamp(st.st_mtime, timezone.utc).date()
+        return last_write < datetime.now(timezone.utc).date()
+    return False
+
+
+def _write_lines(path: Path, lines: list[str]) -> None:
+    """Append pre-serialized JSONL lines, rotating the file first if it is too big or from an earlier day."""
+    data = "".join(lines)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if _needs_rotation(path, len(data.encode("utf-8"))):
+        logger.debug("rotated %s -> %s", path, _rotate(path))
+    with path.open("a", encoding="utf-8") as f:
+        f.write(data)
+
+
+class TelemetryWriter:
+    """
+    Background JSONL writer.
+
+    `submit` puts events on a bounded queue without blocking (a batch is one queue entry); when
+    the queue is full the events are dropped and counted. A daemon thread serializes queued events, batches them per file and
+    appends them when `BATCH_SIZE` lines are buffered or `FLUSH_INTERVAL_S` has passed, rotating
+    files by size or day. `flush()` blocks until everything submitted before it is on disk; it
+    also runs at exit.
+    """
+
+    def __init__(
+        self,
+        *,
+        queue_size: int = QUEUE_SIZE,
+        batch_size: int = BATCH_SIZE,
+        flush_interval_s: float = FLUSH_INTERVAL_S,
+    ) -> None:
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self._queue: queue.Queue[tuple[Path, list[dict[str, Any]]] | threading.Event | None] = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.write_errors = 0
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="telemetry-writer", daemon=True)
+                    self._thread.start()
+
+    def submit(self, path: Path, events: list[dict[str, Any]]) -> int:
+        """Queue events for `path`; returns how many were dropped because the queue was full."""
+        if not events:
+            return 0
+        self._ensure_thread()
+        dropped = 0
+        try:
+            self._queue.put_nowait((path, events))
+        except queue.Full:
+            dropped = len(events)
+        with self._lock:
+            self.submitted += len(events) - dropped
+            if dropped:
+                first = self.dropped == 0
+                self.dropped += dropped
+                if first or self.dropped % 1000 < dropped:
+                    logger.warning("telemetry queue full; %d events dropped so far", self.dropped)
+        return dropped
+
+    def flush(self, timeout: float | None = 10.0) -> bool:
+        """Wait until events submitted so far are written; False on timeout or if nothing is running."""
+        if self._thread is None or not self._thread.is_alive():
+            return False
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self.flush()
+        self._queue.put(None)
+        self._thread.join(timeout=10.0)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "written": self.written,
+                "dropped": self.dropped,
+                "write_errors": self.write_errors,
+                "queued": self._queue.qsize(),
+            }
+
+    def _write(self, pending: dict[Path, list[str]]) -> None:
+        for path, lines in pending.items():
+            try:
+                _write_lines(path, lines)
+                with self._lock:
+                    self.written += len(lines)
+            except Exception as e:
+                with self._lock:
+                    self.write_errors += len(lines)
+                logger.error(f"Failed to write {len(lines)} telemetry events to {path}: {e}")
+        pending.clear()
+
+    def _run(self) -> None:
+        pending: dict[Path, list[str]] = {}
+        buffered = 0
+        deadline: float | None = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = False  # flush interval elapsed
+
+            if isinstance(item, tuple):
+                path, events = item
+                pending.setdefault(path, []).extend(json.dumps(e, ensure_ascii=False, default=str) + "\n" for e in events)
+                buffered += len(events)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval_s
+                if buffered < self.batch_size:
+                    continue
+
+            self._write(pending)
+            buffered, deadline = 0, None
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is None:
+                return
+
+
+_writer = TelemetryWriter()
+atexit.register(_writer.close)
+
+
+def get_writer() -> TelemetryWriter:
+    return _writer
+
+
+def flush(timeout: float | None = 10.0) -> bool:
+    """Block until queued telemetry is on disk (tests, scripts that read the files they just wrote)."""
+    return _writer.flush(timeout)
+
+
+def _append_event(path: Path, event: dict[str, Any]) -> None:
+    """Queue one timestamped event for a JSONL telemetry file."""
+    _writer.submit(path, [{**event, "ts": _now_iso()}])
+
+
+def _append_events(path: Path, events: list[dict[str, Any]]) -> None:
+    """Queue many events sharing one timestamp."""
+    if not events:
+        return
+    ts = _now_iso()
+    _writer.submit(path, [{**e, "ts": ts} for e in events])
 
 
 def log_intent_event(event: dict[str, Any]) -> None:
     """Log an intent event to the telemetry file."""
     try:
-        DATA_DIR.mkdir(parents=True, exist_ok=True)
-        event = dict[str, Any](event)
-        event["ts"] = datetime.now(timezone.utc).isoformat()
-        INTENT_LOG_PATH.write_text("", encoding="utf-8") if not INTENT_LOG_PATH.exists() else None
-        with INTENT_LOG_PATH.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+        _append_event(INTENT_LOG_PATH, event)
+    except Exception as e:
+        logger.error(f"Failed to log intent event: {e}")
+
+
+def log_intent_events(events: list[dict[str, Any]]) -> None:
+    """Log a batch of intent events in one append (bulk classification)."""
+    try:
+        _append_events(INTENT_LOG_PATH, events)
+    except Exception as e:
+        logger.error(f"Failed to log intent events: {e}")
+
+
+def log_prompt_event(event: dict[str, Any]) -> None:
+    """Log prompt size (tokens per stage) to the telemetry file."""
+    try:
+        _append_event(PROMPT_LOG_PATH, event)
+    except Exception as e:
+        logger.error(f"Failed to log prompt event: {e}")
+
+
+def log_escalation_event(event: dict[str, Any]) -> None:
+    """Log an LLM-escalation controller decision (threshold, rates, guardrails) for auditing."""
+    try:
+        _append_event(ESCALATION_LOG_PATH, event)
+    except Exception as e:
+        logger.error(f"Failed to log escalation event: {e}")
+
+
+def log_usage_event(event: dict[str, Any]) -> None:
+    """Log the LLM token usage of one request (per stage, mode, budget downgrade)."""
+    try:
+        _append_event(USAGE_LOG_PATH, event)
+    except Exception as e:
+        logger.error(f"Failed to log usage event: {e}")
+
+
+def log_trace_spans(spans: list[dict[str, Any]]) -> None:
+    """Log the finished spans of one trace (one line per span; see `tracing.py`)."""
+    try:
+        _writer.submit(TRACE_LOG_PATH, spans)
     except Exception as e:
-        logger.error(f"Failed to log intent event: {e}")
\ No newline at end of file
+        logger.error(f"Failed to log trace spans: {e}")
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import bisect
+import gzip
+import json
+import zlib
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import IO, Any, Iterator
+
+from .store.write_behind import atomic_write_text
+from .telemetry import rotated_files
+from .logging_utils import get_logger
+
+
+logger = get_logger("telemetry_stats")
+
+
+STATE_VERSION = 1
+DEFAULT_STATE_PATH = Path("data/intent_stats_state.json")
+LOW_CONFIDENCE = 0.65
+# LLM latency histogram: geometric bucket edges from 1 ms to ~2.5 min (each bucket 25% wider)
+LATENCY_EDGES_MS = tuple(round(1.25 ** k, 3) for k in range(54))
+
+
+def _bucket_key(ts: str | None) -> str:
+    """Hourly window key, "YYYY-MM-DDTHH" (UTC); "unknown" if the event has no parseable timestamp."""
+    if not ts:
+        return "unknown"
+    try:
+        return datetime.fromisoformat(ts).astimezone(timezone.utc).strftime("%Y-%m-%dT%H")
+    except ValueError:
+        return "unknown"
+
+
+@dataclass
+class WindowStats:
+    """Aggregates of the intent events in one time window; mergeable and JSON-serializable."""
+
+    n: int = 0
+    intents: Counter[str] = field(default_factory=Counter)
+    stages: Counter[str] = field(default_factory=Counter)
+    llm: int = 0
+    low_confidence: int = 0
+    cached: int = 0
+    latency: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_EDGES_MS) + 1))
+
+    def add(self, e: dict[str, Any]) -> None:
+        self.n += 1
+        self.intents[str(e.get("intent"))] += 1
+        stage = str(e.get("stage") or ("llm" if e.get("use_llm") else "rules"))
+        self.stages[stage] += 1
+        self.llm += bool(e.get("use_llm")) and not e.get("cached")  # a cache hit made no LLM call
+        self.low_confidence += float(e.get("confidence", 1.0)) < LOW_CONFIDENCE
+        self.cached += bool(e.get("cached"))
+        if e.get("llm_ms") is not None:
+            self.latency[bisect.bisect_left(LATENCY_EDGES_MS, float(e["llm_ms"]))] += 1
+
+    def merge(self, other: "WindowStats") -> None:
+        self.n += other.n
+        self.intents.update(other.intents)
+        self.stages.update(other.stages)
+        self.llm += other.llm
+        self.low_confidence += other.low_confidence
+        self.cached += other.cached
+        self.latency = [a + b for a, b in zip(self.latency, other.latency)]
+
+    def latency_percentile(self, q: float) -> float | None:
+        """Upper edge (ms) of the histogram bucket holding the q-th percentile; None without latency samples."""
+        total = sum(self.latency)
+        if total == 0:
+            return None
+        rank = q / 100 * total
+        seen = 0
+        for i, count in enumerate(self.latency):
+            seen += count
+            if count and seen >= rank:
+                return LATENCY_EDGES_MS[min(i, len(LATENCY_EDGES_MS) - 1)]
+        return LATENCY_EDGES_MS[-1]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "n": self.n, "intents": dict(self.intents), "stages": dict(self.stages), "llm": self.llm,
+            "low_confidence": self.low_confidence, "cached": self.cached, "latency": self.latency,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict[str, Any]) -> "WindowStats":
+        return cls(
+            n=d["n"], intents=Counter(d["intents"]), stages=Counter(d["stages"]), llm=d["llm"],
+            low_confidence=d["low_confidence"], cached=d["cached"], latency=list(d["latency"]),
+        )
+
+
+def _fingerprint(first_line: bytes) -> str:
+    return f"{zlib.crc32(first_line):08x}:{len(first_line)}"
+
+
+def _complete_lines(f: IO[bytes], skip: int = 0) -> Iterator[tuple[int, bytes]]:
+    """(offset after line, line) for each newline-terminated line after `skip` bytes; a partial last line is left."""
+    if skip:
+        f.seek(skip)  # for gzip streams this decompresses and discards
+    offset = skip
+    for line in f:
+        if not line.endswith(b"\n"):
+            return
+        offset += len(line)
+        yield offset, line
+
+
+def _first_line(f: IO[bytes]) -> bytes | None:
+    line = f.readline()
+    return line if line.endswith(b"\n") else None
+
+
+class IntentStats:
+    """
+    Incrementally maintained intent-telemetry aggregates, bucketed by UTC hour.
+
+    `update(log_path)` streams only events it has not seen: rotated archives are processed once
+    (by name), and the live file is resumed from a checkpointed byte offset. The live file is
+    identified by a fingerprint of its first line, so when it is rotated, the archive carrying
+    the same first line resumes from that offset instead of being counted twice.
+    The aggregates and checkpoint are persisted together with `save()`.
+    """
+
+    def __init__(self) -> None:
+        self.windows: dict[str, WindowStats] = {}
+        self.archives_done: set[str] = set()
+        self.live_fingerprint: str | None = None
+        self.live_offset = 0
+        self.bad_lines = 0
+
+    # ---- persistence ----
+
+    @classmethod
+    def load(cls, path: Path = DEFAULT_STATE_PATH) -> "IntentStats":
+        stats = cls()
+        if not path.exists():
+            return stats
+        d = json.loads(path.read_text(encoding="utf-8"))
+        if d.get("version") != STATE_VERSION:
+            logger.warning("ignoring intent stats state with version %s", d.get("version"))
+            return stats
+        stats.windows = {k: WindowStats.from_dict(v) for k, v in d["windows"].items()}
+        stats.archives_done = set(d["archives_done"])
+        stats.live_fingerprint = d["live_fingerprint"]
+        stats.live_offset = d["live_offset"]
+        stats.bad_lines = d.get("bad_lines", 0)
+        return stats
+
+    def save(self, path: Path = DEFAULT_STATE_PATH) -> None:
+        atomic_write_text(path, json.dumps({
+            "version": STATE_VERSION,
+            "windows": {k: w.to_dict() for k, w in sorted(self.windows.items())},
+            "archives_done": sorted(self.archives_done),
+            "live_fingerprint": self.live_fingerprint,
+            "live_offset": self.live_offset,
+            "bad_lines": self.bad_lines,
+        }))
+
+    # ---- ingestion ----
+
+    def _ingest(self, line: bytes) -> None:
+        try:
+            e = json.loads(line)
+        except json.JSONDecodeError:
+            self.bad_lines += 1
+            return
+        self.windows.setdefault(_bucket_key(e.get("ts")), WindowStats()).add(e)
+
+    def update(self, log_path: Path) -> int:
+        """Process events added since the last update; returns how many were read."""
+        before = self.events
+        for archive in rotated_files(log_path):
+            if archive.name in self.archives_done:
+                continue
+            with gzip.open(archive, "rb") as f:
+                first = _first_line(f)
+            # the archive is the live file we were part-way through: resume where we stopped
+            resumed = first is not None and _fingerprint(first) == self.live_fingerprint
+            with gzip.open(archive, "rb") as f:
+                for _, line in _complete_lines(f, self.live_offset if resumed else 0):
+                    self._ingest(line)
+            self.archives_done.add(archive.name)
+            if resumed:
+                self.live_fingerprint, self.live_offset = None, 0
+
+        if log_path.exists():
+            with log_path.open("rb") as f:
+                first = _first_line(f)
+                if first is not None:
+                    fp = _fingerprint(first)
+                    if fp != self.live_fingerprint:
+                        self.live_fingerprint, self.live_offset = fp, 0
+                    f.seek(0)
+                    for offset, line in _complete_lines(f, self.live_offset):
+                        self._ingest(line)
+                        self.live_offset = offset
+        return self.events - before
+
+    @property
+    def events(self) -> int:
+        return sum(w.n for w in self.windows.values())
+
+    # ---- reporting ----
+
+    def window(self, since: datetime | None = None, until: datetime | None = None) -> WindowStats:
+        """Merged aggregates for hourly windows within [since, until)."""
+        lo = since.astimezone(timezone.utc).strftime("%Y-%m-%dT%H") if since else None
+        hi = until.astimezone(timezone.utc).strftime("%Y-%m-%dT%H") if until else None
+        out = WindowStats()
+        for key, w in self.windows.items():
+            if key == "unknown" and (lo or hi):
+                continue
+            if (lo and key < lo) or (hi and key >= hi):
+                continue
+            out.merge(w)
+        return out
+
+    def summary(self, since: datetime | None = None, until: datetime | None = None) -> dict[str, Any]:
+        w = self.window(since, until)
+        n = max(w.n, 1)
+        return {
+            "events": w.n,
+            "intent_distribution": {k: round(v / n, 4) for k, v in w.intents.most_common()},
+            "stage_counts": dict(w.stages),
+            "llm_use_rate": round(w.llm / n, 4),
+            "low_confidence_rate": round(w.low_confidence / n, 4),
+            "cached_rate": round(w.cached / n, 4),
+            "llm_latency_ms": {f"p{q}": w.latency_percentile(q) for q in (50, 90, 99)},
+        }
+
+
+def hours_ago(hours: float) -> datetime:
+    return datetime.now(timezone.utc) - timedelta(hours=hours)
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import time
+
 from .schemas import PlanStep, ToolCall, ToolError, ToolResult
 from .tool_registry import ToolRegistry
 from .tools.http import ToolHTTPError
+from .metrics import REGISTRY, collect_http_stats
+from .tracing import span
 from .logging_utils import get_logger
 
 logger = get_logger("tool_executor")
@@ -22,6 +26,21 @@ class ToolExecutor:
         return results
 
     def _execute_tool(self, call: ToolCall) -> ToolResult:
+        started = time.perf_counter()
+        with span("tool.call", tool=call.tool.value, top_k=call.top_k) as s, collect_http_stats() as http:
+            result = self._run_tool(call)
+            s.set(results=len(result.results), http_retries=http.retries)
+            if result.error:
+                s.set(error_type=result.error.error_type)
+        result.latency_ms = round((time.perf_counter() - started) * 1000.0, 3)
+        result.http_retries = http.retries
+        result.backoff_ms = round(http.backoff_ms, 3)
+        REGISTRY.observe(
+            "tool_latency_ms", result.latency_ms, tool=call.tool.value, outcome="error" if result.error else "ok"
+        )
+        return result
+
+    def _run_tool(self, call: ToolCall) -> ToolResult:
         tool = self.registry.get(call.tool)
         logger.info("tool_call tool=%s query=%r top_k=%d", call.tool.value, call.query, call.top_k)
         try:
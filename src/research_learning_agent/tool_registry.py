@@ -6,6 +6,7 @@ from .tools.http import ToolHTTPError
 from .tools.serper_web import SerperWebSearchTool
 from .tools.youtube_data_api import YouTubeSearchTool
 from .tools.ddg_instant_answer import DuckDuckGoInstantAnswerTool
+from .tracing import current_span, span
 from .logging_utils import get_logger
 
 logger = get_logger("tool_registry")
@@ -18,11 +19,14 @@ class WebToolWithFallback(Tool):
     
     def run(self, query: str, top_k: int = 5) -> list[dict[str, str]]:
         try:
-            return self.primary.run(query, top_k)
+            with span("web_search.primary", tool=self.primary.__class__.__name__):
+                return self.primary.run(query, top_k)
         except ToolHTTPError as e:
             logger.warning("web_search primary failed (%s): %s", e.error_type, e)
             logger.info("web_search using fallback: %s", self.fallback.__class__.__name__)
-            return self.fallback.run(query, top_k)
+            current_span().set(fallback=self.fallback.__class__.__name__, primary_error=e.error_type)
+            with span("web_search.fallback", tool=self.fallback.__class__.__name__):
+                return self.fallback.run(query, top_k)
 
 
 class ToolRegistry:
@@ -3,14 +3,18 @@ from __future__ import annotations
 import json
 import os
 import random
+import threading
 import time
 from dataclasses import dataclass
 from typing import Any, TypeVar, cast
 
 import requests
 from requests import Response
+from requests.adapters import HTTPAdapter
 from urllib.parse import urlsplit, urlunsplit
 
+from ..metrics import REGISTRY, current_http_stats
+from ..tracing import record_span, span
 from ..logging_utils import get_logger
 
 logger = get_logger("tools.http")
@@ -103,6 +107,43 @@ BACKOFF_MAX_SECONDS = 6.0
 
 _MAX_TEXT_LEN = 500
 
+# Connections kept open per host by the shared session; raise with `configure_pool` for concurrent callers
+DEFAULT_POOL_MAXSIZE = _env_int("TOOL_HTTP_POOL_MAXSIZE", 10)
+
+
+# ---------------------------------
+# Shared connection pool
+# ---------------------------------
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def _new_session(pool_maxsize: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Process-wide session, so tool calls reuse keep-alive connections instead of reconnecting per call."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = _new_session(DEFAULT_POOL_MAXSIZE)
+        return _session
+
+
+def configure_pool(pool_maxsize: int) -> None:
+    """Replace the shared session with one keeping up to `pool_maxsize` connections per host (e.g. one per worker)."""
+    global _session
+    with _session_lock:
+        old, _session = _session, _new_session(max(1, pool_maxsize))
+    if old is not None:
+        old.close()
+
 
 # ---------------------------------
 # Logging safety helpers
@@ -183,6 +224,38 @@ def _sleep_backoff(attempt: int) -> None:
     time.sleep(delay)
 
 
+def _backoff(attempt: int, url: str) -> None:
+    """Sleep before a retry and account for it (retry count, time spent sleeping)."""
+    started = time.perf_counter()
+    with span("http.backoff", attempt=attempt + 1):
+        _sleep_backoff(attempt)
+    slept_ms = (time.perf_counter() - started) * 1000.0
+
+    host = _host(url)
+    REGISTRY.inc("http_retries_total", host=host)
+    REGISTRY.observe("http_backoff_ms", slept_ms, host=host)
+    stats = current_http_stats()
+    if stats is not None:
+        stats.retries += 1
+        stats.backoff_ms += slept_ms
+
+
+def _host(url: str | None) -> str:
+    try:
+        return urlsplit(url or "").netloc or "unknown"
+    except Exception:
+        return "unknown"
+
+
+def _record_attempt(url: str, started: float, outcome: str) -> None:
+    """Per-attempt latency (without backoff sleeps), labelled by host and outcome."""
+    REGISTRY.observe("http_attempt_ms", (time.perf_counter() - started) * 1000.0, host=_host(url), outcome=outcome)
+    record_span("http.attempt", started, outcome=outcome)
+    stats = current_http_stats()
+    if stats is not None:
+        stats.attempts += 1
+
+
 # ---------------------------------
 # Core request helpers
 # ---------------------------------
@@ -216,6 +289,26 @@ def request(
       - timeouts
       - HTTP 429/5xx (retryable errors)
     """
+    with span("http.request", method=method.upper().strip(), host=_host(url)) as s:
+        resp = _request(
+            method, url, headers=headers, params=params, json_body=json_body, data=data,
+            timeout_seconds=timeout_seconds, max_retries=max_retries,
+        )
+        s.set(status_code=resp.status_code)
+        return resp
+
+
+def _request(
+    method: str,
+    url: str,
+    *,
+    headers: dict[str, str] | None,
+    params: dict[str, Any] | None,
+    json_body: dict[str, Any] | None,
+    data: Any | None,
+    timeout_seconds: float,
+    max_retries: int,
+) -> Response:
     method_u = method.upper().strip()
     if method_u not in {"GET", "POST", "PUT", "DELETE", "PATCH"}:
         raise ToolHTTPError(
@@ -227,6 +320,7 @@ def request(
     last_exc: Exception | None = None
 
     for attempt in range(max_retries):
+        started = time.perf_counter()
         try:
             logger.debug(
                 "HTTP %s %s attempt=%d/%d params_keys=%s json_keys=%s json_preview=%s",
@@ -239,7 +333,7 @@ def request(
                 _safe_body_preview(json_body),     
             )
 
-            resp = requests.request(
+            resp = get_session().request(
                 method=method_u,
                 url=url,
                 headers=headers,
@@ -248,13 +342,14 @@ def request(
                 data=data,
                 timeout=timeout_seconds,
             )
+            _record_attempt(url, started, str(resp.status_code))
 
             # Retryable HTTP errors
             if _is_retryable_status(resp.status_code):
                 msg = f"Retryable HTTP status: {resp.status_code}"
                 logger.warning("%s for %s (attempt=%d/%d)", msg, url, attempt + 1, max_retries)
                 if attempt < max_retries:
-                    _sleep_backoff(attempt)
+                    _backoff(attempt, url)
                     continue
                 raise ToolHTTPError(
                     error_type="http",
@@ -279,18 +374,20 @@ def request(
 
         except requests.Timeout as e:
             last_exc = e
+            _record_attempt(url, started, "timeout")
             logger.warning("Timeout calling %s (attempt=%d/%d)", url, attempt + 1, max_retries)
             if attempt < max_retries:
-                _sleep_backoff(attempt)
+                _backoff(attempt, url)
                 continue
             raise ToolHTTPError(error_type="timeout", message=str(e), url=url) from e
         
         except requests.RequestException as e:
             # Covers connection errors, DNS errors, etc.
             last_exc = e
+            _record_attempt(url, started, "network")
             logger.warning("Network error calling %s (attempt=%d/%d): %s", url, attempt + 1, max_retries, str(e))
             if attempt < max_retries:
-                _sleep_backoff(attempt)
+                _backoff(attempt, url)
                 continue
             raise ToolHTTPError(error_type="network", message=str(e), url=url) from e
         
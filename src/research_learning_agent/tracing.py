@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import contextvars
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterator, TypeVar
+
+from . import telemetry
+from .logging_utils import get_logger
+
+
+logger = get_logger("tracing")
+
+
+TRACING_ENABLED = os.getenv("TRACING", "1").strip().lower() not in {"0", "false", "no", "off"}
+
+_R = TypeVar("_R")
+
+
+@dataclass
+class Span:
+    """One timed operation in a trace; `set()` adds attributes while it runs."""
+
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    name: str
+    start_ms: float                       # wall clock, ms since epoch
+    duration_ms: float | None = None
+    attrs: dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+    error: str | None = None
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace_id, "span_id": self.span_id, "parent_id": self.parent_id, "name": self.name,
+            "start_ms": round(self.start_ms, 3), "duration_ms": round(self.duration_ms or 0.0, 3),
+            "attrs": self.attrs, "status": self.status, "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """Returned outside a trace (or with tracing off) so call sites never need to check."""
+
+    trace_id = None
+    span_id = None
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class _Trace:
+    """Spans of one request; wall-clock span starts are derived from one perf_counter anchor."""
+
+    def __init__(self, trace_id: str) -> None:
+        self.trace_id = trace_id
+        self.anchor_wall_ms = time.time() * 1000.0
+        self.anchor_perf = time.perf_counter()
+        self.spans: list[Span] = []
+        self.lock = threading.Lock()
+
+    def wall_ms(self, perf: float) -> float:
+        return self.anchor_wall_ms + (perf - self.anchor_perf) * 1000.0
+
+    def add(self, span: Span) -> None:
+        with self.lock:
+            self.spans.append(span)
+
+
+_trace: contextvars.ContextVar[_Trace | None] = contextvars.ContextVar("trace", default=None)
+_span: contextvars.ContextVar[Span | None] = contextvars.ContextVar("span", default=None)
+
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex
+
+
+def current_trace_id() -> str | None:
+    trace = _trace.get()
+    return trace.trace_id if trace is not None else None
+
+
+@contextmanager
+def _open_span(trace: _Trace, name: str, attrs: dict[str, Any]) -> Iterator[Span]:
+    parent = _span.get()
+    started = time.perf_counter()
+    s = Span(
+        trace_id=trace.trace_id, span_id=uuid.uuid4().hex[:16], parent_id=parent.span_id if parent else None,
+        name=name, start_ms=trace.wall_ms(started), attrs=dict(attrs),
+    )
+    token = _span.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.status, s.error = "error", f"{type(e).__name__}: {e}"[:300]
+        raise
+    finally:
+        s.duration_ms = (time.perf_counter() - started) * 1000.0
+        _span.reset(token)
+        trace.add(s)
+
+
+@contextmanager
+def start_trace(name: str, *, trace_id: str | None = None, **attrs: Any) -> Iterator[Span | _NoopSpan]:
+    """
+    Root span of a request. Spans opened inside (in this thread, or in workers wrapped with `bind`)
+    join the trace; when the root ends, the whole trace is queued for `telemetry.TRACE_LOG_PATH`.
+    Inside an existing trace this is just a child span.
+    """
+    if not TRACING_ENABLED:
+        yield _NOOP
+        return
+    if _trace.get() is not None:
+        with span(name, **attrs) as s:
+            yield s
+        return
+
+    trace = _Trace(trace_id or new_trace_id())
+    token = _trace.set(trace)
+    try:
+        with _open_span(trace, name, attrs) as root:
+            yield root
+    finally:
+        _trace.reset(token)
+        with trace.lock:
+            spans = [s.to_dict() for s in sorted(trace.spans, key=lambda s: s.start_ms)]
+        telemetry.log_trace_spans(spans)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Span | _NoopSpan]:
+    """Child of the current span; a no-op outside a trace."""
+    trace = _trace.get()
+    if trace is None:
+        yield _NOOP
+        return
+    with _open_span(trace, name, attrs) as s:
+        yield s
+
+
+def record_span(name: str, started: float, **attrs: Any) -> None:
+    """Add an already finished child span that began at perf_counter() == `started` and ends now."""
+    trace = _trace.get()
+    if trace is None:
+        return
+    parent = _span.get()
+    trace.add(Span(
+        trace_id=trace.trace_id, span_id=uuid.uuid4().hex[:16], parent_id=parent.span_id if parent else None,
+        name=name, start_ms=trace.wall_ms(started), duration_ms=(time.perf_counter() - started) * 1000.0,
+        attrs=attrs,
+    ))
+
+
+def current_span() -> Span | _NoopSpan:
+    return _span.get() or _NOOP
+
+
+def bind(fn: Callable[..., _R]) -> Callable[..., _R]:
+    """Run `fn` (e.g. in a thread pool) inside the caller's trace context, so its spans nest correctly."""
+    ctx = contextvars.copy_context()
+
+    def run(*args: Any, **kwargs: Any) -> _R:
+        return ctx.copy().run(fn, *args, **kwargs)
+
+    return run
+
+
+# ---- reading and analysis (scripts/trace_view.py) ----
+
+def load_spans(path: Path, trace_id: str | None = None) -> list[dict[str, Any]]:
+    """Spans from the trace log and its rotated archives, optionally only those of one trace."""
+    return [s for s in telemetry.read_events(path) if trace_id is None or s.get("trace_id") == trace_id]
+
+
+def roots(spans: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Root span of every trace, oldest first."""
+    return sorted((s for s in spans if s.get("parent_id") is None), key=lambda s: s["start_ms"])
+
+
+def _end(s: dict[str, Any]) -> float:
+    return s["start_ms"] + s["duration_ms"]
+
+
+def critical_path(spans: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Spans that determined the trace's end-to-end latency, in execution order.
+
+    Starting at the root, the child that finished last is on the path; then, walking back in time,
+    the latest child that finished before that one started, and so on (sequential stages are all on
+    the path, of parallel siblings only the slowest). Each returned span gets `self_ms`: its duration
+    not covered by critical children.
+    """
+    if not spans:
+        return []
+    children: dict[str | None, list[dict[str, Any]]] = defaultdict(list)
+    for s in spans:
+        children[s.get("parent_id")].append(s)
+    root = min(children[None], key=lambda s: s["start_ms"]) if children[None] else spans[0]
+
+    def walk(s: dict[str, Any]) -> list[dict[str, Any]]:
+        chosen: list[dict[str, Any]] = []
+        cursor = _end(s) + 1e-6
+        for child in sorted(children.get(s["span_id"], []), key=_end, reverse=True):
+            if _end(child) <= cursor:
+                chosen.append(child)
+                cursor = child["start_ms"] + 1e-6
+        chosen.reverse()
+        path = [{**s, "self_ms": round(max(0.0, s["duration_ms"] - sum(c["duration_ms"] for c in chosen)), 3)}]
+        for child in chosen:
+            path.extend(walk(child))
+        return path
+
+    return walk(root)
+
+
+def render_waterfall(spans: list[dict[str, Any]], *, width: int = 40) -> str:
+    """Indented span tree with start offset, duration and a bar on the trace timeline; `*` marks the critical path."""
+    if not spans:
+        return "(no spans)"
+    children: dict[str | None, list[dict[str, Any]]] = defaultdict(list)
+    for s in spans:
+        children[s.get("parent_id")].append(s)
+    ids = {s["span_id"] for s in spans}
+    top = [s for s in spans if s.get("parent_id") not in ids]  # root, or orphans whose parent was not exported
+    t0 = min(s["start_ms"] for s in spans)
+    total = max(max(_end(s) for s in spans) - t0, 1e-6)
+    critical = {s["span_id"] for s in critical_path(spans)}
+
+    lines = [f"{'start':>9} {'dur':>9}  {'timeline':<{width}}  span"]
+
+    def emit(s: dict[str, Any], depth: int) -> None:
+        lo = int((s["start_ms"] - t0) / total * width)
+        n = max(1, round(s["duration_ms"] / total * width))
+        bar = (" " * lo + "#" * n)[:width]
+        attrs = " ".join(f"{k}={v}" for k, v in s.get("attrs", {}).items())
+        mark = "*" if s["span_id"] in critical else " "
+        status = " [error: " + str(s.get("error")) + "]" if s.get("status") == "error" else ""
+        lines.append(
+            f"{s['start_ms'] - t0:>8.1f}ms {s['duration_ms']:>7.1f}ms  {bar:<{width}} {mark}{'  ' * depth}{s['name']}"
+            + (f" ({attrs})" if attrs else "") + status
+        )
+        for child in sorted(children.get(s["span_id"], []), key=lambda c: c["start_ms"]):
+            emit(child, depth + 1)
+
+    for s in sorted(top, key=lambda s: s["start_ms"]):
+        emit(s, 0)
+    return "\n".join(lines)
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import contextvars
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from pydantic import BaseModel, Field
+
+from .config import UsageBudgetConfig, get_usage_budget_config
+from .metrics import REGISTRY
+from .prompt_budget import PROMPT_TOKEN_BUDGETS
+from .schemas import LearningMode, TokenUsage
+from .store.write_behind import CachedDocument, WriteBehindFlusher, atomic_write_text, file_version
+from .tracing import current_span
+from .logging_utils import get_logger
+
+
+logger = get_logger("usage")
+
+
+USAGE_LEDGER_PATH = Path("data/usage_ledger.json")
+RETAIN_DAYS = 31
+
+
+# ---------------------------------
+# Per-call capture (LLMClient.chat)
+# ---------------------------------
+
+_tags: contextvars.ContextVar[dict[str, str]] = contextvars.ContextVar("usage_tags", default={})
+
+
+@contextmanager
+def usage_tags(**tags: str) -> Iterator[None]:
+    """Tag LLM calls made inside the block (stage=..., mode=...); inner tags override outer ones."""
+    token = _tags.set({**_tags.get(), **tags})
+    try:
+        yield
+    finally:
+        _tags.reset(token)
+
+
+class UsageCollector:
+    """Token usage of the LLM calls made inside one `collect_usage()` block, from any thread bound to it."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._usage = TokenUsage()
+
+    def add(self, stage: str, prompt_tokens: int, completion_tokens: int, *, cost_usd: float, estimated: bool) -> None:
+        with self._lock:
+            u = self._usage
+            u.calls += 1
+            u.prompt_tokens += prompt_tokens
+            u.completion_tokens += completion_tokens
+            u.estimated_calls += estimated
+            u.cost_usd += cost_usd
+            u.by_stage[stage] = u.by_stage.get(stage, 0) + prompt_tokens + completion_tokens
+
+    @property
+    def total_tokens(self) -> int:
+        with self._lock:
+            return self._usage.total_tokens
+
+    def snapshot(self) -> TokenUsage:
+        with self._lock:
+            usage = self._usage.model_copy(deep=True)
+        usage.cost_usd = round(usage.cost_usd, 6)
+        return usage
+
+
+_collector: contextvars.ContextVar[UsageCollector | None] = contextvars.ContextVar("usage_collector", default=None)
+
+
+@contextmanager
+def collect_usage() -> Iterator[UsageCollector]:
+    collector = UsageCollector()
+    token = _collector.set(collector)
+    try:
+        yield collector
+    finally:
+        _collector.reset(token)
+
+
+def record_llm_usage(
+    *,
+    model: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+    estimated: bool = False,
+    config: UsageBudgetConfig | None = None,
+) -> None:
+    """Attribute one LLM call's tokens to the current tags, request collector, metrics and trace span."""
+    config = config or get_usage_budget_config()
+    tags = _tags.get()
+    stage = tags.get("stage", "unknown")
+    cost = (prompt_tokens * config.prompt_price_per_1k + completion_tokens * config.completion_price_per_1k) / 1000.0
+
+    collector = _collector.get()
+    if collector is not None:
+        collector.add(stage, prompt_tokens, completion_tokens, cost_usd=cost, estimated=estimated)
+    REGISTRY.inc("llm_tokens_total", prompt_tokens, stage=stage, kind="prompt", model=model)
+    REGISTRY.inc("llm_tokens_total", completion_tokens, stage=stage, kind="completion", model=model)
+    current_span().set(
+        stage=stage, mode=tags.get("mode"), prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens, usage_estimated=estimated,
+    )
+
+
+# ---------------------------------
+# Ledger (per user, per UTC day)
+# ---------------------------------
+
+class UserDayUsage(TokenUsage):
+    requests: int = 0
+
+
+class UsageLedgerData(BaseModel):
+    days: dict[str, dict[str, UserDayUsage]] = Field(default_factory=dict)  # "YYYY-MM-DD" -> user_id -> usage
+
+
+def _today() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+class UsageLedger:
+    """
+    Token usage aggregated per user and UTC day, kept in memory and persisted by a write-behind
+    flusher to one JSON file. Days older than `retain_days` are dropped on write.
+    """
+
+    def __init__(
+        self, path: Path | None = None, *, flusher: WriteBehindFlusher | None = None, retain_days: int = RETAIN_DAYS
+    ) -> None:
+        self.path = path or USAGE_LEDGER_PATH
+        self.retain_days = retain_days
+        self.flusher = flusher or WriteBehindFlusher(name="usage-ledger-flusher")
+        self._doc: CachedDocument[UsageLedgerData] = CachedDocument(
+            str(self.path), read=self._read, write=self._write, version=lambda: file_version(self.path),
+            flusher=self.flusher,
+        )
+
+    def _read(self) -> UsageLedgerData | None:
+        if not self.path.exists():
+            return None
+        return UsageLedgerData.model_validate_json(self.path.read_text(encoding="utf-8"))
+
+    def _write(self, data: UsageLedgerData) -> None:
+        atomic_write_text(self.path, data.model_dump_json(indent=2))
+
+    def add(self, user_id: str, usage: TokenUsage, *, day: str | None = None) -> None:
+        day = day or _today()
+
+        def apply(data: UsageLedgerData) -> None:
+            if day not in data.days:  # a new day: drop the ones past retention
+                cutoff = (datetime.strptime(day, "%Y-%m-%d") - timedelta(days=self.retain_days)).strftime("%Y-%m-%d")
+                data.days = {d: users for d, users in data.days.items() if d > cutoff}
+            entry = data.days.setdefault(day, {}).setdefault(user_id, UserDayUsage())
+            entry.requests += 1
+            entry.calls += usage.calls
+            entry.prompt_tokens += usage.prompt_tokens
+            entry.completion_tokens += usage.completion_tokens
+            entry.estimated_calls += usage.estimated_calls
+            entry.cost_usd = round(entry.cost_usd + usage.cost_usd, 6)
+            for stage, n in usage.by_stage.items():
+                entry.by_stage[stage] = entry.by_stage.get(stage, 0) + n
+
+        self._doc.update(apply, UsageLedgerData)
+
+    def day(self, day: str | None = None) -> dict[str, UserDayUsage]:
+        day = day or _today()
+        return self._doc.view(lambda data: {
+            u: e.model_copy(deep=True) for u, e in data.days.get(day, {}).items()
+        } if data is not None else {})
+
+    def used_today(self, user_id: str) -> int:
+        def used(data: UsageLedgerData | None) -> int:
+            entry = data.days.get(_today(), {}).get(user_id) if data is not None else None
+            return entry.total_tokens if entry is not None else 0
+
+        return self._doc.view(used)
+
+    def days(self) -> list[str]:
+        return self._doc.view(lambda data: sorted(data.days) if data is not None else [])
+
+    def flush(self) -> None:
+        self.flusher.flush()
+
+
+# ---------------------------------
+# Budgets
+# ---------------------------------
+
+def remaining_tokens(
+    config: UsageBudgetConfig, *, used_in_request: int, user_used_today: int
+) -> int | None:
+    """Tokens this request may still spend under the per-request and per-user budgets; None if uncapped."""
+    caps: list[int] = []
+    if config.request_token_budget > 0:
+        caps.append(config.request_token_budget - used_in_request)
+    if config.user_daily_token_budget > 0:
+        caps.append(config.user_daily_token_budget - user_used_today - used_in_request)
+    return min(caps) if caps else None
+
+
+def estimated_generation_tokens(mode: LearningMode, max_completion_tokens: int, calls: int = 1) -> int:
+    """Upper estimate of generating in `mode`: `calls` LLM calls, each its prompt budget plus the completion cap."""
+    return calls * (PROMPT_TOKEN_BUDGETS[mode] + max_completion_tokens)
+
+
+def mode_within_budget(
+    mode: LearningMode,
+    remaining: int | None,
+    max_completion_tokens: int,
+    *,
+    calls: Callable[[LearningMode], int] | None = None,
+) -> LearningMode:
+    """
+    `mode` if its generation fits in `remaining` tokens; otherwise the most expensive cheaper mode
+    that fits, or the cheapest mode when none does (the answer is degraded, never refused).
+    `calls(mode)` is how many LLM calls the generator makes in that mode (default one).
+    """
+    if remaining is None:
+        return mode
+
+    def cost_of(m: LearningMode) -> int:
+        return estimated_generation_tokens(m, max_completion_tokens, calls(m) if calls is not None else 1)
+
+    cost = cost_of(mode)
+    if cost <= remaining:
+        return mode
+    cheaper = sorted((m for m in PROMPT_TOKEN_BUDGETS if cost_of(m) < cost), key=cost_of)
+    fitting = [m for m in cheaper if cost_of(m) <= remaining]
+    if fitting:
+        return fitting[-1]
+    return cheaper[0] if cheaper else mode
+
+
+def usage_event(user_id: str, usage: TokenUsage, **extra: Any) -> dict[str, Any]:
+    return {"user_id": user_id, **usage.model_dump(), "total_tokens": usage.total_tokens, **extra}
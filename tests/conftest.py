@@ -0,0 +1,34 @@
+import pytest
+
+import research_learning_agent.intent_model as intent_model
+import research_learning_agent.metrics as metrics
+import research_learning_agent.telemetry as telemetry
+import research_learning_agent.usage as usage
+
+
+@pytest.fixture(autouse=True)
+def _isolate_telemetry(tmp_path, monkeypatch):
+    """Keep telemetry written during tests out of the repo's data/ directory."""
+    monkeypatch.setattr(telemetry, "INTENT_LOG_PATH", tmp_path / "intent_events.jsonl")
+    monkeypatch.setattr(telemetry, "PROMPT_LOG_PATH", tmp_path / "prompt_events.jsonl")
+    monkeypatch.setattr(telemetry, "ESCALATION_LOG_PATH", tmp_path / "escalation_events.jsonl")
+    monkeypatch.setattr(telemetry, "TRACE_LOG_PATH", tmp_path / "traces.jsonl")
+    monkeypatch.setattr(telemetry, "USAGE_LOG_PATH", tmp_path / "usage_events.jsonl")
+    monkeypatch.setattr(usage, "USAGE_LEDGER_PATH", tmp_path / "usage_ledger.json")
+    yield
+    telemetry.flush()  # events queued by this test land in its tmp_path, not the next test's
+
+
+@pytest.fixture(autouse=True)
+def _isolate_intent_model(tmp_path, monkeypatch):
+    """Tests never pick up a locally trained data/intent_model.npz."""
+    monkeypatch.setattr(intent_model, "INTENT_MODEL_PATH", tmp_path / "intent_model.npz")
+
+
+@pytest.fixture(autouse=True)
+def _isolate_metrics(tmp_path, monkeypatch):
+    """Metrics snapshots go to tmp_path; each test starts from an empty registry."""
+    monkeypatch.setattr(metrics, "SNAPSHOT_PATH", tmp_path / "metrics.json")
+    metrics.REGISTRY.reset()
+    yield
+    metrics.REGISTRY.reset()  # nothing left for the exit-time snapshot to write into data/
@@ -0,0 +1,39 @@
+from research_learning_agent import app_cli
+from research_learning_agent.schemas import (
+    AgentAnswer, OrchestratorAction, OrchestratorActionType, OrchestratorResult, UserProfile,
+)
+
+
+PROFILE = UserProfile(user_id="u1", background="", level="beginner", goals="")
+
+
+class ScriptedOrchestrator:
+    """Answers the first question, asks to clarify the first follow-up, then answers again."""
+
+    def __init__(self):
+        self.queries = []
+
+    def run(self, query, profile, *, force_final=False):
+        self.queries.append(query)
+        if len(self.queries) == 2:
+            return OrchestratorResult(action=OrchestratorAction(
+                kind=OrchestratorActionType.need_clarification, clarifying_question="Which part?",
+            ))
+        return OrchestratorResult(
+            action=OrchestratorAction(kind=OrchestratorActionType.final),
+            answer=AgentAnswer(explanation=f"answer to {query.question}"),
+        )
+
+
+def test_follow_up_that_needs_clarification_asks_and_keeps_the_session(monkeypatch, capsys) -> None:
+    orch = ScriptedOrchestrator()
+    monkeypatch.setattr(app_cli, "Orchestrator", lambda: orch)
+    monkeypatch.setattr(app_cli.CachedProfileStore, "load", lambda self: PROFILE)
+    inputs = iter(["what is rl", "+ and planning?", "+ the search part", "quit"])
+    monkeypatch.setattr(app_cli.console, "input", lambda prompt="": next(inputs))
+
+    app_cli.main([])
+
+    out = capsys.readouterr().out
+    assert "Which part?" in out and "answer to the search part" in out
+    assert len({q.session_id for q in orch.queries}) == 1
@@ -0,0 +1,102 @@
+import json
+import threading
+import time
+
+from research_learning_agent import app_cli
+from research_learning_agent.batch import run_batch
+from research_learning_agent.orchestrator import Orchestrator
+from research_learning_agent.prompts import BEST_EFFORT_SUFFIX
+from research_learning_agent.schemas import AgentAnswer, IntentResult, Plan, PlanStep, StepType, UserProfile
+from research_learning_agent.tools import http
+
+
+PROFILE = UserProfile(user_id="u1", background="", level="beginner", goals="")
+
+
+class FakeIntent:
+    def classify(self, question, profile, *, allow_llm=True):
+        ask = "vague" in question
+        return IntentResult(
+            intent="professional_research", confidence=0.9, rationale="r",
+            should_ask_clarifying_question=ask, clarifying_question="Which part?" if ask else None,
+        )
+
+
+class FakePlanner:
+    def create_plan(self, question, profile, intent):
+        return Plan(goal="g", intent=intent.intent, steps=[PlanStep(step_id="s1", type=StepType.finalize, description="f")])
+
+
+class SlowGenerator:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def generate(self, *, query, profile, intent, plan, tool_results, spec, force_final=False):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.2 if "slow" in query.question else 0.02)
+        with self.lock:
+            self.active -= 1
+        if "boom" in query.question:
+            raise RuntimeError("generator failed")
+        return AgentAnswer(explanation=f"{profile.user_id}: {query.question}", mode=spec.mode)
+
+
+def _orchestrator(monkeypatch) -> Orchestrator:
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    orch = Orchestrator()
+    orch.intent, orch.planner, orch.generator = FakeIntent(), FakePlanner(), SlowGenerator()
+    return orch
+
+
+def test_batch_streams_rows_in_completion_order_with_timings(monkeypatch) -> None:
+    orch = _orchestrator(monkeypatch)
+    other = PROFILE.model_copy(update={"user_id": "u2"}).model_dump()
+    lines = [
+        json.dumps({"id": "a", "question": "slow question"}),
+        json.dumps({"id": "b", "question": "quick question", "profile": other}),
+        json.dumps({"id": "c", "question": "vague question"}),
+        json.dumps({"id": "d", "question": "boom"}),
+        "not json",
+    ]
+    rows = list(run_batch(orch, lines, default_profile=PROFILE, parallelism=4))
+
+    by_id = {r["id"]: r for r in rows}
+    assert rows[0]["id"] == "5" and rows[0]["status"] == "error"  # bad lines are reported without waiting
+    assert rows[-1]["id"] == "a"  # the slow question finishes last
+    assert by_id["b"]["answer"]["explanation"] == "u2: quick question"
+    assert by_id["c"]["status"] == "ok" and by_id["c"]["answer"]["explanation"].endswith(BEST_EFFORT_SUFFIX)
+    assert by_id["d"]["status"] == "error" and "generator failed" in by_id["d"]["error"]
+    assert by_id["a"]["latency_ms"] >= 200 and by_id["a"]["timings_ms"]["generate"] >= 200
+    assert orch.generator.peak > 1
+
+
+def test_duplicate_ids_do_not_share_a_session(monkeypatch) -> None:
+    orch = _orchestrator(monkeypatch)
+    lines = [json.dumps({"id": "x", "question": q}) for q in ("first question", "second question")]
+    rows = list(run_batch(orch, lines, default_profile=PROFILE, parallelism=1))
+
+    assert sorted(r["answer"]["explanation"] for r in rows) == ["u1: first question", "u1: second question"]
+    assert all(r["id"] == "x" for r in rows)
+
+
+def test_batch_without_any_profile_reports_errors(monkeypatch) -> None:
+    orch = _orchestrator(monkeypatch)
+    [row] = run_batch(orch, [json.dumps({"question": "q"})], default_profile=None, parallelism=2)
+    assert row["status"] == "error" and row["id"] == "1"
+
+
+def test_batch_subcommand_writes_output_jsonl(monkeypatch, tmp_path) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(app_cli, "Orchestrator", lambda: _orchestrator(monkeypatch))
+    monkeypatch.setattr(app_cli.CachedProfileStore, "load", lambda self: PROFILE)
+    src, out = tmp_path / "questions.jsonl", tmp_path / "out" / "answers.jsonl"
+    src.write_text("\n".join(json.dumps({"question": f"q{i}"}) for i in range(6)) + "\n", encoding="utf-8")
+
+    assert app_cli.main(["batch", str(src), "--out", str(out), "--parallel", "3"]) == 0
+    rows = [json.loads(l) for l in out.read_text(encoding="utf-8").splitlines()]
+    assert sorted(r["id"] for r in rows) == [str(i) for i in range(1, 7)]
+    assert http.get_session().get_adapter("https://example.com")._pool_maxsize == 6
@@ -0,0 +1,132 @@
+import re
+import threading
+import time
+
+from research_learning_agent.config import GeneratorConfig
+from research_learning_agent.generator import Generator, DAY_PLAN_SECTION
+from research_learning_agent.schemas import (
+    GenerationSpec, LearningMode, ToolResult, ToolType, UserProfile, UserQuery, IntentResult, 
+    Plan, UserLevel, LearningIntent, PlanStep, StepType
+)
+from research_learning_agent.llm_client import LLMMessage
+
+
+class SectionFakeLLM:
+    """
+    Thread-safe fake LLM that answers the framing prompt or the single section it is asked for,
+    and records how many calls were in flight at once.
+    """
+
+    def __init__(self, delay: float = 0.02) -> None:
+        self.delay = delay
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def chat(self, messages: list[LLMMessage]) -> str:
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            prompt = messages[0].content
+            m = re.search(r'Write ONLY the section "(.*?)"', prompt)
+            if not m:
+                return "EXPLANATION:\nFraming text\n\nBULLETS:\n- b1\n- b2\n"
+            title = m.group(1)
+            days = re.search(r"Write ONLY days (\d+)-(\d+)", prompt)
+            body = f"Days {days.group(1)}-{days.group(2)}" if days else f"{title} body"
+            return f"## {title}\n{body}\n\nSOURCES:\n- https://b.com\n- https://invented.example\n"
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def _get_minimul_inputs():
+    profile = UserProfile(user_id="u1", background="x", level=UserLevel.beginner, goals="x")
+    query = UserQuery(question="x")
+    intent = IntentResult(intent=LearningIntent.guided_study, confidence=0.9, rationale="x")
+    plan = Plan(goal="x", intent="x", steps=[PlanStep(step_id="s1", type=StepType.study_plan, description="x")])
+    tool_results = [
+        ToolResult(
+            tool=ToolType.web_search,
+            query="x",
+            results=[
+                {"title": "A", "url": "https://a.com", "snippet": "a"},
+                {"title": "B", "url": "https://b.com", "snippet": "b"},
+            ],
+        )
+    ]
+    return profile, query, intent, plan, tool_results
+
+
+def test_parallel_generation_stitches_sections_and_day_groups():
+    spec = GenerationSpec(
+        mode=LearningMode.guided_study,
+        required_sections=["Overview", DAY_PLAN_SECTION, "Resources", "Checkpoints"],
+        style_notes="x",
+    )
+    llm = SectionFakeLLM()
+    gen = Generator(config=GeneratorConfig(parallel_sections=True, max_concurrency=3), llm=llm)
+
+    profile, query, intent, plan, tool_results = _get_minimul_inputs()
+    out = gen.generate(
+        query=query, profile=profile, intent=intent, plan=plan, tool_results=tool_results, spec=spec
+    )
+
+    # framing + 3 single sections + 3 day groups
+    assert llm.calls == 7
+    assert llm.max_in_flight <= 3
+    assert out.explanation == "Framing text"
+    assert out.bullet_summary == ["b1", "b2"]
+    assert [s.title for s in out.sections] == spec.required_sections
+    assert out.sections[0].content == "Overview body"
+    assert out.sections[1].content == "Days 1-3\n\nDays 4-6\n\nDays 7-10"
+
+
+def test_parallel_generation_sources_keep_only_evidence_urls_cited_first():
+    spec = GenerationSpec(
+        mode=LearningMode.deep_research,
+        required_sections=["Executive Summary", "Reading List"],
+        style_notes="x",
+    )
+    gen = Generator(config=GeneratorConfig(parallel_sections=True, max_concurrency=4), llm=SectionFakeLLM(delay=0.0))
+
+    profile, query, intent, plan, tool_results = _get_minimul_inputs()
+    out = gen.generate(
+        query=query, profile=profile, intent=intent, plan=plan, tool_results=tool_results, spec=spec
+    )
+
+    urls = [s.url for s in out.sources]
+    assert urls == ["https://b.com", "https://a.com"]
+
+
+def test_parallel_generation_not_used_for_quick_explain():
+    spec = GenerationSpec(mode=LearningMode.quick_explain, required_sections=["Explanation"], style_notes="x")
+    llm = SectionFakeLLM(delay=0.0)
+    gen = Generator(config=GeneratorConfig(parallel_sections=True), llm=llm)
+
+    profile, query, intent, plan, tool_results = _get_minimul_inputs()
+    gen.generate(query=query, profile=profile, intent=intent, plan=plan, tool_results=tool_results, spec=spec)
+
+    assert llm.calls == 1
+
+
+class FramingFailsLLM(SectionFakeLLM):
+    def chat(self, messages: list[LLMMessage]) -> str:
+        if 'Write ONLY the section' not in messages[0].content:
+            raise TimeoutError("framing call timed out")
+        return super().chat(messages)
+
+
+def test_parallel_generation_keeps_sections_when_framing_fails():
+    spec = GenerationSpec(mode=LearningMode.deep_research, required_sections=["Executive Summary", "Reading List"], style_notes="x")
+    gen = Generator(config=GeneratorConfig(parallel_sections=True), llm=FramingFailsLLM(delay=0.0))
+
+    profile, query, intent, plan, tool_results = _get_minimul_inputs()
+    out = gen.generate(query=query, profile=profile, intent=intent, plan=plan, tool_results=tool_results, spec=spec)
+
+    assert (out.explanation, out.bullet_summary) == ("", [])
+    assert [s.content for s in out.sections] == ["Executive Summary body", "Reading List body"]
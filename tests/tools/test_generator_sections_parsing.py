@@ -70,8 +70,7 @@ Try a simple Q-learning tutorial.
         style_notes="Be concise and to the point.",
     )
 
-    gen = Generator()
-    gen.llm = FakeLLM(canned)
+    gen = Generator(llm=FakeLLM(canned))
 
     profile, query, intent, plan, tool_results = _get_minimul_inputs()
 
@@ -121,8 +120,7 @@ Analogy text
         style_notes="Be concise and to the point.",
     )
 
-    gen = Generator()
-    gen.llm = FakeLLM(canned)
+    gen = Generator(llm=FakeLLM(canned))
 
     profile, query, intent, plan, tool_results = _get_minimul_inputs()
 
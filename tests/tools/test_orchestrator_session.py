@@ -0,0 +1,147 @@
+from research_learning_agent.evidence_ranker import uncovered_terms
+from research_learning_agent.orchestrator import Orchestrator
+from research_learning_agent.schemas import (
+    AgentAnswer, IntentResult, OrchestratorActionType, Plan, PlanStep, StepType, ToolCall, ToolResult, ToolType,
+    UserProfile, UserQuery,
+)
+from research_learning_agent.session import SessionState, SessionStore
+
+
+PROFILE = UserProfile(user_id="u1", background="", level="beginner", goals="")
+
+
+class FakeIntent:
+    def __init__(self, clarify_first: bool = False):
+        self.questions: list[str] = []
+        self.clarify_first = clarify_first
+
+    def classify(self, question, profile, *, allow_llm=True):
+        self.questions.append(question)
+        ask = self.clarify_first and len(self.questions) == 1
+        return IntentResult(
+            intent="professional_research", confidence=0.5 if ask else 0.9, rationale="r",
+            should_ask_clarifying_question=ask, clarifying_question="Which domain?" if ask else None,
+        )
+
+
+class FakePlanner:
+    def __init__(self):
+        self.calls = 0
+
+    def create_plan(self, question, profile, intent):
+        self.calls += 1
+        return Plan(
+            goal="g", intent=intent.intent,
+            steps=[PlanStep(
+                step_id="s1", type=StepType.research, description="r",
+                tool_calls=[ToolCall(tool=ToolType.web_search, query=question, top_k=2)],
+            )],
+        )
+
+
+class FakeToolExecutor:
+    def __init__(self):
+        self.steps: list[PlanStep] = []
+
+    def execute_step(self, step):
+        self.steps.append(step)
+        return [
+            ToolResult(tool=c.tool, query=c.query, results=[
+                {"title": "Monte Carlo tree search", "url": "https://mcts.org", "snippet": "search planning rollouts"},
+            ])
+            for c in step.tool_calls
+        ]
+
+
+class FakeGenerator:
+    def __init__(self):
+        self.questions: list[str] = []
+        self.evidence: list[int] = []
+
+    def generate(self, *, query, profile, intent, plan, tool_results, spec, force_final=False):
+        self.questions.append(query.question)
+        self.evidence.append(len(tool_results))
+        return AgentAnswer(explanation="ok", mode=spec.mode)
+
+
+def _orchestrator(monkeypatch, **intent_kwargs) -> Orchestrator:
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    orch = Orchestrator()
+    orch.intent, orch.planner, orch.tools = FakeIntent(**intent_kwargs), FakePlanner(), FakeToolExecutor()
+    orch.generator = FakeGenerator()
+    return orch
+
+
+def test_follow_up_reuses_intent_plan_and_covered_evidence(monkeypatch) -> None:
+    orch = _orchestrator(monkeypatch)
+    first = orch.run(UserQuery(question="monte carlo tree search", session_id="s"), PROFILE)
+    assert first.session_reused == []
+
+    res = orch.run(UserQuery(question="how does planning with rollouts work?", session_id="s"), PROFILE)
+
+    assert res.action.kind == OrchestratorActionType.final
+    assert res.session_reused == ["intent", "plan", "tools"]
+    assert orch.planner.calls == 1 and len(orch.intent.questions) == 1
+    assert len(orch.tools.steps) == 1  # the follow-up's terms are covered by the first turn's evidence
+    assert orch.generator.questions[-1] == (
+        "monte carlo tree search\n\nFollow-up question: how does planning with rollouts work?"
+    )
+
+
+def test_follow_up_on_uncovered_terms_fetches_more_evidence(monkeypatch) -> None:
+    orch = _orchestrator(monkeypatch)
+    orch.run(UserQuery(question="monte carlo tree search", session_id="s"), PROFILE)
+    orch.run(UserQuery(question="compare with alphazero value networks", session_id="s"), PROFILE)
+
+    step = orch.tools.steps[-1]
+    assert [c.query for c in step.tool_calls] == ["monte carlo tree search compare alphazero value networks"]
+    assert orch.generator.evidence == [1, 2]
+    assert orch.sessions.get("s", user_id="u1").turns == 2
+
+
+def test_clarification_reply_reclassifies_and_force_final_keeps_the_intent(monkeypatch) -> None:
+    orch = _orchestrator(monkeypatch, clarify_first=True)
+    asked = orch.run(UserQuery(question="tell me about search", session_id="s"), PROFILE)
+    assert asked.action.kind == OrchestratorActionType.need_clarification
+    assert orch.sessions.get("s", user_id="u1").awaiting_clarification
+
+    reply = orch.run(UserQuery(question="tell me about search\n\nplanning in games", session_id="s"), PROFILE)
+    assert reply.session_reused == [] and len(orch.intent.questions) == 2
+
+    orch.sessions.put(SessionState(session_id="f", user_id="u1", question="q", intent=reply.intent, awaiting_clarification=True))
+    forced = orch.run(UserQuery(question="q (best effort)", session_id="f"), PROFILE, force_final=True)
+    assert forced.session_reused == ["intent"] and len(orch.intent.questions) == 2
+    assert orch.planner.calls == 2
+
+
+def test_sessions_belong_to_the_user_who_started_them(monkeypatch) -> None:
+    orch = _orchestrator(monkeypatch)
+    orch.run(UserQuery(question="monte carlo tree search", session_id="s"), PROFILE)
+    other = PROFILE.model_copy(update={"user_id": "u2"})
+
+    res = orch.run(UserQuery(question="how does planning with rollouts work?", session_id="s"), other)
+    assert res.session_reused == [] and orch.planner.calls == 2
+    assert orch.sessions.get("s", user_id="u1").question == "monte carlo tree search"  # not overwritten
+    assert orch.sessions.get("s", user_id="u2").question == "how does planning with rollouts work?"
+
+
+def test_uncovered_terms_only_reports_mostly_new_questions() -> None:
+    results = [ToolResult(tool=ToolType.web_search, query="q", results=[
+        {"title": "Tree search", "url": "https://a.com", "snippet": "rollouts and value estimates"},
+    ])]
+    assert uncovered_terms("tree search rollouts", results) == []
+    assert uncovered_terms("policy gradient rollouts", results, context="") == ["policy", "gradient"]
+    assert uncovered_terms("policy gradient", results, context="policy gradient methods") == []
+
+
+def test_session_store_evicts_idle_and_least_recent_sessions() -> None:
+    now = [0.0]
+    store = SessionStore(max_sessions=2, ttl_s=10, clock=lambda: now[0])
+    for sid in ("a", "b"):
+        store.put(SessionState(session_id=sid, question=sid))
+    store.get("a")
+    store.put(SessionState(session_id="c", question="c"))
+    assert store.get("b") is None and store.get("a") is not None
+
+    now[0] = 11.0
+    assert store.get("a") is None and store.get("c") is None
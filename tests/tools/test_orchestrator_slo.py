@@ -0,0 +1,138 @@
+import time
+
+from research_learning_agent import intent_classifier as ic
+from research_learning_agent.orchestrator import Orchestrator
+from research_learning_agent.schemas import (
+    AgentAnswer, Degradation, IntentResult, Plan, PlanStep, StepType, ToolCall, ToolResult, ToolType,
+    UserProfile, UserQuery,
+)
+
+
+PROFILE = UserProfile(user_id="u1", background="", level="beginner", goals="")
+
+
+class FakeIntent:
+    def __init__(self):
+        self.allow_llm: list[bool] = []
+
+    def classify(self, question, profile, *, allow_llm=True):
+        self.allow_llm.append(allow_llm)
+        return IntentResult(intent="professional_research", confidence=0.9, rationale="r")
+
+
+class FakePlanner:
+    def __init__(self, delay_s: float = 0.0):
+        self.delay_s = delay_s
+        self.calls = 0
+
+    def create_plan(self, question, profile, intent):
+        self.calls += 1
+        time.sleep(self.delay_s)
+        calls = [ToolCall(tool=ToolType.web_search, query="a", top_k=2), ToolCall(tool=ToolType.docs_search, query="b", top_k=2)]
+        return Plan(
+            goal="g", intent=intent.intent,
+            steps=[
+                PlanStep(step_id="s1", type=StepType.research, description="r1", tool_calls=calls),
+                PlanStep(step_id="s2", type=StepType.research, description="r2", tool_calls=calls),
+                PlanStep(step_id="s3", type=StepType.finalize, description="f"),
+            ],
+        )
+
+
+class FakeToolExecutor:
+    def __init__(self):
+        self.steps: list[PlanStep] = []
+
+    def execute_step(self, step):
+        self.steps.append(step)
+        return [
+            ToolResult(tool=c.tool, query=c.query, results=[{"title": "A", "url": f"https://{c.query}.com", "snippet": "s"}])
+            for c in step.tool_calls
+        ]
+
+
+class FakeGenerator:
+    def __init__(self):
+        self.specs = []
+
+    def generate(self, *, query, profile, intent, plan, tool_results, spec, force_final=False):
+        self.specs.append(spec)
+        return AgentAnswer(explanation="full", mode=spec.mode)
+
+
+class FakeSimpleAgent:
+    def answer(self, query, profile, intent):
+        return AgentAnswer(explanation="simple")
+
+
+def _orchestrator(monkeypatch, *, planner_delay_s: float = 0.0) -> Orchestrator:
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    orch = Orchestrator()
+    orch.intent, orch.planner, orch.tools = FakeIntent(), FakePlanner(planner_delay_s), FakeToolExecutor()
+    orch.generator, orch.simple_agent = FakeGenerator(), FakeSimpleAgent()
+    return orch
+
+
+def test_no_budget_runs_the_full_pipeline_and_learns_stage_latency(monkeypatch) -> None:
+    orch = _orchestrator(monkeypatch)
+    res = orch.run(UserQuery(question="compare planners"), PROFILE)
+
+    assert res.answer.explanation == "full" and res.answer.degradations == []
+    assert sum(len(s.tool_calls) for s in orch.tools.steps) == 4
+    assert orch.stage_latency.expected("plan") is not None
+
+
+def test_slow_planner_skips_tools(monkeypatch) -> None:
+    orch = _orchestrator(monkeypatch, planner_delay_s=0.08)
+    res = orch.run(UserQuery(question="compare planners"), PROFILE, latency_budget_ms=100)
+
+    # the planner used 80 ms; the tools deadline (65% of 100 ms) has already passed
+    assert res.answer.degradations == [Degradation.skipped_tools]
+    assert orch.tools.steps == [] and res.tool_results == []
+    assert res.answer.explanation == "full"
+
+
+def test_expected_overruns_trim_tools_and_sections(monkeypatch) -> None:
+    orch = _orchestrator(monkeypatch)
+    orch.stage_latency.observe("tools", 250.0)
+    orch.stage_latency.observe("generate", 400.0)
+    res = orch.run(UserQuery(question="compare planners"), PROFILE, latency_budget_ms=300)
+
+    assert res.answer.degradations == [Degradation.trimmed_tools, Degradation.fewer_sections]
+    [step] = orch.tools.steps
+    assert [c.query for c in step.tool_calls] == ["a"]
+    assert len(orch.generator.specs[-1].required_sections) == orch.slo.min_sections
+    # degraded stages keep their previous expectation
+    assert orch.stage_latency.expected("generate") == 400.0
+
+
+def test_ladder_ends_with_simple_agent(monkeypatch) -> None:
+    orch = _orchestrator(monkeypatch)
+    for stage in ("intent", "plan", "generate"):
+        orch.stage_latency.observe(stage, 1000.0)
+    res = orch.run(UserQuery(question="compare planners"), PROFILE, latency_budget_ms=100)
+
+    assert res.answer.degradations == [
+        Degradation.rules_only_intent, Degradation.template_plan, Degradation.simple_agent,
+    ]
+    assert orch.intent.allow_llm == [False]
+    assert orch.planner.calls == 0
+    assert res.plan.notes == "template plan (latency SLO)"
+    assert [c.tool for c in res.plan.steps[0].tool_calls] == [ToolType.docs_search]
+    assert res.answer.explanation == "simple"
+    assert [s.url for s in res.answer.sources] == ["https://compare planners.com"]
+
+
+class FailingLLM:
+    def chat(self, messages) -> str:
+        raise AssertionError("LLM must not be called")
+
+
+def test_classify_without_llm_uses_rules_and_is_not_cached(monkeypatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    clf = ic.IntentClassifier()
+    clf.llm = FailingLLM()
+
+    res = clf.classify("tell me about robots", PROFILE, allow_llm=False)
+    assert res.stage == "rules" and not res.use_llm
+    assert clf.cache is None or clf.cache.get("tell me about robots", PROFILE.level) is None
@@ -0,0 +1,158 @@
+import asyncio
+import json
+import threading
+
+from research_learning_agent.config import ServerConfig
+from research_learning_agent.orchestrator import Orchestrator
+from research_learning_agent.prompts import BEST_EFFORT_SUFFIX
+from research_learning_agent.schemas import AgentAnswer, IntentResult, Plan, PlanStep, StepType, UserProfile
+from research_learning_agent.scripts import server_load_test
+from research_learning_agent.scripts.server_load_test import http_json
+from research_learning_agent.server import AgentServer
+from research_learning_agent.storage import ProfileDirectory
+
+
+class FakeIntent:
+    def classify(self, question, profile, *, allow_llm=True):
+        ask = "vague" in question and "Additional context" not in question
+        return IntentResult(
+            intent="professional_research", confidence=0.9, rationale="r",
+            should_ask_clarifying_question=ask, clarifying_question="Which part?" if ask else None,
+        )
+
+
+class FakePlanner:
+    def create_plan(self, question, profile, intent):
+        return Plan(goal="g", intent=intent.intent, steps=[PlanStep(step_id="s1", type=StepType.finalize, description="f")])
+
+
+class GatedGenerator:
+    """Blocks until `gate` is set, so tests can hold workers busy."""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def generate(self, *, query, profile, intent, plan, tool_results, spec, force_final=False):
+        self.gate.wait(5)
+        return AgentAnswer(explanation=f"{profile.user_id}: {query.question}", mode=spec.mode)
+
+
+def _server(monkeypatch, tmp_path, *, max_concurrency=2, max_queue=1) -> AgentServer:
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    orch = Orchestrator()
+    orch.intent, orch.planner, orch.generator = FakeIntent(), FakePlanner(), GatedGenerator()
+    profiles = ProfileDirectory(tmp_path / "profiles")
+    return AgentServer(orch, profiles, ServerConfig(max_concurrency=max_concurrency, max_queue=max_queue))
+
+
+def _serve(server: AgentServer, scenario) -> None:
+    async def main():
+        host, port = await server.start("127.0.0.1", 0)
+        try:
+            await scenario(host, port)
+        finally:
+            await server.close()
+
+    asyncio.run(main())
+
+
+PROFILE = {"background": "", "level": "beginner", "goals": ""}
+
+
+def test_profile_per_user_and_resumable_clarification(monkeypatch, tmp_path) -> None:
+    server = _server(monkeypatch, tmp_path)
+
+    async def scenario(host, port):
+        status, _, body = await http_json(host, port, "POST", "/v1/ask", {"user_id": "bob", "question": "q"})
+        assert status == 404 and "PUT /v1/profiles/bob" in body["error"]
+        for user in ("alice", "bob"):
+            assert (await http_json(host, port, "PUT", f"/v1/profiles/{user}", PROFILE))[0] == 200
+        assert (await http_json(host, port, "PUT", "/v1/profiles/..", PROFILE))[0] == 400
+
+        status, _, body = await http_json(host, port, "POST", "/v1/ask", {"user_id": "alice", "question": "what is rl"})
+        assert status == 200 and body["answer"]["explanation"] == "alice: what is rl"
+
+        _, _, asked = await http_json(host, port, "POST", "/v1/ask", {"user_id": "bob", "question": "vague thing"})
+        assert asked["status"] == "need_clarification" and asked["clarifying_question"] == "Which part?"
+        resume = {"user_id": "bob", "session_id": asked["session_id"], "reply": "the planner"}
+        _, _, final = await http_json(host, port, "POST", "/v1/ask", resume)
+        assert final["status"] == "final" and final["session_id"] == asked["session_id"]
+        assert final["answer"]["explanation"].endswith("Additional context from user:\nthe planner")
+
+        assert (await http_json(host, port, "POST", "/v1/ask", resume))[0] == 409  # nothing pending any more
+
+        # session ids are issued by the server and only resolve for their owner
+        for user in ("alice", "bob"):
+            _, _, body = await http_json(host, port, "POST", "/v1/ask", {"user_id": user, "question": "vague again"})
+            assert body["session_id"] != asked["session_id"]
+        stolen = {"user_id": "alice", "session_id": asked["session_id"]}
+        assert (await http_json(host, port, "POST", "/v1/ask", {**stolen, "reply": "x"}))[0] == 404
+        assert (await http_json(host, port, "POST", "/v1/ask", {**stolen, "question": "follow-up"}))[0] == 404
+        made_up = {"user_id": "bob", "session_id": "chosen-by-client", "question": "what is rl"}
+        assert (await http_json(host, port, "POST", "/v1/ask", made_up))[0] == 404
+
+    _serve(server, scenario)
+
+
+def test_empty_reply_answers_best_effort(monkeypatch, tmp_path) -> None:
+    server = _server(monkeypatch, tmp_path)
+    server.profiles.save(UserProfile(user_id="bob", **PROFILE))
+
+    async def scenario(host, port):
+        _, _, asked = await http_json(host, port, "POST", "/v1/ask", {"user_id": "bob", "question": "vague thing"})
+        _, _, final = await http_json(host, port, "POST", "/v1/ask", {"user_id": "bob", "session_id": asked["session_id"], "reply": ""})
+        assert final["answer"]["explanation"] == "bob: vague thing" + BEST_EFFORT_SUFFIX
+        assert final["session_reused"] == ["intent"]
+
+    _serve(server, scenario)
+
+
+def test_streaming_sends_stage_events_then_the_result(monkeypatch, tmp_path) -> None:
+    server = _server(monkeypatch, tmp_path)
+    server.profiles.save(UserProfile(user_id="alice", **PROFILE))
+
+    async def scenario(host, port):
+        status, headers, events = await http_json(
+            host, port, "POST", "/v1/ask", {"user_id": "alice", "question": "what is rl", "stream": True}
+        )
+        assert status == 200 and headers["content-type"] == "application/x-ndjson"
+        kinds = [e["event"] for e in events]
+        assert kinds[:2] == ["accepted", "started"] and kinds[-1] == "result"
+        stages = [e["stage"] for e in events if e["event"] == "stage"]
+        assert stages[:2] == ["intent", "plan"] and stages[-1] == "total"
+        assert events[-1]["answer"]["explanation"] == "alice: what is rl"
+
+    _serve(server, scenario)
+
+
+def test_saturated_server_rejects_with_503(monkeypatch, tmp_path) -> None:
+    server = _server(monkeypatch, tmp_path, max_concurrency=1, max_queue=1)
+    server.profiles.save(UserProfile(user_id="alice", **PROFILE))
+    gen = server.orchestrator.generator
+    gen.gate.clear()
+
+    async def scenario(host, port):
+        ask = {"user_id": "alice", "question": "what is rl"}
+        admitted = [asyncio.create_task(http_json(host, port, "POST", "/v1/ask", ask)) for _ in range(2)]
+        while server._in_flight < 2:
+            await asyncio.sleep(0.01)
+        status, headers, body = await http_json(host, port, "POST", "/v1/ask", ask)
+        assert status == 503 and headers["retry-after"] == "1"
+        _, _, health = await http_json(host, port, "GET", "/healthz")
+        assert (health["in_flight"], health["queued"], health["capacity"]) == (2, 1, 2)
+
+        gen.gate.set()
+        assert [r[0] for r in await asyncio.gather(*admitted)] == [200, 200]
+        assert server._in_flight == 0
+
+    _serve(server, scenario)
+
+
+def test_load_test_runs_requests_in_parallel(capsys) -> None:
+    argv = ["--concurrency", "1,4", "--requests", "8", "--stage-ms", "0", "0", "0", "40", "--json"]
+    assert server_load_test.main(argv) == 0
+    one, four = json.loads(capsys.readouterr().out)
+    assert one["ok"] == four["ok"] == 8
+    assert one["rejected_503"] == four["rejected_503"] == 0
+    assert one["peak_parallel"] == 1 and four["peak_parallel"] > 1  # no wall-clock ratio: CI speed varies
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import numpy as np
+
+from research_learning_agent.evidence_ranker import bm25_scores, rank_evidence
+from research_learning_agent.schemas import ToolError, ToolResult, ToolType
+
+
+def _tr(tool: ToolType, items: list[tuple[str, str, str]]) -> ToolResult:
+    return ToolResult(
+        tool=tool,
+        query="q",
+        results=[{"title": t, "url": u, "snippet": s} for t, u, s in items],
+    )
+
+
+def test_bm25_prefers_documents_with_query_terms() -> None:
+    tf = np.array([[0, 0, 1], [2, 1, 0], [1, 0, 0]], dtype=float)
+    scores = bm25_scores(tf, [0, 1])
+    assert scores[1] > scores[2] > scores[0] == 0.0
+
+
+def test_rank_evidence_orders_by_relevance_not_provider_order() -> None:
+    results = [
+        _tr(ToolType.web_search, [
+            ("Cooking pasta at home", "https://food.com/pasta", "Boil water and add salt"),
+            ("PPO reinforcement learning algorithm", "https://rl.org/ppo", "Proximal policy optimization clips updates"),
+        ])
+    ]
+    ranked = rank_evidence("how does PPO reinforcement learning work", results)
+    assert ranked[0].url == "https://rl.org/ppo"
+    assert ranked[0].score > ranked[1].score
+
+
+def test_rank_evidence_removes_exact_and_near_duplicates() -> None:
+    results = [
+        _tr(ToolType.web_search, [
+            ("PPO explained", "https://rl.org/ppo", "Proximal policy optimization clips the policy update ratio"),
+            ("PPO explained (mirror)", "https://mirror.net/ppo", "Proximal policy optimization clips the policy update ratio"),
+            ("SAC explained", "https://rl.org/sac", "Soft actor critic maximizes entropy"),
+        ]),
+        _tr(ToolType.docs_search, [
+            ("PPO explained", "https://www.rl.org/ppo/", "Proximal policy optimization clips the policy update ratio"),
+        ]),
+    ]
+    ranked = rank_evidence("ppo policy optimization", results)
+    urls = [r.url for r in ranked]
+
+    assert "https://www.rl.org/ppo/" not in urls  # same canonical URL
+    assert len([u for u in urls if u.endswith("/ppo")]) == 1  # near-duplicate mirror dropped
+    assert "https://rl.org/sac" in urls
+
+
+def test_rank_evidence_caps_top_n_and_skips_failed_tools() -> None:
+    ok = _tr(ToolType.web_search, [(f"Result {i} topic{i}", f"https://e.com/{i}", f"unique words{i}") for i in range(12)])
+    failed = ToolResult(
+        tool=ToolType.video_search,
+        query="q",
+        error=ToolError(tool=ToolType.video_search, query="q", error_type="network", message="x"),
+    )
+    ranked = rank_evidence("result", [ok, failed], top_n=5)
+    assert len(ranked) == 5
+    assert all(r.tool == ToolType.web_search for r in ranked)
+
+
+def test_rank_evidence_without_query_terms_keeps_provider_order() -> None:
+    results = [_tr(ToolType.web_search, [("Alpha", "https://a.com", "one"), ("Beta", "https://b.com", "two")])]
+    ranked = rank_evidence("", results)
+    assert [r.url for r in ranked] == ["https://a.com", "https://b.com"]
+    assert rank_evidence("x", []) == []
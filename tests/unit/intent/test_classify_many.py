@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import json
+import random
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import research_learning_agent.telemetry as telemetry
+from research_learning_agent import intent_classifier as ic
+from research_learning_agent.schemas import LearningIntent, UserLevel, UserProfile
+
+
+CASES_PATH = Path(__file__).resolve().parents[2] / "fixtures" / "intent_cases.json"
+PROFILE = UserProfile(user_id="test_user", background="", level=UserLevel.beginner, goals="")
+
+
+class FakeLLM:
+    def __init__(self, fail_on: str | None = None) -> None:
+        self.calls = 0
+        self.fail_on = fail_on
+        self._lock = threading.Lock()
+
+    def chat(self, messages) -> str:
+        with self._lock:
+            self.calls += 1
+        if self.fail_on and self.fail_on in messages[-1].content:
+            raise RuntimeError("llm down")
+        return json.dumps({
+            "intent": "guided_study",
+            "confidence": 0.8,
+            "rationale": "fake",
+            "should_ask_clarifying_question": False,
+        })
+
+
+@pytest.fixture
+def classifier(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    clf = ic.IntentClassifier()
+    clf.llm = FakeLLM()
+    clf.cache = None  # compare classification paths, not cache hits
+    return clf
+
+
+def _questions() -> list[str]:
+    return [c["query"] for c in json.loads(CASES_PATH.read_text(encoding="utf-8"))]
+
+
+def test_vectorized_rule_stage_matches_scalar() -> None:
+    rng = random.Random(0)
+    values = [0.0, 0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 4.5]
+    matrix = np.array([[rng.choice(values) for _ in ic._INTENT_COLUMNS] for _ in range(500)])
+
+    chosen = ic._pick_intents(matrix)
+    confs = ic._calibrate_confidences(matrix, chosen)
+    for row, c, conf in zip(matrix, chosen, confs):
+        scores = dict(zip(ic._INTENT_COLUMNS, row.tolist()))
+        intent = ic._pick_intent(scores)
+        assert ic._INTENT_COLUMNS[c] == intent
+        assert conf == ic._calibrate_confidence(intent, scores)
+        assert ic._needs_llm_many(np.array([conf]))[0] == ic._needs_llm(scores, conf, "some longer query text here")
+
+
+def test_classify_many_matches_classify(classifier) -> None:
+    questions = _questions()
+    single = [classifier.classify(q, PROFILE) for q in questions]
+    classifier.llm.calls = 0
+
+    batch = classifier.classify_many(questions, PROFILE, max_workers=4)
+
+    assert [r.model_dump() for r in batch] == [r.model_dump() for r in single]
+    assert classifier.llm.calls == sum(r.use_llm for r in single)
+
+
+def test_classify_many_writes_telemetry_once_per_batch(classifier) -> None:
+    questions = _questions()
+    classifier.classify_many(questions, PROFILE)
+
+    telemetry.flush()
+    lines = telemetry.INTENT_LOG_PATH.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == len(questions)
+    events = [json.loads(line) for line in lines]
+    assert [e["query"] for e in events] == questions
+    assert len({e["ts"] for e in events}) == 1
+
+
+def test_classify_many_keeps_rule_result_when_llm_fails(classifier) -> None:
+    classifier.llm = FakeLLM(fail_on="robots")
+    results = classifier.classify_many(["tell me about robots", "tell me about graphs"], PROFILE)
+
+    assert results[0].use_llm is False
+    assert results[0].confidence == 0.55
+    assert results[1].use_llm is True
+    assert results[1].intent == LearningIntent.guided_study
+
+
+def test_classify_many_empty(classifier) -> None:
+    assert classifier.classify_many([], PROFILE) == []
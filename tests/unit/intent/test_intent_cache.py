@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import json
+import threading
+
+import research_learning_agent.telemetry as telemetry
+from research_learning_agent import intent_classifier as ic
+from research_learning_agent.intent_cache import IntentCache, normalize_question
+from research_learning_agent.prompts import BEST_EFFORT_SUFFIX
+from research_learning_agent.schemas import IntentResult, LearningIntent, UserLevel, UserProfile
+
+
+BEGINNER = UserProfile(user_id="test_user", background="", level=UserLevel.beginner, goals="")
+ADVANCED = UserProfile(user_id="test_user", background="", level=UserLevel.advanced, goals="")
+
+
+class CountingLLM:
+    def __init__(self) -> None:
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def chat(self, messages) -> str:
+        with self._lock:
+            self.calls += 1
+        return json.dumps({"intent": "casual_curiosity", "confidence": 0.7, "rationale": "fake"})
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _result(intent: LearningIntent = LearningIntent.casual_curiosity) -> IntentResult:
+    return IntentResult(intent=intent, confidence=0.8, rationale="test")
+
+
+def test_normalize_question() -> None:
+    assert normalize_question("  What is  ROS2? ") == "what is ros2"
+    assert normalize_question("What is ROS2?" + BEST_EFFORT_SUFFIX) == "what is ros2"
+
+
+def test_lru_ttl_and_version() -> None:
+    clock = FakeClock()
+    cache = IntentCache(version="v1", max_entries=2, ttl_s=10, clock=clock)
+    cache.put("a", UserLevel.beginner, _result())
+    cache.put("b", UserLevel.beginner, _result())
+    assert cache.get("A.", UserLevel.beginner) is not None   # refreshes "a"
+    cache.put("c", UserLevel.beginner, _result())             # evicts "b"
+    assert cache.get("b", UserLevel.beginner) is None
+    assert cache.get("a", UserLevel.advanced) is None          # level is part of the key
+
+    clock.now = 11
+    assert cache.get("a", UserLevel.beginner) is None          # expired
+
+    cache.put("d", UserLevel.beginner, _result())
+    cache.version = "v2"                                       # rules or prompt changed
+    assert cache.get("d", UserLevel.beginner) is None
+    assert len(cache) == 1
+
+
+def test_cached_result_is_a_copy() -> None:
+    cache = IntentCache(version="v1")
+    cache.put("q", "beginner", _result())
+    cache.get("q", "beginner").intent = LearningIntent.guided_study
+    assert cache.get("q", "beginner").intent == LearningIntent.casual_curiosity
+
+
+def test_version_tracks_rules_and_prompt(monkeypatch) -> None:
+    v = ic.intent_cache_version()
+    assert ic.intent_cache_version() == v
+    monkeypatch.setattr(ic, "INTENT_SYSTEM_PROMPT", ic.INTENT_SYSTEM_PROMPT + " ")
+    assert ic.intent_cache_version() != v
+
+
+def test_version_tracks_model_file_and_escalation_threshold(tmp_path) -> None:
+    model_path = tmp_path / "intent_model.npz"
+    untrained = ic.intent_cache_version(model_path)
+    assert ic.intent_cache_version(model_path, 0.5) != untrained
+
+    model_path.write_bytes(b"v1")
+    trained = ic.intent_cache_version(model_path)
+    assert trained != untrained
+    model_path.write_bytes(b"v2-retrained")
+    assert ic.intent_cache_version(model_path) != trained
+
+
+def test_threshold_change_invalidates_cached_results(tmp_path) -> None:
+    class FixedThreshold:
+        threshold = ic.ESCALATION_THRESHOLD
+
+        def should_probe(self, rule_conf: float) -> bool:
+            return False
+
+        def observe(self, **kwargs) -> None:
+            pass
+
+    escalation = FixedThreshold()
+    clf = ic.IntentClassifier(model_path=tmp_path / "missing.npz", escalation=escalation)
+    clf.llm = CountingLLM()
+
+    assert clf.classify("tell me about robots", BEGINNER).stage == "llm"
+    clf.classify("tell me about robots", BEGINNER)
+    assert clf.llm.calls == 1
+
+    escalation.threshold = 0.0                                  # controller moved the threshold
+    assert clf.classify("tell me about robots", BEGINNER).stage == "rules"
+    assert clf.llm.calls == 1
+
+
+def test_repeats_skip_the_llm() -> None:
+    clf = ic.IntentClassifier()
+    clf.llm = CountingLLM()
+
+    first = clf.classify("tell me about robots", BEGINNER)
+    assert first.stage == "llm" and clf.llm.calls == 1
+
+    assert clf.classify("Tell me about robots?", BEGINNER).model_dump() == first.model_dump()
+    assert clf.classify("tell me about robots" + BEST_EFFORT_SUFFIX, BEGINNER).stage == "llm"
+    assert clf.llm.calls == 1
+
+    clf.classify("tell me about robots", ADVANCED)
+    assert clf.llm.calls == 2
+
+    telemetry.flush()
+    events = [json.loads(line) for line in telemetry.INTENT_LOG_PATH.read_text(encoding="utf-8").splitlines()]
+    assert [e.get("cached", False) for e in events] == [False, True, True, False]
+
+
+def test_classify_many_uses_cache_and_dedupes() -> None:
+    clf = ic.IntentClassifier()
+    clf.llm = CountingLLM()
+    clf.classify("tell me about robots", BEGINNER)
+
+    batch = clf.classify_many(
+        ["tell me about robots", "tell me about graphs", "Tell me about graphs.", "Compare papers on benchmarks"],
+        BEGINNER,
+    )
+    assert clf.llm.calls == 2
+    assert [r.stage for r in batch] == ["llm", "llm", "llm", "rules"]
+    assert clf.cache.get("compare papers on benchmarks", UserLevel.beginner) is not None
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import json
+import threading
+
+import pytest
+
+import research_learning_agent.telemetry as telemetry
+from research_learning_agent import intent_classifier as ic
+from research_learning_agent.config import EscalationConfig
+from research_learning_agent.intent_escalation import EscalationController, recent_events
+from research_learning_agent.schemas import LearningIntent, UserLevel, UserProfile
+
+
+PROFILE = UserProfile(user_id="test_user", background="", level=UserLevel.beginner, goals="")
+CONFLICTING = "fix the study"        # rules: urgent_troubleshooting @ 0.60
+NO_SIGNAL = "tell me about robots"   # rules: casual_curiosity @ 0.55
+
+
+class TroubleshootingLLM:
+    """Always answers urgent_troubleshooting: agrees with the rules on CONFLICTING, not on NO_SIGNAL."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def chat(self, messages) -> str:
+        with self._lock:
+            self.calls += 1
+        return json.dumps({"intent": "urgent_troubleshooting", "confidence": 0.8, "rationale": "fake"})
+
+
+def _config(**overrides) -> EscalationConfig:
+    base = dict(adaptive=True, window=100, update_every=10, min_samples=5, probe_rate=0.1)
+    base.update(overrides)
+    return EscalationConfig(**base)
+
+
+def _events() -> list[dict]:
+    telemetry.flush()
+    return recent_events(telemetry.ESCALATION_LOG_PATH, 1000)
+
+
+def _observe(ctl: EscalationController, conf: float, agree: bool, n: int, *, llm_ms: float | None = None) -> None:
+    for _ in range(n):
+        ctl.observe(
+            rule_intent=LearningIntent.guided_study, rule_conf=conf,
+            final_intent=LearningIntent.guided_study if agree else LearningIntent.casual_curiosity,
+            stage="llm", llm_ms=llm_ms,
+        )
+
+
+def test_threshold_stays_put_without_agreement_evidence() -> None:
+    ctl = EscalationController(_config(min_samples=50))
+    _observe(ctl, 0.60, True, 20)
+
+    assert ctl.threshold == 0.70
+    events = _events()
+    assert len(events) == 2
+    assert events[-1]["reason"] == "guardrail_floor"
+    assert events[-1]["changed"] is False
+    assert events[-1]["observed_llm_rate"] == 1.0
+
+
+def test_threshold_drops_only_through_levels_where_rules_agree_with_llm() -> None:
+    ctl = EscalationController(_config())
+    _observe(ctl, 0.60, True, 10)
+    _observe(ctl, 0.55, False, 10)
+
+    # 0.60 passes the guardrail, 0.55 does not: the 0.55 rows keep going to the LLM
+    assert ctl.threshold == pytest.approx(0.60)
+    assert ctl.agreement(0.60) == (1.0, 10)
+    assert ctl.agreement(0.55) == (0.0, 10)
+    first, last = _events()
+    assert first["changed"] is True and first["threshold"] == pytest.approx(0.60)
+    assert last["changed"] is False
+    assert last["agreement"]["0.6"] == [1.0, 10]
+
+
+def test_slow_llm_tightens_the_target() -> None:
+    ctl = EscalationController(_config(target_llm_rate=0.5, latency_target_ms=500))
+    assert ctl.effective_target() == 0.5
+    _observe(ctl, 0.60, True, 10, llm_ms=2000)
+    assert ctl.effective_target() == pytest.approx(0.125)
+    assert _events()[-1]["mean_llm_ms"] == 2000.0
+
+
+def test_classifier_uses_controller_threshold_and_keeps_probing() -> None:
+    ctl = EscalationController(_config())
+    clf = ic.IntentClassifier(escalation=ctl)
+    clf.llm = TroubleshootingLLM()
+    clf.cache = None  # repeats must reach the controller
+
+    for _ in range(10):
+        assert clf.classify(CONFLICTING, PROFILE).stage == "llm"
+    assert clf.llm.calls == 10
+    assert ctl.threshold == pytest.approx(0.60)
+
+    stages = [clf.classify(CONFLICTING, PROFILE).stage for _ in range(20)]
+    assert stages.count("llm") == 2  # probes (probe_rate=0.1)
+    assert stages.count("rules") == 18
+
+    # below the lowered threshold nothing changes
+    assert clf.classify(NO_SIGNAL, PROFILE).stage == "llm"
+
+    batch = clf.classify_many([CONFLICTING] * 10, PROFILE)
+    assert sum(r.stage == "llm" for r in batch) == 1
+
+    telemetry.flush()
+    intent_events = recent_events(telemetry.INTENT_LOG_PATH, 1000)
+    assert intent_events[0]["rule_confidence"] == pytest.approx(0.60)
+    assert intent_events[0]["rule_intent"] == "urgent_troubleshooting"
+    assert "llm_ms" in intent_events[0]
+
+
+def test_warm_start_from_intent_telemetry() -> None:
+    ctl = EscalationController(_config())
+    events = [
+        {"rule_intent": "guided_study", "rule_confidence": 0.6, "intent": "guided_study", "stage": "llm", "llm_ms": 900},
+    ] * 10 + [{"intent": "casual_curiosity", "confidence": 0.55}]  # older events without rule fields are skipped
+    ctl.warm_start(events)
+
+    assert ctl.threshold == pytest.approx(0.60)
+    assert ctl.agreement(0.60) == (1.0, 10)
+    assert _events() == []  # replay does not log decisions
+
+
+def test_static_threshold_without_controller(monkeypatch) -> None:
+    monkeypatch.delenv("INTENT_ADAPTIVE_ESCALATION", raising=False)
+    clf = ic.IntentClassifier()
+    assert clf.escalation is None
+    assert clf.escalation_threshold == ic.ESCALATION_THRESHOLD
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from research_learning_agent.intent_classifier import _signal_strength, _signal_strength_reference
+from research_learning_agent.intent_matcher import SignalMatcher, SignalRule
+from research_learning_agent.schemas import LearningIntent
+
+
+CASES_PATH = Path(__file__).resolve().parents[2] / "fixtures" / "intent_cases.json"
+
+
+def _fixture_queries() -> list[str]:
+    return [c["query"] for c in json.loads(CASES_PATH.read_text(encoding="utf-8"))]
+
+
+@pytest.mark.parametrize("query", _fixture_queries())
+def test_matcher_scores_match_reference_on_fixture(query: str) -> None:
+    assert _signal_strength(query) == _signal_strength_reference(query)
+
+
+@pytest.mark.parametrize("query", [
+    "How do I fix this error? Traceback (most recent call last): File \"x.py\", line 3",
+    "what's wrong with my 7-day study plan",
+    "Compare papers on trade-offs; what's the problem with SOTA benchmark ablations?",
+    "xwhat's the problem here",          # `\bwhat's` has no word boundary before it
+    "prefix fixture bugfix",             # no word-boundary matches
+    "",
+])
+def test_matcher_scores_match_reference_on_edge_cases(query: str) -> None:
+    assert _signal_strength(query) == _signal_strength_reference(query)
+
+
+def test_matcher_scores_match_reference_on_random_queries() -> None:
+    vocab = (
+        "what is explain error fix how do i bug failed study learn plan 7-day 10 day course compare "
+        "trade-off papers sota citation reference benchmark ablation file line traceback syntaxerror "
+        "doesn't work issue what's wrong the problem a x of".split()
+    )
+    rng = random.Random(0)
+    for _ in range(500):
+        q = " ".join(rng.choice(vocab) for _ in range(rng.randint(1, 12)))
+        assert _signal_strength(q) == _signal_strength_reference(q), q
+
+
+def test_overlapping_rules_at_same_position_all_count() -> None:
+    matcher = SignalMatcher([
+        SignalRule("a", r"\bhow do i fix\b"),
+        SignalRule("b", r"\bhow\b"),
+        SignalRule("b", r"\bfix\b", 2.0),
+    ])
+    assert matcher.scores("how do i fix it") == {"a": 1.0, "b": 3.0}
+    assert matcher.scores("nothing here") == {"a": 0.0, "b": 0.0}
+
+
+def test_each_rule_counts_once() -> None:
+    matcher = SignalMatcher([SignalRule(LearningIntent.guided_study, r"\bstudy\b")])
+    assert matcher.scores("study study study") == {LearningIntent.guided_study: 1.0}
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from research_learning_agent import intent_classifier as ic
+from research_learning_agent.intent_model import (
+    FEATURE_DIM, IntentModel, _counts, features, get_intent_model, is_holdout, load_training_data,
+)
+from research_learning_agent.schemas import LearningIntent, UserLevel, UserProfile
+
+
+CASES_PATH = Path(__file__).resolve().parents[2] / "fixtures" / "intent_cases.json"
+PROFILE = UserProfile(user_id="test_user", background="", level=UserLevel.beginner, goals="")
+
+TRAIN = [
+    ("tell me about black holes", "casual_curiosity"),
+    ("curious about how volcanoes form", "casual_curiosity"),
+    ("tell me something about octopus brains", "casual_curiosity"),
+    ("curious how rainbows appear", "casual_curiosity"),
+    ("kubectl pod crashloopbackoff again", "urgent_troubleshooting"),
+    ("pod stuck crashloopbackoff after deploy", "urgent_troubleshooting"),
+    ("nginx returns 502 bad gateway", "urgent_troubleshooting"),
+    ("gateway 502 from nginx after restart", "urgent_troubleshooting"),
+    ("weekly syllabus for linear algebra", "guided_study"),
+    ("syllabus to master linear algebra in a month", "guided_study"),
+    ("weekly syllabus for calculus", "guided_study"),
+    ("month long syllabus for statistics", "guided_study"),
+]
+
+
+class CountingLLM:
+    def __init__(self) -> None:
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def chat(self, messages) -> str:
+        with self._lock:
+            self.calls += 1
+        return json.dumps({"intent": "casual_curiosity", "confidence": 0.6, "rationale": "fake"})
+
+
+@pytest.fixture
+def model() -> IntentModel:
+    texts, labels = zip(*TRAIN)
+    return IntentModel.train(list(texts), list(labels))
+
+
+def test_model_predicts_training_style_queries(model: IntentModel) -> None:
+    assert model.predict("pod in crashloopbackoff")[0] == "urgent_troubleshooting"
+    assert model.predict("syllabus for linear algebra")[0] == "guided_study"
+    probs = model.predict_proba(["tell me about stars", "xyzzy"])
+    assert probs.shape == (2, 3)
+    assert abs(float(probs.sum(axis=1)[0]) - 1.0) < 1e-6
+
+
+def test_counts_are_sparse_and_match_the_dense_product(model: IntentModel) -> None:
+    texts = [t for t, _ in TRAIN] + [""]
+    x = _counts(texts)
+    assert len(x.vals) <= sum(len(features(t)) for t in texts)  # no n x FEATURE_DIM matrix
+
+    dense = np.zeros((len(texts), FEATURE_DIM))
+    for i, t in enumerate(texts):
+        np.add.at(dense[i], features(t), 1.0)
+    assert np.allclose(x.dot(model.log_likelihood), dense @ model.log_likelihood.T.astype(np.float64), atol=1e-3)
+
+
+def test_model_roundtrip_is_compact(model: IntentModel, tmp_path: Path) -> None:
+    path = tmp_path / "intent_model.npz"
+    model.save(path)
+    assert path.stat().st_size < 64 * 1024
+
+    loaded = IntentModel.load(path)
+    assert loaded.classes == model.classes
+    assert loaded.temperature == model.temperature
+    assert loaded.predict("nginx 502 bad gateway")[0] == model.predict("nginx 502 bad gateway")[0]
+
+
+def test_load_training_data_uses_fixture_and_confident_events(tmp_path: Path) -> None:
+    events = tmp_path / "events.jsonl"
+    events.write_text("\n".join(json.dumps(e) for e in [
+        {"query": "low confidence", "intent": "guided_study", "confidence": 0.55},
+        {"query": "llm decided", "intent": "professional_research", "confidence": 0.6, "use_llm": True, "stage": "llm"},
+        {"query": "hand labelled", "intent": "guided_study", "confidence": 0.5, "label": "casual_curiosity"},
+        {"query": "What is reinforcement learning?", "intent": "guided_study", "confidence": 0.9, "stage": "rules"},
+        {"query": "model said", "intent": "guided_study", "confidence": 0.95, "stage": "model"},
+        {"query": "cached llm", "intent": "guided_study", "confidence": 0.6, "use_llm": True, "stage": "llm", "cached": True},
+        {"query": "degraded rules", "intent": "guided_study", "confidence": 0.9, "stage": "rules", "degraded": True},
+    ]) + "\n", encoding="utf-8")
+
+    texts, labels = load_training_data(CASES_PATH, events, exclude_holdout=False)
+    pairs = dict(zip(texts, labels))
+    assert "low confidence" not in pairs
+    assert pairs["llm decided"] == "professional_research"
+    assert pairs["hand labelled"] == "casual_curiosity"
+    assert pairs["What is reinforcement learning?"] == "casual_curiosity"  # fixture label wins
+    # the model's own predictions, cache replays and SLO-degraded rule answers are not labels
+    assert not {"model said", "cached llm", "degraded rules"} & set(pairs)
+
+
+def test_load_training_data_skips_the_holdout_split() -> None:
+    cases = json.loads(CASES_PATH.read_text(encoding="utf-8"))
+    held = [c["query"] for c in cases if is_holdout(c["query"])]
+    assert 0 < len(held) < len(cases)
+
+    texts, _ = load_training_data(CASES_PATH)
+    assert len(texts) == len(cases) - len(held)
+    assert not set(held) & set(texts)
+
+
+def test_missing_model_loads_as_none(tmp_path: Path) -> None:
+    assert get_intent_model(tmp_path / "nope.npz") is None
+
+
+def test_retrained_model_file_is_reloaded(model: IntentModel, tmp_path: Path) -> None:
+    path = tmp_path / "trained.npz"
+    assert get_intent_model(path) is None
+    model.save(path)
+    first = get_intent_model(path)
+    assert first is not None and get_intent_model(path) is first
+
+    texts, labels = zip(*TRAIN[:-1])
+    IntentModel.train(list(texts), list(labels)).save(path)
+    assert get_intent_model(path) is not first
+
+
+def test_model_stage_sits_between_rules_and_llm(model: IntentModel, tmp_path: Path, monkeypatch) -> None:
+    path = tmp_path / "trained.npz"
+    model.save(path)
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    clf = ic.IntentClassifier(model_path=path)
+    clf.llm = CountingLLM()
+    clf.cache = None  # the same query is re-classified under different thresholds
+    monkeypatch.setattr(ic, "MODEL_CONFIDENCE_THRESHOLD", 0.5)
+
+    # rules are unsure about these (no keyword signals), the model is not
+    res = clf.classify("pod stuck in crashloopbackoff", PROFILE)
+    assert res.stage == "model"
+    assert res.intent == LearningIntent.urgent_troubleshooting
+    assert res.use_llm is False
+    assert clf.llm.calls == 0
+
+    # rule-confident queries never reach the model
+    assert clf.classify("Compare papers on the benchmark trade-offs", PROFILE).stage == "rules"
+
+    # low model confidence escalates to the LLM
+    monkeypatch.setattr(ic, "MODEL_CONFIDENCE_THRESHOLD", 1.01)
+    res = clf.classify("pod stuck in crashloopbackoff", PROFILE)
+    assert res.stage == "llm"
+    assert clf.llm.calls == 1
+
+    monkeypatch.setattr(ic, "MODEL_CONFIDENCE_THRESHOLD", 0.5)
+    batch = clf.classify_many(["pod stuck in crashloopbackoff", "weekly syllabus for biology"], PROFILE)
+    assert [r.stage for r in batch] == ["model", "model"]
+    assert clf.llm.calls == 1
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from research_learning_agent.schemas import IntentResult, LearningIntent
+from research_learning_agent.scripts import intent_regression
+
+
+class FakeClassifier:
+    """Predicts guided_study for queries mentioning 'plan', casual_curiosity otherwise."""
+
+    batches: list[list[str]] = []
+
+    def classify_many(self, questions, profile, *, max_workers=8):
+        FakeClassifier.batches.append(list(questions))
+        return [
+            IntentResult(
+                intent=LearningIntent.guided_study if "plan" in q else LearningIntent.casual_curiosity,
+                confidence=0.8, rationale="fake",
+            )
+            for q in questions
+        ]
+
+
+@pytest.fixture
+def harness(tmp_path: Path, monkeypatch):
+    FakeClassifier.batches = []
+    monkeypatch.setattr(intent_regression, "IntentClassifier", FakeClassifier)
+    run_ids = iter(f"run{i:02d}" for i in range(100))
+    monkeypatch.setattr(intent_regression, "_now_run_id", lambda: next(run_ids))
+
+    cases_path = tmp_path / "cases.json"
+    out_dir = tmp_path / "runs"
+
+    def run(cases: list[dict]) -> dict:
+        cases_path.write_text(json.dumps(cases), encoding="utf-8")
+        intent_regression.main(["--cases", str(cases_path), "--out_dir", str(out_dir), "--workers", "2"])
+        return json.loads(sorted(out_dir.glob("intent_run_*_summary.json"))[-1].read_text(encoding="utf-8"))
+
+    return run
+
+
+CASES = [
+    {"id": "a", "query": "What is RL?", "expected_intent": "casual_curiosity"},
+    {"id": "b", "query": "Make me a study plan", "expected_intent": "guided_study"},
+    {"id": "c", "query": "Tell me about graphs", "expected_intent": "casual_curiosity"},
+]
+
+
+def test_only_changed_cases_are_re_evaluated(harness) -> None:
+    first = harness(CASES)
+    assert (first["evaluated"], first["reused_from_cache"]) == (3, 0)
+    assert first["accuracy"] == 1.0
+    assert "diff_vs_previous" not in first
+
+    second = harness(CASES)
+    assert (second["evaluated"], second["reused_from_cache"]) == (0, 3)
+    assert second["accuracy"] == 1.0
+    assert second["diff_vs_previous"]["previous_run"] == "intent_run_run00.jsonl"
+    assert second["diff_vs_previous"]["regressed"] == []
+
+    changed = [dict(c) for c in CASES]
+    changed[2]["query"] = "Give me a plan for graphs"
+    changed.append({"id": "d", "query": "plan a week of calculus", "expected_intent": "guided_study"})
+    third = harness(changed)
+
+    assert FakeClassifier.batches[-1] == ["Give me a plan for graphs", "plan a week of calculus"]
+    assert (third["evaluated"], third["reused_from_cache"]) == (2, 2)
+    assert third["diff_vs_previous"]["regressed"] == ["c"]
+    assert third["diff_vs_previous"]["new"] == ["d"]
+
+
+def test_classifier_version_change_invalidates_cache(harness, monkeypatch) -> None:
+    harness(CASES)
+    monkeypatch.setattr(intent_regression, "intent_cache_version", lambda: "rules-v2")
+    assert harness(CASES)["evaluated"] == 3
+
+
+def test_llm_failures_are_not_cached(tmp_path: Path, monkeypatch) -> None:
+    class FailingLLM:
+        def chat(self, messages) -> str:
+            raise TimeoutError("LLM down")
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    real = intent_regression.IntentClassifier
+
+    def classifier():
+        clf = real()
+        clf.llm, clf.cache, clf.model_path = FailingLLM(), None, tmp_path / "no_model.npz"
+        return clf
+
+    monkeypatch.setattr(intent_regression, "IntentClassifier", classifier)
+    cases_path, out_dir = tmp_path / "cases.json", tmp_path / "runs"
+    vague = {"id": "v", "query": "hmm", "expected_intent": "casual_curiosity"}  # no rule signals: goes to the LLM
+    cases_path.write_text(json.dumps([vague]), encoding="utf-8")
+
+    intent_regression.main(["--cases", str(cases_path), "--out_dir", str(out_dir)])
+    [summary_path] = out_dir.glob("intent_run_*_summary.json")
+    assert json.loads(summary_path.read_text(encoding="utf-8"))["llm_failures"] == 1
+    assert json.loads((out_dir / intent_regression.CASE_CACHE_NAME).read_text(encoding="utf-8")) == {}
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+from research_learning_agent.memory import MemoryManager
+from research_learning_agent.memory_extract import (
+    MAX_SUMMARY_CHARS,
+    extract_memory_fields,
+    extract_summary,
+    extract_topic,
+)
+from research_learning_agent.schemas import AgentAnswer, AnswerSection, LearningIntent, LearningMode, UserMemory
+from research_learning_agent.store.memory_store import MemoryStore
+
+
+ANSWER = AgentAnswer(
+    explanation=(
+        "Gradient descent is an optimization algorithm that updates model parameters in the direction "
+        "that reduces the loss. The learning rate controls the step size of each update. "
+        "If the learning rate is too large, gradient descent can diverge."
+    ),
+    bullet_summary=[
+        "Gradient descent follows the negative gradient of the loss.",
+        "Choose the learning rate carefully.",
+    ],
+    mode=LearningMode.guided_study,
+    sections=[
+        AnswerSection(title="Core Concepts", content="- **Loss function**: measures error\n- Stochastic gradient descent uses mini-batches."),
+        AnswerSection(title="Resources", content="https://example.com/gd"),
+    ],
+)
+
+
+def test_extract_topic_picks_key_phrase_from_question() -> None:
+    assert extract_topic("Can you explain how gradient descent works?", ANSWER.explanation) == "gradient descent"
+    assert extract_topic("What is a transformer model in NLP?") in {"transformer model", "nlp"}
+
+
+def test_extract_topic_falls_back_for_stopword_only_question() -> None:
+    assert extract_topic("what is it?") == "what is it"
+
+
+def test_extract_summary_is_bounded_and_relevant() -> None:
+    summary = extract_summary("How does gradient descent work?", ANSWER)
+    assert 0 < len(summary) <= MAX_SUMMARY_CHARS
+    assert "gradient descent" in summary.lower()
+    assert "http" not in summary
+    assert "**" not in summary
+
+
+def test_extract_summary_truncates_single_long_sentence() -> None:
+    answer = AgentAnswer(explanation="word " * 200 + ".")
+    summary = extract_summary("word", answer, max_chars=50)
+    assert len(summary) <= 50
+    assert summary.endswith("...")
+
+
+def test_extract_memory_fields_is_fast() -> None:
+    t0 = time.perf_counter()
+    for _ in range(20):
+        extract_memory_fields("How does gradient descent work?", ANSWER)
+    assert (time.perf_counter() - t0) / 20 < 0.01
+
+
+def test_remember_answer_fills_topic_and_summary(tmp_path: Path) -> None:
+    mgr = MemoryManager(MemoryStore(path=tmp_path / "user_memory.json"))
+    mem = mgr.remember_answer(
+        UserMemory(user_id="default"),
+        query="How does gradient descent work?",
+        intent=LearningIntent.guided_study,
+        answer=ANSWER,
+    )
+    assert mem.last_topic == "gradient descent"
+    assert mem.history[-1].mode == LearningMode.guided_study
+    assert mem.history[-1].summary
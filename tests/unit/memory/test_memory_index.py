@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from research_learning_agent.memory import MemoryManager
+from research_learning_agent.memory_index import HistoryIndex
+from research_learning_agent.schemas import LearningIntent, LearningMode, MemoryItem, UserMemory
+from research_learning_agent.store.memory_store import MemoryStore
+
+
+def _item(i: int, topic: str, query: str, summary: str = "") -> MemoryItem:
+    return MemoryItem(
+        ts=f"2026-01-01T00:00:{i:02d}+00:00", query=query, topic=topic,
+        intent="casual_curiosity", mode=LearningMode.quick_explain, summary=summary,
+    )
+
+
+HISTORY = [
+    _item(0, "reinforcement learning", "What is Q-learning?", "Q-learning learns action values from rewards."),
+    _item(1, "sourdough", "Why does my sourdough not rise?", "Starter activity and proofing temperature."),
+    _item(2, "transformers", "How does attention work in transformers?", "Attention weights tokens by relevance."),
+    _item(3, "kubernetes", "How do I debug a crashing pod?", "Check logs, events and resource limits."),
+]
+
+
+def test_search_returns_most_relevant_items_first() -> None:
+    index = HistoryIndex()
+    index.sync(HISTORY)
+
+    hits = index.search("policy gradient vs q-learning in reinforcement learning", k=2)
+    assert hits
+    assert hits[0][0].topic == "reinforcement learning"
+    assert all(a[1] >= b[1] for a, b in zip(hits, hits[1:]))
+
+
+def test_search_filters_unrelated_items() -> None:
+    index = HistoryIndex()
+    index.sync(HISTORY)
+
+    topics = [item.topic for item, _ in index.search("pod keeps crashing in kubernetes", k=4)]
+    assert topics[0] == "kubernetes"
+    assert "sourdough" not in topics
+
+
+def test_sync_is_incremental_and_follows_eviction() -> None:
+    index = HistoryIndex()
+    index.sync(HISTORY[:3])
+    assert len(index) == 3
+
+    index.sync(HISTORY[1:])  # oldest evicted, one new item
+    assert [it.ts for it in index.items] == [it.ts for it in HISTORY[1:]]
+    assert all(item.topic != "reinforcement learning" for item, _ in index.search("q-learning", k=3))
+
+
+def test_build_prompt_context_adds_relevant_history_under_cap(tmp_path: Path) -> None:
+    mgr = MemoryManager(MemoryStore(path=tmp_path / "user_memory.json"))
+    mem = UserMemory(user_id="default")
+    for it in HISTORY:
+        mem = mgr.update_after_answer(
+            mem, query=it.query, topic=it.topic, intent=LearningIntent.casual_curiosity,
+            mode=it.mode, answer_summary=it.summary,
+        )
+
+    ctx = mgr.build_prompt_context(mem, "explain multi-head attention in transformers")
+    assert "Related earlier questions" in ctx
+    assert "How does attention work in transformers?" in ctx
+    assert "sourdough" not in ctx.split("Related earlier questions")[1]
+
+    capped = mgr.build_prompt_context(mem, "explain multi-head attention in transformers", history_token_cap=5)
+    assert "Related earlier questions" not in capped
+
+    assert "Related earlier questions" not in mgr.build_prompt_context(mem)
+
+
+def test_relevant_history_from_head_uses_persisted_history(tmp_path: Path) -> None:
+    store = MemoryStore(path=tmp_path / "user_memory.json")
+    store.save(UserMemory(user_id="default", topics=["kubernetes"], history=HISTORY))
+
+    mgr = MemoryManager(store)
+    hits = mgr.relevant_history(mgr.load_head("default"), "crashing pod")
+    assert hits and hits[0].topic == "kubernetes"
@@ -168,4 +168,32 @@ def test_memory_manager_save_then_load_roundtrip(tmp_path: Path) -> None:
     mgr.save(mem)
 
     mem2 = mgr.load(user_id="default")
-    assert mem2.topics == ["topicX"]
\ No newline at end of file
+    assert mem2.topics == ["topicX"]
+
+def test_history_index_is_built_once_per_user_and_bounded(tmp_path: Path) -> None:
+    import threading
+    import time
+
+    class CountingStore(MemoryStore):
+        def __init__(self, path: Path) -> None:
+            super().__init__(path=path)
+            self.history_loads: list[str] = []
+
+        def load_history(self, user_id: str = "default", **kwargs):
+            self.history_loads.append(user_id)
+            time.sleep(0.01)  # widen the race between concurrent first lookups
+            return super().load_history(user_id, **kwargs)
+
+    store = CountingStore(tmp_path / "user_memory.json")
+    mgr = MemoryManager(store, background_rollup=False, max_cached_indexes=2)
+
+    threads = [threading.Thread(target=mgr.relevant_history, args=(UserMemory(user_id="u1"), "q")) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert store.history_loads == ["u1"]
+
+    for user_id in ("u2", "u3"):
+        mgr.relevant_history(UserMemory(user_id=user_id), "q")
+    assert list(mgr._indexes) == ["u2", "u3"]
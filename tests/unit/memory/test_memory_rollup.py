@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+import research_learning_agent.memory as mem_mod
+from research_learning_agent.memory import MemoryManager
+from research_learning_agent.memory_rollup import MAX_DIGESTS, fold_into_digests
+from research_learning_agent.schemas import LearningIntent, LearningMode, MemoryItem, TopicDigest, UserMemory
+from research_learning_agent.store.journal_memory_store import JournalMemoryStore
+from research_learning_agent.store.memory_store import MemoryStore
+from research_learning_agent.store.sqlite_memory_store import SQLiteMemoryStore
+
+
+def _item(i: int, topic: str, mode: LearningMode = LearningMode.quick_explain, summary: str = "") -> MemoryItem:
+    return MemoryItem(
+        ts=f"2026-01-01T00:{i // 60:02d}:{i % 60:02d}+00:00", query=f"q{i}", topic=topic,
+        intent="casual_curiosity", mode=mode, summary=summary,
+    )
+
+
+def _answer(mgr: MemoryManager, mem: UserMemory, i: int, topic: str) -> UserMemory:
+    return mgr.update_after_answer(
+        mem, query=f"q{i}", topic=topic, intent=LearningIntent.casual_curiosity,
+        mode=LearningMode.quick_explain, answer_summary=f"Learned fact number {i} about {topic}.",
+    )
+
+
+def test_fold_into_digests_merges_per_topic() -> None:
+    items = [
+        _item(0, "RL", summary="Q-learning estimates action values."),
+        _item(1, "sourdough", summary="Starter needs feeding."),
+        _item(2, "rl", LearningMode.deep_research, summary="Policy gradients optimize the policy directly."),
+    ]
+    digests = fold_into_digests([], items)
+
+    assert [d.topic for d in digests] == ["sourdough", "RL"]  # ordered by last_seen
+    rl = digests[-1]
+    assert rl.count == 2
+    assert rl.modes == {"quick_explain": 1, "deep_research": 1}
+    assert rl.first_seen == items[0].ts and rl.last_seen == items[2].ts
+    assert "Policy gradients" in rl.summary and "Q-learning" in rl.summary
+
+    again = fold_into_digests(digests, [_item(3, "RL", summary="Q-learning estimates action values.")])
+    assert again[-1].count == 3
+    assert again[-1].summary.count("Q-learning") == 1
+    assert digests[-1].count == 2  # input not mutated
+
+
+def test_fold_into_digests_is_bounded() -> None:
+    items = [_item(i, f"topic {i}", summary="x " * 400) for i in range(MAX_DIGESTS + 5)]
+    digests = fold_into_digests([], items)
+    assert len(digests) == MAX_DIGESTS
+    assert digests[0].topic == "topic 5"
+    assert all(len(d.summary) <= 300 for d in digests)
+
+
+def test_evicted_history_is_rolled_up_inline(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(mem_mod, "MAX_HISTORY", 3)
+    mgr = MemoryManager(MemoryStore(path=tmp_path / "user_memory.json"), background_rollup=False)
+
+    mem = UserMemory(user_id="default")
+    for i in range(10):
+        mem = _answer(mgr, mem, i, "rl" if i % 2 else "sourdough")
+
+    assert len(mem.history) == 3
+    assert mem.rollup_pending == []
+    assert sum(d.count for d in mem.digests) == 7
+
+
+def test_background_rollup_persists_digests(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(mem_mod, "MAX_HISTORY", 2)
+    store = SQLiteMemoryStore(path=tmp_path / "mem.sqlite3")
+    mgr = MemoryManager(store)
+
+    mem = UserMemory(user_id="u1")
+    for i in range(6):
+        mem = _answer(mgr, mem, i, f"t{i % 3}")
+        mgr.save(mem)
+    mgr.rollup.flush()
+
+    loaded = store.load("u1")
+    assert loaded.rollup_pending == []
+    assert sum(d.count for d in loaded.digests) == 4
+    assert len(loaded.history) == 2
+
+
+@pytest.mark.parametrize("kind", ["json", "sqlite", "journal"])
+def test_stores_roundtrip_digests_and_pending(kind: str, tmp_path: Path) -> None:
+    store = {
+        "json": lambda: MemoryStore(path=tmp_path / "user_memory.json"),
+        "sqlite": lambda: SQLiteMemoryStore(path=tmp_path / "mem.sqlite3"),
+        "journal": lambda: JournalMemoryStore(root=tmp_path / "journal", fsync=False),
+    }[kind]()
+
+    mem = UserMemory(user_id="default", history=[_item(5, "a")], rollup_pending=[_item(1, "b"), _item(2, "b")])
+    store.save(mem)
+    mem.digests = [TopicDigest(topic="b", count=2, modes={"quick_explain": 2}, first_seen="x", last_seen="y")]
+    mem.rollup_pending = []
+    store.save(mem)
+    mem.topics = ["a"]
+    store.save(mem)  # journal: digests unchanged, not repeated in this record
+
+    assert store.load("default").model_dump() == mem.model_dump()
+    assert store.load_head("default").digests == mem.digests
+
+
+def test_prompt_context_includes_related_digest(tmp_path: Path) -> None:
+    mgr = MemoryManager(MemoryStore(path=tmp_path / "user_memory.json"), background_rollup=False)
+    mem = UserMemory(user_id="default", topics=["cooking"])
+    mem.digests = [
+        TopicDigest(topic="reinforcement learning", count=4, first_seen="2025-01-01", last_seen="2025-03-01",
+                    summary="Q-learning estimates action values."),
+        TopicDigest(topic="sourdough", count=1, first_seen="2025-01-01", last_seen="2025-02-01"),
+    ]
+
+    ctx = mgr.build_prompt_context(mem, "how does reinforcement learning use rewards?")
+    assert "Earlier topics" in ctx
+    assert "reinforcement learning (asked 4x, last 2025-03-01): Q-learning" in ctx
+    assert "sourdough" not in ctx
+
+    assert "sourdough" in mgr.build_prompt_context(mem)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import json
+
+import research_learning_agent.telemetry as telemetry
+from research_learning_agent.prompt_budget import (
+    assemble_to_budget, compact_plan, count_tokens, estimate_tokens, record_prompt_tokens
+)
+from research_learning_agent.schemas import LLMMessage, Plan, PlanStep, StepType, ToolCall, ToolType
+
+
+def _plan() -> Plan:
+    return Plan(
+        goal="Explain PPO",
+        intent="casual_curiosity",
+        steps=[
+            PlanStep(
+                step_id="s1",
+                type=StepType.research,
+                description="Find the PPO paper and a tutorial " * 5,
+                tool_calls=[ToolCall(tool=ToolType.docs_search, query="ppo paper site:arxiv.org")],
+            ),
+            PlanStep(step_id="s2", type=StepType.finalize, description="Write the answer"),
+        ],
+    )
+
+
+def _render(plan_text: str, evidence: str) -> str:
+    return f"HEADER\nPlan:\n{plan_text}\nEvidence:\n{evidence}\n"
+
+
+def test_estimate_tokens_is_roughly_word_count_for_prose() -> None:
+    text = "The agent learns a policy that maximizes the expected reward."
+    assert 10 <= estimate_tokens(text) <= 14
+    assert estimate_tokens("") == 0
+    assert count_tokens("hello world") >= 2
+
+
+def test_compact_plan_levels_get_shorter() -> None:
+    plan = _plan()
+    full = compact_plan(plan, "full")
+    brief = compact_plan(plan, "brief")
+    goal_only = compact_plan(plan, "goal_only")
+
+    assert "docs_search('ppo paper site:arxiv.org')" in full
+    assert count_tokens(full) > count_tokens(brief) > count_tokens(goal_only)
+    assert goal_only == "Goal: Explain PPO\nSteps: research -> finalize"
+    assert count_tokens(full) < count_tokens(plan.model_dump_json(indent=2))
+
+
+def test_assemble_keeps_everything_when_under_budget() -> None:
+    lines = [f"- [web_search] Result {i} | https://example.com/{i}" for i in range(3)]
+    out = assemble_to_budget(_render, _plan(), lines, budget=10_000)
+
+    assert out.evidence_kept == 3
+    assert out.evidence_dropped == 0
+    assert out.plan_detail == "full"
+    assert not out.over_budget
+
+
+def test_assemble_drops_lowest_value_evidence_first() -> None:
+    lines = [f"- [web_search] Result number {i} with a longish title | https://example.com/{i}" for i in range(20)]
+    base = count_tokens(_render(compact_plan(_plan(), "full"), lines[0]))
+    out = assemble_to_budget(_render, _plan(), lines, budget=base + 40)
+
+    assert 0 < out.evidence_kept < 20
+    assert out.tokens <= out.budget
+    assert "Result number 0 " in out.text
+    assert "Result number 19 " not in out.text
+
+
+def test_assemble_shrinks_plan_when_evidence_does_not_fit() -> None:
+    lines = ["- [web_search] One result | https://example.com/1"]
+    tight = count_tokens(_render(compact_plan(_plan(), "goal_only"), lines[0])) + 2
+    out = assemble_to_budget(_render, _plan(), lines, budget=tight)
+
+    assert out.plan_detail in {"brief", "goal_only"}
+    assert out.evidence_kept == 1
+    assert not out.over_budget
+
+
+def test_record_prompt_tokens_writes_stage_event() -> None:
+    messages = [LLMMessage(role="system", content="abc def"), LLMMessage(role="user", content="q")]
+    n = record_prompt_tokens("planner", messages, mode="quick_explain")
+
+    telemetry.flush()
+    events = [json.loads(l) for l in telemetry.PROMPT_LOG_PATH.read_text(encoding="utf-8").splitlines()]
+    assert events[-1]["stage"] == "planner"
+    assert events[-1]["prompt_tokens"] == n
+    assert events[-1]["mode"] == "quick_explain"
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+
+import research_learning_agent.telemetry as telemetry
+from research_learning_agent.config import GeneratorConfig, UsageBudgetConfig
+from research_learning_agent.generator import generation_calls
+from research_learning_agent.llm_client import LLMClient
+from research_learning_agent.orchestrator import Orchestrator
+from research_learning_agent.pedagogy import Pedagogy
+from research_learning_agent.schemas import (
+    AgentAnswer, IntentResult, LearningMode, LLMMessage, Plan, PlanStep, StepType, TokenUsage, UserProfile, UserQuery,
+)
+from research_learning_agent.scripts import usage_report
+from research_learning_agent.store.write_behind import WriteBehindFlusher
+from research_learning_agent.usage import (
+    UsageLedger, UsageLedgerData, collect_usage, mode_within_budget, record_llm_usage, usage_tags,
+)
+
+
+PROFILE = UserProfile(user_id="u1", background="", level="beginner", goals="")
+
+
+class FakeCompletions:
+    def __init__(self, usage):
+        self.usage = usage
+
+    def create(self, **kwargs):
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="a short reply"))], usage=self.usage
+        )
+
+
+def _client(monkeypatch, usage) -> LLMClient:
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    llm = LLMClient()
+    llm.client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(usage)))
+    return llm
+
+
+def test_chat_records_reported_and_estimated_usage_by_stage(monkeypatch) -> None:
+    messages = [LLMMessage(role="user", content="explain gradient descent")]
+    reported = _client(monkeypatch, SimpleNamespace(prompt_tokens=120, completion_tokens=30, total_tokens=150))
+    unreported = _client(monkeypatch, None)
+
+    with collect_usage() as usage:
+        with usage_tags(stage="planner"):
+            reported.chat(messages)
+        with usage_tags(stage="generator", mode="quick_explain"):
+            unreported.chat(messages)
+    u = usage.snapshot()
+
+    assert u.calls == 2 and u.estimated_calls == 1
+    assert u.by_stage["planner"] == 150
+    assert 0 < u.by_stage["generator"] < 50
+    assert u.prompt_tokens > 120 and u.completion_tokens > 30
+
+
+def test_mode_within_budget_picks_the_richest_mode_that_fits() -> None:
+    # generation estimate = prompt budget + 800 completion: quick 2000, fix 2400, guided 2800, deep 3200
+    assert mode_within_budget(LearningMode.deep_research, None, 800) == LearningMode.deep_research
+    assert mode_within_budget(LearningMode.deep_research, 3200, 800) == LearningMode.deep_research
+    assert mode_within_budget(LearningMode.deep_research, 2900, 800) == LearningMode.guided_study
+    assert mode_within_budget(LearningMode.guided_study, 100, 800) == LearningMode.quick_explain
+    assert mode_within_budget(LearningMode.quick_explain, 0, 800) == LearningMode.quick_explain
+
+
+def test_mode_within_budget_counts_every_generator_call() -> None:
+    # section-parallel generation: deep_research = framing + 5 sections = 6 calls x 3200
+    parallel = lambda m: generation_calls(Pedagogy().build_spec(m, PROFILE), GeneratorConfig(parallel_sections=True))
+    assert parallel(LearningMode.deep_research) == 6 and parallel(LearningMode.quick_explain) == 1
+    assert mode_within_budget(LearningMode.deep_research, 3200, 800, calls=parallel) == LearningMode.fix_my_problem
+    assert mode_within_budget(LearningMode.deep_research, 6 * 3200, 800, calls=parallel) == LearningMode.deep_research
+
+
+class FakeIntent:
+    def classify(self, question, profile):
+        return IntentResult(intent="professional_research", confidence=0.9, rationale="r")
+
+
+class FakePlanner:
+    def create_plan(self, question, profile, intent):
+        with usage_tags(stage="planner"):
+            record_llm_usage(model="m", prompt_tokens=500, completion_tokens=100)
+        return Plan(goal="g", intent=intent.intent, steps=[PlanStep(step_id="s1", type=StepType.finalize, description="f")])
+
+
+class FakeGenerator:
+    def __init__(self):
+        self.modes: list[LearningMode] = []
+
+    def generate(self, *, query, profile, intent, plan, tool_results, spec, force_final=False):
+        self.modes.append(spec.mode)
+        with usage_tags(stage="generator", mode=spec.mode.value):
+            record_llm_usage(model="m", prompt_tokens=900, completion_tokens=100)
+        return AgentAnswer(explanation="ok", mode=spec.mode)
+
+
+def test_orchestrator_downgrades_mode_under_user_daily_budget(monkeypatch, capsys) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("LLM_MAX_TOKENS", "800")
+    orch = Orchestrator()
+    orch.intent, orch.planner, orch.generator = FakeIntent(), FakePlanner(), FakeGenerator()
+    orch.budget = UsageBudgetConfig(user_daily_token_budget=3000)
+    profile = UserProfile(user_id="u1", background="", level="beginner", goals="")
+
+    first = orch.run(UserQuery(question="survey of rl papers"), profile)
+    assert first.usage.total_tokens == 1600
+    assert first.usage.by_stage == {"planner": 600, "generator": 1000}
+    # 3000 - 600 spent by the planner leaves 2400: deep_research (3200) -> fix_my_problem (2400)
+    assert first.budget_downgraded_from == LearningMode.deep_research
+    assert orch.generator.modes[-1] == LearningMode.fix_my_problem
+
+    second = orch.run(UserQuery(question="survey of rl papers"), profile)
+    assert orch.generator.modes[-1] == LearningMode.quick_explain  # 1600 already spent today
+    assert orch.usage_ledger.used_today("u1") == 3200
+    assert orch.usage_ledger.day()["u1"].requests == 2
+
+    telemetry.flush()
+    events = [json.loads(l) for l in telemetry.USAGE_LOG_PATH.read_text(encoding="utf-8").splitlines()]
+    assert [e["mode"] for e in events] == ["fix_my_problem", "quick_explain"]
+    assert events[1]["trace_id"] == second.trace_id
+
+    orch.usage_ledger.flush()
+    assert usage_report.main(["--ledger", str(orch.usage_ledger.path), "--json"]) == 0
+    [row] = json.loads(capsys.readouterr().out)
+    assert (row["user_id"], row["requests"], row["total_tokens"]) == ("u1", 2, 3200)
+
+
+def test_ledger_updates_in_place_and_prunes_old_days(tmp_path, monkeypatch) -> None:
+    ledger = UsageLedger(tmp_path / "ledger.json", flusher=WriteBehindFlusher(delay=60), retain_days=2)
+    copies = []
+    real_copy = UsageLedgerData.model_copy
+    monkeypatch.setattr(UsageLedgerData, "model_copy", lambda self, **kw: copies.append(1) or real_copy(self, **kw))
+
+    for day in ("2026-10-15", "2026-10-18", "2026-10-18", "2026-10-19"):
+        ledger.add("u1", TokenUsage(calls=1, prompt_tokens=10, completion_tokens=5, by_stage={"generate": 15}), day=day)
+    assert copies == []  # no whole-ledger copy per update
+    assert ledger.days() == ["2026-10-18", "2026-10-19"]
+    assert ledger.day("2026-10-18")["u1"].requests == 2
+
+    ledger.flush()
+    assert len(copies) == 1  # one snapshot per write
+    assert UsageLedger(tmp_path / "ledger.json").day("2026-10-18")["u1"].by_stage == {"generate": 30}
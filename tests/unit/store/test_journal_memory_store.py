@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from research_learning_agent.memory import MemoryManager
+from research_learning_agent.schemas import LearningIntent, LearningMode, UserMemory, Verbosity
+from research_learning_agent.store.journal_memory_store import JournalMemoryStore
+
+
+def _answer(mgr: MemoryManager, user_id: str, i: int) -> UserMemory:
+    mem = mgr.load(user_id)
+    mem = mgr.update_after_answer(
+        mem,
+        query=f"q{i}",
+        topic=f"t{i % 3}",
+        intent=LearningIntent.casual_curiosity,
+        mode=LearningMode.quick_explain,
+        answer_summary=f"s{i}",
+    )
+    mgr.save(mem)
+    return mem
+
+
+def test_journal_store_load_missing_returns_none(tmp_path: Path) -> None:
+    assert JournalMemoryStore(root=tmp_path).load("nobody") is None
+
+
+def test_journal_store_appends_one_record_per_save(tmp_path: Path) -> None:
+    store = JournalMemoryStore(root=tmp_path, fsync=False)
+    mgr = MemoryManager(store)
+
+    for i in range(5):
+        _answer(mgr, "u1", i)
+
+    lines = store.log_path("u1").read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 5
+    assert all(len(json.loads(l)["items"]) == 1 for l in lines)
+
+    # a fresh store (new process) replays the journal
+    loaded = JournalMemoryStore(root=tmp_path).load("u1")
+    assert [h.query for h in loaded.history] == ["q0", "q1", "q2", "q3", "q4"]
+    assert loaded.topics == ["t2", "t0", "t1"]
+    assert loaded.last_topic == "t1"
+
+
+def test_journal_store_replays_history_cap_and_preferences(tmp_path: Path, monkeypatch) -> None:
+    import research_learning_agent.memory as mem_mod
+
+    monkeypatch.setattr(mem_mod, "MAX_HISTORY", 2)
+    store = JournalMemoryStore(root=tmp_path, fsync=False)
+    mgr = MemoryManager(store)
+
+    for i in range(4):
+        mem = _answer(mgr, "u1", i)
+    mem.preferences.verbosity = Verbosity.detailed
+    mgr.save(mem)
+
+    loaded = JournalMemoryStore(root=tmp_path).load("u1")
+    assert [h.query for h in loaded.history] == ["q2", "q3"]
+    assert loaded.preferences.verbosity == Verbosity.detailed
+
+
+def test_journal_store_ignores_and_trims_torn_tail(tmp_path: Path) -> None:
+    store = JournalMemoryStore(root=tmp_path, fsync=False)
+    mgr = MemoryManager(store)
+    _answer(mgr, "u1", 0)
+    _answer(mgr, "u1", 1)
+
+    log = store.log_path("u1")
+    with log.open("a", encoding="utf-8") as f:
+        f.write('{"seq": 3, "items": [{"ts": "2')  # crash mid-write
+
+    store2 = JournalMemoryStore(root=tmp_path, fsync=False)
+    mgr2 = MemoryManager(store2)
+    assert [h.query for h in store2.load("u1").history] == ["q0", "q1"]
+
+    _answer(mgr2, "u1", 2)
+    assert [h.query for h in JournalMemoryStore(root=tmp_path).load("u1").history] == ["q0", "q1", "q2"]
+
+
+def test_journal_store_compacts_in_background(tmp_path: Path) -> None:
+    store = JournalMemoryStore(root=tmp_path, compact_threshold_bytes=1_000, fsync=False)
+    mgr = MemoryManager(store)
+
+    for i in range(20):
+        _answer(mgr, "u1", i)
+    store.wait_for_compaction(timeout=5)
+
+    assert store.snapshot_path("u1").exists()
+    # records folded into the snapshot are gone from the journal
+    assert len(store.log_path("u1").read_text(encoding="utf-8").splitlines()) < 20
+
+    loaded = JournalMemoryStore(root=tmp_path).load("u1")
+    assert [h.query for h in loaded.history] == [f"q{i}" for i in range(20)]
+
+
+def test_journal_store_snapshot_without_truncation_does_not_duplicate(tmp_path: Path) -> None:
+    store = JournalMemoryStore(root=tmp_path, fsync=False)
+    mgr = MemoryManager(store)
+    for i in range(3):
+        _answer(mgr, "u1", i)
+
+    journal = store.log_path("u1").read_text(encoding="utf-8")
+    store.compact("u1")
+    # simulate a crash after the snapshot was written but before the journal was emptied
+    store.log_path("u1").write_text(journal, encoding="utf-8")
+
+    loaded = JournalMemoryStore(root=tmp_path).load("u1")
+    assert [h.query for h in loaded.history] == ["q0", "q1", "q2"]
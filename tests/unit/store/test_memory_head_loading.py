@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from research_learning_agent.memory import MemoryManager
+from research_learning_agent.schemas import LearningMode, MemoryItem, UserMemory, Verbosity
+from research_learning_agent.store.journal_memory_store import JournalMemoryStore
+from research_learning_agent.store.memory_store import CachedMemoryStore, MemoryStore
+from research_learning_agent.store.sqlite_memory_store import SQLiteMemoryStore
+from research_learning_agent.store.write_behind import WriteBehindFlusher
+
+
+def _memory(n: int) -> UserMemory:
+    mem = UserMemory(user_id="default", topics=["a", "b"], last_topic="b")
+    mem.preferences.verbosity = Verbosity.detailed
+    mem.history = [
+        MemoryItem(ts=f"2026-01-01T00:00:{i:02d}+00:00", query=f"q{i}", topic="a", intent="casual_curiosity",
+                   mode=LearningMode.quick_explain)
+        for i in range(n)
+    ]
+    return mem
+
+
+@pytest.fixture(params=["json", "sqlite", "journal"])
+def store(request, tmp_path: Path):
+    if request.param == "json":
+        return MemoryStore(path=tmp_path / "user_memory.json")
+    if request.param == "sqlite":
+        return SQLiteMemoryStore(path=tmp_path / "mem.sqlite3")
+    return JournalMemoryStore(root=tmp_path / "journal", fsync=False)
+
+
+def test_load_head_matches_full_memory(store) -> None:
+    mem = _memory(5)
+    store.save(mem)
+
+    head = store.load_head("default")
+    assert head is not None
+    assert head.model_dump() == mem.head().model_dump()
+    assert not hasattr(head, "history")
+
+
+def test_load_head_missing_user(store) -> None:
+    assert store.load_head("default") is None
+    assert store.load_history("default") == []
+
+
+def test_load_history_pages_newest_first(store) -> None:
+    store.save(_memory(25))
+
+    newest = store.load_history("default", limit=10)
+    assert [h.query for h in newest] == [f"q{i}" for i in range(15, 25)]
+
+    older = store.load_history("default", offset=10, limit=10)
+    assert [h.query for h in older] == [f"q{i}" for i in range(5, 15)]
+
+    oldest = store.load_history("default", offset=20, limit=10)
+    assert [h.query for h in oldest] == [f"q{i}" for i in range(0, 5)]
+
+    assert len(store.load_history("default")) == 25
+
+
+def test_json_head_does_not_read_history(tmp_path: Path) -> None:
+    store = MemoryStore(path=tmp_path / "user_memory.json")
+    store.save(_memory(3))
+    store.history_path.write_text("not json\n", encoding="utf-8")
+
+    assert store.load_head("default").topics == ["a", "b"]
+
+
+def test_cached_head_does_not_read_history(tmp_path: Path) -> None:
+    MemoryStore(path=tmp_path / "user_memory.json").save(_memory(3))
+    store = CachedMemoryStore(path=tmp_path / "user_memory.json", flusher=WriteBehindFlusher(delay=60))
+    store.history_path.write_text("not json\n", encoding="utf-8")
+
+    assert store.load_head("default").topics == ["a", "b"]
+
+
+def test_json_store_reads_legacy_inline_history(tmp_path: Path) -> None:
+    path = tmp_path / "user_memory.json"
+    path.write_text(_memory(4).model_dump_json(), encoding="utf-8")
+    store = MemoryStore(path=path)
+
+    assert [h.query for h in store.load("default").history] == ["q0", "q1", "q2", "q3"]
+    assert [h.query for h in store.load_history("default", limit=2)] == ["q2", "q3"]
+    assert store.load_head("default").last_topic == "b"
+
+
+def test_manager_prompt_context_from_head(tmp_path: Path) -> None:
+    mgr = MemoryManager(MemoryStore(path=tmp_path / "user_memory.json"))
+    mgr.save(_memory(2))
+
+    ctx = mgr.build_prompt_context(mgr.load_head("default"))
+    assert "Recent topics: a, b" in ctx
+    assert "verbosity=detailed" in ctx
+
+
+def test_manager_load_head_defaults_for_new_user(tmp_path: Path) -> None:
+    mgr = MemoryManager(SQLiteMemoryStore(path=tmp_path / "mem.sqlite3"))
+    head = mgr.load_head("nobody")
+    assert head.user_id == "nobody"
+    assert head.topics == []
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+from research_learning_agent.schemas import UserLevel, UserMemory, UserProfile
+from research_learning_agent.storage import CachedProfileStore, ProfileDirectory, ProfileStore
+from research_learning_agent.store.memory_store import CachedMemoryStore, MemoryStore
+from research_learning_agent.store.write_behind import WriteBehindFlusher, atomic_write_text
+
+
+def _profile(goals: str = "learn") -> UserProfile:
+    return UserProfile(user_id="u1", background="x", level=UserLevel.beginner, goals=goals)
+
+
+def test_atomic_write_replaces_file_without_leftovers(tmp_path: Path) -> None:
+    path = tmp_path / "doc.json"
+    atomic_write_text(path, "one")
+    atomic_write_text(path, "two")
+    assert path.read_text(encoding="utf-8") == "two"
+    assert os.listdir(tmp_path) == ["doc.json"]
+
+
+def test_save_is_deferred_and_coalesced(tmp_path: Path, monkeypatch) -> None:
+    path = tmp_path / "user_profile.json"
+    store = CachedProfileStore(path=path, flusher=WriteBehindFlusher(delay=60))
+
+    writes: list[str] = []
+    original = ProfileStore.save
+    monkeypatch.setattr(ProfileStore, "save", lambda self, p: (writes.append(p.goals), original(self, p)))
+
+    for i in range(10):
+        store.save(_profile(f"goal {i}"))
+
+    assert not path.exists()  # nothing on the request path
+    assert store.load().goals == "goal 9"
+
+    store.flush()
+    assert writes == ["goal 9"]
+    assert ProfileStore(path=path).load().goals == "goal 9"
+
+
+def test_background_flusher_writes_without_explicit_flush(tmp_path: Path) -> None:
+    path = tmp_path / "user_profile.json"
+    flusher = WriteBehindFlusher(delay=0.01)
+    store = CachedProfileStore(path=path, flusher=flusher)
+    store.save(_profile("bg"))
+
+    flusher.close()  # waits for the thread, then flushes anything left
+    assert ProfileStore(path=path).load().goals == "bg"
+
+
+def test_flusher_writes_once_delay_after_the_first_update() -> None:
+    flusher = WriteBehindFlusher(delay=0.3)
+    writes: list[tuple[int, float]] = []
+    t0 = time.monotonic()
+    for i in range(5):
+        flusher.mark_dirty("k", lambda i=i: writes.append((i, time.monotonic() - t0)))
+        time.sleep(0.02)
+
+    time.sleep(0.1)
+    assert writes == []  # further updates do not wake the flusher early
+    while not writes and time.monotonic() - t0 < 5:
+        time.sleep(0.01)
+    flusher.close()
+    [(last, at)] = writes
+    assert last == 4 and at >= 0.3
+
+
+def test_load_is_cached_until_file_changes(tmp_path: Path, monkeypatch) -> None:
+    path = tmp_path / "user_profile.json"
+    ProfileStore(path=path).save(_profile("disk"))
+    store = CachedProfileStore(path=path, flusher=WriteBehindFlusher(delay=60))
+
+    reads = []
+    original = ProfileStore.load
+    monkeypatch.setattr(ProfileStore, "load", lambda self: (reads.append(1), original(self))[1])
+
+    assert store.load().goals == "disk"
+    assert store.load().goals == "disk"
+    assert len(reads) == 1
+
+    ProfileStore(path=path).save(_profile("changed elsewhere with a longer goal"))
+    assert store.load().goals == "changed elsewhere with a longer goal"
+    assert len(reads) == 2
+
+
+def test_loaded_value_is_a_private_copy(tmp_path: Path) -> None:
+    store = CachedProfileStore(path=tmp_path / "user_profile.json", flusher=WriteBehindFlusher(delay=60))
+    store.save(_profile("a"))
+    p = store.load()
+    p.goals = "mutated"
+    assert store.load().goals == "a"
+
+
+def test_cached_memory_store_roundtrip(tmp_path: Path) -> None:
+    path = tmp_path / "user_memory.json"
+    store = CachedMemoryStore(path=path, flusher=WriteBehindFlusher(delay=60))
+    assert store.load() is None
+
+    mem = UserMemory(user_id="default", topics=["rl"])
+    store.save(mem)
+    assert store.load_head().topics == ["rl"]
+    assert MemoryStore(path=path).load() is None
+
+    store.flush()
+    assert MemoryStore(path=path).load().topics == ["rl"]
+
+
+def test_profile_directory_rejects_unsafe_ids_and_bounds_its_stores(tmp_path: Path) -> None:
+    assert not any(ProfileDirectory.valid_user_id(u) for u in ("alice\n", "..", "a/b", ""))
+    profiles = ProfileDirectory(tmp_path, flusher=WriteBehindFlusher(delay=60), max_cached=2)
+    for user in ("a", "b", "c"):
+        profiles.save(_profile(user).model_copy(update={"user_id": user}))
+    assert len(profiles._stores) == 3  # unwritten saves are never evicted
+
+    profiles.flush()
+    profiles.load("d")
+    assert len(profiles._stores) == 2
+    assert profiles.load("a").goals == "a"  # evicted, reloaded from disk
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import json
+import time
+
+import responses
+
+import research_learning_agent.metrics as metrics
+from research_learning_agent.metrics import REGISTRY, MetricsRegistry
+from research_learning_agent.orchestrator import Orchestrator
+from research_learning_agent.schemas import (
+    AgentAnswer, IntentResult, Plan, PlanStep, StepType, ToolCall, ToolType, UserProfile, UserQuery,
+)
+from research_learning_agent.tool_executor import ToolExecutor
+from research_learning_agent.tools.base import Tool
+from research_learning_agent.tools.http import request_json
+
+
+def _series(snapshot: dict, name: str, **labels) -> dict:
+    [s] = [s for s in snapshot["histograms"][name] if all(s["labels"].get(k) == v for k, v in labels.items())]
+    return s
+
+
+def test_histogram_percentiles_and_exports(tmp_path) -> None:
+    reg = MetricsRegistry()
+    for ms in range(1, 101):
+        reg.observe("stage_latency_ms", float(ms), stage="intent")
+    reg.inc("runs_total", action="final")
+
+    s = _series(reg.snapshot(), "stage_latency_ms", stage="intent")
+    assert s["count"] == 100
+    assert 50 <= s["p50_ms"] <= 50 * 1.25
+    assert 95 <= s["p95_ms"] <= 95 * 1.25
+    assert 99 <= s["p99_ms"] <= 99 * 1.25
+
+    prom = reg.to_prometheus()
+    assert '# TYPE rla_stage_latency_ms histogram' in prom
+    assert 'rla_stage_latency_ms_bucket{stage="intent",le="+Inf"} 100' in prom
+    assert 'rla_stage_latency_ms_count{stage="intent"} 100' in prom
+    assert 'rla_runs_total{action="final"} 1' in prom
+
+    reg.write_snapshot(tmp_path / "m.prom")
+    assert (tmp_path / "m.prom").read_text(encoding="utf-8") == prom
+    reg.write_snapshot(tmp_path / "m.json")
+    assert json.loads((tmp_path / "m.json").read_text(encoding="utf-8"))["counters"]["runs_total"][0]["value"] == 1
+
+
+class HTTPTool(Tool):
+    def run(self, query: str, top_k: int = 5):
+        data = request_json("GET", "https://api.example.com/search", max_retries=3)
+        return data["items"]
+
+
+class FakeRegistry:
+    def get(self, tool_type):
+        return HTTPTool()
+
+
+@responses.activate
+def test_tool_result_carries_latency_retries_and_backoff(monkeypatch) -> None:
+    monkeypatch.setattr("research_learning_agent.tools.http._sleep_backoff", lambda attempt: time.sleep(0.01))
+    responses.add(responses.GET, "https://api.example.com/search", status=503)
+    responses.add(responses.GET, "https://api.example.com/search", status=429)
+    responses.add(
+        responses.GET, "https://api.example.com/search",
+        json={"items": [{"title": "A", "url": "https://a.com", "snippet": "a"}]},
+    )
+
+    step = PlanStep(step_id="s1", type=StepType.research, description="r",
+                    tool_calls=[ToolCall(tool=ToolType.web_search, query="q", top_k=2)])
+    [result] = ToolExecutor(registry=FakeRegistry()).execute_step(step)
+
+    assert result.error is None
+    assert result.http_retries == 2
+    assert result.backoff_ms >= 20
+    assert result.latency_ms >= result.backoff_ms
+
+    snap = REGISTRY.snapshot()
+    assert snap["counters"]["http_retries_total"][0] == {"labels": {"host": "api.example.com"}, "value": 2.0}
+    assert _series(snap, "http_attempt_ms", outcome="503")["count"] == 1
+    assert _series(snap, "http_attempt_ms", outcome="200")["count"] == 1
+    assert _series(snap, "tool_latency_ms", tool="web_search", outcome="ok")["count"] == 1
+
+
+class FakeIntent:
+    def classify(self, question, profile):
+        return IntentResult(intent="casual_curiosity", confidence=0.9, rationale="r")
+
+
+class FakePlanner:
+    def create_plan(self, question, profile, intent):
+        return Plan(goal="g", intent=intent.intent, steps=[PlanStep(step_id="s1", type=StepType.finalize, description="f")])
+
+
+class SlowGenerator:
+    def generate(self, *, query, profile, intent, plan, tool_results, spec, force_final=False):
+        time.sleep(0.02)
+        return AgentAnswer(explanation="ok")
+
+
+def test_orchestrator_reports_stage_timings(monkeypatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(metrics, "SNAPSHOT_INTERVAL_S", 0.0)
+    orch = Orchestrator()
+    orch.intent, orch.planner, orch.generator = FakeIntent(), FakePlanner(), SlowGenerator()
+
+    res = orch.run(UserQuery(question="what is rl"), UserProfile(user_id="u1", background="", level="beginner", goals=""))
+
+    assert set(res.timings_ms) == {"intent", "plan", "tools", "pedagogy", "generate", "total"}
+    assert res.timings_ms["generate"] >= 20
+    assert res.timings_ms["total"] >= sum(v for k, v in res.timings_ms.items() if k != "total")
+
+    written = json.loads(metrics.SNAPSHOT_PATH.read_text(encoding="utf-8"))
+    assert _series(written, "stage_latency_ms", stage="generate")["count"] == 1
+    assert written["counters"]["orchestrator_runs_total"][0]["labels"] == {"action": "final"}
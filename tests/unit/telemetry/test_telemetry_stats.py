@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+import research_learning_agent.telemetry as telemetry
+from research_learning_agent.scripts import intent_stats
+from research_learning_agent.telemetry_stats import IntentStats
+
+
+def _event(i: int, *, hour: int = 10, llm_ms: float | None = None, confidence: float = 0.8) -> dict:
+    e = {
+        "query": f"q{i}", "intent": "casual_curiosity" if i % 2 else "guided_study",
+        "confidence": confidence, "use_llm": llm_ms is not None, "stage": "llm" if llm_ms is not None else "rules",
+        "ts": f"2026-10-19T{hour:02d}:15:00+00:00",
+    }
+    if llm_ms is not None:
+        e["llm_ms"] = llm_ms
+    return e
+
+
+def _append(path: Path, events: list[dict], partial: str = "") -> None:
+    with path.open("a", encoding="utf-8") as f:
+        f.write("".join(json.dumps(e) + "\n" for e in events) + partial)
+
+
+def test_only_new_complete_lines_are_read(tmp_path: Path) -> None:
+    log, state = tmp_path / "intent_events.jsonl", tmp_path / "state.json"
+    _append(log, [_event(i) for i in range(3)])
+    stats = IntentStats()
+    assert stats.update(log) == 3
+    stats.save(state)
+
+    tail = json.dumps(_event(5))
+    _append(log, [_event(3), _event(4)], partial=tail[:10])
+    stats = IntentStats.load(state)
+    assert stats.update(log) == 2
+    assert stats.update(log) == 0
+
+    with log.open("a", encoding="utf-8") as f:
+        f.write(tail[10:] + "\n")
+    assert stats.update(log) == 1
+    assert stats.events == 6
+
+
+def test_rotation_does_not_double_count(tmp_path: Path) -> None:
+    log = tmp_path / "intent_events.jsonl"
+    _append(log, [_event(i) for i in range(4)])
+    stats = IntentStats()
+    stats.update(log)
+
+    _append(log, [_event(4), _event(5)])
+    telemetry._rotate(log)
+    _append(log, [_event(6)])
+    _append(tmp_path / "other.jsonl", [_event(99)])
+
+    assert stats.update(log) == 3
+    assert stats.events == 7
+    assert stats.update(log) == 0
+
+    # a fresh run over the same files sees everything once
+    assert IntentStats().update(log) == 7
+
+
+def test_summary_rates_latency_and_windows(tmp_path: Path) -> None:
+    log = tmp_path / "intent_events.jsonl"
+    _append(log, [_event(i, hour=9) for i in range(6)])
+    _append(log, [_event(i, hour=10, llm_ms=100.0 * (i + 1), confidence=0.6) for i in range(4)])
+    _append(log, [{"intent": "guided_study", "confidence": 0.9}])  # no timestamp
+    _append(log, [{**_event(9, hour=8, confidence=0.9), "use_llm": True, "stage": "llm", "cached": True}])
+    log.write_text(log.read_text(encoding="utf-8") + "not json\n", encoding="utf-8")
+    stats = IntentStats()
+    stats.update(log)
+    assert stats.bad_lines == 1
+
+    overall = stats.summary()
+    assert overall["events"] == 12
+    assert overall["llm_use_rate"] == round(4 / 12, 4)  # the cache hit made no LLM call
+    assert overall["low_confidence_rate"] == round(4 / 12, 4)
+
+    since = datetime(2026, 10, 19, 10, tzinfo=timezone.utc)
+    recent = stats.summary(since)
+    assert recent["events"] == 4
+    assert recent["llm_use_rate"] == 1.0
+    p50, p99 = recent["llm_latency_ms"]["p50"], recent["llm_latency_ms"]["p99"]
+    assert 200 <= p50 <= 250
+    assert 400 <= p99 <= 500
+    assert stats.summary(until=since)["events"] == 7
+
+
+def test_cli_checkpoints_between_runs(tmp_path: Path, capsys) -> None:
+    log, state = tmp_path / "intent_events.jsonl", tmp_path / "state.json"
+    _append(log, [_event(i, llm_ms=50.0) for i in range(3)])
+    argv = ["--events", str(log), "--state", str(state), "--json"]
+
+    assert intent_stats.main(argv) == 0
+    first = json.loads(capsys.readouterr().out)
+    assert (first["events"], first["new_events"]) == (3, 3)
+
+    _append(log, [_event(3)])
+    assert intent_stats.main(argv) == 0
+    second = json.loads(capsys.readouterr().out)
+    assert (second["events"], second["new_events"]) == (4, 1)
+
+    assert intent_stats.main(["--events", str(log), "--state", str(state), "--by", "hour"]) == 0
+    assert "2026-10-19T10" in capsys.readouterr().out
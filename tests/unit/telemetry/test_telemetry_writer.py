@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import research_learning_agent.telemetry as telemetry
+from research_learning_agent.intent_escalation import recent_events
+from research_learning_agent.intent_model import load_training_data
+from research_learning_agent.telemetry import TelemetryWriter, read_events, rotated_files
+
+
+def _lines(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def _wait_for_lines(path: Path, n: int) -> list[dict]:
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        if path.exists() and len(rows := _lines(path)) >= n:
+            return rows
+        time.sleep(0.01)
+    return _lines(path) if path.exists() else []
+
+
+def test_flush_writes_batched_events_per_file(tmp_path: Path) -> None:
+    writer = TelemetryWriter(flush_interval_s=60)
+    a, b = tmp_path / "a.jsonl", tmp_path / "b.jsonl"
+    writer.submit(a, [{"i": i} for i in range(5)])
+    writer.submit(b, [{"i": 99}])
+    assert writer.flush()
+
+    assert [e["i"] for e in _lines(a)] == [0, 1, 2, 3, 4]
+    assert _lines(b) == [{"i": 99}]
+    assert writer.stats()["written"] == 6
+    writer.close()
+
+
+def test_interval_and_batch_size_trigger_writes(tmp_path: Path) -> None:
+    path = tmp_path / "events.jsonl"
+    writer = TelemetryWriter(flush_interval_s=0.05, batch_size=1000)
+    writer.submit(path, [{"i": 1}])
+    assert _wait_for_lines(path, 1) == [{"i": 1}]
+
+    writer = TelemetryWriter(flush_interval_s=60, batch_size=3)
+    path = tmp_path / "batched.jsonl"
+    writer.submit(path, [{"i": i} for i in range(3)])
+    assert len(_wait_for_lines(path, 3)) == 3
+
+
+def test_full_queue_drops_and_counts(tmp_path: Path, monkeypatch) -> None:
+    release = threading.Event()
+    real_write = telemetry._write_lines
+    monkeypatch.setattr(telemetry, "_write_lines", lambda p, lines: (release.wait(5), real_write(p, lines)))
+
+    writer = TelemetryWriter(queue_size=4, batch_size=1)
+    path = tmp_path / "events.jsonl"
+    dropped = sum(writer.submit(path, [{"i": i}]) for i in range(50))
+
+    assert dropped > 0
+    assert writer.stats()["dropped"] == dropped
+    release.set()
+    writer.flush()
+    assert len(_lines(path)) == 50 - dropped
+
+
+def test_rotates_by_size_into_gzip(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(telemetry, "MAX_FILE_BYTES", 200)
+    path = tmp_path / "events.jsonl"
+    writer = TelemetryWriter(batch_size=1)
+    for i in range(20):
+        writer.submit(path, [{"i": i, "pad": "x" * 30}])
+    writer.flush()
+
+    archived = rotated_files(path)
+    assert archived
+    rows = [json.loads(line) for f in archived for line in gzip.open(f, "rt", encoding="utf-8")]
+    rows += _lines(path)
+    assert [r["i"] for r in rows] == list(range(20))
+    assert all(f.stat().st_size < 200 for f in archived)
+
+
+def test_rotates_when_file_is_from_an_earlier_day(tmp_path: Path, monkeypatch) -> None:
+    path = tmp_path / "events.jsonl"
+    path.write_text(json.dumps({"i": 0}) + "\n", encoding="utf-8")
+    yesterday = time.time() - 2 * 86400
+    os.utime(path, (yesterday, yesterday))
+
+    writer = TelemetryWriter()
+    writer.submit(path, [{"i": 1}])
+    writer.flush()
+    assert rotated_files(path) == []  # daily rotation is opt-in
+
+    monkeypatch.setattr(telemetry, "ROTATE_DAILY", True)
+    path.write_text(json.dumps({"i": 0}) + "\n", encoding="utf-8")
+    os.utime(path, (yesterday, yesterday))
+    writer.submit(path, [{"i": 1}])
+    writer.flush()
+
+    assert _lines(path) == [{"i": 1}]
+    [archived] = rotated_files(path)
+    assert gzip.open(archived, "rt", encoding="utf-8").read() == json.dumps({"i": 0}) + "\n"
+
+
+def test_readers_see_rotated_archives(tmp_path: Path) -> None:
+    path = tmp_path / "intent_events.jsonl"
+    event = {"intent": "guided_study", "confidence": 0.6, "use_llm": True, "stage": "llm"}
+    path.write_text("".join(json.dumps({**event, "query": f"q{i}"}) + "\n" for i in range(3)), encoding="utf-8")
+    telemetry._rotate(path)
+    path.write_text("".join(json.dumps({**event, "query": f"q{i}"}) + "\n" for i in range(3, 5)) + "{partial", encoding="utf-8")
+
+    assert [e["query"] for e in read_events(path)] == ["q0", "q1", "q2", "q3", "q4"]
+    assert [e["query"] for e in recent_events(path, 3)] == ["q2", "q3", "q4"]
+    texts, _ = load_training_data(tmp_path / "no_cases.json", path, exclude_holdout=False)
+    assert texts == ["q0", "q1", "q2", "q3", "q4"]
+
+
+def test_log_helpers_go_through_the_writer() -> None:
+    telemetry.log_intent_event({"query": "q", "intent": "casual_curiosity"})
+    telemetry.log_intent_events([{"query": "a"}, {"query": "b"}])
+    assert telemetry.flush()
+
+    events = _lines(telemetry.INTENT_LOG_PATH)
+    assert [e["query"] for e in events] == ["q", "a", "b"]
+    assert events[1]["ts"] == events[2]["ts"]
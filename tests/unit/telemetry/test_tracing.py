@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import responses
+
+import research_learning_agent.telemetry as telemetry
+from research_learning_agent.orchestrator import Orchestrator
+from research_learning_agent.schemas import (
+    AgentAnswer, IntentResult, Plan, PlanStep, StepType, ToolCall, ToolType, UserProfile, UserQuery,
+)
+from research_learning_agent.scripts import trace_view
+from research_learning_agent.tool_executor import ToolExecutor
+from research_learning_agent.tool_registry import WebToolWithFallback
+from research_learning_agent.tools.base import Tool
+from research_learning_agent.tools.http import request_json
+from research_learning_agent.tracing import bind, critical_path, load_spans, span, start_trace
+
+
+class PrimaryTool(Tool):
+    def run(self, query: str, top_k: int = 5):
+        return request_json("GET", "https://primary.example.com/search", max_retries=2)["items"]
+
+
+class FallbackTool(Tool):
+    def run(self, query: str, top_k: int = 5):
+        return [{"title": "F", "url": "https://f.com", "snippet": "f"}]
+
+
+class FakeRegistry:
+    def get(self, tool_type):
+        return WebToolWithFallback(PrimaryTool(), FallbackTool())
+
+
+class FakeIntent:
+    def classify(self, question, profile):
+        with span("intent.classify"):
+            return IntentResult(intent="casual_curiosity", confidence=0.9, rationale="r")
+
+
+class FakePlanner:
+    def create_plan(self, question, profile, intent):
+        step = PlanStep(step_id="s1", type=StepType.research, description="r",
+                        tool_calls=[ToolCall(tool=ToolType.web_search, query="q", top_k=2)])
+        return Plan(goal="g", intent=intent.intent, steps=[step])
+
+
+class FakeGenerator:
+    def generate(self, *, query, profile, intent, plan, tool_results, spec, force_final=False):
+        return AgentAnswer(explanation="ok")
+
+
+def _by_name(spans: list[dict]) -> dict[str, list[dict]]:
+    out: dict[str, list[dict]] = {}
+    for s in spans:
+        out.setdefault(s["name"], []).append(s)
+    return out
+
+
+@responses.activate
+def test_orchestrator_run_exports_nested_spans(monkeypatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr("research_learning_agent.tools.http._sleep_backoff", lambda attempt: time.sleep(0.005))
+    responses.add(responses.GET, "https://primary.example.com/search", status=503)
+    responses.add(responses.GET, "https://primary.example.com/search", status=503)
+
+    orch = Orchestrator()
+    orch.intent, orch.planner, orch.generator = FakeIntent(), FakePlanner(), FakeGenerator()
+    orch.tools = ToolExecutor(registry=FakeRegistry())
+    profile = UserProfile(user_id="u1", background="", level="beginner", goals="")
+    res = orch.run(UserQuery(question="what is rl"), profile, trace_id="t-1")
+
+    assert res.trace_id == "t-1"
+    assert res.tool_results[0].results[0]["url"] == "https://f.com"
+    telemetry.flush()
+    spans = load_spans(telemetry.TRACE_LOG_PATH, "t-1")
+    names = _by_name(spans)
+    ids = {s["span_id"]: s for s in spans}
+
+    def parent(name: str) -> str:
+        return ids[names[name][0]["parent_id"]]["name"]
+
+    [root] = names["orchestrator.run"]
+    assert root["parent_id"] is None and root["attrs"]["action"] == "final"
+    assert parent("intent.classify") == "orchestrator.intent"
+    assert parent("tool.call") == "orchestrator.tools"
+    assert parent("web_search.primary") == "tool.call"
+    assert parent("web_search.fallback") == "tool.call"
+    assert parent("http.request") == "web_search.primary"
+    assert {parent("http.attempt"), parent("http.backoff")} == {"http.request"}
+
+    [primary] = names["web_search.primary"]
+    assert primary["status"] == "error" and "ToolHTTPError" in primary["error"]
+    assert names["tool.call"][0]["attrs"]["fallback"] == "FallbackTool"
+    assert [a["attrs"]["outcome"] for a in names["http.attempt"]] == ["503", "503"]
+
+
+def test_bind_carries_trace_into_worker_threads() -> None:
+    def work(i: int) -> None:
+        with span("worker", i=i):
+            time.sleep(0.001)
+
+    with start_trace("batch", trace_id="t-2"):
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            list(pool.map(bind(work), range(3)))
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pool.submit(work, 99).result()  # not bound: no trace context, no span
+
+    telemetry.flush()
+    spans = load_spans(telemetry.TRACE_LOG_PATH, "t-2")
+    [root] = [s for s in spans if s["name"] == "batch"]
+    workers = [s for s in spans if s["name"] == "worker"]
+    assert sorted(w["attrs"]["i"] for w in workers) == [0, 1, 2]
+    assert all(w["parent_id"] == root["span_id"] for w in workers)
+
+
+def _s(span_id: str, parent: str | None, start: float, dur: float) -> dict:
+    return {"trace_id": "t", "span_id": span_id, "parent_id": parent, "name": span_id,
+            "start_ms": start, "duration_ms": dur, "attrs": {}, "status": "ok", "error": None}
+
+
+def test_critical_path_follows_slowest_parallel_branch() -> None:
+    spans = [
+        _s("root", None, 0, 100),
+        _s("plan", "root", 0, 20),
+        _s("fast", "root", 20, 10),
+        _s("slow", "root", 20, 60),
+        _s("llm", "slow", 25, 50),
+        _s("generate", "root", 80, 15),
+    ]
+    path = critical_path(spans)
+    assert [s["name"] for s in path] == ["root", "plan", "slow", "llm", "generate"]
+    assert {s["name"]: s["self_ms"] for s in path}["root"] == 5
+    assert {s["name"]: s["self_ms"] for s in path}["slow"] == 10
+
+
+def test_trace_view_cli(capsys) -> None:
+    with start_trace("orchestrator.run", trace_id="t-3"):
+        with span("orchestrator.generate"):
+            time.sleep(0.002)
+    telemetry.flush()
+
+    argv = ["--traces", str(telemetry.TRACE_LOG_PATH)]
+    assert trace_view.main(argv) == 0
+    out = capsys.readouterr().out
+    assert "Trace t-3" in out and "orchestrator.generate" in out and "Critical path" in out
+
+    assert trace_view.main([*argv, "--list", "5"]) == 0
+    assert capsys.readouterr().out.startswith("t-3")
+    assert trace_view.main([*argv, "missing"]) == 1